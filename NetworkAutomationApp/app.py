@@ -4,29 +4,119 @@ Flask API Backend pour Application d'Automatisation Réseau
 Compatible avec Flask 2.3+
 """
 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_request_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from datetime import datetime, timedelta
 import os
 import json
+import time
 from pathlib import Path
 
+from modules import metrics, profiling
+
 # Configuration
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///network_automation.db'
+# Base surchargeable (benchmarks, déploiements): NETAUTO_DATABASE_URI=sqlite:////chemin/base.db
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('NETAUTO_DATABASE_URI', 'sqlite:///network_automation.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JSON_SORT_KEYS'] = False
+app.config['NETAUTO_CONFIG'] = os.environ.get('NETAUTO_CONFIG', str(Path(__file__).parent / 'config' / 'devices.yaml'))
 
 db = SQLAlchemy(app)
 CORS(app)
 
+# ===== MÉTRIQUES =====
+# Actives par défaut côté API (NETAUTO_METRICS=0 pour les couper), exposées sur /metrics
+
+if os.environ.get('NETAUTO_METRICS', '1').lower() not in ('0', 'false', 'no', 'off'):
+    metrics.enable()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if metrics.is_enabled() and has_request_context():
+        g._metrics_query_start = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if metrics.is_enabled() and has_request_context() and 'metrics_start' in g:
+        g._metrics_db_time += time.perf_counter() - g.pop('_metrics_query_start', time.perf_counter())
+        g._metrics_db_queries += 1
+
+@app.before_request
+def _metrics_before_request():
+    if metrics.is_enabled():
+        g.metrics_start = time.perf_counter()
+        g._metrics_db_time = 0.0
+        g._metrics_db_queries = 0
+
+@app.after_request
+def _metrics_after_request(response):
+    if metrics.is_enabled() and 'metrics_start' in g:
+        # Endpoint Flask (nom de la vue) plutôt que l'URL: cardinalité bornée
+        endpoint = request.endpoint or 'unmatched'
+        metrics.observe('http_request_seconds', time.perf_counter() - g.metrics_start, endpoint=endpoint)
+        metrics.inc('http_requests_total', endpoint=endpoint, status=str(response.status_code))
+        if g._metrics_db_queries:
+            metrics.observe('db_query_seconds', g._metrics_db_time, endpoint=endpoint)
+            metrics.inc('db_queries_total', g._metrics_db_queries, endpoint=endpoint)
+    return response
+
+# ===== PROFILAGE À LA DEMANDE =====
+# Activé à chaud via /api/profiling; une requête est profilée si elle porte
+# l'en-tête X-Profile: 1 ou le paramètre ?profile=1
+
+@app.before_request
+def _profiling_before_request():
+    if not profiling.is_enabled() or request.endpoint == 'profiling_settings':
+        return
+    if profiling.requested(request.headers.get('X-Profile')) or profiling.requested(request.args.get('profile')):
+        session = profiling.ProfileSession(threads=False)
+        if session.start():
+            g.profile_session = session
+
+@app.after_request
+def _profiling_after_request(response):
+    session = g.pop('profile_session', None)
+    if session is not None:
+        path = profiling.write_profile(session.stop(), f"api_{request.endpoint or 'unmatched'}")
+        response.headers['X-Profile-File'] = path.name
+    return response
+
+@app.teardown_request
+def _profiling_teardown(exc):
+    # Exception non gérée: after_request n'est pas appelé, la session doit être libérée
+    session = g.pop('profile_session', None)
+    if session is not None:
+        session.stop()
+
+@app.route('/api/profiling', methods=['GET', 'POST'])
+def profiling_settings():
+    """État du profilage (GET) ou activation à chaud (POST {"enabled": bool})"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if 'enabled' not in data:
+            return jsonify({'error': "Champ 'enabled' requis"}), 400
+        if data['enabled']:
+            profiling.enable()
+        else:
+            profiling.disable()
+    return jsonify({
+        'enabled': profiling.is_enabled(),
+        'directory': profiling.PROFILE_DIR,
+        'profiles': profiling.recent_profiles()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Métriques au format texte Prometheus"""
+    return app.response_class(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 # --- Ajout: servir le frontend build si présent ---
 from flask import send_from_directory, send_file
 import io
-from modules.reports import ReportGenerator
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -55,6 +145,8 @@ class Device(db.Model):
     username = db.Column(db.String(100), nullable=False)
     password = db.Column(db.String(100), nullable=False)
     status = db.Column(db.String(20), default='offline')
+    location = db.Column(db.String(100))
+    port = db.Column(db.Integer, default=22)
     uptime = db.Column(db.String(100))
     interfaces_count = db.Column(db.Integer, default=0)
     cpu_usage = db.Column(db.Float, default=0)
@@ -65,6 +157,7 @@ class Device(db.Model):
     # Relations
     monitoring_data = db.relationship('MonitoringData', backref='device', lazy=True, cascade='all, delete-orphan')
     backups = db.relationship('Backup', backref='device', lazy=True, cascade='all, delete-orphan')
+    alerts = db.relationship('Alert', backref='device', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -73,6 +166,8 @@ class Device(db.Model):
             'ip': self.ip,
             'device_type': self.device_type,
             'status': self.status,
+            'location': self.location,
+            'port': self.port,
             'uptime': self.uptime,
             'interfaces_count': self.interfaces_count,
             'cpu_usage': self.cpu_usage,
@@ -86,13 +181,16 @@ class MonitoringData(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     device_id = db.Column(db.Integer, db.ForeignKey('devices.id'), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     latency = db.Column(db.Float)  # ms
     packet_loss = db.Column(db.Float)  # %
     cpu_usage = db.Column(db.Float)  # %
     memory_usage = db.Column(db.Float)  # %
     availability = db.Column(db.Float)  # %
     
+    # Historique d'un équipement (/api/monitoring/<id>) et fenêtres des dashboards
+    __table_args__ = (db.Index('ix_monitoring_data_device_timestamp', 'device_id', 'timestamp'),)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -116,6 +214,9 @@ class Backup(db.Model):
     size = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Purge de rétention par lots (modules/backup_scheduler.prune_rows)
+    __table_args__ = (db.Index('ix_backups_created_at', 'created_at'),)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -145,12 +246,119 @@ class Report(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+class Alert(db.Model):
+    """Modèle pour les alertes sur seuils (une ligne active par équipement et métrique)"""
+    __tablename__ = 'alerts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    device_id = db.Column(db.Integer, db.ForeignKey('devices.id'), nullable=False)
+    metric = db.Column(db.String(30), nullable=False)  # latency, packet_loss, cpu, memory
+    severity = db.Column(db.String(20), nullable=False)  # warning, critical
+    status = db.Column(db.String(20), default='active')  # active, resolved
+    value = db.Column(db.Float)
+    peak = db.Column(db.Float)
+    threshold = db.Column(db.Float)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime)
+    
+    # Alertes actives d'un équipement (reprise du moteur, mise à jour à chaque transition)
+    __table_args__ = (db.Index('ix_alerts_device_status', 'device_id', 'status'),)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'device_id': self.device_id,
+            'metric': self.metric,
+            'severity': self.severity,
+            'status': self.status,
+            'value': self.value,
+            'peak': self.peak,
+            'threshold': self.threshold,
+            'started_at': self.started_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None
+        }
+
+class Agent(db.Model):
+    """Modèle pour les agents de collecte distants (collector_agent.py)"""
+    __tablename__ = 'agents'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    hostname = db.Column(db.String(100))
+    locations = db.Column(db.Text, default='[]')  # JSON; liste vide = toutes les locations
+    capacity = db.Column(db.Integer, default=0)  # équipements au plus, 0 = sans limite
+    credentials = db.Column(db.Boolean, default=False)  # identifiants SSH transmis avec les baux (métriques hôte)
+    token_hash = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), default='active')  # active, expired, stopped
+    samples = db.Column(db.Integer, default=0)
+    registered_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen = db.Column(db.DateTime, default=datetime.utcnow)
+    lease_expires_at = db.Column(db.DateTime)
+    
+    leases = db.relationship('DeviceLease', backref='agent', lazy=True, cascade='all, delete-orphan')
+    
+    @property
+    def location_list(self):
+        return json.loads(self.locations or '[]')
+    
+    def to_dict(self, devices=0):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'hostname': self.hostname,
+            'locations': self.location_list,
+            'capacity': self.capacity,
+            'credentials': bool(self.credentials),
+            'status': self.status,
+            'devices': devices,
+            'samples': self.samples,
+            'registered_at': self.registered_at.isoformat(),
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None,
+            'lease_expires_at': self.lease_expires_at.isoformat() if self.lease_expires_at else None
+        }
+
+class DeviceLease(db.Model):
+    """Bail d'un équipement par un agent (au plus un agent par équipement)"""
+    __tablename__ = 'device_leases'
+    
+    device_id = db.Column(db.Integer, db.ForeignKey('devices.id', ondelete='CASCADE'), primary_key=True)
+    agent_id = db.Column(db.Integer, db.ForeignKey('agents.id'), nullable=False)
+    acquired_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    # Baux d'un agent (renouvellement, envoi des mesures) et baux expirés (réattribution)
+    __table_args__ = (db.Index('ix_device_leases_agent', 'agent_id'),
+                      db.Index('ix_device_leases_expires_at', 'expires_at'))
+
 # ===== INITIALISATION BASE DE DONNÉES =====
 
+# Colonnes ajoutées après la création des premières bases: (table, colonne)
+ADDED_COLUMNS = (('devices', 'location'), ('devices', 'port'), ('agents', 'credentials'))
+
+def _add_missing_columns():
+    """create_all ne modifie pas les tables existantes: ALTER TABLE des colonnes manquantes"""
+    from sqlalchemy import inspect, text
+    
+    inspector = inspect(db.engine)
+    for table, column in ADDED_COLUMNS:
+        if column in {c['name'] for c in inspector.get_columns(table)}:
+            continue
+        column_type = db.Model.metadata.tables[table].c[column].type.compile(db.engine.dialect)
+        with db.engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+        print(f"[+] Colonne {table}.{column} ajoutée")
+
 def init_db():
     """Initialise la base de données"""
     with app.app_context():
         db.create_all()
+        _add_missing_columns()
+        # create_all ne crée pas les index des tables déjà existantes
+        for index in [*MonitoringData.__table__.indexes, *Backup.__table__.indexes, *Alert.__table__.indexes,
+                      *DeviceLease.__table__.indexes]:
+            index.create(bind=db.engine, checkfirst=True)
         print("[+] Base de données initialisée")
 
 # ===== ROUTES API =====
@@ -184,7 +392,9 @@ def create_device():
         ip=data['ip'],
         device_type=data['device_type'],
         username=data['username'],
-        password=data['password']
+        password=data['password'],
+        location=data.get('location'),
+        port=data.get('port', 22)
     )
     
     db.session.add(device)
@@ -199,6 +409,8 @@ def update_device(device_id):
     data = request.get_json()
     
     device.status = data.get('status', device.status)
+    device.location = data.get('location', device.location)
+    device.port = data.get('port', device.port)
     device.uptime = data.get('uptime', device.uptime)
     device.interfaces_count = data.get('interfaces_count', device.interfaces_count)
     device.cpu_usage = data.get('cpu_usage', device.cpu_usage)
@@ -213,6 +425,8 @@ def update_device(device_id):
 def delete_device(device_id):
     """Supprime un équipement"""
     device = Device.query.get_or_404(device_id)
+    # SQLite n'applique pas ON DELETE CASCADE sans PRAGMA foreign_keys
+    DeviceLease.query.filter_by(device_id=device_id).delete(synchronize_session=False)
     db.session.delete(device)
     db.session.commit()
     
@@ -236,9 +450,15 @@ def create_monitoring_data(device_id):
     """Crée une nouvelle mesure de monitoring"""
     device = Device.query.get_or_404(device_id)
     data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Données manquantes'}), 400
+    invalid = [name for name in SAMPLE_METRICS if not _is_metric(data.get(name))]
+    if invalid:
+        return jsonify({'error': f"Nombres attendus: {', '.join(invalid)}"}), 400
     
     monitoring = MonitoringData(
         device_id=device_id,
+        timestamp=datetime.utcnow(),
         latency=data.get('latency'),
         packet_loss=data.get('packet_loss'),
         cpu_usage=data.get('cpu_usage'),
@@ -247,10 +467,41 @@ def create_monitoring_data(device_id):
     )
     
     db.session.add(monitoring)
+    _evaluate_alerts(monitoring)
     db.session.commit()
     
     return jsonify(monitoring.to_dict()), 201
 
+@app.route('/api/monitoring/heatmap', methods=['GET'])
+def get_latency_heatmap():
+    """
+    Heatmap des latences équipements x intervalles
+    
+    Paramètres: hours (défaut 24), buckets (colonnes max, défaut 200).
+    La matrice est découpée dans le store memmap (instance/latency_store),
+    mis à jour avec les seules mesures ajoutées depuis l'appel précédent.
+    """
+    import numpy as np
+    from modules.dashboard_data import to_datetimes
+    from modules.latency_store import latency_heatmap
+    
+    if db.engine.url.get_backend_name() != 'sqlite':
+        return jsonify({'error': 'Heatmap disponible uniquement avec SQLite'}), 501
+    
+    hours = min(max(request.args.get('hours', 24, type=int), 1), 720)
+    buckets = min(max(request.args.get('buckets', 200, type=int), 1), 1000)
+    
+    devices, bucket_starts, matrix = latency_heatmap(
+        db.engine.url.database, hours, buckets,
+        os.path.join(app.instance_path, 'latency_store')
+    )
+    return jsonify({
+        'hours': hours,
+        'devices': devices,
+        'x': to_datetimes(bucket_starts),
+        'z': np.where(np.isnan(matrix), None, matrix).tolist()
+    })
+
 # 3. BACKUPS ENDPOINTS
 @app.route('/api/backups', methods=['GET'])
 def get_backups():
@@ -337,6 +588,89 @@ def scan_network():
         'message': 'Scan en cours...'
     }), 202
 
+# Disponibilité glissante par équipement (anneau en mémoire, amorcé une fois depuis la base)
+AVAILABILITY_WINDOW = 100
+_availability = None
+# Instantanés /proc précédents par équipement (CPU et débits par écarts de compteurs)
+_proc_collector = None
+# Moteur d'alertes sur seuils (état par équipement en mémoire, repris des alertes actives)
+_alert_engine = None
+# Envoi des alertes (email, Slack, syslog) par un thread de fond, regroupées par rafale
+_notifications = None
+
+def _epoch(moment):
+    """datetime UTC naïf -> secondes"""
+    return (moment - datetime(1970, 1, 1)).total_seconds()
+
+def _evaluate_alerts(mon_data):
+    """Évalue une mesure contre les seuils et répercute les transitions sur la table alerts"""
+    global _alert_engine
+    from modules.alerts import AlertEngine, AlertRules, load_thresholds
+    
+    if _alert_engine is None:
+        thresholds = load_thresholds(app.config['NETAUTO_CONFIG'])
+        _alert_engine = AlertEngine(AlertRules.from_config(thresholds))
+    device_id = mon_data.device_id
+    if not _alert_engine.has(device_id):
+        for alert in Alert.query.filter_by(device_id=device_id, status='active'):
+            _alert_engine.restore(device_id, alert.metric, alert.severity,
+                                  _epoch(alert.started_at), alert.peak)
+    
+    events = _alert_engine.process(device_id, {
+        'latency': mon_data.latency,
+        'packet_loss': mon_data.packet_loss,
+        'cpu_usage': mon_data.cpu_usage,
+        'memory_usage': mon_data.memory_usage
+    }, _epoch(mon_data.timestamp))
+    for alert_event in events:
+        alert = Alert.query.filter_by(device_id=device_id, metric=alert_event['metric'], status='active').first()
+        if alert_event['level'] == 'ok':
+            if alert is not None:
+                alert.status = 'resolved'
+                alert.value = alert_event['value']
+                alert.updated_at = alert.resolved_at = mon_data.timestamp
+            continue
+        if alert is None:
+            alert = Alert(device_id=device_id, metric=alert_event['metric'], started_at=mon_data.timestamp)
+            db.session.add(alert)
+        alert.severity = alert_event['level']
+        alert.value = alert_event['value']
+        alert.peak = alert_event['peak']
+        alert.threshold = alert_event['threshold']
+        alert.updated_at = mon_data.timestamp
+    if events:
+        hostname = Device.query.get(device_id).hostname
+        dispatcher = _notification_dispatcher()
+        for alert_event in events:
+            dispatcher.submit(dict(alert_event, device=hostname))
+    return events
+
+def _notification_dispatcher():
+    """Répartiteur des notifications, créé au premier événement d'alerte"""
+    global _notifications
+    if _notifications is None:
+        import atexit
+        from modules.notifications import NotificationDispatcher, load_notifications
+        _notifications = NotificationDispatcher.from_config(load_notifications(app.config['NETAUTO_CONFIG']))
+        # Récapitulatifs en attente envoyés à l'arrêt du serveur
+        atexit.register(_notifications.close)
+    return _notifications
+
+def _rolling_availability(device_id, packet_loss):
+    """Ajoute l'échantillon à l'anneau de l'équipement et retourne la disponibilité (%)"""
+    global _availability
+    from modules.monitoring import RollingAvailability
+    
+    if _availability is None:
+        _availability = RollingAvailability(AVAILABILITY_WINDOW)
+    if not _availability.has(device_id):
+        recent = MonitoringData.query.with_entities(MonitoringData.packet_loss)\
+            .filter_by(device_id=device_id)\
+            .order_by(MonitoringData.timestamp.desc())\
+            .limit(AVAILABILITY_WINDOW - 1).all()
+        _availability.seed(device_id, [row.packet_loss for row in reversed(recent)])
+    return _availability.add(device_id, packet_loss)
+
 @app.route('/api/actions/monitor/<int:device_id>', methods=['POST'])
 def start_monitoring(device_id):
     """Lance le monitoring sur un équipement"""
@@ -347,26 +681,50 @@ def start_monitoring(device_id):
         monitoring = NetworkMonitoring()
         
         ping_result = monitoring.ping_monitor(device.ip, count=4)
+        packet_loss = ping_result.get('packet_loss', 0 if ping_result['success'] else 100.0)
         
-        # Sauvegarder les données
+        # CPU et mémoire: une lecture /proc en une commande, seulement si l'hôte répond.
+        # Le CPU demande deux lectures: absent au premier échantillon d'un équipement.
+        global _proc_collector
+        usage = {}
         if ping_result['success']:
-            mon_data = MonitoringData(
-                device_id=device_id,
-                latency=ping_result.get('avg_rtt'),
-                packet_loss=0,
-                availability=100
-            )
-            db.session.add(mon_data)
-            device.status = 'online'
-        else:
-            device.status = 'offline'
+            from modules.proc_collector import ProcCollector
+            if _proc_collector is None:
+                _proc_collector = ProcCollector()
+            usage = _proc_collector.sample({
+                'name': device.hostname,
+                'host': device.ip,
+                'port': device.port or 22,
+                'username': device.username,
+                'password': device.password
+            })
+            if usage.get('cpu_usage') is not None:
+                device.cpu_usage = usage['cpu_usage']
+            if usage.get('memory_usage') is not None:
+                device.memory_usage = usage['memory_usage']
         
+        # Échantillon enregistré même sans réponse: la disponibilité en dépend
+        mon_data = MonitoringData(
+            device_id=device_id,
+            timestamp=datetime.utcnow(),
+            latency=ping_result.get('avg_rtt'),
+            packet_loss=packet_loss,
+            cpu_usage=usage.get('cpu_usage'),
+            memory_usage=usage.get('memory_usage'),
+            availability=_rolling_availability(device_id, packet_loss)
+        )
+        db.session.add(mon_data)
+        alerts = _evaluate_alerts(mon_data)
+        device.status = 'online' if ping_result['success'] else 'offline'
         device.last_check = datetime.utcnow()
         db.session.commit()
         
         return jsonify({
             'status': device.status,
-            'result': ping_result
+            'result': ping_result,
+            'usage': usage,
+            'availability': mon_data.availability,
+            'alerts': alerts
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -384,7 +742,7 @@ def backup_device(device_id):
             'host': device.ip,
             'username': device.username,
             'password': device.password,
-            'port': 22,
+            'port': device.port or 22,
             'device_type': device.device_type
         }
         
@@ -409,6 +767,396 @@ def backup_device(device_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# 7. ALERTS ENDPOINTS
+@app.route('/api/alerts', methods=['GET'])
+def get_alerts():
+    """Alertes sur seuils (?status=active|resolved|all, device_id, severity, limit)"""
+    status = request.args.get('status', 'active')
+    query = Alert.query
+    if status != 'all':
+        query = query.filter_by(status=status)
+    if request.args.get('device_id'):
+        query = query.filter_by(device_id=request.args.get('device_id', type=int))
+    if request.args.get('severity'):
+        query = query.filter_by(severity=request.args['severity'])
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    alerts = query.order_by(Alert.started_at.desc()).limit(limit).all()
+    return jsonify([a.to_dict() for a in alerts])
+
+@app.route('/api/alerts/rules', methods=['GET'])
+def get_alert_rules():
+    """Seuils appliqués par le moteur d'alertes"""
+    from modules.alerts import AlertRules, load_thresholds
+    if _alert_engine is not None:
+        return jsonify(_alert_engine.rules.to_dict())
+    return jsonify(AlertRules.from_config(load_thresholds(app.config['NETAUTO_CONFIG'])).to_dict())
+
+# 8. AGENTS ENDPOINTS
+# Agents de collecte distants: inscription, bail renouvelable sur une part des
+# équipements (par location), envoi des mesures par lots compressés (gzip).
+# Un agent qui ne renouvelle plus perd ses baux à leur expiration; ses
+# équipements sont repris par les autres agents au renouvellement suivant.
+# L'inscription exige le secret agents.enrollment_token (en-tête
+# X-Enrollment-Token); sans secret configuré, elle est refusée.
+LEASE_SECONDS = 30
+MAX_UPLOAD_BYTES = 16 * 1024 * 1024
+SAMPLE_METRICS = ('latency', 'packet_loss', 'cpu_usage', 'memory_usage')
+_agent_settings = None
+
+def _agents_config():
+    """Section agents de la configuration (lease_seconds, enrollment_token)"""
+    global _agent_settings
+    if _agent_settings is None:
+        from modules.inventory import load_section
+        try:
+            _agent_settings = load_section(app.config['NETAUTO_CONFIG'], 'agents')
+        except (OSError, ImportError) as e:
+            print(f"[!] Configuration des agents indisponible ({e}), valeurs par défaut")
+            _agent_settings = {}
+    return _agent_settings
+
+def _token_hash(token):
+    import hashlib
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def _agent_token_valid(agent):
+    """Jeton de l'en-tête X-Agent-Token égal à celui de l'agent"""
+    import hmac
+    
+    token = request.headers.get('X-Agent-Token', '')
+    return bool(agent.token_hash) and hmac.compare_digest(_token_hash(token), agent.token_hash)
+
+def _authenticated_agent(agent_id):
+    """Agent de l'URL authentifié par l'en-tête X-Agent-Token (None si jeton invalide, 404 si inconnu)"""
+    agent = Agent.query.get_or_404(agent_id)
+    return agent if _agent_token_valid(agent) else None
+
+def _enrollment_valid():
+    """En-tête X-Enrollment-Token égal à agents.enrollment_token (NETAUTO_ENROLLMENT_TOKEN prioritaire)"""
+    import hmac
+    
+    expected = os.environ.get('NETAUTO_ENROLLMENT_TOKEN') or _agents_config().get('enrollment_token')
+    if not expected:
+        return False
+    return hmac.compare_digest(request.headers.get('X-Enrollment-Token', '').encode('utf-8'),
+                               str(expected).encode('utf-8'))
+
+def _request_payload():
+    """
+    Corps JSON de la requête, éventuellement compressé (Content-Encoding: gzip), borné en taille
+    
+    Returns:
+        Le JSON décodé, None si le corps (brut ou décompressé) dépasse MAX_UPLOAD_BYTES
+    """
+    import zlib
+    
+    # Refus avant lecture: Content-Length annoncé, sinon lecture bornée (corps chunked)
+    if (request.content_length or 0) > MAX_UPLOAD_BYTES:
+        return None
+    body = bytearray()
+    while len(body) <= MAX_UPLOAD_BYTES:
+        chunk = request.stream.read(64 * 1024)
+        if not chunk:
+            break
+        body += chunk
+    if len(body) > MAX_UPLOAD_BYTES:
+        return None
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(body, MAX_UPLOAD_BYTES)
+        except zlib.error as e:
+            raise ValueError(f"gzip invalide: {e}")
+        if decompressor.unconsumed_tail:
+            return None
+    return json.loads(bytes(body) or b'{}')
+
+def _expire_leases(now):
+    """Libère les baux expirés et marque expirés les agents qui ne renouvellent plus"""
+    released = DeviceLease.query.filter(DeviceLease.expires_at < now).delete(synchronize_session=False)
+    Agent.query.filter(Agent.status == 'active', Agent.lease_expires_at < now)\
+        .update({'status': 'expired'}, synchronize_session=False)
+    return released
+
+def _lease_candidates(agents, location):
+    """Agents chargés d'une location: ceux qui la listent, à défaut ceux sans liste"""
+    explicit = [agent.id for agent in agents if location in agent.location_list]
+    return explicit or [agent.id for agent in agents if not agent.location_list]
+
+def _lease_devices(agent, now, ttl):
+    """
+    Renouvelle les baux de l'agent puis ajuste sa part
+    
+    La part d'un agent est, location par location, le nombre d'équipements
+    divisé par le nombre d'agents actifs qui en sont chargés (capacity en
+    plafond). Un agent au-dessus de sa part rend l'excédent, un agent en
+    dessous prend des équipements libres: un nouvel agent est servi au
+    renouvellement suivant des autres.
+    
+    Returns:
+        tuple: (équipements baillés, acquis, rendus)
+    """
+    import math
+    from sqlalchemy import func
+    
+    expires = now + timedelta(seconds=ttl)
+    agent.status = 'active'
+    agent.last_seen = now
+    agent.lease_expires_at = expires
+    DeviceLease.query.filter_by(agent_id=agent.id).update({'expires_at': expires}, synchronize_session=False)
+    
+    active = Agent.query.filter(Agent.status == 'active', Agent.lease_expires_at >= now).all()
+    counts = dict(db.session.query(Device.location, func.count(Device.id)).group_by(Device.location).all())
+    locations = []
+    share = 0.0
+    for location, count in counts.items():
+        candidates = _lease_candidates(active, location)
+        if agent.id in candidates:
+            locations.append(location)
+            share += count / len(candidates)
+    target = math.ceil(share - 1e-9)
+    if agent.capacity:
+        target = min(target, agent.capacity)
+    
+    held = db.session.query(DeviceLease.device_id, Device.location)\
+        .join(Device, Device.id == DeviceLease.device_id)\
+        .filter(DeviceLease.agent_id == agent.id).order_by(DeviceLease.device_id).all()
+    # Excédent rendu: d'abord les équipements dont l'agent n'est plus chargé
+    release = [device_id for device_id, location in held if location not in locations]
+    keep = [device_id for device_id, location in held if location in locations]
+    if len(keep) > target:
+        release += keep[target:]
+        keep = keep[:target]
+    if release:
+        DeviceLease.query.filter(DeviceLease.device_id.in_(release))\
+            .delete(synchronize_session=False)
+    
+    acquired = 0
+    if len(keep) < target and locations:
+        from sqlalchemy import or_
+        conditions = [Device.location.in_([loc for loc in locations if loc is not None])]
+        if None in locations:
+            conditions.append(Device.location.is_(None))
+        free = db.session.query(Device.id).outerjoin(DeviceLease, DeviceLease.device_id == Device.id)\
+            .filter(DeviceLease.device_id.is_(None), or_(*conditions))\
+            .order_by(Device.id).limit(target - len(keep)).all()
+        db.session.add_all(DeviceLease(device_id=device_id, agent_id=agent.id, acquired_at=now, expires_at=expires)
+                           for device_id, in free)
+        acquired = len(free)
+    
+    devices = Device.query.join(DeviceLease, DeviceLease.device_id == Device.id)\
+        .filter(DeviceLease.agent_id == agent.id).order_by(Device.id).all() if (keep or acquired) else []
+    return devices, acquired, len(release)
+
+def _leased_device(device, credentials):
+    """Équipement tel que transmis à l'agent (identifiants SSH seulement si demandés à l'inscription)"""
+    leased = {
+        'id': device.id,
+        'name': device.hostname,
+        'host': device.ip,
+        'port': device.port or 22,
+        'device_type': device.device_type,
+        'location': device.location
+    }
+    if credentials:
+        leased['username'] = device.username
+        leased['password'] = device.password
+    return leased
+
+def _is_metric(value):
+    """Valeur de métrique acceptée: absente (None) ou nombre fini (bool exclu)"""
+    import math
+    
+    if value is None:
+        return True
+    return not isinstance(value, bool) and isinstance(value, (int, float)) and math.isfinite(value)
+
+def _parse_sample(sample, now):
+    """
+    Mesure d'un agent validée
+    
+    Returns:
+        tuple: (device_id, horodatage, mesure) ou None si la mesure est invalide
+    """
+    if not isinstance(sample, dict) or type(sample.get('device_id')) is not int:
+        return None
+    try:
+        timestamp = sample.get('timestamp')
+        timestamp = now if timestamp is None else min(datetime.utcfromtimestamp(float(timestamp)), now)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+    if not all(_is_metric(sample.get(name)) for name in SAMPLE_METRICS):
+        return None
+    return sample['device_id'], timestamp, sample
+
+@app.route('/api/agents', methods=['GET'])
+def get_agents():
+    """Agents inscrits et nombre d'équipements baillés"""
+    from sqlalchemy import func
+    
+    counts = dict(db.session.query(DeviceLease.agent_id, func.count(DeviceLease.device_id))
+                  .group_by(DeviceLease.agent_id).all())
+    return jsonify([agent.to_dict(counts.get(agent.id, 0)) for agent in Agent.query.order_by(Agent.id).all()])
+
+@app.route('/api/agents/register', methods=['POST'])
+def register_agent():
+    """
+    Inscrit un agent (name, hostname, locations, capacity, credentials) et
+    retourne son jeton
+    
+    Exige l'en-tête X-Enrollment-Token. Un nom déjà inscrit n'est repris
+    (redémarrage, baux conservés) qu'avec le jeton courant de cet agent dans
+    X-Agent-Token. credentials: true demande les identifiants SSH des
+    équipements avec les baux (métriques hôte); sinon ils ne sont pas transmis.
+    """
+    import secrets
+    
+    if not _enrollment_valid():
+        return jsonify({'error': "Secret d'inscription invalide ou non configuré (agents.enrollment_token)"}), 403
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('name'), str) or not data['name']:
+        return jsonify({'error': 'Données manquantes'}), 400
+    locations = data.get('locations') or []
+    if not isinstance(locations, list):
+        return jsonify({'error': 'locations doit être une liste'}), 400
+    try:
+        capacity = max(0, int(data.get('capacity') or 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'capacity doit être un entier'}), 400
+    
+    token = secrets.token_urlsafe(24)
+    now = datetime.utcnow()
+    agent = Agent.query.filter_by(name=data['name']).first()
+    if agent is None:
+        agent = Agent(name=data['name'], registered_at=now)
+        db.session.add(agent)
+    elif not _agent_token_valid(agent):
+        return jsonify({'error': 'Nom déjà inscrit: jeton de cet agent requis (X-Agent-Token)'}), 409
+    agent.hostname = data.get('hostname')
+    agent.locations = json.dumps([str(location) for location in locations])
+    agent.capacity = capacity
+    agent.credentials = bool(data.get('credentials'))
+    agent.token_hash = _token_hash(token)
+    agent.status = 'active'
+    agent.last_seen = now
+    agent.lease_expires_at = now + timedelta(seconds=_agents_config().get('lease_seconds', LEASE_SECONDS))
+    db.session.commit()
+    
+    lease_seconds = _agents_config().get('lease_seconds', LEASE_SECONDS)
+    return jsonify({
+        'agent_id': agent.id,
+        'token': token,
+        'lease_seconds': lease_seconds,
+        'renew_seconds': lease_seconds / 3
+    }), 201
+
+@app.route('/api/agents/<int:agent_id>/lease', methods=['POST'])
+def lease_devices(agent_id):
+    """Renouvelle les baux de l'agent et retourne les équipements qu'il doit sonder"""
+    from sqlalchemy.exc import IntegrityError, OperationalError
+    
+    ttl = _agents_config().get('lease_seconds', LEASE_SECONDS)
+    # Deux agents peuvent viser le même équipement libre: la clé primaire (ou le verrou SQLite) tranche, on recommence
+    for attempt in range(3):
+        agent = _authenticated_agent(agent_id)
+        if agent is None:
+            return jsonify({'error': 'Jeton agent invalide'}), 401
+        now = datetime.utcnow()
+        try:
+            _expire_leases(now)
+            devices, acquired, released = _lease_devices(agent, now, ttl)
+            db.session.commit()
+            break
+        except (IntegrityError, OperationalError):
+            db.session.rollback()
+    else:
+        return jsonify({'error': 'Conflit de baux, réessayer'}), 409
+    
+    metrics.inc('agent_leases_total', acquired, result='acquired')
+    metrics.inc('agent_leases_total', released, result='released')
+    return jsonify({
+        'agent_id': agent.id,
+        'lease_seconds': ttl,
+        'renew_seconds': ttl / 3,
+        'expires_at': agent.lease_expires_at.isoformat(),
+        'acquired': acquired,
+        'released': released,
+        'devices': [_leased_device(device, agent.credentials) for device in devices]
+    })
+
+@app.route('/api/agents/<int:agent_id>/samples', methods=['POST'])
+def upload_agent_samples(agent_id):
+    """
+    Mesures d'un agent: {"samples": [{device_id, timestamp (epoch), success,
+    latency, packet_loss, cpu_usage, memory_usage}]}, gzip accepté
+    
+    Seules les mesures des équipements baillés par l'agent sont enregistrées
+    (disponibilité glissante et alertes comme /api/actions/monitor).
+    """
+    agent = _authenticated_agent(agent_id)
+    if agent is None:
+        return jsonify({'error': 'Jeton agent invalide'}), 401
+    try:
+        payload = _request_payload()
+    except (ValueError, OSError):
+        return jsonify({'error': 'Corps illisible (JSON, gzip)'}), 400
+    if payload is None:
+        return jsonify({'error': f'Lot trop volumineux (> {MAX_UPLOAD_BYTES} octets)'}), 413
+    samples = payload.get('samples') if isinstance(payload, dict) else None
+    if not isinstance(samples, list):
+        return jsonify({'error': 'Objet {"samples": [...]} attendu'}), 400
+    
+    now = datetime.utcnow()
+    leased = {device_id for device_id, in db.session.query(DeviceLease.device_id).filter_by(agent_id=agent_id)}
+    devices = {device.id: device for device in Device.query.filter(Device.id.in_(leased))} if leased else {}
+    parsed = [_parse_sample(sample, now) for sample in samples]
+    valid = sorted((entry for entry in parsed if entry is not None), key=lambda entry: entry[1])
+    accepted = alerts = 0
+    rejected = len(parsed) - len(valid)
+    for device_id, timestamp, sample in valid:
+        device = devices.get(device_id)
+        if device is None:
+            rejected += 1
+            continue
+        packet_loss = sample.get('packet_loss', 0 if sample.get('success') else 100.0)
+        mon_data = MonitoringData(
+            device_id=device.id,
+            timestamp=timestamp,
+            latency=sample.get('latency'),
+            packet_loss=packet_loss,
+            cpu_usage=sample.get('cpu_usage'),
+            memory_usage=sample.get('memory_usage'),
+            availability=_rolling_availability(device.id, packet_loss)
+        )
+        db.session.add(mon_data)
+        alerts += len(_evaluate_alerts(mon_data))
+        device.status = 'online' if sample.get('success') else 'offline'
+        device.last_check = timestamp
+        if sample.get('cpu_usage') is not None:
+            device.cpu_usage = sample['cpu_usage']
+        if sample.get('memory_usage') is not None:
+            device.memory_usage = sample['memory_usage']
+        accepted += 1
+    agent.samples = (agent.samples or 0) + accepted
+    agent.last_seen = now
+    db.session.commit()
+    
+    metrics.inc('agent_samples_total', accepted, result='accepted')
+    metrics.inc('agent_samples_total', rejected, result='rejected')
+    return jsonify({'accepted': accepted, 'rejected': rejected, 'alerts': alerts})
+
+@app.route('/api/agents/<int:agent_id>', methods=['DELETE'])
+def deregister_agent(agent_id):
+    """Arrêt propre d'un agent: ses équipements sont libérés immédiatement"""
+    agent = _authenticated_agent(agent_id)
+    if agent is None:
+        return jsonify({'error': 'Jeton agent invalide'}), 401
+    released = DeviceLease.query.filter_by(agent_id=agent_id).delete(synchronize_session=False)
+    agent.status = 'stopped'
+    agent.lease_expires_at = datetime.utcnow()
+    db.session.commit()
+    return jsonify({'released': released})
+
 # ===== ERROR HANDLERS =====
 
 @app.errorhandler(404)
@@ -433,6 +1181,10 @@ def health_check():
 
 def _text_to_pdf_bytes(text):
     """Convertit un texte en PDF bytes (pagination simple)."""
+    # reportlab n'est chargé qu'au premier rendu PDF
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    
     buf = io.BytesIO()
     c = canvas.Canvas(buf, pagesize=A4)
     width, height = A4
@@ -473,6 +1225,7 @@ def _latest_report_text(report_type):
         latest = max(files, key=lambda p: p.stat().st_mtime)
         return latest.read_text(encoding='utf-8'), latest.name
     # fallback: générer via ReportGenerator (génère .txt)
+    from modules.reports import ReportGenerator
     rg = ReportGenerator()
     if report_type == 'inventory' or report_type == 'generate':
         path = Path(rg.generate_inventory_report({}))  # génère fichier texte vide si pas de données
@@ -498,7 +1251,8 @@ def get_report_pdf(report_type):
         return jsonify({'error': 'Type de rapport inconnu'}), 400
 
     text, txt_name = _latest_report_text(report_type)
-    pdf_bytes = _text_to_pdf_bytes(text)
+    with metrics.timer('report_render_seconds', format='pdf'):
+        pdf_bytes = _text_to_pdf_bytes(text)
     pdf_filename = txt_name.rsplit('.', 1)[0] + '.pdf'
 
     # renvoyer le PDF en pièce jointe
@@ -0,0 +1,4 @@
+"""
+Benchmarks et outils de charge de l'application d'automatisation réseau
+À lancer depuis NetworkAutomationApp/ : python3 -m benchmarks.<nom>
+"""
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark des agents de collecte distants (collector_agent.py)
+Lance l'API sur une base temporaire (bail court: --lease secondes), la
+peuple de --devices équipements répartis sur --locations locations, puis
+démarre --agents agents sur la même machine et relève:
+
+- la convergence: délai jusqu'à ce que chaque équipement soit baillé par
+  exactement un agent, et l'écart à la part équitable;
+- la reprise: un agent est tué (SIGKILL, sans désinscription), délai
+  jusqu'à ce que les survivants aient repris tous ses équipements;
+- l'arrivée: un agent de plus, délai jusqu'au rééquilibrage;
+- l'envoi: mesures reçues par l'API; octets envoyés contre JSON brut
+  (compteurs des agents arrêtés proprement).
+
+Sans binaire ping sur la machine, les sondages échouent (perte de 100 %):
+les mesures sont tout de même envoyées et enregistrées.
+
+Usage: python3 -m benchmarks.bench_agents [--devices 200] [--agents 3]
+           [--locations 4] [--lease 3] [--output resultats.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+import yaml
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+SERVER_SCRIPT = """
+import contextlib, logging, sys
+from werkzeug.serving import make_server
+sys.path.insert(0, {app_dir!r})
+from app import app, init_db
+with contextlib.redirect_stdout(sys.stderr):
+    init_db()
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+server = make_server('127.0.0.1', 0, app, threaded=True)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+
+def start_api(directory, lease, enrollment_token):
+    """API sur une base et une configuration temporaires (bail de lease secondes)"""
+    with open(APP_DIR / 'config' / 'devices.yaml', 'r') as f:
+        config = yaml.safe_load(f) or {}
+    config['agents'] = {'lease_seconds': lease, 'enrollment_token': enrollment_token}
+    config_path = Path(directory) / 'devices.yaml'
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f, default_flow_style=False)
+    env = dict(os.environ, NETAUTO_DATABASE_URI=f"sqlite:///{Path(directory) / 'agents.db'}",
+               NETAUTO_CONFIG=str(config_path), NETAUTO_ENROLLMENT_TOKEN='')
+    process = subprocess.Popen([sys.executable, '-c', SERVER_SCRIPT.format(app_dir=str(APP_DIR))],
+                               cwd=directory, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               text=True)
+    port = int(process.stdout.readline())
+    return process, f"http://127.0.0.1:{port}/api"
+
+
+def seed_devices(api, count, locations):
+    session = requests.Session()
+    for i in range(count):
+        session.post(f"{api}/devices", timeout=10, json={
+            'hostname': f'device-{i}',
+            'ip': f'192.0.{2 + (i >> 8)}.{i & 255}',
+            'device_type': 'linux',
+            'username': 'ubuntu',
+            'password': 'ubuntu123',
+            'location': f'rack-{i % locations}'
+        }).raise_for_status()
+
+
+def start_agent(api, name, directory, interval, enrollment_token):
+    with open(Path(directory) / f'{name}.log', 'w') as log:
+        return subprocess.Popen([sys.executable, str(APP_DIR / 'collector_agent.py'), '--api', api, '--name', name,
+                                 '--interval', str(interval), '--count', '1', '--timeout', '1',
+                                 '--enrollment-token', enrollment_token],
+                                cwd=APP_DIR, stdout=log, stderr=subprocess.STDOUT)
+
+
+def agent_stats(directory, name):
+    """Compteurs écrits par l'agent à son arrêt (dernière ligne "[*] {...}" de son journal)"""
+    lines = (Path(directory) / f'{name}.log').read_text(encoding='utf-8').splitlines()
+    for line in reversed(lines):
+        if line.startswith('[*] {'):
+            return json.loads(line[4:])
+    return {}
+
+
+def leased(api):
+    """{nom de l'agent actif: équipements baillés}"""
+    agents = requests.get(f"{api}/agents", timeout=10).json()
+    return {agent['name']: agent['devices'] for agent in agents if agent['status'] == 'active'}
+
+
+def wait_for(api, condition, timeout):
+    """Délai (s) jusqu'à ce que condition(baux) soit vraie, None au-delà de timeout"""
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        if condition(leased(api)):
+            return round(time.monotonic() - start, 2)
+        time.sleep(0.1)
+    return None
+
+
+def balanced(names, devices):
+    """Tous les équipements baillés, par les seuls agents names, à la part équitable près"""
+    share = math.ceil(devices / len(names))
+
+    def check(leases):
+        counts = [leases.get(name, 0) for name in names]
+        return sum(leases.values()) == devices and all(share - 1 <= count <= share for count in counts)
+    return check
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark des agents de collecte distants")
+    parser.add_argument('--devices', type=int, default=200, help="Équipements en base")
+    parser.add_argument('--agents', type=int, default=3, help="Agents démarrés")
+    parser.add_argument('--locations', type=int, default=4)
+    parser.add_argument('--lease', type=float, default=3, help="Durée d'un bail (s)")
+    parser.add_argument('--interval', type=float, default=1, help="Secondes entre deux sondages")
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+    timeout = 10 * args.lease + 20
+
+    results = {'devices': args.devices, 'agents': args.agents, 'lease_seconds': args.lease}
+    agents = {}
+    enrollment_token = secrets.token_urlsafe(16)
+    with tempfile.TemporaryDirectory() as directory:
+        server, api = start_api(directory, args.lease, enrollment_token)
+        try:
+            print(f"[*] {args.devices} équipements, {args.agents} agents", file=sys.stderr)
+            seed_devices(api, args.devices, args.locations)
+            names = [f'agent-{i}' for i in range(args.agents)]
+            for name in names:
+                agents[name] = start_agent(api, name, directory, args.interval, enrollment_token)
+            results['converge_s'] = wait_for(api, balanced(names, args.devices), timeout)
+            results['leases'] = leased(api)
+
+            victim = names.pop(0)
+            print(f"[*] Arrêt brutal de {victim}", file=sys.stderr)
+            agents.pop(victim).kill()
+            results['takeover_s'] = wait_for(api, balanced(names, args.devices), timeout)
+
+            name = f'agent-{args.agents}'
+            names.append(name)
+            agents[name] = start_agent(api, name, directory, args.interval, enrollment_token)
+            results['join_s'] = wait_for(api, balanced(names, args.devices), timeout)
+            results['leases_after'] = leased(api)
+
+            time.sleep(2 * args.interval)
+            for process in agents.values():
+                process.send_signal(signal.SIGINT)
+            for process in agents.values():
+                process.wait(timeout=30)
+            summary = requests.get(f"{api}/agents", timeout=10).json()
+            results['samples'] = sum(agent['samples'] for agent in summary)
+            results['stopped_with_leases'] = sum(agent['devices'] for agent in summary)
+            stats = [agent_stats(directory, name) for name in names]
+        finally:
+            for process in agents.values():
+                if process.poll() is None:
+                    process.kill()
+            server.terminate()
+            server.wait(timeout=10)
+
+    results['uploads'] = {key: sum(agent.get(key, 0) for agent in stats)
+                          for key in ('uploads', 'accepted', 'rejected', 'raw_bytes', 'sent_bytes')}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    problems = []
+    for key, label in (('converge_s', 'répartition initiale'), ('takeover_s', 'reprise'), ('join_s', 'arrivée')):
+        if results[key] is None:
+            problems.append(f"{label} non atteinte en {timeout} s")
+    if not results['samples']:
+        problems.append("aucune mesure reçue")
+    if results['stopped_with_leases']:
+        problems.append(f"{results['stopped_with_leases']} baux non rendus à l'arrêt")
+    if problems:
+        print(f"[!] {'; '.join(problems)}", file=sys.stderr)
+        return 1
+    ratio = results['uploads']['raw_bytes'] / max(1, results['uploads']['sent_bytes'])
+    print(f"[+] Répartition en {results['converge_s']} s, reprise d'un agent tué en {results['takeover_s']} s "
+          f"(bail {args.lease} s), arrivée en {results['join_s']} s; {results['samples']} mesures reçues, "
+          f"JSON compressé {ratio:.1f}x par les agents survivants", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark du moteur d'alertes sur seuils
+Génère des flux d'échantillons synthétiques (marche aléatoire par équipement
+avec des pics au-dessus des seuils de config/devices.yaml), vérifie sur un
+extrait que les événements sont ceux d'une implémentation de référence
+directe (un dict d'état par équipement et métrique), puis mesure le débit
+d'AlertEngine.process échantillon par échantillon: échantillons par seconde,
+événements émis contre échantillons hors seuil (déduplication), mémoire de
+l'état par équipement.
+
+Usage: python3 -m benchmarks.bench_alerts [--devices 10000] [--samples 500000]
+           [--min-duration 20] [--target 100000] [--output resultats.json]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from modules.alerts import LEVELS, METRICS, AlertEngine, AlertRules, load_thresholds
+
+INTERVAL = 10.0
+
+
+def generate(devices, samples, seed):
+    """Échantillons (équipement, dict, instant), un tour de flotte toutes les INTERVAL secondes"""
+    rng = random.Random(seed)
+    state = [[20.0, 0.0, 40.0, 60.0] for _ in range(devices)]
+    stream = []
+    for n in range(samples):
+        device = n % devices
+        values = state[device]
+        values[0] = max(1.0, values[0] + rng.gauss(0, 6))
+        values[1] = 100.0 if rng.random() < 0.002 else max(0.0, values[1] * 0.5 + rng.gauss(0, 1.5))
+        values[2] = min(100.0, max(0.0, values[2] + rng.gauss(0, 5)))
+        values[3] = min(100.0, max(0.0, values[3] + rng.gauss(0, 2)))
+        if rng.random() < 0.001:
+            values[0] += 150
+        stream.append((f'device-{device}', {
+            'latency': values[0], 'packet_loss': values[1],
+            'cpu_usage': values[2], 'memory_usage': values[3],
+        }, (n // devices) * INTERVAL))
+    return stream
+
+
+class ReferenceEngine:
+    """Implémentation directe des mêmes règles, pour contrôler AlertEngine"""
+    def __init__(self, rules):
+        self.rules = rules
+        self.state = {}
+
+    def process(self, device, sample, timestamp):
+        events = []
+        for metric, key, warning, critical, clear, raise_for, clear_for in self.rules.rules:
+            value = sample.get(key)
+            if value is None:
+                continue
+            state = self.state.setdefault((device, metric), {'level': 0, 'pending': 0, 'since': 0.0})
+            level = state['level']
+            if value >= critical:
+                target = 2
+            elif value >= warning:
+                target = 1
+            else:
+                target = 0
+            if target < level and value >= clear[level]:
+                target = level
+            if target == level:
+                state['pending'] = level
+                continue
+            if state['pending'] == level or (state['pending'] > level) != (target > level):
+                state['since'] = timestamp
+            state['pending'] = target
+            if timestamp - state['since'] >= (raise_for if target > level else clear_for):
+                state['level'] = state['pending'] = target
+                events.append((device, METRICS[metric][0], LEVELS[target], timestamp))
+        return events
+
+
+def check(rules, stream):
+    """Compare les événements d'AlertEngine à ceux de la référence"""
+    engine, reference = AlertEngine(rules), ReferenceEngine(rules)
+    mismatches = 0
+    events = 0
+    for device, sample, timestamp in stream:
+        got = [(e['device'], e['metric'], e['level'], e['timestamp'])
+               for e in engine.process(device, sample, timestamp)]
+        expected = reference.process(device, sample, timestamp)
+        events += len(expected)
+        mismatches += got != expected
+    return {'samples': len(stream), 'events': events, 'mismatches': mismatches}
+
+
+def over_threshold(rules, stream):
+    """Couples échantillon/métrique au-dessus du seuil d'avertissement (alertes sans déduplication)"""
+    return sum(
+        1 for _, sample, _ in stream
+        for _, key, warning, _, _, _, _ in rules.rules
+        if sample.get(key) is not None and sample[key] >= warning
+    )
+
+
+def bench(rules, stream, rounds):
+    """Meilleur débit sur plusieurs passes (moteur neuf à chaque passe)"""
+    best = None
+    for _ in range(rounds):
+        engine = AlertEngine(rules)
+        process = engine.process
+        events = 0
+        start = time.perf_counter()
+        for device, sample, timestamp in stream:
+            events += len(process(device, sample, timestamp))
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, events, engine)
+    elapsed, events, engine = best
+    return {
+        'seconds': round(elapsed, 3),
+        'samples_per_second': round(len(stream) / elapsed),
+        'us_per_sample': round(elapsed / len(stream) * 1e6, 2),
+        'events': events,
+        'devices': len(engine),
+        'state_bytes_per_device': round(engine.memory_bytes() / len(engine), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du moteur d'alertes sur seuils")
+    parser.add_argument('--devices', type=int, default=10000, help="Équipements simulés")
+    parser.add_argument('--samples', type=int, default=500000, help="Échantillons du flux")
+    parser.add_argument('--config', default='config/devices.yaml', help="Fichier des seuils")
+    parser.add_argument('--min-duration', type=float, default=20, help="Durée avant levée (s)")
+    parser.add_argument('--clear-duration', type=float, default=20, help="Durée avant retour (s)")
+    parser.add_argument('--check-samples', type=int, default=50000, help="Échantillons comparés à la référence")
+    parser.add_argument('--rounds', type=int, default=3, help="Passes chronométrées")
+    parser.add_argument('--target', type=int, default=100000, help="Débit minimal attendu (échantillons/s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    rules = AlertRules.from_config(load_thresholds(args.config), min_duration=args.min_duration,
+                                   clear_duration=args.clear_duration)
+    print(f"[*] Génération de {args.samples} échantillons ({args.devices} équipements)", file=sys.stderr)
+    stream = generate(args.devices, args.samples, args.seed)
+
+    results = {
+        'rules': rules.to_dict(),
+        'reference_check': check(rules, stream[:args.check_samples]),
+        'over_threshold': over_threshold(rules, stream),
+        'engine': bench(rules, stream, args.rounds),
+    }
+    results['events_per_over_threshold'] = round(
+        results['engine']['events'] / max(1, results['over_threshold']), 4)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    if results['reference_check']['mismatches']:
+        print(f"[!] {results['reference_check']['mismatches']} écart(s) avec la référence", file=sys.stderr)
+        return 1
+    rate = results['engine']['samples_per_second']
+    if rate < args.target:
+        print(f"[!] {rate} échantillons/s, sous l'objectif de {args.target}", file=sys.stderr)
+        return 1
+    print(f"[+] {rate} échantillons/s (objectif {args.target})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
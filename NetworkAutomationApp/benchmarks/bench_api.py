@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'API Flask sous charge, avec détection de régressions
+Peuple une base SQLite dédiée (par défaut 10 000 équipements, 50 M mesures
+et 100 000 sauvegardes; --scale pour réduire), puis sollicite les endpoints
+principaux à concurrence fixe, via un serveur WSGI local lancé dans un
+processus séparé (--mode server) ou le client de test Flask (--mode client).
+Les latences p50/p95/p99 et le débit sont écrits dans une baseline JSON.
+
+Usage:
+    python3 -m benchmarks.bench_api --scale 0.01 --output baseline.json
+    python3 -m benchmarks.bench_api --scale 0.01 --compare baseline.json --threshold 0.2
+        -> code de sortie 1 si un endpoint régresse au-delà du seuil
+
+La base peuplée est réutilisée tant que les volumes sont identiques
+(--reseed pour la reconstruire). L'API lit l'URI de sa base dans
+NETAUTO_DATABASE_URI.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Volumes de référence (multipliés par --scale)
+VOLUMES = {'devices': 10_000, 'monitoring': 50_000_000, 'backups': 100_000}
+
+# Origine fixe des mesures: données identiques d'une exécution à l'autre
+SEED_EPOCH = 1735689600  # 2025-01-01 00:00:00 UTC
+SAMPLE_INTERVAL = 60
+
+# Endpoint -> générateur de chemins (rng, nombre d'équipements)
+ENDPOINTS = {
+    'health': lambda rng, n: '/api/health',
+    'devices': lambda rng, n: '/api/devices',
+    'stats': lambda rng, n: '/api/stats',
+    'monitoring': lambda rng, n: f'/api/monitoring/{rng.randint(1, n)}',
+    'report_inventory': lambda rng, n: '/api/report/inventory',
+}
+
+# Métriques comparées: plus haut = pire, sauf le débit
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+SERVER_SCRIPT = """
+import logging, sys
+from werkzeug.serving import WSGIRequestHandler, make_server
+sys.path.insert(0, {app_dir!r})
+from app import app
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+server = make_server('127.0.0.1', 0, app, threaded=True)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+
+# ===== PEUPLEMENT =====
+
+def seed_database(db_path, volumes, workdir):
+    """
+    Crée le schéma de l'API puis insère les volumes demandés
+
+    Les mesures et sauvegardes sont générées par SQLite (CTE récursive),
+    sans passer par Python ligne à ligne; les index de monitoring_data sont
+    créés après l'insertion.
+    """
+    db_path.unlink(missing_ok=True)
+    os.environ['NETAUTO_DATABASE_URI'] = f"sqlite:///{db_path}"
+    sys.path.insert(0, str(APP_DIR))
+    from app import MonitoringData, app, db
+
+    with app.app_context():
+        db.create_all()
+        engine = db.engine
+        for index in MonitoringData.__table__.indexes:
+            index.drop(bind=engine)
+
+    devices, monitoring, backups = volumes['devices'], volumes['monitoring'], volumes['backups']
+    rng = random.Random(42)
+    start = time.perf_counter()
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        created = datetime.utcfromtimestamp(SEED_EPOCH).strftime('%Y-%m-%d %H:%M:%S.000000')
+        conn.executemany(
+            "INSERT INTO devices (id, hostname, ip, device_type, username, password, status, uptime,"
+            " interfaces_count, cpu_usage, memory_usage, created_at, last_check)"
+            " VALUES (?, ?, ?, 'linux', 'admin', 'admin', ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (i + 1, f"device-{i:05d}", f"10.{i // 65536}.{i // 256 % 256}.{i % 256}",
+                 'online' if rng.random() < 0.9 else 'offline', f"up {rng.randint(1, 300)} days",
+                 rng.randint(1, 48), round(rng.uniform(1, 95), 1), round(rng.uniform(5, 95), 1),
+                 created, created)
+                for i in range(devices)
+            )
+        )
+        print(f"[+] {devices} équipements", file=sys.stderr)
+
+        # Valeurs pseudo-aléatoires déterministes dérivées de l'indice
+        conn.execute(f"""
+            WITH RECURSIVE seq(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i < {monitoring - 1})
+            INSERT INTO monitoring_data (device_id, timestamp, latency, packet_loss, cpu_usage, memory_usage, availability)
+            SELECT i % {devices} + 1,
+                   strftime('%Y-%m-%d %H:%M:%S', {SEED_EPOCH} + (i / {devices}) * {SAMPLE_INTERVAL}, 'unixepoch') || '.000000',
+                   (i * 2654435761 % 10007) / 100.0,
+                   CASE WHEN i % 97 = 0 THEN 25.0 ELSE 0.0 END,
+                   (i * 40503 % 9001) / 100.0,
+                   (i * 69069 % 8999) / 100.0,
+                   CASE WHEN i % 97 = 0 THEN 75.0 ELSE 100.0 END
+            FROM seq
+        """)
+        conn.commit()
+        print(f"[+] {monitoring} mesures ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+
+        config = "auto eth0\niface eth0 inet static\n    address 10.0.0.10\n" * 20
+        conn.execute(f"""
+            WITH RECURSIVE seq(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i < {backups - 1})
+            INSERT INTO backups (device_id, filename, content, size, created_at)
+            SELECT i % {devices} + 1, 'backup_device-' || (i % {devices}) || '_' || i || '.txt', ?, ?,
+                   strftime('%Y-%m-%d %H:%M:%S', {SEED_EPOCH} + i * 60, 'unixepoch') || '.000000'
+            FROM seq
+        """, (config, len(config)))
+        conn.commit()
+        print(f"[+] {backups} sauvegardes", file=sys.stderr)
+
+    with app.app_context():
+        for index in MonitoringData.__table__.indexes:
+            index.create(bind=db.engine)
+        db.engine.dispose()
+    print(f"[+] Index créés ({time.perf_counter() - start:.1f}s au total)", file=sys.stderr)
+
+    # Rapport texte servi (converti en PDF) par /api/report/inventory
+    reports_dir = workdir / 'reports'
+    reports_dir.mkdir(exist_ok=True)
+    lines = ["RAPPORT D'INVENTAIRE"] + [f"device-{i:05d}: linux, online" for i in range(min(devices, 500))]
+    (reports_dir / 'inventory_report_20250101_000000.txt').write_text("\n".join(lines) + "\n", encoding='utf-8')
+
+
+def prepare_database(workdir, volumes, reseed=False):
+    """Réutilise la base peuplée si ses volumes correspondent, sinon la recrée"""
+    workdir.mkdir(parents=True, exist_ok=True)
+    db_path = workdir / 'bench_api.db'
+    seed_file = workdir / 'seed.json'
+    try:
+        current = json.loads(seed_file.read_text())
+    except (OSError, ValueError):
+        current = None
+    if reseed or current != volumes or not db_path.exists():
+        print(f"[*] Peuplement de {db_path}: {volumes}", file=sys.stderr)
+        seed_file.unlink(missing_ok=True)
+        seed_database(db_path, volumes, workdir)
+        seed_file.write_text(json.dumps(volumes))
+    else:
+        print(f"[*] Base peuplée réutilisée: {db_path}", file=sys.stderr)
+    return db_path
+
+
+# ===== CHARGE =====
+
+class ServerTarget:
+    """Serveur WSGI threadé (werkzeug) dans un processus séparé, HTTP/1.1 keep-alive"""
+    def __init__(self, db_path, workdir):
+        env = dict(os.environ, NETAUTO_DATABASE_URI=f"sqlite:///{db_path}")
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', SERVER_SCRIPT.format(app_dir=str(APP_DIR))],
+            cwd=workdir, env=env, stdout=subprocess.PIPE, text=True
+        )
+        self.port = int(self.process.stdout.readline())
+        self._local = threading.local()
+
+    def request(self, path):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            raise
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+
+class ClientTarget:
+    """Client de test Flask dans le processus courant (un client par thread)"""
+    def __init__(self, db_path, workdir):
+        os.environ['NETAUTO_DATABASE_URI'] = f"sqlite:///{db_path}"
+        os.chdir(workdir)
+        sys.path.insert(0, str(APP_DIR))
+        from app import app
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, path):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client.get(path).status_code
+
+    def close(self):
+        pass
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_endpoint(target, name, paths, concurrency, warmup):
+    """
+    Envoie les requêtes à concurrence fixe
+
+    Returns:
+        dict: Latences (ms), débit (req/s) et erreurs
+    """
+    for path in paths[:warmup]:
+        try:
+            target.request(path)
+        except Exception:
+            pass
+
+    def one(path):
+        start = time.perf_counter()
+        try:
+            ok = 200 <= target.request(path) < 300
+        except Exception:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, paths))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(ms for ms, _ in outcomes)
+    return {
+        'requests': len(paths),
+        'errors': sum(1 for _, ok in outcomes if not ok),
+        'mean_ms': round(statistics.fmean(latencies), 2),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(latencies[-1], 2),
+        'throughput_rps': round(len(paths) / wall, 1),
+    }
+
+
+# ===== COMPARAISON =====
+
+def compare(baseline, results, threshold):
+    """
+    Compare les résultats à une baseline
+
+    Returns:
+        list: Régressions (messages) au-delà du seuil relatif
+    """
+    regressions = []
+    for name, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        for metric in LATENCY_METRICS:
+            if current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(f"{name} {metric}: {previous[metric]} -> {current[metric]}")
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - threshold):
+            regressions.append(
+                f"{name} throughput_rps: {previous['throughput_rps']} -> {current['throughput_rps']}"
+            )
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{name} errors: {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de l'API Flask sous charge")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Facteur appliqué aux volumes (1.0 = 10k équipements, 50M mesures, 100k sauvegardes)")
+    parser.add_argument('--workdir', default=str(Path(tempfile.gettempdir()) / 'netauto_bench_api'),
+                        help="Répertoire de la base peuplée et des rapports")
+    parser.add_argument('--reseed', action='store_true', help="Reconstruit la base peuplée")
+    parser.add_argument('--mode', choices=('server', 'client'), default='server')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="Requêtes par endpoint")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--endpoints', nargs='+', choices=sorted(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument('--output', help="Écrit les résultats (baseline) dans ce fichier JSON")
+    parser.add_argument('--compare', help="Baseline JSON de référence")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Dégradation relative tolérée en mode comparaison (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    volumes = {key: max(1, int(value * args.scale)) for key, value in VOLUMES.items()}
+    workdir = Path(args.workdir).resolve()
+    db_path = prepare_database(workdir, volumes, args.reseed)
+
+    target = (ServerTarget if args.mode == 'server' else ClientTarget)(db_path, workdir)
+    results = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'mode': args.mode,
+        'volumes': volumes,
+        'concurrency': args.concurrency,
+        'endpoints': {}
+    }
+    try:
+        rng = random.Random(1)
+        for name in args.endpoints:
+            paths = [ENDPOINTS[name](rng, volumes['devices']) for _ in range(args.requests)]
+            print(f"[*] {name}: {args.requests} requêtes, concurrence {args.concurrency}", file=sys.stderr)
+            results['endpoints'][name] = run_endpoint(target, name, paths, args.concurrency, args.warmup)
+    finally:
+        target.close()
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        if baseline.get('volumes') != volumes or baseline.get('concurrency') != args.concurrency:
+            print("[!] Volumes ou concurrence différents de la baseline: comparaison indicative", file=sys.stderr)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            for regression in regressions:
+                print(f"[!] Régression: {regression}", file=sys.stderr)
+            return 1
+        print(f"[+] Aucune régression au-delà de {args.threshold:.0%}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la planification des sauvegardes
+Deux volets:
+
+- exécution: sauvegarde de la flotte simulée (locations site-0..site-N)
+  par BackupScheduler (départs étalés sur --window secondes, --per-location
+  simultanées par site) puis par BatchRunner (tout en parallèle); la
+  concurrence par site est mesurée dans l'action elle-même, indépendamment
+  des compteurs du scheduler;
+- purge: --rows lignes dans une table backups SQLite (dont --old-ratio hors
+  rétention) et autant de fichiers; suppression par lots (prune_rows) puis en
+  un seul DELETE sur une copie, avec un écrivain concurrent qui insère en
+  continu: durée de la purge et pire attente de l'écrivain.
+
+Usage: python3 -m benchmarks.bench_backup_scheduler [--devices 120] [--sites 4]
+           [--window 3] [--per-location 2] [--rows 200000] [--output resultats.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from modules import batch
+from modules.backup_scheduler import BackupScheduler, prune_files, prune_rows
+
+from .ssh_simulator import SimulatorProcess
+
+
+class ConcurrencyProbe:
+    """Action de sauvegarde instrumentée: pic de sauvegardes simultanées par site"""
+    def __init__(self, action):
+        self.action = action
+        self.current = Counter()
+        self.peak = Counter()
+        self.lock = threading.Lock()
+
+    def __call__(self, device, **kwargs):
+        site = device['location']
+        with self.lock:
+            self.current[site] += 1
+            self.peak[site] = max(self.peak[site], self.current[site])
+        try:
+            return self.action(device, **kwargs)
+        finally:
+            with self.lock:
+                self.current[site] -= 1
+
+
+def bench_run(devices, args, directory):
+    probe = ConcurrencyProbe(batch.backup_device)
+    scheduler = BackupScheduler(probe, backup_dir=directory, window=args.window,
+                                per_location=args.per_location, workers=args.workers, retention_days=0)
+    summary = scheduler.run(devices)
+
+    baseline = ConcurrencyProbe(batch.backup_device)
+    runner = batch.BatchRunner(devices, workers=args.workers, stream=io.StringIO())
+    start = time.perf_counter()
+    runner.run('backup', baseline, backup_dir=directory)
+    return {
+        'scheduler': {
+            'duration_ms': summary['duration_ms'],
+            'failed': summary['failed'],
+            'backup_ms': summary['backup_ms'],
+            'waited_ms': summary['waited_ms'],
+            'max_concurrency_per_site': max(probe.peak.values()),
+            'reported_concurrency': {site: entry['max_concurrency'] for site, entry in summary['locations'].items()},
+        },
+        'batch_runner': {
+            'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+            'max_concurrency_per_site': max(baseline.peak.values()),
+        },
+    }
+
+
+def build_database(path, rows, old_ratio):
+    now = datetime.utcnow()
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("""CREATE TABLE backups (id INTEGER PRIMARY KEY, device_id INTEGER NOT NULL,
+                          filename VARCHAR(200) NOT NULL, content TEXT, size INTEGER, created_at DATETIME)""")
+    connection.execute("CREATE INDEX ix_backups_created_at ON backups (created_at)")
+    old = int(rows * old_ratio)
+    connection.executemany(
+        "INSERT INTO backups (device_id, filename, content, size, created_at) VALUES (?, ?, ?, ?, ?)",
+        ((i % 500, f'backup_{i}.txt', 'x' * 200, 200,
+          (now - timedelta(days=90 if i < old else 1, seconds=i)).isoformat(sep=' ')) for i in range(rows)))
+    connection.commit()
+    connection.close()
+    return old
+
+
+def with_writer(path, work):
+    """Exécute work() pendant qu'un écrivain insère une ligne toutes les 5 ms; pire attente"""
+    stop = threading.Event()
+    waits = []
+
+    def writer():
+        connection = sqlite3.connect(path, timeout=60)
+        while not stop.is_set():
+            start = time.perf_counter()
+            connection.execute("INSERT INTO backups (device_id, filename, size, created_at) VALUES (1, 'w', 0, ?)",
+                               (datetime.utcnow().isoformat(sep=' '),))
+            connection.commit()
+            waits.append(time.perf_counter() - start)
+            time.sleep(0.005)
+        connection.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    removed = work()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    return {'removed': removed, 'seconds': round(elapsed, 3),
+            'writer_max_wait_ms': round(max(waits) * 1000, 1), 'writer_inserts': len(waits)}
+
+
+def bench_prune(args, directory):
+    database = os.path.join(directory, 'prune.db')
+    expected = build_database(database, args.rows, args.old_ratio)
+    single = os.path.join(directory, 'single.db')
+    shutil.copy(database, single)
+    cutoff = datetime.utcnow() - timedelta(days=30)
+
+    def single_delete():
+        connection = sqlite3.connect(single, timeout=60)
+        with connection:
+            count = connection.execute("DELETE FROM backups WHERE created_at < ?",
+                                       (cutoff.isoformat(sep=' '),)).rowcount
+        connection.close()
+        return count
+
+    files = Path(directory) / 'files'
+    files.mkdir()
+    old_files = int(args.files * args.old_ratio)
+    stale = time.time() - 90 * 86400
+    for i in range(args.files):
+        path = files / f'backup_device-{i}_20240101_000000.txt'
+        path.write_text('x' * 200)
+        if i < old_files:
+            os.utime(path, (stale, stale))
+    start = time.perf_counter()
+    removed, freed = prune_files(files, time.time() - 30 * 86400)
+
+    return {
+        'rows': args.rows,
+        'expected_removed': expected,
+        'batched': with_writer(database, lambda: prune_rows(f'sqlite:///{database}', cutoff, args.batch)),
+        'single_delete': with_writer(single, single_delete),
+        'files': {'total': args.files, 'removed': removed, 'expected': old_files, 'freed_bytes': freed,
+                  'seconds': round(time.perf_counter() - start, 3)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la planification des sauvegardes")
+    parser.add_argument('--devices', type=int, default=120, help="Équipements simulés")
+    parser.add_argument('--sites', type=int, default=4, help="Locations")
+    parser.add_argument('--window', type=float, default=3, help="Fenêtre d'étalement (s)")
+    parser.add_argument('--per-location', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--latency', type=float, default=0.01, help="Délai par commande (s)")
+    parser.add_argument('--rows', type=int, default=200000, help="Lignes de la table backups")
+    parser.add_argument('--files', type=int, default=2000, help="Fichiers de sauvegarde")
+    parser.add_argument('--old-ratio', type=float, default=0.8, help="Part hors rétention")
+    parser.add_argument('--batch', type=int, default=500, help="Lignes par lot de purge")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"[*] Simulateur ({args.devices} équipements, {args.sites} sites)", file=sys.stderr)
+        with SimulatorProcess(count=args.devices, latency=args.latency, seed=args.seed) as simulator:
+            devices = [dict(device, location=f'site-{i % args.sites}')
+                       for i, device in enumerate(simulator.devices())]
+            with contextlib.redirect_stdout(sys.stderr):
+                run = bench_run(devices, args, os.path.join(directory, 'backups'))
+        print(f"[*] Purge de {args.rows} lignes et {args.files} fichiers", file=sys.stderr)
+        prune = bench_prune(args, directory)
+
+    results = {'devices': args.devices, 'sites': args.sites, 'window_s': args.window,
+               'per_location': args.per_location, 'run': run, 'prune': prune}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    problems = []
+    if run['scheduler']['max_concurrency_per_site'] > args.per_location:
+        problems.append(f"{run['scheduler']['max_concurrency_per_site']} sauvegardes simultanées sur un site")
+    if run['scheduler']['failed']:
+        problems.append(f"{run['scheduler']['failed']} sauvegarde(s) en échec")
+    if prune['batched']['removed'] != prune['expected_removed'] or prune['files']['removed'] != prune['files']['expected']:
+        problems.append("purge incomplète")
+    if problems:
+        print(f"[!] {'; '.join(problems)}", file=sys.stderr)
+        return 1
+    print(f"[+] Au plus {run['scheduler']['max_concurrency_per_site']} sauvegardes simultanées par site "
+          f"(BatchRunner: {run['batch_runner']['max_concurrency_per_site']}); écrivain bloqué au pire "
+          f"{prune['batched']['writer_max_wait_ms']} ms (DELETE unique: {prune['single_delete']['writer_max_wait_ms']} ms)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark des collecteurs SSH contre le simulateur local
+Mesure, pour NALPMUtils (facts, interfaces, routes, condensat d'état) et
+NetworkMonitoring (CPU, mémoire) et ProcCollector (/proc), la durée par équipement puis la collecte
+complète de la flotte en parallèle: durée totale, connexions SSH ouvertes,
+commandes exécutées et pic de mémoire Python (tracemalloc).
+
+Usage: python3 -m benchmarks.bench_collectors [--devices 100] [--workers 20]
+           [--latency 0.005] [--failure-rate 0.05 --failure-mode command]
+           [--slow-rate 0.02 --slow-delay 1] [--output resultats.json]
+"""
+
+import argparse
+import contextlib
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from modules.monitoring import NetworkMonitoring
+from modules.napalm_utils import NALPMUtils
+from modules.proc_collector import ProcCollector
+
+from .ssh_simulator import FAILURE_MODES, SimulatorProcess
+
+
+def collect_inventory(napalm, device):
+    """Collecte d'inventaire d'un équipement (comme main.py retrieve_data)"""
+    return {
+        'facts': napalm.get_facts(device),
+        'interfaces': napalm.get_interfaces(device),
+        'routes': napalm.get_routes(device),
+    }
+
+
+def _ok(name, result):
+    """Indique si un résultat de collecteur est exploitable"""
+    if not result:
+        return False
+    if name in ('cpu', 'memory', 'proc'):
+        return 'error' not in result
+    if name == 'facts':
+        return result.get('hostname') is not None
+    if name == 'collect':
+        return result['facts'].get('hostname') is not None and bool(result['interfaces'])
+    return True
+
+
+def build_collectors():
+    napalm = NALPMUtils()
+    return {
+        'facts': napalm.get_facts,
+        'interfaces': napalm.get_interfaces,
+        'routes': napalm.get_routes,
+        'state_digest': napalm.get_state_digest,
+        'cpu': NetworkMonitoring.check_cpu_usage,
+        'memory': NetworkMonitoring.check_memory_usage,
+        'proc': ProcCollector().sample,
+        'collect': lambda device: collect_inventory(napalm, device),
+    }
+
+
+def summarize(durations_ms):
+    """Statistiques de durées (ms)"""
+    ordered = sorted(durations_ms)
+    if not ordered:
+        return {}
+    return {
+        'mean_ms': round(statistics.fmean(ordered), 2),
+        'p50_ms': round(ordered[len(ordered) // 2], 2),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        'max_ms': round(ordered[-1], 2),
+    }
+
+
+def timed(collector, name, device):
+    start = time.perf_counter()
+    try:
+        ok = _ok(name, collector(device))
+    except Exception:
+        ok = False
+    return (time.perf_counter() - start) * 1000, ok
+
+
+def bench_per_device(simulator, devices, collectors):
+    """Chaque collecteur, séquentiellement, sur un échantillon d'équipements"""
+    results = {}
+    for name, collector in collectors.items():
+        simulator.reset_stats()
+        durations, failures = [], 0
+        for device in devices:
+            elapsed, ok = timed(collector, name, device)
+            durations.append(elapsed)
+            failures += not ok
+        stats = simulator.stats()
+        results[name] = dict(
+            summarize(durations),
+            failures=failures,
+            connections_per_device=round(stats['connections'] / len(devices), 2),
+            commands_per_device=round(stats['commands'] / len(devices), 2),
+        )
+    return results
+
+
+def bench_fleet(simulator, devices, collector, workers):
+    """Collecte complète de la flotte en parallèle"""
+    simulator.reset_stats()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(lambda device: timed(collector, 'collect', device), devices))
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = simulator.stats()
+    durations = [elapsed for elapsed, _ in outcomes]
+    return dict(
+        devices=len(devices),
+        workers=workers,
+        wall_seconds=round(wall, 3),
+        devices_per_second=round(len(devices) / wall, 1),
+        per_device=summarize(durations),
+        failures=sum(1 for _, ok in outcomes if not ok),
+        connections_opened=stats['connections'],
+        commands=stats['commands'],
+        refused=stats['refused'],
+        auth_failures=stats['auth_failures'],
+        failed_commands=stats['failed_commands'],
+        slow_commands=stats['slow_commands'],
+        peak_memory_mb=round(peak / 1e6, 2),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark des collecteurs SSH (simulateur local)")
+    parser.add_argument('--devices', type=int, default=100, help="Équipements simulés")
+    parser.add_argument('--workers', type=int, default=20, help="Threads de la collecte de flotte")
+    parser.add_argument('--sample', type=int, default=10, help="Équipements du benchmark par collecteur")
+    parser.add_argument('--latency', type=float, default=0.005, help="Délai par commande (s)")
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--failure-mode', choices=FAILURE_MODES, default='command')
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-delay', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    options = dict(
+        count=args.devices, latency=args.latency, failure_rate=args.failure_rate,
+        failure_mode=args.failure_mode, slow_rate=args.slow_rate,
+        slow_delay=args.slow_delay, seed=args.seed
+    )
+    print(f"[*] Démarrage du simulateur ({args.devices} équipements)", file=sys.stderr)
+    with SimulatorProcess(**options) as simulator:
+        devices = simulator.devices()
+        collectors = build_collectors()
+        # Messages d'erreur des collecteurs sur stderr: stdout reste du JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            print("[*] Durées par équipement", file=sys.stderr)
+            per_device = bench_per_device(simulator, devices[:args.sample], collectors)
+            print("[*] Collecte de la flotte", file=sys.stderr)
+            fleet = bench_fleet(simulator, devices, collectors['collect'], args.workers)
+
+    results = {'simulator': options, 'per_device': per_device, 'fleet': fleet}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la récupération des configurations contre le simulateur local
+Sauvegarde la flotte simulée quatre fois et relève, pour chaque passe, les
+octets renvoyés par les équipements (sorties de commandes et lectures SFTP),
+les commandes exécutées, les connexions et la durée:
+
+- legacy: NALPMUtils.get_config (un `cat` par fichier, ip route, ip addr);
+- froid: ConfigFetcher avec un cache vide;
+- chaud: ConfigFetcher sur une flotte inchangée (seule la liste des
+  empreintes circule);
+- modifié: après modification de /etc/sysctl.conf sur --changed de la flotte.
+
+Usage: python3 -m benchmarks.bench_config_fetch [--devices 100] [--workers 20]
+           [--latency 0.005] [--changed 0.05] [--output resultats.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from modules import batch
+
+from .ssh_simulator import SimulatorProcess
+
+
+def run_pass(simulator, devices, workers, **kwargs):
+    """Sauvegarde de toute la flotte; compteurs du simulateur pour cette passe"""
+    simulator.reset_stats()
+    runner = batch.BatchRunner(devices, workers=workers, stream=io.StringIO())
+    start = time.perf_counter()
+    results = runner.run('backup', batch.backup_device, **kwargs)
+    elapsed = time.perf_counter() - start
+    stats = simulator.stats()
+    transferred = stats['output_bytes'] + stats['sftp_bytes']
+    records = list(results.values())
+    return {
+        'seconds': round(elapsed, 3),
+        'failed': sum(1 for record in records if 'error' in record or record.get('status') != 'success'),
+        'connections': stats['connections'],
+        'commands': stats['commands'],
+        'sftp_reads': stats['sftp_reads'],
+        'bytes': transferred,
+        'bytes_per_device': round(transferred / len(devices), 1),
+        'files_fetched': sum(record.get('fetched', 0) for record in records),
+        'commands_rerun': sum(record.get('commands_rerun', 0) for record in records),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la récupération incrémentale des configurations")
+    parser.add_argument('--devices', type=int, default=100, help="Équipements simulés")
+    parser.add_argument('--workers', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.005, help="Délai par commande (s)")
+    parser.add_argument('--changed', type=float, default=0.05, help="Part de la flotte modifiée")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    passes = {}
+    with tempfile.TemporaryDirectory() as directory, \
+            SimulatorProcess(count=args.devices, latency=args.latency, seed=args.seed) as simulator:
+        devices = simulator.devices()
+        backup_dir = str(Path(directory) / 'backups')
+        with contextlib.redirect_stdout(sys.stderr):
+            passes['legacy'] = run_pass(simulator, devices, args.workers, backup_dir=backup_dir)
+            passes['cold'] = run_pass(simulator, devices, args.workers, backup_dir=backup_dir, incremental=True)
+            passes['warm'] = run_pass(simulator, devices, args.workers, backup_dir=backup_dir, incremental=True)
+            changed = simulator.change_files(args.changed)
+            passes['changed'] = run_pass(simulator, devices, args.workers, backup_dir=backup_dir, incremental=True)
+
+    results = {'devices': args.devices, 'changed_devices': changed, 'passes': passes}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    problems = []
+    if any(result['failed'] for result in passes.values()):
+        problems.append("sauvegardes en échec")
+    if passes['warm']['files_fetched'] or passes['warm']['commands_rerun']:
+        problems.append("fichiers retéléchargés sur une flotte inchangée")
+    if passes['changed']['files_fetched'] != changed:
+        problems.append(f"{passes['changed']['files_fetched']} fichiers téléchargés pour {changed} modifiés")
+    if problems:
+        print(f"[!] {'; '.join(problems)}", file=sys.stderr)
+        return 1
+    print(f"[+] {passes['warm']['bytes_per_device']} octets par équipement sur une flotte inchangée "
+          f"(legacy: {passes['legacy']['bytes_per_device']}), {passes['warm']['commands'] // args.devices} "
+          f"commande(s) par équipement (legacy: {passes['legacy']['commands'] // args.devices})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
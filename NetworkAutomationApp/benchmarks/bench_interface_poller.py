@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark du sondage des interfaces contre le simulateur local
+Compare, sur un échantillon d'équipements, NetworkMonitoring.get_interface_stats
+(une connexion SSH par interface interrogée) et InterfacePoller (une commande
+par équipement sur une connexion persistante), puis vérifie que le sondage de
+toute la flotte tient dans l'intervalle: durée de chaque cycle, temps CPU
+du processus, connexions ouvertes, mémoire des historiques.
+
+Usage: python3 -m benchmarks.bench_interface_poller [--devices 300] [--rounds 4]
+           [--interval 10] [--workers 32] [--latency 0.005] [--output resultats.json]
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+from pathlib import Path
+
+from modules.interface_poller import InterfacePoller
+from modules.monitoring import NetworkMonitoring
+
+from .bench_collectors import summarize
+from .ssh_simulator import SimulatorProcess
+
+
+def bench_legacy(simulator, devices):
+    """Compteurs de chaque interface via get_interface_stats (hors lo)"""
+    simulator.reset_stats()
+    poller = InterfacePoller()
+    interfaces = 0
+    start = time.perf_counter()
+    for device in devices:
+        names = [name for name in poller.poll(device).get('interfaces', {}) if name != 'lo']
+        for name in names:
+            NetworkMonitoring.get_interface_stats(device, name)
+        interfaces += len(names)
+    poller.close()
+    elapsed = time.perf_counter() - start
+    stats = simulator.stats()
+    return {
+        'devices': len(devices),
+        'interfaces': interfaces,
+        'seconds': round(elapsed, 3),
+        # Une connexion (et une commande) par équipement revient à l'inventaire des interfaces
+        'connections': stats['connections'] - len(devices),
+        'commands': stats['commands'] - len(devices),
+    }
+
+
+def bench_poller(simulator, devices, rounds, interval, workers):
+    """Cycles de sondage de toute la flotte, à intervalle fixe"""
+    simulator.reset_stats()
+    poller = InterfacePoller(workers=workers)
+    cycles = []
+    due = time.monotonic()
+    for _ in range(rounds):
+        time.sleep(max(0, due - time.monotonic()))
+        started, cpu = time.monotonic(), time.process_time()
+        results = poller.poll_all(devices)
+        cycles.append({
+            'seconds': round(time.monotonic() - started, 3),
+            'cpu_seconds': round(time.process_time() - cpu, 3),
+            'failures': sum(1 for result in results.values() if 'error' in result),
+            'with_rates': sum(1 for result in results.values() if result.get('interval')),
+        })
+        due = started + interval
+    history_bytes = poller.history_bytes()
+    poller.close()
+    stats = simulator.stats()
+    steady = cycles[1:] or cycles
+    return {
+        'devices': len(devices),
+        'rounds': rounds,
+        'interval': interval,
+        'workers': workers,
+        'first_cycle': cycles[0],
+        'steady_cycles': summarize([cycle['seconds'] * 1000 for cycle in steady]),
+        'steady_cpu_seconds_max': max(cycle['cpu_seconds'] for cycle in steady),
+        'failures': sum(cycle['failures'] for cycle in cycles),
+        'connections_opened': stats['connections'],
+        'commands': stats['commands'],
+        'history_kb': round(history_bytes / 1024, 1),
+        'within_interval': all(cycle['seconds'] < interval for cycle in cycles),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du sondage des interfaces (simulateur local)")
+    parser.add_argument('--devices', type=int, default=300, help="Équipements simulés")
+    parser.add_argument('--rounds', type=int, default=4, help="Cycles de sondage de la flotte")
+    parser.add_argument('--interval', type=float, default=10, help="Secondes entre deux cycles")
+    parser.add_argument('--workers', type=int, default=32, help="Équipements sondés en parallèle")
+    parser.add_argument('--sample', type=int, default=10, help="Équipements de la comparaison avec get_interface_stats")
+    parser.add_argument('--latency', type=float, default=0.005, help="Délai par commande (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    options = dict(count=args.devices, latency=args.latency, seed=args.seed)
+    print(f"[*] Démarrage du simulateur ({args.devices} équipements)", file=sys.stderr)
+    with SimulatorProcess(**options) as simulator:
+        devices = simulator.devices()
+        with contextlib.redirect_stdout(sys.stderr):
+            print("[*] get_interface_stats, une connexion par interface", file=sys.stderr)
+            legacy = bench_legacy(simulator, devices[:args.sample])
+            print(f"[*] InterfacePoller, {args.rounds} cycles toutes les {args.interval}s", file=sys.stderr)
+            poller = bench_poller(simulator, devices, args.rounds, args.interval, args.workers)
+
+    results = {'simulator': options, 'get_interface_stats': legacy, 'interface_poller': poller}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    if not poller['within_interval']:
+        print(f"[!] Un cycle a dépassé l'intervalle de {args.interval}s", file=sys.stderr)
+        return 1
+    print(f"[+] Tous les cycles tiennent dans l'intervalle de {args.interval}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark du chargement de l'inventaire
+Génère un devices.yaml de --devices équipements (sections de configuration
+de config/devices.yaml conservées), puis mesure:
+
+- yaml.safe_load (chargement de main.py avant modules/inventory.py);
+- load_inventory à froid (CSafeLoader, validation, écriture du cache);
+- load_inventory sur cache, puis après un simple touch du fichier (mtime
+  modifié, contenu identique: sha256 vérifié);
+- sélection par index (location et rôle exacts) contre batch.filter_devices;
+- mémoire des équipements (tracemalloc): dicts contre DeviceRecord.
+
+Usage: python3 -m benchmarks.bench_inventory [--devices 20000] [--runs 3]
+           [--output resultats.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import yaml
+
+from modules.batch import filter_devices
+from modules.inventory import cache_path, load_inventory
+
+APP_DIR = Path(__file__).resolve().parent.parent
+ROLES = ('web', 'db', 'lb', 'cache')
+
+
+def build_inventory(path, count):
+    with open(APP_DIR / 'config' / 'devices.yaml', 'r') as f:
+        config = yaml.safe_load(f) or {}
+    config['devices'] = [
+        {
+            'name': f'device-{i}',
+            'host': f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}',
+            'username': 'ubuntu',
+            'password': 'ubuntu123',
+            'device_type': 'linux',
+            'port': 22,
+            'location': f'rack-{i // 40}',
+            'role': ROLES[i % len(ROLES)],
+        }
+        for i in range(count)
+    ]
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f, default_flow_style=False)
+
+
+def best_of(runs, function):
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 1), result
+
+
+def allocated(function):
+    tracemalloc.start()
+    result = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du chargement de l'inventaire")
+    parser.add_argument('--devices', type=int, default=20000, help="Équipements générés")
+    parser.add_argument('--runs', type=int, default=3, help="Mesures par cas (meilleure gardée)")
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'devices.yaml'
+        print(f"[*] Génération de {args.devices} équipements", file=sys.stderr)
+        build_inventory(path, args.devices)
+
+        def safe_load():
+            with open(path, 'r') as f:
+                return yaml.safe_load(f)
+
+        def cold():
+            cache_path(path).unlink(missing_ok=True)
+            return load_inventory(path)
+
+        def touched():
+            os.utime(path)
+            return load_inventory(path)
+
+        safe_load_ms, config = best_of(1, safe_load)
+        cold_ms, _ = best_of(args.runs, cold)
+        warm_ms, inventory = best_of(args.runs, lambda: load_inventory(path))
+        touched_ms, touched_inventory = best_of(args.runs, touched)
+
+        location, role = 'rack-7', 'db'
+        patterns = {'location': [location], 'role': [role]}
+        index_ms, selected = best_of(args.runs, lambda: inventory.filter(**patterns))
+        scan_ms, expected = best_of(args.runs, lambda: filter_devices(inventory.devices, **patterns))
+
+        dict_bytes, _ = allocated(safe_load)
+        record_bytes, _ = allocated(lambda: load_inventory(path))
+        file_bytes = path.stat().st_size
+        cache_bytes = cache_path(path).stat().st_size
+
+    results = {
+        'devices': args.devices,
+        'file_bytes': file_bytes,
+        'cache_bytes': cache_bytes,
+        'load_ms': {'yaml_safe_load': safe_load_ms, 'cold': cold_ms, 'cache': warm_ms, 'touched': touched_ms},
+        'select_ms': {'index': index_ms, 'scan': scan_ms, 'devices': len(selected)},
+        'memory_bytes': {'dicts': dict_bytes, 'records': record_bytes},
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    problems = []
+    if inventory.source != 'cache' or touched_inventory.source != 'cache':
+        problems.append("cache non utilisé")
+    if [dict(device) for device in inventory.devices] != config['devices']:
+        problems.append("équipements différents du YAML")
+    if [device['name'] for device in selected] != [device['name'] for device in expected]:
+        problems.append("sélection par index différente de filter_devices")
+    if problems:
+        print(f"[!] {'; '.join(problems)}", file=sys.stderr)
+        return 1
+    print(f"[+] {args.devices} équipements: {warm_ms} ms sur cache, {cold_ms} ms à froid "
+          f"(yaml.safe_load: {safe_load_ms} ms)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
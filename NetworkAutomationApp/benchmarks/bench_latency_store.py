@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark du stockage matriciel des latences
+Remplit un LatencyMatrixStore (5 000 équipements x 30 jours à 5 minutes par
+défaut) cycle par cycle, puis mesure le temps et la mémoire Python des
+heatmaps 24 h et 30 jours. Code de sortie 1 si un budget est dépassé.
+
+Usage: python3 -m benchmarks.bench_latency_store [--devices 5000] [--days 30]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from modules.latency_store import BUCKET_SECONDS, LatencyMatrixStore
+
+
+def fill(store, devices, days, seed=42):
+    """
+    Écrit un cycle de mesures par intervalle pour tous les équipements
+
+    Returns:
+        dict: Durées par cycle (ms): moyenne et maximum
+    """
+    rng = np.random.default_rng(seed)
+    hostnames = [f"device-{i:05d}" for i in range(devices)]
+    baseline = rng.uniform(1, 50, devices)
+    n_buckets = days * 86400 // BUCKET_SECONDS
+    first = int(time.time() // BUCKET_SECONDS) - n_buckets + 1
+
+    durations = np.empty(n_buckets)
+    for i in range(n_buckets):
+        timestamps = np.full(devices, (first + i) * BUCKET_SECONDS + 30)
+        latencies = baseline + rng.exponential(2, devices)
+        start = time.perf_counter()
+        store.update(hostnames, timestamps, latencies)
+        durations[i] = (time.perf_counter() - start) * 1000
+    store.save()
+    return {'mean_ms': round(float(durations.mean()), 3), 'max_ms': round(float(durations.max()), 3)}
+
+
+def measure_heatmap(store, hours, max_buckets):
+    """Temps et pic de mémoire Python d'une heatmap"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    devices, _, matrix = store.heatmap(hours, max_buckets)
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'hours': hours,
+        'shape': list(matrix.shape),
+        'devices': len(devices),
+        'ms': round(elapsed, 2),
+        'peak_mb': round(peak / 1e6, 1)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du stockage matriciel des latences")
+    parser.add_argument('--devices', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--max-buckets', type=int, default=200)
+    parser.add_argument('--budget-ms', type=float, default=2000,
+                        help="Budget de la heatmap sur toute la rétention")
+    parser.add_argument('--directory', help="Répertoire du store (défaut: temporaire, supprimé)")
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    directory = Path(args.directory or tempfile.mkdtemp(prefix='latency_store_'))
+    try:
+        print(f"[*] Remplissage: {args.devices} équipements x {args.days} jours", file=sys.stderr)
+        store = LatencyMatrixStore(directory, retention_days=args.days)
+        start = time.perf_counter()
+        cycles = fill(store, args.devices, args.days)
+
+        results = {
+            'devices': args.devices,
+            'days': args.days,
+            'buckets': store.n_buckets,
+            'fill_seconds': round(time.perf_counter() - start, 2),
+            'cycle_update': cycles,
+            'disk_mb': round(sum(f.stat().st_size for f in directory.iterdir()) / 1e6, 1),
+            'heatmaps': [
+                measure_heatmap(LatencyMatrixStore(directory), hours, args.max_buckets)
+                for hours in (24, args.days * 24)
+            ],
+            'budget_ms': args.budget_ms
+        }
+    finally:
+        if not args.directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    failures = [
+        f"heatmap {h['hours']}h: {h['ms']}ms > {args.budget_ms}ms"
+        for h in results['heatmaps'] if h['ms'] > args.budget_ms
+    ]
+    results['failures'] = failures
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    if failures:
+        for failure in failures:
+            print(f"[!] {failure}", file=sys.stderr)
+        return 1
+    print("[+] Heatmaps dans le budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
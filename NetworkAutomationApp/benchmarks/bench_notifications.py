@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark du répartiteur de notifications contre les récepteurs locaux
+Envoie plusieurs rafales d'événements d'alerte (--storm événements sur
+--devices équipements, --waves rafales espacées de --gap secondes) à
+NotificationDispatcher branché sur les récepteurs SMTP, webhook et syslog
+locaux, puis vérifie:
+
+- que submit() ne bloque pas l'appelant (durée par appel, p99 et max);
+- qu'une rafale donne un récapitulatif par canal, pas un message par
+  événement (emails et webhooks reçus contre événements soumis);
+- que les connexions SMTP et HTTP sont réutilisées d'une rafale à l'autre;
+- que syslog envoie un message par groupe (équipement, métrique), borné par
+  max_messages, et que tous arrivent.
+
+Usage: python3 -m benchmarks.bench_notifications [--storm 500] [--devices 100]
+           [--waves 3] [--gap 1.5] [--output resultats.json]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from modules.notifications import NotificationDispatcher
+
+from .bench_collectors import summarize
+from .notification_sinks import NotificationSinks
+
+METRIC_NAMES = ('latency', 'packet_loss', 'cpu', 'memory')
+
+
+def storm(rng, size, devices, now):
+    """Événements d'une rafale: levées et aggravations sur une partie de la flotte"""
+    events = []
+    for _ in range(size):
+        level = rng.choice(('warning', 'critical', 'ok'))
+        events.append({
+            'device': f'device-{rng.randrange(devices)}',
+            'metric': rng.choice(METRIC_NAMES),
+            'level': level,
+            'previous': 'ok' if level != 'ok' else 'warning',
+            'value': round(rng.uniform(50, 150), 1),
+            'threshold': 50.0,
+            'peak': 150.0,
+            'started': now,
+            'timestamp': now,
+        })
+    return events
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark des notifications (récepteurs locaux)")
+    parser.add_argument('--storm', type=int, default=500, help="Événements par rafale")
+    parser.add_argument('--devices', type=int, default=100, help="Équipements concernés")
+    parser.add_argument('--waves', type=int, default=3, help="Rafales")
+    parser.add_argument('--gap', type=float, default=1.5, help="Secondes entre deux rafales")
+    parser.add_argument('--group-wait', type=float, default=0.2, help="Fenêtre de regroupement (s)")
+    parser.add_argument('--min-interval', type=float, default=1.0, help="Intervalle minimal par canal (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    timing = {'group_wait': args.group_wait, 'min_interval': args.min_interval}
+    with NotificationSinks() as sinks:
+        config = sinks.config(email=timing, slack=timing, syslog={'group_wait': args.group_wait})
+        dispatcher = NotificationDispatcher.from_config(config)
+        durations = []
+        groups = 0
+        for wave in range(args.waves):
+            if wave:
+                time.sleep(args.gap)
+            events = storm(rng, args.storm, args.devices, time.time())
+            groups += len({(event['device'], event['metric']) for event in events})
+            for event in events:
+                start = time.perf_counter()
+                dispatcher.submit(event)
+                durations.append((time.perf_counter() - start) * 1000)
+        dispatcher.close()
+        channels = dispatcher.channel_stats()
+        # Les derniers datagrammes syslog (envoyés à la fermeture) peuvent être encore en file
+        deadline = time.monotonic() + 2
+        while sinks.stats()['syslog'] < channels['syslog'].get('datagrams', 0) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        received = sinks.stats()
+
+    submitted = args.storm * args.waves
+    results = {
+        'submitted': submitted,
+        'dropped': dispatcher.stats['dropped'],
+        'submit_ms': summarize(durations),
+        'received': received,
+        'channels': channels,
+        'groups': groups,
+        'messages_per_event': {
+            'email': round(received['emails'] / submitted, 4),
+            'slack': round(received['webhooks'] / submitted, 4),
+            'syslog': round(received['syslog'] / submitted, 4),
+        },
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    problems = []
+    if received['emails'] > args.waves or received['webhooks'] > args.waves:
+        problems.append("plus d'un récapitulatif par rafale")
+    if received['smtp_connections'] > 1 or received['http_connections'] > 1:
+        problems.append("connexions SMTP/HTTP non réutilisées")
+    if received['syslog'] != channels['syslog'].get('datagrams', 0):
+        problems.append(f"{received['syslog']} messages syslog reçus sur {channels['syslog'].get('datagrams', 0)}")
+    if any(stats.get('failures') for stats in channels.values()):
+        problems.append("envois en échec")
+    if problems:
+        print(f"[!] {'; '.join(problems)}", file=sys.stderr)
+        return 1
+    print(f"[+] {submitted} événements -> {received['emails']} emails, {received['webhooks']} webhooks, "
+          f"{received['syslog']} messages syslog", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
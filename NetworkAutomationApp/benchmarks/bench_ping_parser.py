@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark du parseur de sorties ping
+Compare, sur un corpus de sorties ping, le parseur ligne à ligne (regex par
+ligne, listes Python, module statistics) et modules.ping_stats, appelé
+sortie par sortie (analyze) puis sur tout le corpus en un appel
+(analyze_many). Rapporte sorties/s et réponses/s, et vérifie que les
+parseurs donnent les mêmes statistiques.
+
+Le corpus est soit synthétique (formats Linux, BusyBox et Windows, pertes
+et doublons), soit un répertoire de sorties capturées (*.txt, une sortie
+ping par fichier).
+
+Usage: python3 -m benchmarks.bench_ping_parser [--outputs 20000] [--count 20]
+           [--corpus captures/] [--output resultats.json]
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from modules.ping_stats import PERCENTILES, analyze, analyze_many
+
+LINE_RE = re.compile(r'(?:icmp_)?seq=(\d+).*time[=<]([\d.]+) ?ms|time[=<]([\d.]+)ms')
+SENT_RE = re.compile(r'(\d+) packets transmitted|Sent = (\d+)')
+
+
+def synthetic_output(rng, index, count, loss):
+    """Une sortie ping plausible (format tiré au hasard)"""
+    host = f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+    base = rng.uniform(0.2, 80)
+    style = rng.choice(('linux', 'linux', 'busybox', 'windows'))
+    received = []
+    lines = []
+    if style == 'windows':
+        lines.append(f"Pinging {host} with 32 bytes of data:")
+    else:
+        lines.append(f"PING {host} ({host}) 56(84) bytes of data.")
+    for seq in range(1, count + 1):
+        if rng.random() < loss:
+            if style == 'windows':
+                lines.append("Request timed out.")
+            continue
+        rtt = base + rng.expovariate(1 / max(base * 0.1, 0.05))
+        received.append(rtt)
+        if style == 'windows':
+            lines.append(f"Reply from {host}: bytes=32 time={max(1, round(rtt))}ms TTL=117")
+        elif style == 'busybox':
+            lines.append(f"64 bytes from {host}: seq={seq - 1} ttl=64 time={rtt:.3f} ms")
+        else:
+            lines.append(f"64 bytes from {host}: icmp_seq={seq} ttl=64 time={rtt:.3f} ms")
+            if rng.random() < 0.01:
+                lines.append(f"64 bytes from {host}: icmp_seq={seq} ttl=64 time={rtt + 0.1:.3f} ms (DUP!)")
+    lost = count - len(received)
+    if style == 'windows':
+        lines.append(f"\nPing statistics for {host}:")
+        lines.append(f"    Packets: Sent = {count}, Received = {len(received)}, Lost = {lost}")
+    else:
+        lines.append(f"\n--- {host} ping statistics ---")
+        lines.append(f"{count} packets transmitted, {len(received)} received, "
+                     f"{round(100 * lost / count)}% packet loss, time {count * 1000}ms")
+    return "\n".join(lines) + "\n"
+
+
+def line_parser(output):
+    """Parseur de référence: regex ligne par ligne et module statistics"""
+    replies = {}
+    sent = None
+    for index, line in enumerate(output.splitlines()):
+        match = LINE_RE.search(line)
+        if match:
+            if match.group(3) is not None:
+                replies.setdefault(index, float(match.group(3)))
+            else:
+                replies.setdefault(int(match.group(1)), float(match.group(2)))
+            continue
+        match = SENT_RE.search(line)
+        if match:
+            sent = int(match.group(1) or match.group(2))
+    values = [replies[key] for key in sorted(replies)]
+    received = len(values)
+    sent = max(sent or received, received)
+    stats = {
+        'sent': sent,
+        'received': received,
+        'packet_loss': round(100.0 * (sent - received) / sent, 2) if sent else 100.0,
+    }
+    if values:
+        stats['avg_rtt'] = round(statistics.fmean(values), 3)
+        stats['stddev'] = round(statistics.pstdev(values), 3)
+        stats['jitter'] = round(statistics.fmean(abs(b - a) for a, b in zip(values, values[1:])), 3) \
+            if received > 1 else 0.0
+        cuts = statistics.quantiles(values, n=100, method='inclusive') if received > 1 else [values[0]] * 99
+        stats.update({f'p{p}': round(cuts[p - 1], 3) for p in PERCENTILES})
+    return stats
+
+
+def load_corpus(args):
+    if args.corpus:
+        return [p.read_text(encoding='utf-8', errors='replace') for p in sorted(Path(args.corpus).glob('*.txt'))]
+    rng = random.Random(args.seed)
+    return [synthetic_output(rng, i, args.count, args.loss) for i in range(args.outputs)]
+
+
+def measure(parser, corpus, replies, batch=False):
+    start = time.perf_counter()
+    results = parser(corpus) if batch else [parser(output) for output in corpus]
+    elapsed = time.perf_counter() - start
+    return results, {
+        'seconds': round(elapsed, 3),
+        'outputs_per_s': round(len(corpus) / elapsed),
+        'replies_per_s': round(replies / elapsed),
+    }
+
+
+def compare(reference, vectorized, tolerance=0.002):
+    """Nombre de sorties dont les statistiques diffèrent"""
+    mismatches = 0
+    for ref, vec in zip(reference, vectorized):
+        for key, value in ref.items():
+            other = vec.get(key)
+            if value is None or other is None:
+                if value != other:
+                    mismatches += 1
+                    break
+            elif abs(value - other) > tolerance * max(1.0, abs(value)):
+                mismatches += 1
+                break
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du parseur de sorties ping")
+    parser.add_argument('--outputs', type=int, default=20000, help="Sorties synthétiques")
+    parser.add_argument('--count', type=int, default=20, help="Pings par sortie synthétique")
+    parser.add_argument('--loss', type=float, default=0.05, help="Taux de perte synthétique")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--corpus', help="Répertoire de sorties capturées (*.txt)")
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args)
+    if not corpus:
+        print("[!] Corpus vide", file=sys.stderr)
+        return 1
+
+    print(f"[*] {len(corpus)} sorties ping, analyse...", file=sys.stderr)
+    reference, line_timing = measure(line_parser, corpus, 0)
+    replies = sum(r['received'] for r in reference)
+    line_timing['replies_per_s'] = round(replies / line_timing['seconds'])
+    single, single_timing = measure(analyze, corpus, replies)
+    batched, batch_timing = measure(analyze_many, corpus, replies, batch=True)
+    mismatches = compare(reference, single) + compare(reference, batched)
+
+    results = {
+        'outputs': len(corpus),
+        'replies': replies,
+        'line_parser': line_timing,
+        'analyze': single_timing,
+        'analyze_many': batch_timing,
+        'speedup_analyze': round(line_timing['seconds'] / single_timing['seconds'], 2),
+        'speedup_analyze_many': round(line_timing['seconds'] / batch_timing['seconds'], 2),
+        'mismatches': mismatches,
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    if mismatches:
+        print(f"[!] {mismatches} sortie(s) avec des statistiques différentes", file=sys.stderr)
+        return 1
+    print("[+] Statistiques identiques entre les deux parseurs", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'exécution répartie (modules/sharding.py)
+Trois volets:
+
+- répartition: --keys équipements fictifs sur 2..--max-processes processus:
+  écart au processus le plus chargé, et part des équipements déplacés quand
+  on ajoute un processus (hachage cohérent contre un simple modulo);
+- transport: une action triviale sur --keys équipements, BatchRunner contre
+  ShardedRunner, pour mesurer le coût du pipe par enregistrement;
+- sondage réel: interfaces de la flotte simulée pendant --rounds passes,
+  dans un processus (InterfacePoller) puis réparties sur --processes
+  processus (chacun son pool SSH et son calendrier): durée, CPU du parent,
+  connexions ouvertes (une par équipement si les pools sont gardés) et débits
+  calculés dès la deuxième passe.
+
+Le gain en durée dépend des cœurs disponibles (os.cpu_count() est rapporté).
+
+Usage: python3 -m benchmarks.bench_sharding [--devices 120] [--processes 4]
+           [--rounds 3] [--keys 20000] [--output resultats.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+
+from modules import batch
+from modules.interface_poller import InterfacePoller
+from modules.sharding import HashRing, ShardedRunner, close_worker_locals, shard_names
+
+from .ssh_simulator import SimulatorProcess
+
+
+def echo_device(device):
+    """Action triviale: coût du transport seul"""
+    return {'status': 'ok', 'location': device.get('location')}
+
+
+def bench_distribution(keys, max_processes):
+    devices = [{'name': f'device-{i}', 'host': f'10.0.{i >> 8 & 255}.{i & 255}'} for i in range(keys)]
+    rows = []
+    for count in range(2, max_processes + 1):
+        ring = HashRing(shard_names(count))
+        grown = HashRing(shard_names(count + 1))
+        sizes = [len(group) for group in ring.partition(devices).values()]
+        moved = sum(1 for device in devices if ring.node(device['name']) != grown.node(device['name']))
+        modulo = sum(1 for device in devices
+                     if zlib.crc32(device['name'].encode()) % count != zlib.crc32(device['name'].encode()) % (count + 1))
+        rows.append({
+            'processes': count,
+            'max_over_mean': round(max(sizes) / (keys / count), 3),
+            'moved_on_add': round(moved / keys, 3),
+            'ideal': round(1 / (count + 1), 3),
+            'moved_modulo': round(modulo / keys, 3),
+        })
+    return rows
+
+
+def bench_transport(keys, processes):
+    devices = [{'name': f'device-{i}', 'host': f'10.0.{i >> 8 & 255}.{i & 255}', 'location': f'rack-{i // 40}'}
+               for i in range(keys)]
+    start = time.perf_counter()
+    batch.BatchRunner(devices, workers=4, stream=io.StringIO()).run('echo', echo_device)
+    single = time.perf_counter() - start
+    with ShardedRunner(devices, processes=processes, workers=4, stream=io.StringIO()) as runner:
+        start = time.perf_counter()
+        results = runner.run('echo', echo_device)
+        sharded = time.perf_counter() - start
+    return {
+        'records': len(results),
+        'batch_runner_s': round(single, 3),
+        'sharded_s': round(sharded, 3),
+        'records_per_s': round(len(results) / sharded),
+    }
+
+
+def bench_poll(simulator, devices, processes, rounds, workers):
+    """Passes de sondage des interfaces: un processus puis plusieurs"""
+    simulator.reset_stats()
+    stream = io.StringIO()
+    runner = batch.BatchRunner(devices, workers=workers, stream=stream)
+    poller = InterfacePoller(history=rounds)
+    start, cpu = time.perf_counter(), time.process_time()
+    single_results = []
+    for _ in range(rounds):
+        single_results.append(runner.run('interfaces', poller.poll))
+    single = {
+        'seconds': round(time.perf_counter() - start, 3),
+        'parent_cpu_s': round(time.process_time() - cpu, 3),
+        'connections': simulator.stats()['connections'],
+    }
+    poller.close()
+
+    simulator.reset_stats()
+    records = []
+    with ShardedRunner(devices, processes=processes, workers=max(1, workers // processes),
+                       stream=io.StringIO()) as sharded_runner:
+        start, cpu = time.perf_counter(), time.process_time()
+        sharded_runner.serve('interfaces', batch.poll_interfaces, interval=0, iterations=rounds,
+                             on_record=records.append, history=rounds)
+        sharded = {
+            'seconds': round(time.perf_counter() - start, 3),
+            'parent_cpu_s': round(time.process_time() - cpu, 3),
+            'shards': {shard: len(group) for shard, group in sharded_runner.shards.items()},
+        }
+    sharded['connections'] = simulator.stats()['connections']
+    sharded['records'] = len(records)
+    sharded['failed'] = sum(1 for record in records if 'error' in record)
+    # Débits dès la deuxième passe: l'historique des compteurs est gardé dans chaque processus
+    with_rates = {record['device'] for record in records
+                  if any('rx_bps' in entry for entry in record.get('interfaces', {}).values())}
+    sharded['devices_with_rates'] = len(with_rates)
+    single['failed'] = sum(1 for result in single_results for record in result.values() if 'error' in record)
+    return {'single_process': single, 'sharded': sharded}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de l'exécution répartie sur plusieurs processus")
+    parser.add_argument('--devices', type=int, default=120, help="Équipements simulés")
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=32, help="Équipements en parallèle (au total)")
+    parser.add_argument('--rounds', type=int, default=3, help="Passes de sondage")
+    parser.add_argument('--keys', type=int, default=20000, help="Équipements fictifs (répartition, transport)")
+    parser.add_argument('--max-processes', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.005, help="Délai par commande (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    print(f"[*] Répartition de {args.keys} équipements", file=sys.stderr)
+    distribution = bench_distribution(args.keys, args.max_processes)
+    print("[*] Transport des enregistrements", file=sys.stderr)
+    transport = bench_transport(args.keys, args.processes)
+    print(f"[*] Sondage des interfaces ({args.devices} équipements simulés)", file=sys.stderr)
+    with SimulatorProcess(count=args.devices, latency=args.latency, seed=args.seed) as simulator:
+        devices = simulator.devices()
+        with contextlib.redirect_stdout(sys.stderr):
+            poll = bench_poll(simulator, devices, args.processes, args.rounds, args.workers)
+    close_worker_locals()
+
+    results = {'cpu_count': os.cpu_count(), 'processes': args.processes,
+               'distribution': distribution, 'transport': transport, 'poll': poll}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    problems = []
+    for row in distribution:
+        if row['moved_on_add'] > 2 * row['ideal']:
+            problems.append(f"{row['moved_on_add']:.0%} déplacés en passant à {row['processes'] + 1} processus")
+    sharded = poll['sharded']
+    if sharded['records'] != args.devices * args.rounds or sharded['failed']:
+        problems.append(f"{sharded['records']} sondages ({sharded['failed']} en échec) "
+                        f"pour {args.devices * args.rounds} attendus")
+    if sharded['connections'] != args.devices:
+        problems.append(f"{sharded['connections']} connexions SSH pour {args.devices} équipements")
+    if args.rounds > 1 and sharded['devices_with_rates'] != args.devices:
+        problems.append("historique des compteurs perdu entre deux passes")
+    if problems:
+        print(f"[!] {'; '.join(problems)}", file=sys.stderr)
+        return 1
+    worst = max(distribution, key=lambda row: row['moved_on_add'] / row['ideal'])
+    print(f"[+] Ajout d'un processus: au plus {worst['moved_on_add']:.1%} des équipements déplacés "
+          f"(idéal {worst['ideal']:.1%}, modulo {worst['moved_modulo']:.1%}); "
+          f"{transport['records_per_s']} enregistrements/s par les pipes; "
+          f"sondage {poll['single_process']['seconds']} s -> {sharded['seconds']} s "
+          f"sur {os.cpu_count()} cœur(s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark du sondage SNMP contre l'agent local
+Sonde toute la flotte simulée en SNMP v2c (GETBULK, socket UDP partagé) sur
+plusieurs cycles: durée par cycle, temps CPU du processus, requêtes par
+équipement, expirations et nouvelles tentatives (--drop-rate). Avec
+--compare-ssh, la même flotte est sondée par InterfacePoller (SSH, connexions
+persistantes) contre le simulateur SSH pour comparer durée et CPU. Avec
+--compare-pysnmp, les mêmes objets sont lus avec l'API synchrone de pysnmp
+(requirements.txt, optionnel), équipement par équipement.
+
+Usage: python3 -m benchmarks.bench_snmp [--devices 300] [--rounds 3]
+           [--latency 0.002] [--drop-rate 0.01] [--compare-ssh] [--compare-pysnmp]
+           [--output resultats.json]
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+from pathlib import Path
+
+from modules.interface_poller import InterfacePoller
+from modules.snmp_poller import IF_TABLE, IFX_TABLE, SYSTEM, SNMPPoller
+
+from .bench_collectors import summarize
+from .snmp_agent import AgentProcess
+from .ssh_simulator import SimulatorProcess
+
+
+def run_cycles(poll, devices, rounds):
+    """Cycles consécutifs: durée, CPU et échecs de chacun"""
+    cycles = []
+    for _ in range(rounds):
+        started, cpu = time.perf_counter(), time.process_time()
+        results = poll(devices)
+        cycles.append({
+            'seconds': time.perf_counter() - started,
+            'cpu_seconds': time.process_time() - cpu,
+            'failures': sum(1 for result in results.values() if 'error' in result),
+        })
+    return cycles
+
+
+def report(cycles):
+    steady = cycles[1:] or cycles
+    return {
+        'first_cycle_ms': round(cycles[0]['seconds'] * 1000, 1),
+        'steady_cycles': summarize([cycle['seconds'] * 1000 for cycle in steady]),
+        'steady_cpu_seconds_mean': round(sum(c['cpu_seconds'] for c in steady) / len(steady), 3),
+        'failures': sum(cycle['failures'] for cycle in cycles),
+    }
+
+
+def bench_snmp(args):
+    options = dict(count=args.devices, latency=args.latency, drop_rate=args.drop_rate, seed=args.seed)
+    print(f"[*] Agent SNMP ({args.devices} équipements)", file=sys.stderr)
+    with AgentProcess(**options) as agent:
+        devices = agent.devices()
+        poller = SNMPPoller(timeout=args.timeout, retries=args.retries,
+                            max_repetitions=args.max_repetitions, max_inflight=args.max_inflight)
+        cycles = run_cycles(poller.poll, devices, args.rounds)
+        agent_stats = agent.stats()
+    return dict(
+        report(cycles),
+        agent=options,
+        requests_per_device=round(poller.stats['requests'] / args.rounds / len(devices), 2),
+        timeouts=poller.stats['timeouts'],
+        retries=poller.stats['retries'],
+        agent_requests=agent_stats['requests'],
+        agent_dropped=agent_stats['dropped'],
+    )
+
+
+def bench_ssh(args):
+    print(f"[*] Simulateur SSH ({args.devices} équipements)", file=sys.stderr)
+    with SimulatorProcess(count=args.devices, latency=args.latency, seed=args.seed) as simulator:
+        devices = simulator.devices()
+        poller = InterfacePoller(workers=args.ssh_workers)
+        with contextlib.redirect_stdout(sys.stderr):
+            cycles = run_cycles(poller.poll_all, devices, args.rounds)
+        poller.close()
+        stats = simulator.stats()
+    return dict(report(cycles), connections_opened=stats['connections'], commands=stats['commands'])
+
+
+def bench_pysnmp(args):
+    """Mêmes objets (system, ifTable, ifXTable) avec pysnmp.hlapi, un équipement à la fois"""
+    try:
+        from pysnmp import hlapi
+    except Exception as e:
+        # hlapi.asyncio ne s'importe pas sur Python 3.11+ (asyncio.coroutine), hlapi exige pyasn1 < 0.5
+        print(f"[!] pysnmp indisponible: {e}", file=sys.stderr)
+        return {'error': str(e)}
+
+    engine = hlapi.SnmpEngine()
+
+    def walk(device):
+        community = hlapi.CommunityData(device['snmp_community'], mpModel=1)
+        target = hlapi.UdpTransportTarget((device['host'], device['snmp_port']),
+                                          timeout=args.timeout, retries=args.retries)
+        values = 0
+        requests = [hlapi.getCmd(engine, community, target, hlapi.ContextData(),
+                                 *[hlapi.ObjectType(hlapi.ObjectIdentity(oid + (0,))) for oid in SYSTEM.values()])]
+        for table in (IF_TABLE, IFX_TABLE):
+            requests.append(hlapi.bulkCmd(engine, community, target, hlapi.ContextData(), 0, args.max_repetitions,
+                                          *[hlapi.ObjectType(hlapi.ObjectIdentity(oid)) for oid in table.values()],
+                                          lexicographicMode=False))
+        for request in requests:
+            for error_indication, error_status, _, var_binds in request:
+                if error_indication or error_status:
+                    return {'error': str(error_indication or error_status)}
+                values += len(var_binds)
+        return {'values': values}
+
+    def poll(devices):
+        return {device['name']: walk(device) for device in devices}
+
+    options = dict(count=args.devices, latency=args.latency, drop_rate=args.drop_rate, seed=args.seed)
+    print(f"[*] pysnmp contre l'agent SNMP ({args.devices} équipements)", file=sys.stderr)
+    with AgentProcess(**options) as agent:
+        cycles = run_cycles(poll, agent.devices(), args.rounds)
+    return report(cycles)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du sondage SNMP (agent local)")
+    parser.add_argument('--devices', type=int, default=300, help="Équipements simulés")
+    parser.add_argument('--rounds', type=int, default=3, help="Cycles de sondage de la flotte")
+    parser.add_argument('--latency', type=float, default=0.002, help="Délai par réponse (s)")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="Probabilité de perte d'une requête")
+    parser.add_argument('--timeout', type=float, default=0.5, help="Délai d'attente SNMP (s)")
+    parser.add_argument('--retries', type=int, default=2)
+    parser.add_argument('--max-repetitions', type=int, default=10)
+    parser.add_argument('--max-inflight', type=int, default=256)
+    parser.add_argument('--compare-ssh', action='store_true', help="Compare avec InterfacePoller (SSH)")
+    parser.add_argument('--ssh-workers', type=int, default=32)
+    parser.add_argument('--compare-pysnmp', action='store_true', help="Compare avec pysnmp.hlapi (synchrone)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    results = {'devices': args.devices, 'rounds': args.rounds, 'snmp': bench_snmp(args)}
+    if args.compare_ssh:
+        results['ssh'] = bench_ssh(args)
+        ssh_cpu = results['ssh']['steady_cpu_seconds_mean']
+        snmp_cpu = results['snmp']['steady_cpu_seconds_mean']
+        results['cpu_ratio_ssh_over_snmp'] = round(ssh_cpu / snmp_cpu, 2) if snmp_cpu else None
+    if args.compare_pysnmp:
+        results['pysnmp'] = bench_pysnmp(args)
+        pysnmp_cpu = results['pysnmp'].get('steady_cpu_seconds_mean')
+        snmp_cpu = results['snmp']['steady_cpu_seconds_mean']
+        results['cpu_ratio_pysnmp_over_snmp'] = round(pysnmp_cpu / snmp_cpu, 2) if pysnmp_cpu and snmp_cpu else None
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    if results['snmp']['failures']:
+        print(f"[!] {results['snmp']['failures']} sondage(s) SNMP en échec", file=sys.stderr)
+        return 1
+    print("[+] Tous les équipements ont répondu en SNMP", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark du temps de démarrage des points d'entrée
+Mesure le coût des imports (python -X importtime), le temps de
+`main.py --help` et vérifie qu'aucune dépendance lourde n'est chargée
+au démarrage. Code de sortie 1 si un budget est dépassé.
+
+Usage: python3 -m benchmarks.bench_startup [--budget-ms 150] [--runs 5]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Dépendances qui ne doivent être chargées qu'à la première utilisation
+HEAVY_MODULES = ('plotly', 'reportlab', 'paramiko', 'yaml')
+
+# Modules dont l'import est mesuré; app n'est mesuré que si Flask est installé
+ENTRY_MODULES = ('main', 'cli_with_api', 'app')
+
+PROBE = (
+    "import sys, json\n"
+    "import {module}\n"
+    "print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))\n"
+)
+
+
+def measure_import(module):
+    """
+    Importe un module dans un interpréteur neuf avec -X importtime
+
+    Returns:
+        dict: {'cumulative_ms', 'heavy_loaded'} ou {'error'}
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=APP_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'erreur'
+        return {'error': last_line}
+
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1].strip())
+
+    heavy_loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return {'cumulative_ms': round(cumulative_us / 1000, 2), 'heavy_loaded': heavy_loaded}
+
+
+def measure_wall(argv, runs):
+    """Temps minimal (ms) d'exécution d'une commande Python sur plusieurs essais"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, cwd=APP_DIR, capture_output=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage à froid")
+    parser.add_argument('--budget-ms', type=float, default=150,
+                        help="Budget pour `main.py --help`, hors démarrage de l'interpréteur")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    interpreter_ms = measure_wall(["-c", "pass"], args.runs)
+    help_ms = measure_wall(["main.py", "--help"], args.runs)
+
+    results = {
+        'interpreter_ms': interpreter_ms,
+        'main_help_ms': help_ms,
+        'main_help_overhead_ms': round(help_ms - interpreter_ms, 2),
+        'budget_ms': args.budget_ms,
+        'imports': {module: measure_import(module) for module in ENTRY_MODULES}
+    }
+
+    failures = []
+    if results['main_help_overhead_ms'] > args.budget_ms:
+        failures.append(f"main.py --help: {results['main_help_overhead_ms']}ms > {args.budget_ms}ms")
+    for module, measure in results['imports'].items():
+        if measure.get('heavy_loaded'):
+            failures.append(f"{module}: dépendances chargées à l'import: {', '.join(measure['heavy_loaded'])}")
+    results['failures'] = failures
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    if failures:
+        for failure in failures:
+            print(f"[!] {failure}", file=sys.stderr)
+        return 1
+    print("[+] Démarrage dans le budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
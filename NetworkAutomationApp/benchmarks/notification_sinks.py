@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Récepteurs de notifications locaux pour les essais
+Un serveur SMTP minimal (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT, sans
+TLS ni authentification), un webhook HTTP/1.1 keep-alive façon Slack et un
+collecteur syslog UDP, tous sur la boucle locale avec des ports éphémères.
+Chaque récepteur garde les messages reçus et compte les connexions, ce qui
+permet de vérifier regroupement et réutilisation des connexions.
+
+    with NotificationSinks() as sinks:
+        dispatcher = NotificationDispatcher.from_config(sinks.config())
+        ...
+        print(sinks.stats())
+
+Usage: python3 -m benchmarks.notification_sinks [--smtp-port 2525]
+           [--http-port 8025] [--syslog-port 5514]
+"""
+
+import argparse
+import json
+import socket
+import socketserver
+import sys
+import threading
+import time
+from email import message_from_bytes, policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RECEIVE_BUFFER = 4 * 1024 * 1024
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b"\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        sink.count('smtp_connections')
+        self.reply("220 localhost netauto-sink ESMTP")
+        sender, recipients = None, []
+        for raw in self.rfile:
+            command = raw.decode('utf-8', 'replace').rstrip("\r\n")
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply("250 localhost")
+            elif verb == 'MAIL':
+                sender, recipients = command[10:].strip(' <>'), []
+                self.reply("250 OK")
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip(' <>'))
+                self.reply("250 OK")
+            elif verb == 'DATA':
+                self.reply("354 Fin par <CRLF>.<CRLF>")
+                lines = []
+                for line in self.rfile:
+                    if line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(line[1:] if line.startswith(b"..") else line)
+                message = message_from_bytes(b"".join(lines), policy=policy.default)
+                sink.record('emails', {
+                    'from': sender,
+                    'to': recipients,
+                    'subject': message['Subject'],
+                    'body': message.get_content(),
+                })
+                self.reply("250 OK")
+            elif verb in ('RSET', 'NOOP'):
+                self.reply("250 OK")
+            elif verb == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Commande non gérée")
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.sink.count('http_connections')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.sink.record('webhooks', {'path': self.path, **json.loads(body or b'{}')})
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _SyslogHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.server.sink.record('syslog', self.request[0].decode('utf-8', 'replace'))
+
+
+class _SyslogServer(socketserver.UDPServer):
+    # Datagrammes traités dans le thread du serveur (pas un thread par message),
+    # tampon de réception large pour absorber les rafales
+    def server_bind(self):
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        super().server_bind()
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class NotificationSinks:
+    """Récepteurs SMTP, webhook HTTP et syslog UDP dans des threads"""
+    def __init__(self, host='127.0.0.1', smtp_port=0, http_port=0, syslog_port=0):
+        self.host = host
+        self.messages = {'emails': [], 'webhooks': [], 'syslog': []}
+        self.counters = {'smtp_connections': 0, 'http_connections': 0}
+        self._lock = threading.Lock()
+        self._servers = [
+            _SMTPServer((host, smtp_port), _SMTPHandler),
+            ThreadingHTTPServer((host, http_port), _WebhookHandler),
+            _SyslogServer((host, syslog_port), _SyslogHandler),
+        ]
+        for server in self._servers:
+            server.sink = self
+            server.daemon_threads = True
+        self._threads = []
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def record(self, kind, message):
+        with self._lock:
+            self.messages[kind].append(message)
+
+    @property
+    def ports(self):
+        smtp, http, syslog = (server.server_address[1] for server in self._servers)
+        return {'smtp': smtp, 'http': http, 'syslog': syslog}
+
+    def start(self):
+        for server in self._servers:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def config(self, **overrides):
+        """Section notifications pointant sur les récepteurs (surcharges par canal)"""
+        ports = self.ports
+        config = {
+            'email': {'enabled': True, 'smtp_server': self.host, 'smtp_port': ports['smtp'],
+                      'from': 'alerts@example.com', 'recipients': ['admin@example.com']},
+            'slack': {'enabled': True, 'webhook_url': f"http://{self.host}:{ports['http']}/services/T0/B0/X"},
+            'syslog': {'enabled': True, 'server': self.host, 'port': ports['syslog']},
+        }
+        for channel, values in overrides.items():
+            config[channel] = {**config.get(channel, {}), **values}
+        return config
+
+    def reset(self):
+        with self._lock:
+            for messages in self.messages.values():
+                messages.clear()
+            for name in self.counters:
+                self.counters[name] = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, **{kind: len(messages) for kind, messages in self.messages.items()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Récepteurs SMTP / webhook / syslog locaux")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--smtp-port', type=int, default=2525)
+    parser.add_argument('--http-port', type=int, default=8025)
+    parser.add_argument('--syslog-port', type=int, default=5514)
+    args = parser.parse_args(argv)
+
+    with NotificationSinks(args.host, args.smtp_port, args.http_port, args.syslog_port) as sinks:
+        print(f"[+] SMTP {args.host}:{sinks.ports['smtp']}, webhook http://{args.host}:{sinks.ports['http']}/, "
+              f"syslog udp {args.host}:{sinks.ports['syslog']} (Ctrl+C pour arrêter)", file=sys.stderr)
+        seen = {kind: 0 for kind in sinks.messages}
+        try:
+            while True:
+                time.sleep(0.5)
+                for kind, messages in sinks.messages.items():
+                    for message in messages[seen[kind]:]:
+                        print(json.dumps({'type': kind, 'message': message}, ensure_ascii=False), flush=True)
+                    seen[kind] = len(messages)
+        except KeyboardInterrupt:
+            print(f"[*] Arrêt: {sinks.stats()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Agent SNMP v2c local pour les benchmarks et tests de charge
+Répond à GET, GETNEXT et GETBULK pour des centaines d'équipements simulés,
+un port UDP loopback par équipement, sur les groupes system, ifTable et
+ifXTable. Les profils (interfaces, vitesses, trafic, uptime) sont ceux du
+simulateur SSH (même graine, mêmes noms): SNMP et SSH voient les mêmes
+compteurs. Latence et pertes de datagrammes sont injectables.
+
+Utilisation en fixture:
+    with SNMPAgent(count=200, latency=0.002) as agent:
+        devices = agent.devices()        # host, snmp_port, snmp_community
+        ...
+        agent.stats()
+
+En processus séparé: AgentProcess(count=500).start() ... .stop()
+
+En ligne de commande:
+    python3 -m benchmarks.snmp_agent --count 200 --inventory /tmp/snmp.yaml
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import random
+import sys
+import threading
+import time
+
+from modules.snmp_poller import (
+    COUNTER32, COUNTER64, END_OF_MIB_VIEW, GAUGE32, GET, GET_BULK, GET_NEXT, IF_TABLE,
+    IFX_TABLE, INTEGER, NO_SUCH_OBJECT, OBJECT_ID, OCTET_STRING, RESPONSE, SNMPError, SYSTEM,
+    TIMETICKS, decode_message, encode_message
+)
+
+from .ssh_simulator import SimulatedDevice
+
+COMMUNITY = 'public'
+# Varbinds au plus par réponse (un datagramme reste sous 64 Ko)
+MAX_VARBINDS = 1000
+NET_SNMP_OID = (1, 3, 6, 1, 4, 1, 8072, 3, 2, 10)
+
+
+def _counters(device, name, uptime):
+    """Compteurs d'une interface, cohérents avec SimulatedDevice.link_stats"""
+    rx = int(uptime * device.traffic[name])
+    tx = rx // 3
+    return {
+        'rx_bytes': rx, 'tx_bytes': tx, 'rx_packets': rx // 800, 'tx_packets': tx // 600,
+        'rx_errors': rx // 10**9, 'tx_errors': 0, 'rx_dropped': rx // 10**8, 'tx_dropped': tx // 10**8,
+    }
+
+
+class _Instant:
+    """Uptime d'une réponse et compteurs des interfaces, calculés une fois par réponse"""
+    __slots__ = ('seconds', '_counters')
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._counters = {}
+
+    def counters(self, device, name):
+        values = self._counters.get(name)
+        if values is None:
+            values = self._counters[name] = _counters(device, name, self.seconds)
+        return values
+
+
+def build_mib(device):
+    """
+    MIB d'un équipement: OID triés et fonction (équipement, instant) -> (tag, valeur)
+    """
+    entries = {
+        SYSTEM['descr'] + (0,): lambda d, u: (OCTET_STRING, f"Linux {d.name} {d.kernel} x86_64"),
+        SYSTEM['object_id'] + (0,): lambda d, u: (OBJECT_ID, NET_SNMP_OID),
+        SYSTEM['uptime'] + (0,): lambda d, u: (TIMETICKS, int(u.seconds * 100) % 2**32),
+        SYSTEM['contact'] + (0,): lambda d, u: (OCTET_STRING, "noc@example.net"),
+        SYSTEM['name'] + (0,): lambda d, u: (OCTET_STRING, d.name),
+        SYSTEM['location'] + (0,): lambda d, u: (OCTET_STRING, f"rack-{d.index // 40}"),
+    }
+    for position, (name, state, mtu, _, _) in enumerate(device.interfaces):
+        index = (position + 1,)
+        speed = device.speeds.get(name, 0)
+        status = 2 if state == 'DOWN' else 1
+
+        def counter(key, tag, name=name):
+            modulo = 2**32 if tag == COUNTER32 else 2**64
+            return lambda d, u: (tag, u.counters(d, name)[key] % modulo)
+
+        entries.update({
+            IF_TABLE['descr'] + index: lambda d, u, name=name: (OCTET_STRING, name),
+            IF_TABLE['type'] + index: lambda d, u, name=name: (INTEGER, 24 if name == 'lo' else 6),
+            IF_TABLE['mtu'] + index: lambda d, u, mtu=mtu: (INTEGER, mtu),
+            IF_TABLE['speed'] + index: lambda d, u, speed=speed: (GAUGE32, min(speed * 10**6, 2**32 - 1)),
+            IF_TABLE['oper_status'] + index: lambda d, u, status=status: (INTEGER, status),
+            IF_TABLE['in_octets'] + index: counter('rx_bytes', COUNTER32),
+            IF_TABLE['in_ucast_pkts'] + index: counter('rx_packets', COUNTER32),
+            IF_TABLE['in_discards'] + index: counter('rx_dropped', COUNTER32),
+            IF_TABLE['in_errors'] + index: counter('rx_errors', COUNTER32),
+            IF_TABLE['out_octets'] + index: counter('tx_bytes', COUNTER32),
+            IF_TABLE['out_ucast_pkts'] + index: counter('tx_packets', COUNTER32),
+            IF_TABLE['out_discards'] + index: counter('tx_dropped', COUNTER32),
+            IF_TABLE['out_errors'] + index: counter('tx_errors', COUNTER32),
+            IFX_TABLE['name'] + index: lambda d, u, name=name: (OCTET_STRING, name),
+            IFX_TABLE['hc_in_octets'] + index: counter('rx_bytes', COUNTER64),
+            IFX_TABLE['hc_in_ucast_pkts'] + index: counter('rx_packets', COUNTER64),
+            IFX_TABLE['hc_out_octets'] + index: counter('tx_bytes', COUNTER64),
+            IFX_TABLE['hc_out_ucast_pkts'] + index: counter('tx_packets', COUNTER64),
+            IFX_TABLE['high_speed'] + index: lambda d, u, speed=speed: (GAUGE32, speed),
+        })
+    oids = sorted(entries)
+    return oids, [entries[o] for o in oids]
+
+
+class _AgentProtocol(asyncio.DatagramProtocol):
+    """Endpoint UDP d'un équipement simulé"""
+    def __init__(self, agent, device):
+        self.agent = agent
+        self.device = device
+        self.oids, self.getters = build_mib(device)
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        agent = self.agent
+        agent._stats['requests'] += 1
+        if agent.drop_rate and agent.rng.random() < agent.drop_rate:
+            agent._stats['dropped'] += 1
+            return
+        try:
+            message = decode_message(data)
+        except SNMPError:
+            agent._stats['invalid'] += 1
+            return
+        if message['community'] != agent.community.encode('utf-8'):
+            # Mauvaise communauté: pas de réponse (comportement des agents réels)
+            agent._stats['bad_community'] += 1
+            return
+        response = encode_message(message['community'], RESPONSE, message['request_id'], self.answer(message))
+        agent._stats['responses'] += 1
+        if agent.latency:
+            asyncio.get_running_loop().call_later(agent.latency, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+    def _value(self, position, instant):
+        tag, value = self.getters[position](self.device, instant)
+        return self.oids[position], tag, value
+
+    def _next(self, oid, instant):
+        position = bisect.bisect_right(self.oids, oid)
+        if position >= len(self.oids):
+            return oid, END_OF_MIB_VIEW, None
+        return self._value(position, instant)
+
+    def answer(self, message):
+        """Varbinds de la réponse à GET, GETNEXT ou GETBULK"""
+        instant = _Instant(self.device.current_uptime())
+        requested = [oid for oid, _, _ in message['varbinds']]
+        pdu_type = message['pdu_type']
+        if pdu_type == GET:
+            varbinds = []
+            for oid in requested:
+                position = bisect.bisect_left(self.oids, oid)
+                if position < len(self.oids) and self.oids[position] == oid:
+                    varbinds.append(self._value(position, instant))
+                else:
+                    varbinds.append((oid, NO_SUCH_OBJECT, None))
+            return varbinds
+        if pdu_type == GET_NEXT:
+            return [self._next(oid, instant) for oid in requested]
+        if pdu_type != GET_BULK:
+            return [(oid, NO_SUCH_OBJECT, None) for oid in requested]
+
+        non_repeaters = max(0, min(message['error_status'], len(requested)))
+        repetitions = max(0, message['error_index'])
+        varbinds = [self._next(oid, instant) for oid in requested[:non_repeaters]]
+        cursors = requested[non_repeaters:]
+        for _ in range(repetitions):
+            if not cursors or len(varbinds) + len(cursors) > MAX_VARBINDS:
+                break
+            row = [self._next(oid, instant) for oid in cursors]
+            varbinds.extend(row)
+            cursors = [oid for oid, _, _ in row]
+            if all(tag == END_OF_MIB_VIEW for _, tag, _ in row):
+                break
+        return varbinds
+
+
+class SNMPAgent:
+    """
+    Agent SNMP simulant `count` équipements sur des ports UDP loopback
+
+    Args:
+        count: Nombre d'équipements
+        latency: Délai (s) avant chaque réponse
+        drop_rate: Probabilité de perdre une requête (tests d'expiration)
+        community: Communauté acceptée
+        seed: Graine des profils (identique au simulateur SSH)
+        host: Adresse d'écoute
+    """
+    def __init__(self, count=100, latency=0.0, drop_rate=0.0, community=COMMUNITY, seed=0, host='127.0.0.1'):
+        self.host = host
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.community = community
+        self.rng = random.Random(seed)
+        self.simulated = [SimulatedDevice(f"sim-{i:04d}", i, seed) for i in range(count)]
+        self._ports = {}
+        self._loop = None
+        self._thread = None
+        self._stats = {}
+        self.reset_stats()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """Ouvre un port UDP par équipement dans une boucle asyncio dédiée"""
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        async def open_endpoints():
+            for device in self.simulated:
+                transport, _ = await self._loop.create_datagram_endpoint(
+                    lambda device=device: _AgentProtocol(self, device), local_addr=(self.host, 0))
+                self._ports[device.name] = transport
+            ready.set()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(open_endpoints())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        for transport in self._ports.values():
+            self._loop.call_soon_threadsafe(transport.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
+        self._loop = None
+
+    def devices(self):
+        """Inventaire au format config/devices.yaml (clés SNMP par équipement)"""
+        return [
+            {
+                'name': device.name,
+                'host': self.host,
+                'snmp_port': self._ports[device.name].get_extra_info('sockname')[1],
+                'snmp_community': self.community,
+                'snmp_version': '2c',
+                'device_type': 'linux',
+                'location': f"rack-{device.index // 40}",
+            }
+            for device in self.simulated
+        ]
+
+    def stats(self):
+        return dict(self._stats)
+
+    def reset_stats(self):
+        self._stats = {'requests': 0, 'responses': 0, 'dropped': 0, 'invalid': 0, 'bad_community': 0}
+
+
+def _agent_main(conn, kwargs):
+    """Processus agent: répond aux requêtes 'devices', 'stats', 'reset', 'stop'"""
+    agent = SNMPAgent(**kwargs).start()
+    conn.send(agent.devices())
+    while True:
+        request = conn.recv()
+        if request == 'stats':
+            conn.send(agent.stats())
+        elif request == 'reset':
+            agent.reset_stats()
+            conn.send(True)
+        else:
+            agent.stop()
+            conn.send(True)
+            return
+
+
+class AgentProcess:
+    """SNMPAgent exécuté dans un processus séparé, piloté par un pipe"""
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self._conn = None
+        self._process = None
+        self._devices = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        import multiprocessing
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_agent_main, args=(child, self.kwargs), daemon=True)
+        self._process.start()
+        self._conn = parent
+        self._devices = parent.recv()
+        return self
+
+    def devices(self):
+        return [dict(device) for device in self._devices]
+
+    def stats(self):
+        self._conn.send('stats')
+        return self._conn.recv()
+
+    def reset_stats(self):
+        self._conn.send('reset')
+        self._conn.recv()
+
+    def stop(self):
+        if self._process and self._process.is_alive():
+            self._conn.send('stop')
+            self._conn.recv()
+            self._process.join(timeout=5)
+        self._process = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agent SNMP v2c d'équipements simulés")
+    parser.add_argument('--count', type=int, default=100, help="Nombre d'équipements")
+    parser.add_argument('--latency', type=float, default=0.0, help="Délai par réponse (s)")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="Probabilité de perte d'une requête")
+    parser.add_argument('--community', default=COMMUNITY)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--inventory', help="Écrit l'inventaire des équipements (.yaml ou .json)")
+    args = parser.parse_args(argv)
+
+    agent = SNMPAgent(count=args.count, latency=args.latency, drop_rate=args.drop_rate,
+                      community=args.community, seed=args.seed).start()
+    if args.inventory:
+        with open(args.inventory, 'w') as f:
+            if args.inventory.endswith('.json'):
+                json.dump({'devices': agent.devices()}, f, indent=2)
+            else:
+                import yaml
+                yaml.safe_dump({'devices': agent.devices()}, f, sort_keys=False)
+        print(f"[+] Inventaire écrit: {args.inventory}")
+
+    ports = [device['snmp_port'] for device in agent.devices()]
+    print(f"[+] {args.count} agents SNMP simulés sur 127.0.0.1 (ports UDP {min(ports)}-{max(ports)})")
+    print("[*] Ctrl+C pour arrêter")
+    try:
+        while True:
+            time.sleep(10)
+            stats = agent.stats()
+            print(f"[*] requêtes={stats['requests']} réponses={stats['responses']} perdues={stats['dropped']}")
+    except KeyboardInterrupt:
+        agent.stop()
+        print("\n[*] Arrêt")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
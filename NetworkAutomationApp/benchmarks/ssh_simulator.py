@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""
+Simulateur SSH local (paramiko) pour les benchmarks et tests de charge
+Émule des centaines d'équipements Linux, un port loopback par équipement,
+avec des sorties prédéfinies pour les commandes des collecteurs (hostname,
+uptime, uname, ip -j addr, ip -j -s link, ip route, top, free, /proc...),
+un sous-système SFTP en lecture sur les fichiers de configuration et la
+compression SSH. Latence, échecs et réponses lentes sont injectables par
+équipement; change_files() modifie des fichiers en cours de route.
+
+Utilisation en fixture:
+    with SSHSimulator(count=200, latency=0.005) as sim:
+        devices = sim.devices()          # format config/devices.yaml
+        ...
+        sim.stats()                      # connexions, commandes, échecs
+
+En processus séparé (le serveur ne partage pas le GIL avec les collecteurs):
+    sim = SimulatorProcess(count=200); sim.start(); ...; sim.stop()
+
+En ligne de commande (écrit l'inventaire YAML/JSON des équipements simulés):
+    python3 -m benchmarks.ssh_simulator --count 200 --inventory /tmp/sim.yaml
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import re
+import selectors
+import socket
+import struct
+import sys
+import threading
+import time
+
+import paramiko
+from paramiko.common import MSG_CHANNEL_SUCCESS
+
+USERNAME = 'admin'
+PASSWORD = 'admin'
+# Bail DHCP des interfaces (durées de vie de ip addr)
+DHCP_LEASE = 86400
+
+# Échecs injectables: connexion fermée, authentification refusée, commande en erreur
+FAILURE_MODES = ('refuse', 'auth', 'command')
+
+
+class SimulatedDevice:
+    """
+    Profil d'un équipement simulé: identité, interfaces, routes, charge
+    et paramètres d'injection (latence, échecs, lenteurs)
+    """
+    def __init__(self, name, index, seed=0, latency=0.0, failure_rate=0.0,
+                 failure_mode='command', slow_rate=0.0, slow_delay=1.0):
+        rng = random.Random(f"{seed}:{name}")
+        self.name = name
+        self.index = index
+        self.port = None
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.rng = rng
+
+        self.uptime_minutes = rng.randint(10, 90 * 24 * 60)
+        self.kernel = rng.choice(['5.15.0-119-generic', '6.8.0-45-generic'])
+        self.os_version = rng.choice(['22.04', '24.04'])
+        self.cpu_usage = round(rng.uniform(1, 95), 1)
+        self.mem_total_mb = rng.choice([2048, 4096, 8192, 16384])
+        self.mem_used_mb = int(self.mem_total_mb * rng.uniform(0.1, 0.9))
+        subnet = f"10.{index // 250 % 250}.{index % 250}"
+        self.interfaces = [('lo', 'UNKNOWN', 65536, '127.0.0.1', 8)]
+        for i in range(rng.randint(1, 4)):
+            state = 'UP' if rng.random() > 0.1 else 'DOWN'
+            self.interfaces.append((f"eth{i}", state, 1500, f"{subnet}.{10 + i}", 24))
+        self.routes = [f"default via {subnet}.1 dev eth0 proto static"]
+        self.routes += [
+            f"{iface[3].rsplit('.', 1)[0]}.0/24 dev {iface[0]} proto kernel scope link src {iface[3]}"
+            for iface in self.interfaces[1:]
+        ]
+        # Compteurs /proc: ils avancent avec le temps réel depuis la création
+        self.started = time.monotonic()
+        self.cpus = rng.choice([1, 2, 4, 8])
+        self.load = round(self.cpu_usage / 100 * self.cpus, 2)
+        self.traffic = {iface[0]: rng.uniform(1e3, 5e6) for iface in self.interfaces}  # octets/s reçus
+        self.speeds = {iface[0]: rng.choice([1000, 10000]) for iface in self.interfaces[1:]}  # Mbit/s
+        self.files = {
+            '/etc/network/interfaces': "auto lo\niface lo inet loopback\n",
+            '/etc/sysctl.conf': "net.ipv4.ip_forward=1\n",
+            '/etc/netplan/50-cloud-init.yaml': self.netplan(),
+        }
+        self.mtimes = {path: time.time() - rng.randint(86400, 365 * 86400) for path in self.files}
+
+    # ----- Sorties des commandes -----
+
+    def uptime(self):
+        days, rest = divmod(self.uptime_minutes, 24 * 60)
+        hours, minutes = divmod(rest, 60)
+        parts = [f"{days} days"] if days else []
+        parts += [f"{hours} hours", f"{minutes} minutes"]
+        return "up " + ", ".join(parts)
+
+    def ip_json(self):
+        return json.dumps([
+            {
+                'ifindex': i + 1,
+                'ifname': name,
+                'flags': ['UP', 'LOWER_UP'] if state != 'DOWN' else ['BROADCAST'],
+                'mtu': mtu,
+                'operstate': state,
+                'addr_info': [{'family': 'inet', 'local': address, 'prefixlen': prefix}]
+            }
+            for i, (name, state, mtu, address, prefix) in enumerate(self.interfaces)
+        ])
+
+    def ip_text(self, lifetimes=True):
+        """Sortie de ip addr; adresses DHCP avec leurs durées de vie restantes (décomptées chaque seconde)"""
+        remaining = DHCP_LEASE - int(self.current_uptime()) % DHCP_LEASE
+        lines = []
+        for i, (name, state, mtu, address, prefix) in enumerate(self.interfaces):
+            flags = 'UP,LOWER_UP' if state != 'DOWN' else 'BROADCAST'
+            lines.append(f"{i + 1}: {name}: <{flags}> mtu {mtu} state {state}")
+            lines.append(f"    inet {address}/{prefix} scope global {name}")
+            if lifetimes:
+                lifetime = 'forever' if i == 0 else f"{remaining}sec"
+                lines.append(f"       valid_lft {lifetime} preferred_lft {lifetime}")
+        return "\n".join(lines) + "\n"
+
+    def free(self):
+        free_mb = self.mem_total_mb - self.mem_used_mb
+        return (f"Mem:        {self.mem_total_mb / 1024:.1f}Gi       {self.mem_used_mb / 1024:.1f}Gi"
+                f"       {free_mb / 1024:.1f}Gi       64Mi       1.0Gi       {free_mb / 1024:.1f}Gi\n")
+
+    def free_mb(self):
+        available = self.mem_total_mb - self.mem_used_mb
+        return (f"Mem:  {self.mem_total_mb}  {self.mem_used_mb - 256}  {available - 512}  64  768  {available}\n")
+
+    def top_cpu(self):
+        idle = 100 - self.cpu_usage
+        return (f"%Cpu(s): {self.cpu_usage * 0.7:.1f} us, {self.cpu_usage * 0.3:.1f} sy,  0.0 ni, "
+                f"{idle:.1f} id,  0.0 wa,  0.0 hi,  0.0 si,  0.0 st\n")
+
+    def proc(self):
+        """Sortie de cat /proc/uptime /proc/stat /proc/meminfo /proc/loadavg /proc/net/dev"""
+        uptime = self.current_uptime()
+        jiffies = int(uptime * 100 * self.cpus)
+        busy = int(jiffies * self.cpu_usage / 100)
+        user, system = busy * 7 // 10, busy - busy * 7 // 10
+        lines = [
+            f"{uptime:.2f} {uptime * self.cpus * (1 - self.cpu_usage / 100):.2f}",
+            f"cpu  {user} 0 {system} {jiffies - busy} 0 0 0 0 0 0",
+            f"ctxt {jiffies * 3}",
+            f"btime {int(time.time() - uptime)}",
+            f"MemTotal:       {self.mem_total_mb * 1024} kB",
+            f"MemFree:        {(self.mem_total_mb - self.mem_used_mb) * 512} kB",
+            f"MemAvailable:   {(self.mem_total_mb - self.mem_used_mb) * 1024} kB",
+            f"{self.load} {self.load} {self.load} 1/{120 + self.index % 50} {4000 + self.index}",
+            "Inter-|   Receive                                                |  Transmit",
+            " face |bytes    packets errs drop fifo frame compressed multicast|"
+            "bytes    packets errs drop fifo colls carrier compressed",
+        ]
+        for name, rate in self.traffic.items():
+            rx = int(uptime * rate)
+            tx = rx // 3
+            lines.append(f"{name:>6}: {rx} {rx // 800} 0 0 0 0 0 0 {tx} {tx // 600} 0 0 0 0 0 0")
+        return "\n".join(lines) + "\n"
+
+    def current_uptime(self):
+        return self.uptime_minutes * 60 + (time.monotonic() - self.started)
+
+    def link_stats(self):
+        """Sortie de ip -j -s link (compteurs stats64 qui avancent avec le temps)"""
+        uptime = self.current_uptime()
+        links = []
+        for i, (name, state, mtu, _, _) in enumerate(self.interfaces):
+            rx = int(uptime * self.traffic[name])
+            tx = rx // 3
+            links.append({
+                'ifindex': i + 1,
+                'ifname': name,
+                'flags': ['UP', 'LOWER_UP'] if state != 'DOWN' else ['BROADCAST'],
+                'mtu': mtu,
+                'operstate': state,
+                'stats64': {
+                    'rx': {'bytes': rx, 'packets': rx // 800, 'errors': rx // 10**9, 'dropped': rx // 10**8,
+                           'over_errors': 0, 'multicast': 0},
+                    'tx': {'bytes': tx, 'packets': tx // 600, 'errors': 0, 'dropped': tx // 10**8,
+                           'carrier_errors': 0, 'collisions': 0}
+                }
+            })
+        return json.dumps(links) + "\n"
+
+    def link_speeds(self):
+        """Sortie de grep -sH . /sys/class/net/*/speed (lo n'a pas de vitesse)"""
+        return "".join(f"/sys/class/net/{name}/speed:{speed}\n" for name, speed in self.speeds.items())
+
+    def netplan(self):
+        lines = ["network:", "  version: 2", "  ethernets:"]
+        for name, _, mtu, address, prefix in self.interfaces[1:]:
+            lines += [f"    {name}:", f"      addresses: [{address}/{prefix}]", f"      mtu: {mtu}"]
+        return "\n".join(lines) + "\n"
+
+    def change_file(self, path='/etc/sysctl.conf'):
+        """Modifie un fichier de configuration (contenu et mtime)"""
+        self.files[path] = self.files.get(path, '') + f"# modifié {time.time():.6f}\n"
+        self.mtimes[path] = time.time()
+
+    def manifest(self, command):
+        """Sortie de modules.config_fetch.manifest_command: sha256sum des fichiers, empreintes d'état"""
+        lines = [f"{hashlib.sha256(self.files[path].encode()).hexdigest()}  {path}" for path in sorted(self.files)]
+        for pipeline, state in re.findall(r'S \$\((.+?) \| sha256sum \| cut [^)]*\) ([^"]+)"', command):
+            output = run_command(self, pipeline.replace(' 2>/dev/null', ''))[0]
+            lines.append(f"S {hashlib.sha256(output.encode()).hexdigest()} {state}")
+        return "\n".join(lines) + "\n"
+
+    def state_digest(self):
+        # Empreinte de ip -br addr: sans durées de vie
+        state = "\n".join([self.name, self.kernel, self.os_version, self.ip_text(lifetimes=False)] + self.routes)
+        return f"{self.uptime()}\n{hashlib.sha256(state.encode()).hexdigest()}  -\n"
+
+
+def _grep_v(device, command):
+    """commande | grep -v motif: lignes de la sortie sans le motif"""
+    left, pattern = command.rsplit('| grep -v ', 1)
+    pattern = pattern.strip().strip("'\"")
+    stdout, stderr, code = run_command(device, left)
+    return ''.join(line for line in stdout.splitlines(True) if pattern not in line)
+
+
+def _cat(device, command):
+    match = re.match(r"cat (\S+)", command)
+    return device.files.get(match.group(1), '') if match else ''
+
+
+# Commande -> sortie. Testées dans l'ordre: correspondance exacte puis motifs.
+EXACT_COMMANDS = {
+    'hostname': lambda d: d.name + "\n",
+    'uptime -p': lambda d: d.uptime() + "\n",
+    'uname -r': lambda d: d.kernel + "\n",
+    'cat /etc/os-release | grep VERSION_ID': lambda d: f'VERSION_ID="{d.os_version}"\n',
+    'ip -j addr': lambda d: d.ip_json() + "\n",
+    'ip addr': lambda d: d.ip_text(),
+    'ip route': lambda d: "\n".join(d.routes) + "\n",
+    "top -bn1 | grep 'Cpu(s)' | awk '{print $2}'": lambda d: f"{d.cpu_usage}\n",
+    'free -h | grep Mem': lambda d: d.free(),
+    "top -bn1 | grep 'Cpu(s)'": lambda d: d.top_cpu(),
+    'free -m | grep Mem': lambda d: d.free_mb(),
+    'cat /proc/uptime /proc/stat /proc/meminfo /proc/loadavg /proc/net/dev': lambda d: d.proc(),
+    'cat /proc/uptime': lambda d: f"{d.current_uptime():.2f} {d.current_uptime() * d.cpus / 2:.2f}\n",
+    'ip -j -s link': lambda d: d.link_stats(),
+    'grep -sH . /sys/class/net/*/speed': lambda d: d.link_speeds(),
+}
+
+PATTERN_COMMANDS = [
+    (re.compile(r'^find /etc/'), lambda d, c: d.manifest(c)),
+    (re.compile(r'sha256sum'), lambda d, c: d.state_digest()),
+    (re.compile(r'\| grep -v '), _grep_v),
+    (re.compile(r'^cat '), _cat),
+]
+
+
+def run_command(device, command):
+    """
+    Sortie simulée d'une commande
+
+    Returns:
+        tuple: (stdout, stderr, code de sortie)
+    """
+    handler = EXACT_COMMANDS.get(command.strip())
+    if handler:
+        return handler(device), '', 0
+    for pattern, handler in PATTERN_COMMANDS:
+        if pattern.search(command):
+            return handler(device, command), '', 0
+    if ';' in command:
+        # Séquence "a; b": sorties concaténées, code de la dernière commande
+        results = [run_command(device, part) for part in command.split(';') if part.strip()]
+        return ''.join(r[0] for r in results), ''.join(r[1] for r in results), results[-1][2]
+    return '', f"sh: 1: {command.split()[0] if command.split() else command}: not found\n", 127
+
+
+class DeviceServer(paramiko.ServerInterface):
+    """Interface serveur paramiko d'une connexion vers un équipement simulé"""
+    def __init__(self, simulator, device):
+        self.simulator = simulator
+        self.device = device
+
+    def check_auth_password(self, username, password):
+        device = self.device
+        if device.failure_mode == 'auth' and self.simulator._roll(device, device.failure_rate):
+            self.simulator._count(device, 'auth_failures')
+            return paramiko.AUTH_FAILED
+        if username == USERNAME and password == PASSWORD:
+            return paramiko.AUTH_SUCCESSFUL
+        self.simulator._count(device, 'auth_failures')
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        # La réponse part après l'accusé CHANNEL_SUCCESS (voir SimulatorTransport)
+        channel.get_transport().pending[channel.remote_chanid] = (
+            self.simulator, self.device, channel, command.decode('utf-8', 'replace')
+        )
+        return True
+
+
+class _SFTPHandle(paramiko.SFTPHandle):
+    def __init__(self, data):
+        super().__init__()
+        self.data = data
+
+    def read(self, offset, length):
+        return self.data[offset:offset + length]
+
+    def stat(self):
+        attr = paramiko.SFTPAttributes()
+        attr.st_size, attr.st_mode = len(self.data), 0o100644
+        return attr
+
+
+class SimulatedSFTP(paramiko.SFTPServerInterface):
+    """Sous-système SFTP en lecture seule sur les fichiers de l'équipement"""
+    def __init__(self, server, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.simulator = server.simulator
+        self.device = server.device
+
+    def _attributes(self, path):
+        attr = paramiko.SFTPAttributes()
+        attr.st_size = len(self.device.files[path].encode())
+        attr.st_mtime = int(self.device.mtimes[path])
+        attr.st_mode = 0o100644
+        return attr
+
+    def open(self, path, flags, attr):
+        if path not in self.device.files:
+            return paramiko.SFTP_NO_SUCH_FILE
+        data = self.device.files[path].encode()
+        self.simulator._count(self.device, 'sftp_reads')
+        self.simulator._count(self.device, 'sftp_bytes', amount=len(data))
+        return _SFTPHandle(data)
+
+    def stat(self, path):
+        return self._attributes(path) if path in self.device.files else paramiko.SFTP_NO_SUCH_FILE
+
+    lstat = stat
+
+
+class SimulatorTransport(paramiko.Transport):
+    """
+    Transport qui ne lance la réponse à une commande qu'une fois l'accusé
+    CHANNEL_SUCCESS envoyé: sinon une réponse rapide peut fermer le canal
+    avant que le client ait reçu l'acceptation ("Channel closed.")
+    """
+    def __init__(self, sock):
+        super().__init__(sock)
+        self.pending = {}
+
+    def _send_user_message(self, data):
+        super()._send_user_message(data)
+        raw = data.asbytes()
+        if raw[0] == MSG_CHANNEL_SUCCESS:
+            request = self.pending.pop(struct.unpack('>I', raw[1:5])[0], None)
+            if request:
+                simulator, device, channel, command = request
+                threading.Thread(
+                    target=simulator._answer, args=(device, channel, command), daemon=True
+                ).start()
+
+
+class SSHSimulator:
+    """
+    Serveur SSH simulant `count` équipements sur des ports loopback
+
+    Args:
+        count: Nombre d'équipements
+        latency: Délai (s) avant chaque réponse de commande
+        failure_rate: Probabilité d'échec (par connexion ou commande)
+        failure_mode: 'refuse', 'auth' ou 'command'
+        slow_rate: Probabilité qu'une commande soit lente
+        slow_delay: Délai supplémentaire (s) d'une commande lente
+        seed: Graine des profils et des tirages d'injection
+        host: Adresse d'écoute
+    """
+    def __init__(self, count=100, latency=0.0, failure_rate=0.0, failure_mode='command',
+                 slow_rate=0.0, slow_delay=1.0, seed=0, host='127.0.0.1'):
+        if failure_mode not in FAILURE_MODES:
+            raise ValueError(f"Mode d'échec inconnu: {failure_mode}")
+        self.host = host
+        self.simulated = [
+            SimulatedDevice(f"sim-{i:04d}", i, seed, latency, failure_rate, failure_mode, slow_rate, slow_delay)
+            for i in range(count)
+        ]
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._listeners = {}
+        self._transports = []
+        self._selector = None
+        self._running = False
+        self._thread = None
+        self._host_key = None
+        self.reset_stats()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """Ouvre un port d'écoute par équipement et démarre la boucle d'acceptation"""
+        # Déconnexions des clients: attendues, pas d'avertissement paramiko
+        logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+        self._host_key = paramiko.RSAKey.generate(2048)
+        self._selector = selectors.DefaultSelector()
+        for device in self.simulated:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((self.host, 0))
+            listener.listen(64)
+            listener.setblocking(False)
+            device.port = listener.getsockname()[1]
+            self._listeners[device.port] = listener
+            self._selector.register(listener, selectors.EVENT_READ, device)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ferme les ports d'écoute et les connexions ouvertes"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+        for listener in self._listeners.values():
+            listener.close()
+        self._listeners.clear()
+        with self._lock:
+            transports, self._transports = self._transports, []
+        for transport in transports:
+            transport.close()
+        if self._selector:
+            self._selector.close()
+
+    def devices(self):
+        """Inventaire au format config/devices.yaml"""
+        return [
+            {
+                'name': device.name,
+                'host': self.host,
+                'port': device.port,
+                'username': USERNAME,
+                'password': PASSWORD,
+                'device_type': 'linux',
+                'location': f"rack-{device.index // 40}",
+                'role': 'server'
+            }
+            for device in self.simulated
+        ]
+
+    def stats(self):
+        """Compteurs globaux et connexions par équipement"""
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                'connections': 0, 'refused': 0, 'auth_failures': 0,
+                'commands': 0, 'failed_commands': 0, 'slow_commands': 0,
+                'unknown_commands': 0, 'output_bytes': 0, 'sftp_reads': 0, 'sftp_bytes': 0,
+                'per_device': {}
+            }
+
+    def change_files(self, fraction, path='/etc/sysctl.conf'):
+        """Modifie un fichier sur une fraction des équipements (les premiers de la liste)"""
+        changed = self.simulated[:int(len(self.simulated) * fraction)]
+        with self._lock:
+            for device in changed:
+                device.change_file(path)
+        return len(changed)
+
+    # ----- Internes -----
+
+    def _count(self, device, key, per_device=False, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+            if per_device:
+                self._stats['per_device'][device.name] = self._stats['per_device'].get(device.name, 0) + 1
+
+    def _roll(self, device, probability):
+        if probability <= 0:
+            return False
+        with self._lock:
+            return device.rng.random() < probability
+
+    def _accept_loop(self):
+        while self._running:
+            for key, _ in self._selector.select(timeout=0.2):
+                try:
+                    sock, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                sock.setblocking(True)
+                threading.Thread(target=self._serve, args=(key.data, sock), daemon=True).start()
+
+    def _serve(self, device, sock):
+        """Négociation SSH d'une connexion entrante"""
+        self._count(device, 'connections', per_device=True)
+        if device.failure_mode == 'refuse' and self._roll(device, device.failure_rate):
+            self._count(device, 'refused')
+            sock.close()
+            return
+
+        transport = SimulatorTransport(sock)
+        transport.add_server_key(self._host_key)
+        transport.use_compression(True)
+        transport.set_subsystem_handler('sftp', paramiko.SFTPServer, SimulatedSFTP)
+        with self._lock:
+            self._transports = [t for t in self._transports if t.is_active()]
+            self._transports.append(transport)
+        try:
+            transport.start_server(server=DeviceServer(self, device))
+        except (paramiko.SSHException, EOFError, OSError):
+            transport.close()
+            return
+        # Les canaux sont ouverts par le client; les accepter évite leur accumulation
+        while transport.is_active():
+            channel = transport.accept(timeout=1)
+            if channel is None:
+                continue
+
+    def _answer(self, device, channel, command):
+        """Répond à une commande: latence, lenteur et échec éventuels"""
+        self._count(device, 'commands')
+        delay = device.latency
+        if self._roll(device, device.slow_rate):
+            self._count(device, 'slow_commands')
+            delay += device.slow_delay
+        if delay:
+            time.sleep(delay)
+
+        try:
+            if device.failure_mode == 'command' and self._roll(device, device.failure_rate):
+                self._count(device, 'failed_commands')
+                stdout, stderr, status = '', "Input/output error\n", 1
+            else:
+                stdout, stderr, status = run_command(device, command)
+                if status == 127:
+                    self._count(device, 'unknown_commands')
+            if stdout:
+                data = stdout.encode('utf-8')
+                self._count(device, 'output_bytes', amount=len(data))
+                channel.sendall(data)
+            if stderr:
+                channel.sendall_stderr(stderr.encode('utf-8'))
+            channel.send_exit_status(status)
+        except OSError:
+            pass
+        finally:
+            channel.close()
+
+
+def _simulator_main(conn, kwargs):
+    """Processus simulateur: répond aux requêtes 'devices', 'stats', 'reset', ('change', ...), 'stop'"""
+    import contextlib
+    with contextlib.redirect_stdout(sys.stderr):
+        simulator = SSHSimulator(**kwargs).start()
+    conn.send(simulator.devices())
+    while True:
+        request = conn.recv()
+        if request == 'stats':
+            conn.send(simulator.stats())
+        elif request == 'reset':
+            simulator.reset_stats()
+            conn.send(True)
+        elif isinstance(request, tuple) and request[0] == 'change':
+            conn.send(simulator.change_files(*request[1:]))
+        else:
+            simulator.stop()
+            conn.send(True)
+            return
+
+
+class SimulatorProcess:
+    """SSHSimulator exécuté dans un processus séparé, piloté par un pipe"""
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self._conn = None
+        self._process = None
+        self._devices = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        import multiprocessing
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_simulator_main, args=(child, self.kwargs), daemon=True)
+        self._process.start()
+        self._conn = parent
+        self._devices = parent.recv()
+        return self
+
+    def devices(self):
+        return [dict(device) for device in self._devices]
+
+    def stats(self):
+        self._conn.send('stats')
+        return self._conn.recv()
+
+    def reset_stats(self):
+        self._conn.send('reset')
+        self._conn.recv()
+
+    def change_files(self, fraction, path='/etc/sysctl.conf'):
+        self._conn.send(('change', fraction, path))
+        return self._conn.recv()
+
+    def stop(self):
+        if self._process and self._process.is_alive():
+            self._conn.send('stop')
+            self._conn.recv()
+            self._process.join(timeout=5)
+        self._process = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulateur SSH d'équipements Linux")
+    parser.add_argument('--count', type=int, default=100, help="Nombre d'équipements")
+    parser.add_argument('--latency', type=float, default=0.0, help="Délai par commande (s)")
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--failure-mode', choices=FAILURE_MODES, default='command')
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-delay', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--inventory', help="Écrit l'inventaire des équipements (.yaml ou .json)")
+    args = parser.parse_args(argv)
+
+    simulator = SSHSimulator(
+        count=args.count, latency=args.latency, failure_rate=args.failure_rate,
+        failure_mode=args.failure_mode, slow_rate=args.slow_rate,
+        slow_delay=args.slow_delay, seed=args.seed
+    ).start()
+
+    if args.inventory:
+        with open(args.inventory, 'w') as f:
+            if args.inventory.endswith('.json'):
+                json.dump({'devices': simulator.devices()}, f, indent=2)
+            else:
+                import yaml
+                yaml.safe_dump({'devices': simulator.devices()}, f, sort_keys=False)
+        print(f"[+] Inventaire écrit: {args.inventory}")
+
+    ports = [device.port for device in simulator.simulated]
+    print(f"[+] {args.count} équipements simulés sur 127.0.0.1 (ports {min(ports)}-{max(ports)})")
+    print("[*] Ctrl+C pour arrêter")
+    try:
+        while True:
+            time.sleep(10)
+            stats = simulator.stats()
+            print(f"[*] connexions={stats['connections']} commandes={stats['commands']} "
+                  f"échecs={stats['failed_commands'] + stats['refused'] + stats['auth_failures']}")
+    except KeyboardInterrupt:
+        simulator.stop()
+        print("\n[*] Arrêt")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,6 @@ Envoie les données vers la base de données en temps réel
 
 import os
 import sys
-import yaml
 import time
 import requests
 import json
@@ -14,7 +13,7 @@ from pathlib import Path
 from datetime import datetime
 from modules.discovery import NetworkDiscovery
 from modules.napalm_utils import NALPMUtils
-from modules.monitoring import NetworkMonitoring
+from modules.monitoring import NetworkMonitoring, RollingAvailability
 from modules.reports import ReportGenerator
 
 # Configuration API
@@ -55,13 +54,18 @@ class NetworkAutomationCLI:
             print(f"[!] Fichier {self.config_file} non trouvé")
             return
         
-        with open(self.config_file, 'r') as f:
-            config = yaml.safe_load(f)
-            self.devices = config.get('devices', [])
+        from modules.inventory import InventoryError, load_inventory
+        try:
+            self.devices = load_inventory(self.config_file).devices
+        except InventoryError as e:
+            print(f"[!] {self.config_file}: {e}")
+            return
         
         print(f"[+] {len(self.devices)} équipement(s) chargé(s)")
-        for device in self.devices:
+        for device in self.devices[:20]:
             print(f"    - {device['host']} ({device.get('name', 'N/A')})")
+        if len(self.devices) > 20:
+            print(f"    ... et {len(self.devices) - 20} autre(s)")
     
     def sync_device_to_api(self, device, status='offline'):
         """Synchronise un équipement avec l'API"""
@@ -75,6 +79,8 @@ class NetworkAutomationCLI:
                 'device_type': device.get('device_type', 'linux'),
                 'username': device.get('username', 'ubuntu'),
                 'password': device.get('password', ''),
+                'location': device.get('location'),
+                'port': device.get('port', 22),
                 'status': status
             }
             
@@ -186,6 +192,7 @@ class NetworkAutomationCLI:
         print("="*60)
         
         monitoring = NetworkMonitoring()
+        availability = RollingAvailability()
         
         try:
             iteration = 0
@@ -203,9 +210,10 @@ class NetworkAutomationCLI:
                     
                     status = "[+]" if ping_result['success'] else "[-]"
                     print(f"{status} {device_name}: {ping_result['stats']}")
+                    packet_loss = ping_result.get('packet_loss', 0 if ping_result['success'] else 100.0)
                     
-                    # Synchroniser avec API
-                    if self.api_available and ping_result['success']:
+                    # Synchroniser avec API (échecs compris: ils comptent dans la disponibilité)
+                    if self.api_available:
                         try:
                             devices = requests.get(f"{API_URL}/devices", timeout=TIMEOUT).json()
                             device_record = next((d for d in devices if d['ip'] == device['host']), None)
@@ -213,8 +221,8 @@ class NetworkAutomationCLI:
                             if device_record:
                                 monitoring_data = {
                                     'latency': ping_result.get('avg_rtt'),
-                                    'packet_loss': 0,
-                                    'availability': 100
+                                    'packet_loss': packet_loss,
+                                    'availability': availability.add(device_name, packet_loss)
                                 }
                                 
                                 requests.post(
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Agent de collecte distant
+S'inscrit auprès de l'API, sonde les équipements qui lui sont attribués
+(bail renouvelé en continu) et renvoie les mesures par lots compressés.
+Plusieurs agents peuvent tourner sur la même machine (noms différents).
+Le secret d'inscription (agents.enrollment_token côté API) est lu dans
+--enrollment-token ou NETAUTO_ENROLLMENT_TOKEN.
+
+Usage:
+    python3 collector_agent.py --api http://localhost:5000/api --location paris
+    python3 collector_agent.py --name agent-2 --capacity 200 --interval 30 --token-file agent-2.json
+"""
+
+import argparse
+import os
+import socket
+import sys
+
+from modules.agent import CollectorAgent
+
+API_URL = "http://localhost:5000/api"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="collector_agent.py",
+        description="Agent de collecte: sonde les équipements attribués par l'API et lui renvoie les mesures"
+    )
+    parser.add_argument('--api', default=API_URL, help=f"URL de l'API (défaut: {API_URL})")
+    parser.add_argument('--name', default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Nom unique de l'agent (défaut: hôte-pid)")
+    parser.add_argument('-l', '--location', action='append', default=[],
+                        help="Location prise en charge (répétable, défaut: toutes)")
+    parser.add_argument('--capacity', type=int, default=0, help="Équipements au plus (0 = sans limite)")
+    parser.add_argument('--interval', type=float, default=10, help="Secondes entre deux sondages")
+    parser.add_argument('--iterations', type=int, default=0, help="Nombre de sondages (0 = infini)")
+    parser.add_argument('--count', type=int, default=4, help="Pings par sondage")
+    parser.add_argument('--timeout', type=int, default=2, help="Timeout par ping en secondes")
+    parser.add_argument('--host-metrics', action='store_true', help="Métriques CPU/mémoire par SSH (/proc)")
+    parser.add_argument('-w', '--workers', type=int, default=10, help="Équipements sondés en parallèle")
+    parser.add_argument('--enrollment-token', default=os.environ.get('NETAUTO_ENROLLMENT_TOKEN'),
+                        help="Secret d'inscription de l'API (défaut: $NETAUTO_ENROLLMENT_TOKEN)")
+    parser.add_argument('--token-file', help="Garde le jeton de l'agent (redémarrage sous le même nom)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    agent = CollectorAgent(args.api, args.name, locations=args.location, capacity=args.capacity,
+                           count=args.count, timeout=args.timeout, host_metrics=args.host_metrics,
+                           workers=args.workers, enrollment_token=args.enrollment_token,
+                           token_file=args.token_file)
+    try:
+        agent.run(interval=args.interval, iterations=args.iterations)
+    except Exception as e:
+        print(f"[!] Agent arrêté: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,6 @@ Découverte, récupération de données, configuration, monitoring et dashboards
 
 import os
 import sys
-import yaml
 import json
 import time
 from pathlib import Path
@@ -14,22 +13,39 @@ from datetime import datetime
 from modules.discovery import NetworkDiscovery
 from modules.napalm_utils import NALPMUtils
 from modules.monitoring import NetworkMonitoring
-from modules.reports import ReportGenerator
+from modules.reports import ReportGenerator, InventoryCache
+from modules.report_pipeline import ReportPipeline
+from modules import metrics, profiling, tracing
 
-# ✅ IMPORT DU NOUVEAU DASHBOARD PLOTLY
-try:
-    import plotly.graph_objects as go
-    from plotly.subplots import make_subplots
-    PLOTLY_AVAILABLE = True
-except ImportError:
-    print("[!] Plotly non installé. Installez avec: pip install plotly")
-    PLOTLY_AVAILABLE = False
+# Bornes des dashboards: points par courbe, colonnes de heatmap, courbes affichées
+LINE_MAX_POINTS = 500
+HEATMAP_MAX_BUCKETS = 200
+AVAILABILITY_MAX_DEVICES = 20
+# Équipements listés au chargement de l'inventaire
+DEVICES_LISTED = 20
+
+def _load_plotly():
+    """
+    Charge Plotly à la première utilisation (import coûteux, inutile pour
+    la plupart des sous-commandes)
+    
+    Returns:
+        tuple: (plotly.graph_objects, make_subplots) ou (None, None)
+    """
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+    except ImportError:
+        return None, None
+    return go, make_subplots
 
 class NetworkAutomationApp:
     def __init__(self, config_file="devices.yaml"):
         """Initialise l'application avec le fichier de configuration"""
         self.config_file = config_file
         self.devices = []
+        self.inventory = None
+        self.config = {}
         self.results = {}
         self.monitoring_data = {}
         
@@ -43,13 +59,21 @@ class NetworkAutomationApp:
             self.create_sample_config()
             return
         
-        with open(self.config_file, 'r') as f:
-            config = yaml.safe_load(f)
-            self.devices = config.get('devices', [])
-        
-        print(f"[+] {len(self.devices)} équipement(s) chargé(s)")
-        for device in self.devices:
-            print(f"    - {device['host']} ({device['device_type']})")
+        from modules.inventory import InventoryError, load_inventory
+        try:
+            self.inventory = load_inventory(self.config_file)
+        except InventoryError as e:
+            print(f"[!] {self.config_file}: {e}")
+            sys.exit(1)
+        self.config = self.inventory.config
+        self.devices = self.inventory.devices
+        
+        print(f"[+] {len(self.devices)} équipement(s) chargé(s)"
+              + (" (cache)" if self.inventory.source == 'cache' else ""))
+        for device in self.devices[:DEVICES_LISTED]:
+            print(f"    - {device['host']} ({device.get('device_type', 'N/A')})")
+        if len(self.devices) > DEVICES_LISTED:
+            print(f"    ... et {len(self.devices) - DEVICES_LISTED} autre(s)")
     
     def create_sample_config(self):
         """Crée un fichier de configuration exemple"""
@@ -82,11 +106,15 @@ class NetworkAutomationApp:
             ]
         }
         
+        import yaml
         with open(self.config_file, 'w') as f:
             yaml.dump(sample_config, f, default_flow_style=False)
         
         print(f"[+] Fichier {self.config_file} créé avec des exemples")
-        self.devices = sample_config['devices']
+        from modules.inventory import Inventory
+        self.inventory = Inventory.from_config(sample_config)
+        self.config = self.inventory.config
+        self.devices = self.inventory.devices
     
     def discover_network(self):
         """Étape 1 : Découverte des équipements du réseau"""
@@ -96,27 +124,33 @@ class NetworkAutomationApp:
         
         discovery = NetworkDiscovery()
         
-        for device in self.devices:
-            print(f"\n[*] Vérification de {device['name']} ({device['host']})")
-            
-            # Ping sur l'équipement
-            if discovery.ping_host(device['host']):
-                print(f"    [+] Hôte accessible via ping")
+        with tracing.span('discover_network', devices=len(self.devices)):
+            for device in self.devices:
+                print(f"\n[*] Vérification de {device['name']} ({device['host']})")
                 
-                # Vérification SSH
-                if discovery.check_ssh_port(device['host'], device['port']):
-                    print(f"    [+] Port SSH {device['port']} ouvert")
-                    device['status'] = 'online'
-                else:
-                    print(f"    [-] Port SSH {device['port']} fermé")
-                    device['status'] = 'ssh_unavailable'
-            else:
-                print(f"    [-] Hôte inaccessible")
-                device['status'] = 'offline'
+                with tracing.device(device['name']), tracing.span('discover', category='device'):
+                    self._discover_device(discovery, device)
         
         print("\n[+] Découverte complétée")
         return self.devices
     
+    def _discover_device(self, discovery, device):
+        """Ping puis vérification du port SSH d'un équipement"""
+        # Ping sur l'équipement
+        if discovery.ping_host(device['host']):
+            print(f"    [+] Hôte accessible via ping")
+            
+            # Vérification SSH
+            if discovery.check_ssh_port(device['host'], device['port']):
+                print(f"    [+] Port SSH {device['port']} ouvert")
+                device['status'] = 'online'
+            else:
+                print(f"    [-] Port SSH {device['port']} fermé")
+                device['status'] = 'ssh_unavailable'
+        else:
+            print(f"    [-] Hôte inaccessible")
+            device['status'] = 'offline'
+    
     def retrieve_data(self):
         """Étape 2 : Récupération des données"""
         print("\n" + "="*60)
@@ -125,46 +159,88 @@ class NetworkAutomationApp:
         
         napalm = NALPMUtils()
         
-        for device in self.devices:
-            if device.get('status') != 'online':
-                print(f"\n[-] {device['name']} hors ligne, données ignorées")
-                continue
-            
-            print(f"\n[*] Récupération de données pour {device['name']}")
-            self.results[device['name']] = {}
-            
-            try:
-                # Récupération des informations système
-                print(f"    [*] Récupération des facts...")
-                facts = napalm.get_facts(device)
-                self.results[device['name']]['facts'] = facts
-                print(f"    [+] Hostname: {facts.get('hostname', 'N/A')}")
-                print(f"    [+] Uptime: {facts.get('uptime', 'N/A')}")
-                
-                # Récupération des interfaces
-                print(f"    [*] Récupération des interfaces...")
-                interfaces = napalm.get_interfaces(device)
-                self.results[device['name']]['interfaces'] = interfaces
-                print(f"    [+] {len(interfaces)} interface(s) trouvée(s)")
-                
-                # Récupération des routes
-                print(f"    [*] Récupération des routes...")
-                routes = napalm.get_routes(device)
-                self.results[device['name']]['routes'] = routes
-                print(f"    [+] {len(routes)} route(s) trouvée(s)")
+        reports_config = self.config.get('reports', {})
+        inventory_cache = None
+        if reports_config.get('incremental'):
+            reporter = ReportGenerator(reports_config.get('directory', 'reports'))
+            inventory_cache = InventoryCache(reporter.inventory_cache_path)
+        
+        with tracing.span('retrieve_data', devices=len(self.devices)):
+            for device in self.devices:
+                if device.get('status') != 'online':
+                    print(f"\n[-] {device['name']} hors ligne, données ignorées")
+                    continue
                 
-                # Récupération de la configuration
-                print(f"    [*] Sauvegarde de la configuration...")
-                config = napalm.get_config(device)
-                self.results[device['name']]['config'] = config
-                self.save_backup_config(device['name'], config)
-                print(f"    [+] Configuration sauvegardée")
+                print(f"\n[*] Récupération de données pour {device['name']}")
+                self.results[device['name']] = {}
                 
-            except Exception as e:
-                print(f"    [!] Erreur lors de la récupération: {str(e)}")
+                with tracing.device(device['name']), tracing.span('retrieve', category='device'):
+                    self._retrieve_device(napalm, device, inventory_cache)
         
         print("\n[+] Récupération des données complétée")
     
+    def _retrieve_device(self, napalm, device, inventory_cache):
+        """Inventaire (complet ou depuis le cache) puis sauvegarde de la configuration"""
+        try:
+            # Mode incrémental: équipement inchangé depuis le dernier rapport
+            if inventory_cache is not None and self._reuse_cached_inventory(napalm, device, inventory_cache):
+                print(f"    [=] État inchangé, données du dernier rapport réutilisées")
+            else:
+                self._collect_inventory(napalm, device)
+            
+            # Récupération de la configuration
+            print(f"    [*] Sauvegarde de la configuration...")
+            config = napalm.get_config(device)
+            self.results[device['name']]['config'] = config
+            self.save_backup_config(device['name'], config)
+            print(f"    [+] Configuration sauvegardée")
+            
+        except Exception as e:
+            print(f"    [!] Erreur lors de la récupération: {str(e)}")
+    
+    def _reuse_cached_inventory(self, napalm, device, inventory_cache):
+        """
+        Réutilise les données du cache d'inventaire si l'état distant n'a pas changé
+        
+        Returns:
+            bool: True si les données en cache ont été réutilisées
+        """
+        state = napalm.get_state_digest(device)
+        if not state:
+            return False
+        
+        self.results[device['name']]['state_digest'] = state['digest']
+        entry = inventory_cache.get(device['name'])
+        if not entry or entry.get('digest') != state['digest'] or not entry.get('data'):
+            return False
+        
+        for key, value in entry['data'].items():
+            self.results[device['name']][key] = value
+        facts = dict(self.results[device['name']].get('facts', {}), uptime=state['uptime'])
+        self.results[device['name']]['facts'] = facts
+        return True
+    
+    def _collect_inventory(self, napalm, device):
+        """Collecte complète des facts, interfaces et routes d'un équipement"""
+        # Récupération des informations système
+        print(f"    [*] Récupération des facts...")
+        facts = napalm.get_facts(device)
+        self.results[device['name']]['facts'] = facts
+        print(f"    [+] Hostname: {facts.get('hostname', 'N/A')}")
+        print(f"    [+] Uptime: {facts.get('uptime', 'N/A')}")
+        
+        # Récupération des interfaces
+        print(f"    [*] Récupération des interfaces...")
+        interfaces = napalm.get_interfaces(device)
+        self.results[device['name']]['interfaces'] = interfaces
+        print(f"    [+] {len(interfaces)} interface(s) trouvée(s)")
+        
+        # Récupération des routes
+        print(f"    [*] Récupération des routes...")
+        routes = napalm.get_routes(device)
+        self.results[device['name']]['routes'] = routes
+        print(f"    [+] {len(routes)} route(s) trouvée(s)")
+    
     def apply_configuration(self):
         """Étape 3 : Application de configurations automatiquement"""
         print("\n" + "="*60)
@@ -212,7 +288,9 @@ iface eth1 inet static
         print("[*] Ping monitoring sur les équipements\n")
         
         try:
+            due = time.monotonic()
             while True:
+                metrics.observe('scheduler_lag_seconds', max(0, time.monotonic() - due), loop='interactive')
                 for device in self.devices:
                     if device.get('status') != 'online':
                         continue
@@ -223,6 +301,7 @@ iface eth1 inet static
                     status_icon = "[+]" if ping_result['success'] else "[-]"
                     print(f"{status_icon} {device['name']}: {ping_result['stats']}")
                 
+                due = time.monotonic() + 10
                 time.sleep(10)  # Monitoring toutes les 10 secondes
         
         except KeyboardInterrupt:
@@ -236,7 +315,7 @@ iface eth1 inet static
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = backup_dir / f"backup_{device_name}_{timestamp}.txt"
         
-        with open(filename, 'w') as f:
+        with tracing.span('backup_write', size=len(config)), open(filename, 'w') as f:
             f.write(f"Configuration de {device_name}\n")
             f.write(f"Sauvegardée le: {datetime.now()}\n")
             f.write("="*60 + "\n\n")
@@ -244,17 +323,31 @@ iface eth1 inet static
         
         print(f"    [+] Sauvegarde: {filename}")
     
-    def generate_reports(self):
-        """Génération de rapports"""
+    def generate_reports(self, show_dashboards=True):
+        """
+        Génération de rapports
+        
+        Args:
+            show_dashboards: Ouvre aussi les dashboards Plotly interactifs
+        """
         print("\n" + "="*60)
         print("[*] GÉNÉRATION DE RAPPORTS ET DASHBOARDS")
         print("="*60)
         
-        reporter = ReportGenerator()
+        reports_config = self.config.get('reports', {})
+        report_dir = reports_config.get('directory', 'reports')
+        reporter = ReportGenerator(report_dir)
         
-        # Rapport général
-        report_file = reporter.generate_inventory_report(self.results)
-        print(f"[+] Rapport d'inventaire généré: {report_file}")
+        # Rapports d'inventaire (tous les formats configurés, en parallèle)
+        pipeline = ReportPipeline(
+            reports_config.get('formats', ['text']),
+            report_dir,
+            incremental=reports_config.get('incremental', False)
+        )
+        with tracing.span('generate_reports', devices=len(self.results)):
+            manifest = pipeline.run(self.results)
+        for fmt, entry in manifest['formats'].items():
+            print(f"[+] Rapport d'inventaire ({fmt}) généré en {entry['seconds']}s: {entry['file']}")
         
         # Rapport de monitoring
         if self.monitoring_data:
@@ -262,23 +355,81 @@ iface eth1 inet static
             print(f"[+] Rapport de monitoring généré: {monitoring_report}")
         
         # ✅ AFFICHER LES DASHBOARDS PLOTLY INTERACTIFS
-        if PLOTLY_AVAILABLE:
+        if not show_dashboards:
+            return
+        
+        go, _ = _load_plotly()
+        if go is not None:
             print("\n[*] Génération des dashboards Plotly interactifs...")
             self.show_plotly_dashboards()
         else:
             print("[!] Plotly non disponible. Installez avec: pip install plotly")
     
-    def show_plotly_dashboards(self):
-        """✅ NOUVELLE MÉTHODE: Affiche les dashboards Plotly interactifs"""
+    def show_plotly_dashboards(self, hours=24):
+        """
+        Affiche les dashboards Plotly interactifs à partir des mesures stockées
+        
+        Les séries viennent de la table MonitoringData de l'API: agrégats par
+        intervalle pour la heatmap, sous-échantillonnage LTTB pour les courbes,
+        de sorte que le nombre de points reste borné quelle que soit la période.
+        
+        Args:
+            hours: Période affichée en heures (ex: 720 pour 30 jours)
+        """
+        go, make_subplots = _load_plotly()
+        if go is None:
+            print("[!] Plotly non disponible. Installez avec: pip install plotly")
+            return
         
-        import random
+        import numpy as np
+        from modules.dashboard_data import MonitoringDataSource, find_database, to_datetimes
+        from modules.latency_store import DEFAULT_STORE_DIR, latency_heatmap
         
         print("[*] Ouverture des dashboards interactifs...\n")
         
-        # Préparer les données
+        dashboards_config = self.config.get('dashboards', {})
+        db_path = find_database(dashboards_config.get('database'))
+        if db_path:
+            source = MonitoringDataSource(db_path)
+            known_devices = source.devices()
+            rollup = source.load_rollup(hours)
+        else:
+            known_devices, rollup = {}, None
+        if rollup is None or not rollup.devices:
+            print("[!] Aucune mesure de monitoring en base: lancez le monitoring via l'API")
+        
+        # Moyennes de la période par équipement (retrouvé en base par nom ou par IP)
+        summary = {}
+        if rollup is not None:
+            means = {metric: rollup.device_means(metric) for metric in ('latency', 'packet_loss', 'availability')}
+            for i, hostname in enumerate(rollup.devices):
+                summary[hostname] = {metric: float(values[i]) for metric, values in means.items()}
+        by_ip = {info['ip']: summary.get(hostname, {}) for hostname, info in known_devices.items()}
+        
         device_names = [d['name'] for d in self.devices if d.get('status') == 'online']
         if not device_names:
             device_names = [d['name'] for d in self.devices]
+        hosts = {d['name']: d['host'] for d in self.devices}
+        stats = [summary.get(name) or by_ip.get(hosts.get(name)) or {} for name in device_names]
+        
+        def value_or_zero(entry, metric):
+            value = entry.get(metric)
+            return 0 if value is None or np.isnan(value) else value
+        
+        availability = [round(value_or_zero(entry, 'availability'), 1) for entry in stats]
+        latencies = [value_or_zero(entry, 'latency') for entry in stats]
+        loss_rates = [value_or_zero(entry, 'packet_loss') for entry in stats]
+        
+        if rollup is not None:
+            # Heatmap découpée dans le store matriciel, sans relire l'historique
+            heatmap_devices, bucket_starts, heatmap = latency_heatmap(
+                db_path, hours, HEATMAP_MAX_BUCKETS,
+                dashboards_config.get('latency_store') or DEFAULT_STORE_DIR
+            )
+            history_x, history_y = rollup.fleet_series('latency', LINE_MAX_POINTS)
+        else:
+            heatmap_devices, bucket_starts, heatmap = [], [], None
+            history_x, history_y = [], []
         
         # 1️⃣ DASHBOARD PRINCIPAL
         print("[1/4] Dashboard Principal...")
@@ -290,7 +441,7 @@ iface eth1 inet static
                 "Latence réseau (ms)",
                 "Taux de perte de paquets",
                 "Distribution de latence",
-                "Historique 24h"
+                f"Historique {hours}h"
             ),
             specs=[
                 [{"type": "pie"}, {"type": "bar"}],
@@ -317,7 +468,6 @@ iface eth1 inet static
         )
         
         # Disponibilité
-        availability = [random.randint(90, 100) for _ in device_names]
         fig_main.add_trace(
             go.Bar(
                 x=device_names,
@@ -330,7 +480,6 @@ iface eth1 inet static
         )
         
         # Latence
-        latencies = [random.uniform(5, 50) for _ in device_names]
         fig_main.add_trace(
             go.Bar(
                 x=device_names,
@@ -343,7 +492,6 @@ iface eth1 inet static
         )
         
         # Perte paquets
-        loss_rates = [random.uniform(0, 5) for _ in device_names]
         fig_main.add_trace(
             go.Scatter(
                 x=device_names,
@@ -356,24 +504,22 @@ iface eth1 inet static
             row=2, col=2
         )
         
-        # Box plot
-        latency_dist = [random.gauss(lat, lat*0.1) for lat in latencies for _ in range(20)]
+        # Box plot (moyennes par intervalle de la heatmap: taille bornée)
+        latency_dist = heatmap[~np.isnan(heatmap)] if heatmap is not None else []
         fig_main.add_trace(
             go.Box(
-                y=latency_dist,
+                y=list(latency_dist),
                 marker=dict(color='#9c27b0'),
                 boxmean='sd'
             ),
             row=3, col=1
         )
         
-        # Time series
-        hours = list(range(24))
-        values = [random.uniform(15, 45) for _ in hours]
+        # Time series (moyenne de la flotte, LTTB)
         fig_main.add_trace(
             go.Scatter(
-                x=hours,
-                y=values,
+                x=to_datetimes(history_x),
+                y=list(history_y),
                 mode='lines',
                 fill='tozeroy',
                 line=dict(color='#2196f3', width=3)
@@ -401,13 +547,17 @@ iface eth1 inet static
             subplot_titles=("État global", "Interfaces par équipement")
         )
         
-        total_interfaces = sum(len(self.results.get(d['name'], {}).get('interfaces', {})) 
-                              for d in self.devices)
+        interface_states = [
+            iface.get('status')
+            for d in self.devices
+            for iface in self.results.get(d['name'], {}).get('interfaces', {}).values()
+        ]
+        up_count = interface_states.count('up')
         
         fig_interfaces.add_trace(
             go.Pie(
                 labels=['UP', 'DOWN'],
-                values=[total_interfaces, 2],
+                values=[up_count, len(interface_states) - up_count],
                 marker=dict(colors=['#4caf50', '#f44336']),
                 textposition='inside',
                 textinfo='label+percent'
@@ -415,8 +565,8 @@ iface eth1 inet static
             row=1, col=1
         )
         
-        interface_counts = [len(self.results.get(d['name'], {}).get('interfaces', {})) 
-                           for d in self.devices]
+        interface_counts = [len(self.results.get(name, {}).get('interfaces', {})) 
+                           for name in device_names]
         fig_interfaces.add_trace(
             go.Bar(
                 x=device_names,
@@ -437,47 +587,48 @@ iface eth1 inet static
         
         fig_interfaces.show()
         
-        # 3️⃣ HEATMAP LATENCE
+        # 3️⃣ HEATMAP LATENCE (store matriciel des latences)
         print("[3/4] Heatmap de Latence...")
-        z_data = [[random.uniform(10, 50) for _ in range(24)] for _ in device_names]
-        
         fig_heatmap = go.Figure(data=go.Heatmap(
-            z=z_data,
-            x=list(range(24)),
-            y=device_names,
+            z=heatmap.tolist() if heatmap is not None else [],
+            x=to_datetimes(bucket_starts),
+            y=heatmap_devices,
             colorscale='RdYlGn_r',
-            hovertemplate='Équipement: %{y}<br>Heure: %{x}h<br>Latence: %{z:.1f}ms<extra></extra>'
+            hovertemplate='Équipement: %{y}<br>Début: %{x}<br>Latence: %{z:.1f}ms<extra></extra>'
         ))
         
         fig_heatmap.update_layout(
-            title="<b>Heatmap de Latence - 24h</b>",
-            xaxis_title="Heure du jour",
+            title=f"<b>Heatmap de Latence - {hours}h</b>",
+            xaxis_title="Temps (UTC)",
             yaxis_title="Équipement",
-            height=400,
+            height=max(400, 12 * len(heatmap_devices)),
             template='plotly_white'
         )
         
         fig_heatmap.show()
         
-        # 4️⃣ DISPONIBILITÉ
+        # 4️⃣ DISPONIBILITÉ (équipements les moins disponibles, LTTB)
         print("[4/4] Historique Disponibilité...")
-        hours_24 = [f"{h}h" for h in range(24)]
+        ranked = sorted(
+            summary,
+            key=lambda name: 100 if np.isnan(summary[name]['availability']) else summary[name]['availability']
+        )[:AVAILABILITY_MAX_DEVICES]
+        series = rollup.device_series(ranked, 'availability', LINE_MAX_POINTS) if rollup is not None else {}
         
         fig_availability = go.Figure()
         
-        for device_name in device_names:
-            availability_history = [random.uniform(95, 100) for _ in range(24)]
+        for device_name in ranked:
+            xs, ys = series.get(device_name, ([], []))
             fig_availability.add_trace(go.Scatter(
-                x=hours_24,
-                y=availability_history,
-                mode='lines+markers',
-                name=device_name,
-                fill='tozeroy'
+                x=to_datetimes(xs),
+                y=list(ys),
+                mode='lines',
+                name=device_name
             ))
         
         fig_availability.update_layout(
-            title="<b>Historique de Disponibilité - 24h</b>",
-            xaxis_title="Heure",
+            title=f"<b>Historique de Disponibilité - {hours}h</b>",
+            xaxis_title="Temps (UTC)",
             yaxis_title="Disponibilité (%)",
             height=600,
             template='plotly_white',
@@ -526,18 +677,344 @@ iface eth1 inet static
             else:
                 print("[-] Option invalide")
 
-def main():
-    print("""
+BANNER = """
 ╔══════════════════════════════════════════════════════════╗
 ║   Application d'Automatisation Réseau avec Python        ║
 ║   Cours: Automatisation Réseau - TCO M1 2025             ║
 ║   Auteur: Tafita Ralijaona                               ║
 ║   Dashboard: PLOTLY INTERACTIF ✨                        ║
 ╚══════════════════════════════════════════════════════════╝
-    """)
+    """
+
+def _add_selection_arguments(parser):
+    """Options communes: filtres d'inventaire et concurrence"""
+    group = parser.add_argument_group("sélection des équipements (motifs glob, répétables)")
+    group.add_argument('--name', action='append', help="Nom de l'équipement (ex: 'server-*')")
+    group.add_argument('--host', action='append', help="Adresse de l'équipement (ex: '192.168.1.*')")
+    group.add_argument('--location', action='append', help="Site (champ location)")
+    group.add_argument('--role', action='append', help="Rôle (champ role)")
+    group.add_argument('--device-type', action='append', help="Type d'équipement (ex: linux)")
+    parser.add_argument('-w', '--workers', type=int, default=10,
+                        help="Nombre d'équipements traités en parallèle (défaut: 10, par processus avec -p)")
+    parser.add_argument('-p', '--processes', type=int, default=1,
+                        help="Répartit les équipements entre N processus par hachage cohérent, "
+                             "chacun avec ses connexions et son calendrier de sondage (défaut: 1; "
+                             "sans effet pour snmp et backup --schedule)")
+
+def build_parser():
+    """Construit le parseur de la ligne de commande (sous-commandes non interactives)"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Application d'automatisation réseau. Sans sous-commande: menu interactif. "
+                    "Les sous-commandes écrivent un objet JSON par ligne (NDJSON) sur stdout, "
+                    "les messages de progression sur stderr."
+    )
+    parser.add_argument('-c', '--config', default="devices.yaml",
+                        help="Fichier d'inventaire (défaut: devices.yaml)")
+    parser.add_argument('--metrics', metavar='FICHIER',
+                        help="Active les métriques et les écrit périodiquement en JSON dans ce fichier")
+    parser.add_argument('--metrics-interval', type=float, default=10,
+                        help="Secondes entre deux écritures des métriques (défaut: 10)")
+    parser.add_argument('--trace', metavar='FICHIER',
+                        help="Écrit les spans par étape et par équipement (Chrome trace JSON) dans ce fichier")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile la commande avec cProfile (résultat dans reports/profiles/)")
+    
+    subparsers = parser.add_subparsers(dest='command', metavar='commande')
+    subparsers.add_parser('menu', help="Menu interactif (défaut)")
+    
+    _add_selection_arguments(subparsers.add_parser(
+        'discover', help="Découverte des équipements (ping + port SSH)"))
+    _add_selection_arguments(subparsers.add_parser(
+        'collect', help="Découverte puis récupération des facts, interfaces et routes"))
+    
+    monitor_parser = subparsers.add_parser('monitor', help="Monitoring par ping (Ctrl+C pour arrêter)")
+    _add_selection_arguments(monitor_parser)
+    monitor_parser.add_argument('--count', type=int, default=4, help="Pings par mesure (défaut: 4)")
+    monitor_parser.add_argument('--interval', type=float, default=10,
+                                help="Secondes entre deux itérations (défaut: 10)")
+    monitor_parser.add_argument('--iterations', type=int, default=0,
+                                help="Nombre d'itérations, 0 = infini (défaut: 0)")
+    monitor_parser.add_argument('--host-metrics', action='store_true',
+                                help="Ajoute CPU, mémoire, charge et débits des interfaces (lecture /proc par SSH)")
+    
+    interfaces_parser = subparsers.add_parser(
+        'interfaces', help="Sondage des compteurs d'interfaces: débits, erreurs, utilisation (Ctrl+C pour arrêter)")
+    _add_selection_arguments(interfaces_parser)
+    interfaces_parser.add_argument('--interval', type=float, default=10,
+                                   help="Secondes entre deux sondages (défaut: 10)")
+    interfaces_parser.add_argument('--iterations', type=int, default=0,
+                                   help="Nombre de sondages, 0 = infini (défaut: 0)")
+    interfaces_parser.add_argument('--history', type=int, default=90,
+                                   help="Sondages gardés par équipement (défaut: 90)")
+    
+    snmp_parser = subparsers.add_parser(
+        'snmp', help="Sondage SNMP v2c (system, ifTable, ifXTable) sans SSH (Ctrl+C pour arrêter)")
+    _add_selection_arguments(snmp_parser)
+    snmp_parser.add_argument('--interval', type=float, default=10,
+                             help="Secondes entre deux sondages (défaut: 10)")
+    snmp_parser.add_argument('--iterations', type=int, default=1,
+                             help="Nombre de sondages, 0 = infini (défaut: 1)")
+    snmp_parser.add_argument('--timeout', type=float, default=1.0,
+                             help="Délai d'attente d'une réponse SNMP en secondes (défaut: 1)")
+    snmp_parser.add_argument('--retries', type=int, default=2,
+                             help="Nouvelles tentatives par requête (défaut: 2)")
+    snmp_parser.add_argument('--max-inflight', type=int, default=256,
+                             help="Requêtes SNMP en vol au plus (défaut: 256)")
+    snmp_parser.add_argument('--history', type=int, default=90,
+                             help="Sondages gardés par équipement (défaut: 90)")
+    
+    backup_parser = subparsers.add_parser('backup', help="Sauvegarde des configurations")
+    _add_selection_arguments(backup_parser)
+    backup_parser.add_argument('--directory', help="Répertoire des sauvegardes (défaut: backup.directory)")
+    backup_parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=None,
+                               help="Empreintes d'abord, SFTP des seuls fichiers modifiés; --no-incremental "
+                                    "pour une sauvegarde complète (défaut: backup.incremental)")
+    backup_parser.add_argument('--schedule', action='store_true',
+                               help="Planification: backup.schedule / backup.time, départs étalés, "
+                                    "purge de rétention (Ctrl+C pour arrêter)")
+    backup_parser.add_argument('--now', action='store_true',
+                               help="Avec --schedule: première exécution immédiate")
+    backup_parser.add_argument('--iterations', type=int, default=0,
+                               help="Avec --schedule: nombre d'exécutions, 0 = infini (défaut: 0)")
+    backup_parser.add_argument('--window', type=float,
+                               help="Fenêtre d'étalement des départs en minutes (défaut: backup.window_minutes)")
+    backup_parser.add_argument('--per-location', type=int,
+                               help="Sauvegardes simultanées par location (défaut: backup.per_location)")
+    backup_parser.add_argument('--database', default=os.environ.get('NETAUTO_DATABASE_URI'),
+                               help="Base de l'API dont purger la table backups (défaut: NETAUTO_DATABASE_URI)")
+    
+    report_parser = subparsers.add_parser('report', help="Découverte, collecte et génération des rapports")
+    _add_selection_arguments(report_parser)
+    return parser
+
+def _run_periodic(args, loop, run_once, stopped="[*] Arrêt du monitoring"):
+    """Répète run_once toutes les args.interval secondes (args.iterations fois, 0 = infini)"""
+    iteration = 0
+    due = time.monotonic()
+    try:
+        while not args.iterations or iteration < args.iterations:
+            iteration += 1
+            started = time.monotonic()
+            # Retard sur l'heure prévue: cycle précédent plus long que l'intervalle
+            metrics.observe('scheduler_lag_seconds', max(0, started - due), loop=loop)
+            run_once()
+            due = started + args.interval
+            if not args.iterations or iteration < args.iterations:
+                time.sleep(max(0, due - time.monotonic()))
+    except KeyboardInterrupt:
+        print(stopped, file=sys.stderr)
+
+def run_batch_command(app, args):
+    """
+    Exécute une sous-commande non interactive et diffuse les résultats en NDJSON
+    
+    Returns:
+        int: Code de sortie
+    """
+    from modules import batch
+    
+    # Sélection par les index de l'inventaire (noms, adresses, locations, rôles exacts)
+    devices = app.inventory.filter(
+        name=args.name, host=args.host, location=args.location,
+        role=args.role, device_type=args.device_type
+    )
+    sharded = args.processes > 1
+    if sharded:
+        from modules.sharding import ShardedRunner
+        runner = ShardedRunner(devices, processes=args.processes, workers=args.workers)
+    else:
+        runner = batch.BatchRunner(devices, workers=args.workers)
+    
+    try:
+        return _run_selected(app, args, devices, runner)
+    finally:
+        if sharded:
+            runner.close()
+
+def _run_selected(app, args, devices, runner):
+    """Exécute la sous-commande sur les équipements sélectionnés (BatchRunner ou ShardedRunner)"""
+    from modules import batch
+    
+    sharded = args.processes > 1
+    if args.command == 'discover':
+        runner.run('discover', batch.discover_device)
+    
+    elif args.command == 'collect':
+        runner.run('collect', batch.collect_device)
+    
+    elif args.command == 'backup':
+        backup_config = app.config.get('backup', {})
+        backup_dir = args.directory or backup_config.get('directory', 'backups')
+        incremental = args.incremental if args.incremental is not None else backup_config.get('incremental', False)
+        if not args.schedule:
+            runner.run('backup', batch.backup_device, backup_dir=backup_dir, incremental=incremental)
+        elif not backup_config.get('enabled', True):
+            print("[!] Sauvegardes désactivées (backup.enabled: false)", file=sys.stderr)
+            return 1
+        else:
+            from modules.backup_scheduler import BackupScheduler
+            
+            scheduler = BackupScheduler.from_config(
+                backup_config, batch.backup_device, backup_dir=backup_dir, workers=args.workers,
+                window=args.window * 60 if args.window is not None else None,
+                per_location=args.per_location, database_uri=args.database, emit=runner.emit,
+                incremental=incremental
+            )
+            scheduler.serve(devices, backup_config.get('schedule', 'daily'), backup_config.get('time', '02:00'),
+                            iterations=args.iterations, now=args.now,
+                            weekday=backup_config.get('weekday', 'monday'), day=backup_config.get('day', 1))
+    
+    elif args.command == 'monitor':
+        from modules.alerts import AlertEngine, AlertRules, monitoring_sample
+        from modules.notifications import NotificationDispatcher
+        from modules.proc_collector import ProcCollector
+        
+        # Un collecteur pour toute la boucle: les écarts de compteurs se font d'une itération à l'autre
+        collector = ProcCollector() if args.host_metrics else None
+        # Seuils de la configuration: seuls les changements de niveau sont émis (type 'alert')
+        # et transmis aux canaux de notification, sans attendre leur envoi
+        alerts = AlertEngine(AlertRules.from_config(app.config.get('thresholds', {})))
+        notifications = NotificationDispatcher.from_config(app.config.get('notifications', {}))
+        
+        def check_alerts(name, record, now):
+            if 'error' in record:
+                return
+            for event in alerts.process(name, monitoring_sample(record), now):
+                runner.emit({'type': 'alert', **event})
+                notifications.submit(event)
+        
+        def monitor_once():
+            records = runner.run('monitor', batch.monitor_device, count=args.count, collector=collector)
+            now = time.time()
+            for name, record in records.items():
+                check_alerts(name, record, now)
+        
+        try:
+            if sharded:
+                # Chaque processus sonde ses équipements à son rythme; alertes évaluées ici
+                runner.serve('monitor', batch.monitor_device, args.interval, args.iterations,
+                             on_record=lambda record: check_alerts(record['device'], record, time.time()),
+                             count=args.count, host_metrics=args.host_metrics)
+            else:
+                _run_periodic(args, 'monitor', monitor_once)
+        finally:
+            notifications.close()
+    
+    elif args.command == 'interfaces':
+        if sharded:
+            # Un InterfacePoller par processus (batch.poll_interfaces), fermé avec le processus
+            runner.serve('interfaces', batch.poll_interfaces, args.interval, args.iterations,
+                         history=args.history)
+        else:
+            from modules.interface_poller import InterfacePoller
+            
+            # Connexions SSH et historique des compteurs gardés d'un sondage à l'autre
+            poller = InterfacePoller(history=args.history)
+            try:
+                _run_periodic(args, 'interfaces', lambda: runner.run('interfaces', poller.poll),
+                              stopped="[*] Arrêt du sondage des interfaces")
+            finally:
+                poller.close()
+    
+    elif args.command == 'snmp':
+        from modules.interface_poller import InterfacePoller
+        from modules.snmp_poller import SNMPPoller, link_snapshot
+        
+        poller = SNMPPoller.from_config(app.config.get('monitoring', {}), timeout=args.timeout,
+                                        retries=args.retries, max_inflight=args.max_inflight)
+        # Historique des compteurs d'un cycle à l'autre: débits comme pour la commande interfaces
+        history = InterfacePoller(history=args.history)
+        
+        def poll_once():
+            start = time.perf_counter()
+            poller.reset_stats()
+            results = poller.poll(devices)
+            failed = 0
+            for device in devices:
+                name = device.get('name', device['host'])
+                result = results[name]
+                if 'error' in result:
+                    failed += 1
+                else:
+                    rates = history.update(name, link_snapshot(result))
+                    result['interval'] = rates['interval']
+                    for interface, entry in result['interfaces'].items():
+                        entry.update(rates['interfaces'].get(interface, {}))
+                runner.emit({'type': 'snmp', 'device': name, 'host': device['host'], **result})
+            runner.emit({
+                'type': 'summary',
+                'command': 'snmp',
+                'devices': len(devices),
+                'failed': failed,
+                'requests': poller.stats['requests'],
+                'timeouts': poller.stats['timeouts'],
+                'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+                'timestamp': datetime.now().isoformat()
+            })
+        
+        _run_periodic(args, 'snmp', poll_once, stopped="[*] Arrêt du sondage SNMP")
+    
+    elif args.command == 'report':
+        import contextlib
+        
+        records = runner.run('collect', batch.collect_device)
+        app.results = {
+            name: record for name, record in records.items()
+            if record.get('status') == 'online' and 'error' not in record
+        }
+        with contextlib.redirect_stdout(sys.stderr):
+            reports_config = app.config.get('reports', {})
+            manifest = ReportPipeline(
+                reports_config.get('formats', ['text']),
+                reports_config.get('directory', 'reports'),
+                incremental=reports_config.get('incremental', False)
+            ).run(app.results)
+        runner.emit({'type': 'report', **manifest})
+    
+    return 0
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    dumper = metrics.MetricsDumper(args.metrics, args.metrics_interval).start() if args.metrics else None
+    if args.trace:
+        tracing.start()
+    command = args.command or 'menu'
+    session = profiling.ProfileSession() if args.profile else None
+    if session:
+        session.start()
+    elif command in ('menu', 'monitor', 'interfaces'):
+        # Exécutions longues: profil démarré/arrêté à chaud par SIGUSR1
+        profiling.install_signal_toggle(f"cli_{command}")
+    try:
+        return run_command(args)
+    finally:
+        if session:
+            path = profiling.write_profile(session.stop(), f"cli_{command}")
+            print(f"[+] Profil écrit: {path} (résumé: {path.with_suffix('.txt')})", file=sys.stderr)
+        if dumper:
+            dumper.stop()
+        if args.trace:
+            spans = tracing.save(args.trace)
+            print(f"[+] Trace: {spans} span(s) écrits dans {args.trace} (chrome://tracing ou ui.perfetto.dev)",
+                  file=sys.stderr)
+
+def run_command(args):
+    """Exécute le menu interactif ou une sous-commande"""
+    command = args.command or 'menu'
+    
+    if command == 'menu':
+        print(BANNER)
+        app = NetworkAutomationApp(args.config)
+        app.interactive_menu()
+        return 0
     
-    app = NetworkAutomationApp()
-    app.interactive_menu()
+    import contextlib
+    with contextlib.redirect_stdout(sys.stderr):
+        app = NetworkAutomationApp(args.config)
+    return run_batch_command(app, args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Module de l'agent de collecte distant
+Un agent, déployé près d'un groupe d'équipements (site, rack), s'inscrit
+auprès de l'API, obtient le bail d'une part des équipements, les sonde
+localement et renvoie ses mesures par lots compressés:
+
+- le bail est renouvelé par un thread dédié toutes les renew_seconds (un
+  tiers de sa durée), indépendamment de la durée des sondages;
+- un agent qui disparaît perd ses baux à leur expiration, ses équipements
+  sont repris par les autres agents à leur renouvellement suivant;
+- si l'API est injoignable, les mesures restent dans un tampon borné
+  (les plus anciennes sont perdues au-delà) et partent au lot suivant.
+
+L'inscription exige le secret partagé de l'API (agents.enrollment_token).
+Un nom déjà inscrit ne se reprend qu'avec le jeton de cet agent: pour
+redémarrer sous le même nom, garder le jeton dans token_file.
+
+    agent = CollectorAgent('http://localhost:5000/api', 'agent-paris', locations=['paris'],
+                           enrollment_token='...', token_file='/var/lib/netauto/agent-paris.json')
+    agent.run(interval=10)
+"""
+
+import gzip
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from . import batch
+
+TIMEOUT = 10
+# Mesures gardées au plus quand l'API est injoignable
+BUFFER_SIZE = 50000
+# Mesures par envoi
+BATCH_SIZE = 5000
+
+
+class AgentError(RuntimeError):
+    """Inscription refusée par l'API (secret d'inscription, nom déjà pris)"""
+
+
+def encode_samples(samples):
+    """
+    Corps d'un envoi de mesures
+
+    Returns:
+        bytes: JSON compact compressé (gzip)
+    """
+    body = json.dumps({'samples': samples}, separators=(',', ':')).encode('utf-8')
+    return gzip.compress(body, compresslevel=6)
+
+
+def sample_from_record(device, record):
+    """Mesure envoyée à l'API à partir du résultat de batch.monitor_device"""
+    metrics = record.get('host_metrics') or {}
+    return {
+        'device_id': device['id'],
+        'timestamp': round(time.time(), 3),
+        'success': bool(record.get('success')),
+        'latency': record.get('avg_rtt'),
+        'packet_loss': record.get('packet_loss', 0.0 if record.get('success') else 100.0),
+        'cpu_usage': metrics.get('cpu_usage'),
+        'memory_usage': metrics.get('memory_usage'),
+    }
+
+
+class CollectorAgent:
+    """
+    Agent de collecte: inscription, baux, sondage et envoi des mesures
+
+    Args:
+        api_url: URL de l'API (ex: http://localhost:5000/api)
+        name: Nom unique de l'agent (une réinscription sous le même nom garde ses baux)
+        locations: Locations prises en charge (vide = toutes)
+        capacity: Équipements au plus (0 = sans limite)
+        count: Pings par sondage
+        timeout: Timeout par ping en secondes
+        host_metrics: Métriques /proc par SSH en plus du ping (l'API transmet
+            alors les identifiants SSH des équipements avec les baux)
+        workers: Équipements sondés en parallèle
+        enrollment_token: Secret d'inscription de l'API (agents.enrollment_token)
+        token_file: Fichier où garder l'identifiant et le jeton de l'agent
+            (reprise du nom et des baux après un redémarrage)
+    """
+    def __init__(self, api_url, name, locations=(), capacity=0, count=4, timeout=2,
+                 host_metrics=False, workers=10, buffer_size=BUFFER_SIZE,
+                 enrollment_token=None, token_file=None):
+        self.api_url = api_url.rstrip('/')
+        self.name = name
+        self.locations = list(locations)
+        self.capacity = capacity
+        self.count = count
+        self.timeout = timeout
+        self.host_metrics = host_metrics
+        self.workers = max(1, workers)
+        self.agent_id = None
+        self.devices = []
+        self.renew_seconds = 10
+        self.buffer = deque(maxlen=buffer_size)
+        self.stats = {'polls': 0, 'samples': 0, 'uploads': 0, 'accepted': 0, 'rejected': 0,
+                      'raw_bytes': 0, 'sent_bytes': 0, 'renewals': 0, 'failures': 0}
+        self.enrollment_token = enrollment_token
+        self.token_file = token_file
+        self._token = None
+        self._load_token()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._renewer = None
+        # Une session par thread (renouvellement / sondage et envoi)
+        self._session = requests.Session()
+        self._lease_session = requests.Session()
+
+    def _headers(self):
+        return {'X-Agent-Token': self._token or ''}
+
+    def _load_token(self):
+        """Jeton gardé par une exécution précédente sous le même nom"""
+        if not self.token_file or not os.path.exists(self.token_file):
+            return
+        try:
+            with open(self.token_file, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[!] Jeton illisible ({self.token_file}): {e}")
+            return
+        if isinstance(saved, dict) and saved.get('name') == self.name:
+            self._token = saved.get('token')
+
+    def _save_token(self):
+        if not self.token_file:
+            return
+        # Lisible par le seul propriétaire: le jeton suffit à reprendre les baux de l'agent
+        fd = os.open(self.token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'name': self.name, 'agent_id': self.agent_id, 'token': self._token}, f)
+
+    def register(self):
+        """
+        Inscription auprès de l'API (nouveau jeton)
+
+        Le jeton courant, s'il existe, accompagne la demande: l'API ne rend
+        un nom déjà inscrit qu'à l'agent qui le détient.
+
+        Raises:
+            AgentError: Secret d'inscription refusé (403) ou nom déjà pris (409)
+        """
+        headers = {'X-Enrollment-Token': self.enrollment_token or ''}
+        if self._token:
+            headers.update(self._headers())
+        response = self._lease_session.post(f"{self.api_url}/agents/register", headers=headers,
+                                            timeout=TIMEOUT, json={
+            'name': self.name,
+            'hostname': socket.gethostname(),
+            'locations': self.locations,
+            'capacity': self.capacity,
+            'credentials': self.host_metrics
+        })
+        if response.status_code in (403, 409):
+            try:
+                error = response.json().get('error')
+            except ValueError:
+                error = response.reason
+            raise AgentError(f"Inscription de {self.name} refusée ({response.status_code}): {error}")
+        response.raise_for_status()
+        data = response.json()
+        with self._lock:
+            self.agent_id = data['agent_id']
+            self._token = data['token']
+            self.renew_seconds = data['renew_seconds']
+        self._save_token()
+        print(f"[+] Agent {self.name} inscrit (id {self.agent_id}, bail de {data['lease_seconds']} s)")
+        return data
+
+    def renew(self):
+        """
+        Renouvelle les baux et met à jour la liste des équipements à sonder
+
+        Un agent inconnu ou un jeton refusé entraîne une réinscription; si
+        le nom a été repris entre-temps, elle échoue (AgentError).
+
+        Returns:
+            dict: Réponse de l'API (devices, acquired, released)
+        """
+        if self.agent_id is None:
+            self.register()
+        response = self._lease_session.post(f"{self.api_url}/agents/{self.agent_id}/lease",
+                                            headers=self._headers(), timeout=TIMEOUT)
+        if response.status_code in (401, 404):
+            print(f"[!] Agent {self.name} inconnu de l'API, réinscription")
+            self.register()
+            response = self._lease_session.post(f"{self.api_url}/agents/{self.agent_id}/lease",
+                                                headers=self._headers(), timeout=TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        with self._lock:
+            self.devices = data['devices']
+            self.renew_seconds = data['renew_seconds']
+        self.stats['renewals'] += 1
+        if data['acquired'] or data['released']:
+            print(f"[*] Agent {self.name}: {len(data['devices'])} équipement(s) "
+                  f"(+{data['acquired']} / -{data['released']})")
+        return data
+
+    def _renew_loop(self):
+        while not self._stop.wait(self.renew_seconds):
+            try:
+                self.renew()
+            except AgentError as e:
+                # Nouvel essai inutile: secret ou nom refusé jusqu'à intervention de l'administrateur
+                self.stats['failures'] += 1
+                print(f"[!] {e}")
+                self._stop.set()
+            except (requests.RequestException, ValueError) as e:
+                # Baux conservés côté API jusqu'à leur expiration: nouvel essai au prochain tour
+                self.stats['failures'] += 1
+                print(f"[!] Renouvellement impossible: {e}")
+
+    def poll_once(self, executor):
+        """Sonde les équipements baillés et ajoute les mesures au tampon"""
+        with self._lock:
+            devices = list(self.devices)
+        futures = [(device, executor.submit(batch.monitor_device, device, count=self.count,
+                                            timeout=self.timeout, host_metrics=self.host_metrics))
+                   for device in devices]
+        for device, future in futures:
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {'success': False, 'error': str(e)}
+            self.buffer.append(sample_from_record(device, record))
+        self.stats['polls'] += 1
+        self.stats['samples'] += len(devices)
+        return len(devices)
+
+    def flush(self):
+        """
+        Envoie le tampon par lots compressés
+
+        Returns:
+            bool: True si le tampon a été vidé
+        """
+        while self.buffer:
+            samples = [self.buffer[i] for i in range(min(BATCH_SIZE, len(self.buffer)))]
+            body = encode_samples(samples)
+            try:
+                response = self._session.post(
+                    f"{self.api_url}/agents/{self.agent_id}/samples", data=body, timeout=TIMEOUT,
+                    headers={**self._headers(), 'Content-Type': 'application/json', 'Content-Encoding': 'gzip'})
+                response.raise_for_status()
+                result = response.json()
+            except (requests.RequestException, ValueError) as e:
+                self.stats['failures'] += 1
+                print(f"[!] Envoi impossible, {len(self.buffer)} mesure(s) en attente: {e}")
+                return False
+            for _ in samples:
+                self.buffer.popleft()
+            self.stats['uploads'] += 1
+            self.stats['accepted'] += result['accepted']
+            self.stats['rejected'] += result['rejected']
+            self.stats['raw_bytes'] += len(json.dumps({'samples': samples}, separators=(',', ':')))
+            self.stats['sent_bytes'] += len(body)
+        return True
+
+    def run(self, interval=10, iterations=0):
+        """
+        Boucle de collecte: un sondage toutes les interval secondes
+        (iterations fois, 0 = infini), Ctrl+C pour arrêter
+
+        À l'arrêt, les mesures en attente sont envoyées et les baux rendus.
+        """
+        self.renew()
+        self._renewer = threading.Thread(target=self._renew_loop, name='lease-renewer', daemon=True)
+        self._renewer.start()
+        iteration = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                while not iterations or iteration < iterations:
+                    iteration += 1
+                    started = time.monotonic()
+                    self.poll_once(executor)
+                    self.flush()
+                    if iterations and iteration >= iterations:
+                        break
+                    if self._stop.wait(max(0.0, started + interval - time.monotonic())):
+                        break
+        except KeyboardInterrupt:
+            print("\n[*] Arrêt de l'agent")
+        finally:
+            self.close()
+
+    def deregister(self):
+        """Rend les baux de l'agent (arrêt propre)"""
+        if self.agent_id is None:
+            return
+        try:
+            self._session.delete(f"{self.api_url}/agents/{self.agent_id}",
+                                 headers=self._headers(), timeout=TIMEOUT).raise_for_status()
+            print(f"[+] Agent {self.name} désinscrit")
+        except requests.RequestException as e:
+            print(f"[!] Désinscription impossible (baux libérés à expiration): {e}")
+
+    def close(self):
+        self._stop.set()
+        if self._renewer is not None:
+            self._renewer.join(timeout=TIMEOUT)
+        if self.buffer:
+            self.flush()
+        self.deregister()
+        self._session.close()
+        self._lease_session.close()
+        print(f"[*] {json.dumps(self.stats)}", file=sys.stderr)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Module d'alertes sur seuils
+Évalue chaque échantillon de monitoring (latence, perte de paquets, CPU,
+mémoire) au fil de l'eau contre la section thresholds de devices.yaml:
+
+- hystérésis: une alerte ne retombe que sous le seuil moins une marge
+  (hysteresis, fraction du seuil), pas au premier échantillon sous le seuil;
+- durées minimales: un niveau doit tenir min_duration secondes avant d'être
+  levé et clear_duration secondes avant d'être abaissé;
+- déduplication: seuls les changements de niveau (levée, aggravation,
+  atténuation, fin) produisent un événement.
+
+L'état de chaque couple équipement/métrique tient dans des tableaux plats
+(array/bytearray: niveau, niveau en attente, début d'attente, début de
+l'alerte, pic): un échantillon coûte un accès dict et quelques comparaisons
+par métrique, quel que soit l'historique.
+
+    engine = AlertEngine(AlertRules.from_config(config.get('thresholds', {})))
+    for event in engine.process('server-1', {'latency': 120.0, 'cpu_usage': 40}, time.time()):
+        ...
+"""
+
+from array import array
+from datetime import datetime
+
+# Métriques évaluées: (nom, clé de l'échantillon)
+METRICS = (
+    ('latency', 'latency'),
+    ('packet_loss', 'packet_loss'),
+    ('cpu', 'cpu_usage'),
+    ('memory', 'memory_usage'),
+)
+OK, WARNING, CRITICAL = 0, 1, 2
+LEVELS = ('ok', 'warning', 'critical')
+HYSTERESIS = 0.1
+
+_METRIC_INDEX = {name: i for i, (name, _) in enumerate(METRICS)}
+_NEVER = float('inf')
+
+
+def load_thresholds(config_file='config/devices.yaml'):
+    """
+    Section thresholds de la configuration
+
+    Returns:
+        dict: Seuils (vide si le fichier est absent ou illisible)
+    """
+    try:
+        from .inventory import load_section
+        return load_section(config_file, 'thresholds')
+    except (OSError, ImportError) as e:
+        print(f"[!] Seuils d'alerte indisponibles ({e}), alertes désactivées")
+        return {}
+
+
+def monitoring_sample(record):
+    """Résultat de ping_monitor (avec host_metrics éventuel) -> échantillon pour AlertEngine"""
+    host = record.get('host_metrics') or {}
+    return {
+        'latency': record.get('avg_rtt'),
+        'packet_loss': record.get('packet_loss', 0.0 if record.get('success') else 100.0),
+        'cpu_usage': host.get('cpu_usage'),
+        'memory_usage': host.get('memory_usage'),
+    }
+
+
+class AlertRules:
+    """
+    Seuils par métrique, avec hystérésis et durées minimales
+
+    Clés lues (section thresholds): <métrique>_warning, <métrique>_critical
+    pour latency, packet_loss, cpu et memory; hysteresis (fraction du seuil,
+    défaut 0.1), min_duration et clear_duration (secondes, défaut 0), ainsi
+    que <métrique>_min_duration / <métrique>_clear_duration par métrique.
+    Une métrique sans seuil n'est pas évaluée.
+    """
+    def __init__(self, thresholds, hysteresis=HYSTERESIS, min_duration=0.0, clear_duration=0.0):
+        self.hysteresis = float(thresholds.get('hysteresis', hysteresis))
+        self.min_duration = float(thresholds.get('min_duration', min_duration))
+        self.clear_duration = float(thresholds.get('clear_duration', clear_duration))
+        self.rules = []
+        for i, (name, key) in enumerate(METRICS):
+            warning = thresholds.get(f'{name}_warning')
+            critical = thresholds.get(f'{name}_critical')
+            if warning is None and critical is None:
+                continue
+            warning = float(warning if warning is not None else critical)
+            critical = float(critical if critical is not None else _NEVER)
+            self.rules.append((
+                i, key, warning, critical,
+                # Seuils de retour par niveau courant: (ok, warning, critical)
+                (0.0, warning * (1 - self.hysteresis), critical * (1 - self.hysteresis)),
+                float(thresholds.get(f'{name}_min_duration', self.min_duration)),
+                float(thresholds.get(f'{name}_clear_duration', self.clear_duration)),
+            ))
+
+    @classmethod
+    def from_config(cls, thresholds, **kwargs):
+        return cls(thresholds or {}, **kwargs)
+
+    def threshold(self, metric, level):
+        """Seuil du niveau (warning/critical) d'une métrique, None si non configuré"""
+        for i, _, warning, critical, _, _, _ in self.rules:
+            if METRICS[i][0] == metric:
+                value = warning if level == WARNING else critical
+                return None if value == _NEVER else value
+        return None
+
+    def to_dict(self):
+        return {
+            'hysteresis': self.hysteresis,
+            'metrics': {
+                METRICS[i][0]: {
+                    'warning': warning,
+                    'critical': None if critical == _NEVER else critical,
+                    'warning_clear': round(clear[WARNING], 3),
+                    'critical_clear': None if critical == _NEVER else round(clear[CRITICAL], 3),
+                    'min_duration': raise_for,
+                    'clear_duration': clear_for,
+                }
+                for i, _, warning, critical, clear, raise_for, clear_for in self.rules
+            }
+        }
+
+
+class AlertEngine:
+    """
+    Évaluation en flux des échantillons contre AlertRules
+
+    Les instants sont des secondes (time.time() ou équivalent), croissants
+    par équipement. Les événements retournés sont des dicts: device, metric,
+    level, previous, value, threshold, peak, started, timestamp.
+    """
+    def __init__(self, rules):
+        self.rules = rules
+        self._slots = {}
+        self._devices = []
+        # Une case par couple équipement/métrique (index = slot * len(METRICS) + métrique)
+        self._level = bytearray()
+        self._pending = bytearray()
+        self._since = array('d')
+        self._started = array('d')
+        self._peak = array('d')
+
+    def __len__(self):
+        return len(self._devices)
+
+    def has(self, device):
+        return device in self._slots
+
+    def _slot(self, device):
+        base = self._slots.get(device)
+        if base is None:
+            base = self._slots[device] = len(self._devices) * len(METRICS)
+            self._devices.append(device)
+            width = len(METRICS)
+            self._level.extend(bytes(width))
+            self._pending.extend(bytes(width))
+            self._since.extend([0.0] * width)
+            self._started.extend([0.0] * width)
+            self._peak.extend([0.0] * width)
+        return base
+
+    def restore(self, device, metric, level, started, peak=0.0):
+        """Réinstalle une alerte en cours (reprise après redémarrage, depuis la base)"""
+        if isinstance(level, str):
+            level = LEVELS.index(level)
+        i = self._slot(device) + _METRIC_INDEX[metric]
+        self._level[i] = self._pending[i] = level
+        self._started[i] = self._since[i] = started
+        self._peak[i] = peak or 0.0
+
+    def active(self, device):
+        """Alertes en cours d'un équipement: {métrique: niveau}"""
+        base = self._slots.get(device)
+        if base is None:
+            return {}
+        return {
+            name: LEVELS[self._level[base + i]]
+            for i, (name, _) in enumerate(METRICS) if self._level[base + i]
+        }
+
+    def process(self, device, sample, timestamp):
+        """
+        Évalue un échantillon
+
+        Args:
+            device: Identifiant de l'équipement (nom ou id)
+            sample: dict latency / packet_loss / cpu_usage / memory_usage (None ignorés)
+            timestamp: Instant de l'échantillon (s)
+
+        Returns:
+            list: Événements (vide si aucun changement de niveau)
+        """
+        base = self._slots.get(device)
+        if base is None:
+            base = self._slot(device)
+        level, pending, since, peak = self._level, self._pending, self._since, self._peak
+        events = None
+        for metric, key, warning, critical, clear, raise_for, clear_for in self.rules.rules:
+            value = sample.get(key)
+            if value is None:
+                continue
+            i = base + metric
+            current = level[i]
+            if current and value > peak[i]:
+                peak[i] = value
+            target = CRITICAL if value >= critical else WARNING if value >= warning else OK
+            # Hystérésis: sous le seuil mais au-dessus du seuil de retour, le niveau tient
+            if target < current and value >= clear[current]:
+                target = current
+            if target == current:
+                pending[i] = current
+                continue
+            waiting = pending[i]
+            if waiting == current or (waiting > current) != (target > current):
+                since[i] = timestamp
+            pending[i] = target
+            if timestamp - since[i] < (raise_for if target > current else clear_for):
+                continue
+            if events is None:
+                events = []
+            events.append(self._transition(device, i, metric, current, target, value, timestamp))
+        return events or []
+
+    def _transition(self, device, i, metric, previous, level, value, timestamp):
+        """Applique un changement de niveau et construit l'événement"""
+        if previous == OK:
+            self._started[i] = timestamp
+            self._peak[i] = value
+        elif value > self._peak[i]:
+            self._peak[i] = value
+        self._level[i] = self._pending[i] = level
+        name = METRICS[metric][0]
+        return {
+            'device': device,
+            'metric': name,
+            'level': LEVELS[level],
+            'previous': LEVELS[previous],
+            'value': value,
+            'threshold': self.rules.threshold(name, level or previous),
+            'peak': self._peak[i],
+            'started': self._started[i],
+            'timestamp': timestamp,
+        }
+
+    def memory_bytes(self):
+        """Mémoire des tableaux d'état (octets)"""
+        return (len(self._level) + len(self._pending)
+                + (len(self._since) + len(self._started) + len(self._peak)) * self._since.itemsize)
+
+
+def format_event(event):
+    """Ligne lisible d'un événement d'alerte"""
+    when = datetime.fromtimestamp(event['timestamp']).strftime('%H:%M:%S')
+    if event['level'] == 'ok':
+        return (f"[{when}] {event['device']} {event['metric']}: retour à la normale "
+                f"({event['value']:.1f}, pic {event['peak']:.1f})")
+    return (f"[{when}] {event['device']} {event['metric']} {event['level'].upper()}: "
+            f"{event['value']:.1f} >= {event['threshold']}")
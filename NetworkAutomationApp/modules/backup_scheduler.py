@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Module de planification des sauvegardes de la flotte
+Applique la section backup de devices.yaml (schedule, time, retention_days,
+directory):
+
+- exécution à l'heure configurée (daily, weekly, monthly);
+- départs étalés sur une fenêtre (window_minutes), les sites alternés pour
+  que les premiers départs ne tombent pas tous sur le même lien;
+- au plus per_location sauvegardes simultanées par location (et workers au
+  total): un équipement dont le site est saturé attend, ceux des autres
+  sites passent devant;
+- purge de rétention: fichiers de sauvegarde plus vieux que retention_days et
+  lignes de la table backups, supprimées par lots (une transaction courte
+  par lot);
+- récapitulatif de chaque exécution (durées par site, attentes, purge),
+  ajouté à <directory>/backup_runs.ndjson.
+"""
+
+import calendar
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SCHEDULES = ('daily', 'weekly', 'monthly')
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+WINDOW_MINUTES = 60
+PER_LOCATION = 2
+PRUNE_BATCH = 500
+PRUNE_PAUSE = 0.005
+RUNS_FILE = 'backup_runs.ndjson'
+
+
+def next_run(schedule, at, now, weekday='monday', day=1):
+    """
+    Prochaine exécution strictement après now
+
+    Args:
+        schedule: daily, weekly ou monthly
+        at: Heure "HH:MM" (heure locale)
+        now: datetime de référence
+        weekday: Jour de la semaine (weekly)
+        day: Jour du mois (monthly, ramené au dernier jour des mois courts)
+
+    Returns:
+        datetime: Instant de la prochaine exécution
+    """
+    if schedule not in SCHEDULES:
+        raise ValueError(f"backup.schedule inconnu: {schedule!r} ({', '.join(SCHEDULES)})")
+    hour, minute = (int(part) for part in str(at).split(':'))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+    if schedule == 'daily':
+        return candidate if candidate > now else candidate + timedelta(days=1)
+
+    if schedule == 'weekly':
+        target = WEEKDAYS.index(str(weekday).lower()) if not isinstance(weekday, int) else weekday
+        candidate += timedelta(days=(target - candidate.weekday()) % 7)
+        return candidate if candidate > now else candidate + timedelta(days=7)
+
+    year, month = candidate.year, candidate.month
+    while True:
+        last = calendar.monthrange(year, month)[1]
+        candidate = candidate.replace(year=year, month=month, day=min(int(day), last))
+        if candidate > now:
+            return candidate
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def location_of(device):
+    return device.get('location') or 'default'
+
+
+def stagger(devices, window):
+    """
+    Heure de départ de chaque équipement dans la fenêtre
+
+    Les locations sont alternées (tourniquet) puis les départs répartis
+    uniformément sur [0, window[ secondes.
+
+    Returns:
+        list: [(décalage en secondes, équipement)] par décalage croissant
+    """
+    by_location = defaultdict(deque)
+    for device in devices:
+        by_location[location_of(device)].append(device)
+    queues = list(by_location.values())
+    ordered = []
+    while queues:
+        for queue in queues:
+            ordered.append(queue.popleft())
+        queues = [queue for queue in queues if queue]
+    step = window / len(ordered) if ordered else 0
+    return [(i * step, device) for i, device in enumerate(ordered)]
+
+
+def prune_files(directory, cutoff, pattern='backup_*'):
+    """
+    Supprime les fichiers de sauvegarde modifiés avant cutoff (timestamp)
+
+    Returns:
+        tuple: (fichiers supprimés, octets libérés)
+    """
+    removed = freed = 0
+    path = Path(directory)
+    if not path.is_dir():
+        return 0, 0
+    for entry in os.scandir(path):
+        if not entry.is_file() or not Path(entry.name).match(pattern) or entry.name == RUNS_FILE:
+            continue
+        stat = entry.stat()
+        if stat.st_mtime < cutoff:
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += stat.st_size
+    return removed, freed
+
+
+def prune_rows(database_uri, cutoff, batch_size=PRUNE_BATCH, pause=PRUNE_PAUSE):
+    """
+    Supprime par lots les lignes de la table backups créées avant cutoff
+
+    Chaque lot est une transaction courte suivie d'une courte pause: l'API qui
+    écrit dans la même base obtient le verrou entre deux lots au lieu
+    d'attendre la fin de toute la purge.
+
+    Args:
+        database_uri: URI SQLAlchemy de la base de l'API
+        cutoff: datetime UTC (created_at est en UTC)
+        batch_size: Lignes par lot
+        pause: Secondes entre deux lots
+
+    Returns:
+        int: Lignes supprimées
+    """
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_uri)
+    statement = text(
+        "DELETE FROM backups WHERE id IN "
+        "(SELECT id FROM backups WHERE created_at < :cutoff LIMIT :batch)"
+    )
+    removed = 0
+    try:
+        while True:
+            with engine.begin() as connection:
+                count = connection.execute(statement, {
+                    'cutoff': cutoff.isoformat(sep=' '), 'batch': batch_size
+                }).rowcount
+            removed += count
+            if count < batch_size:
+                return removed
+            time.sleep(pause)
+    finally:
+        engine.dispose()
+
+
+def _percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {'p50': round(pick(0.5), 1), 'p95': round(pick(0.95), 1), 'max': round(ordered[-1], 1)}
+
+
+class BackupScheduler:
+    """
+    Exécutions planifiées des sauvegardes, étalées et bornées par site
+
+    Les enregistrements de chaque équipement et le récapitulatif passent par
+    emit (BatchRunner.emit pour la CLI NDJSON).
+    """
+    def __init__(self, action, backup_dir='backups', window=WINDOW_MINUTES * 60,
+                 per_location=PER_LOCATION, workers=10, retention_days=30,
+                 database_uri=None, emit=None, **action_kwargs):
+        self.action = action
+        self.backup_dir = backup_dir
+        self.window = max(0.0, float(window))
+        self.per_location = max(1, int(per_location))
+        self.workers = max(1, int(workers))
+        self.retention_days = retention_days
+        self.database_uri = database_uri
+        self.emit = emit or (lambda record: None)
+        self.action_kwargs = action_kwargs
+
+    @classmethod
+    def from_config(cls, backup, action, **overrides):
+        """Scheduler depuis la section backup (les surcharges None sont ignorées)"""
+        options = {
+            'backup_dir': backup.get('directory', 'backups'),
+            'window': float(backup.get('window_minutes', WINDOW_MINUTES)) * 60,
+            'per_location': backup.get('per_location', PER_LOCATION),
+            'retention_days': backup.get('retention_days', 30),
+        }
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(action, **options)
+
+    def run(self, devices):
+        """
+        Sauvegarde toute la sélection, purge la rétention et écrit le récapitulatif
+
+        Returns:
+            dict: Récapitulatif de l'exécution
+        """
+        from .batch import BatchRunner
+
+        plan = deque(stagger(devices, self.window))
+        ready = []
+        inflight = Counter()
+        peak = Counter()
+        records = []
+        condition = threading.Condition()
+        start = time.monotonic()
+
+        def finished(future, location):
+            with condition:
+                inflight[location] -= 1
+                inflight['*'] -= 1
+                records.append(future.result())
+                condition.notify()
+
+        def task(offset, device):
+            waited = time.monotonic() - start - offset
+            record = BatchRunner._run_one('backup', self.action, device, {
+                'backup_dir': self.backup_dir, **self.action_kwargs
+            })
+            record.update(location=location_of(device), scheduled_s=round(offset, 1),
+                          waited_ms=round(max(0.0, waited) * 1000, 1))
+            self.emit(record)
+            return record
+
+        with contextlib.redirect_stdout(sys.stderr), ThreadPoolExecutor(max_workers=self.workers) as executor:
+            with condition:
+                while plan or ready or inflight['*']:
+                    elapsed = time.monotonic() - start
+                    while plan and plan[0][0] <= elapsed:
+                        ready.append(plan.popleft())
+                    # Premier équipement prêt dont le site a une place libre
+                    for i, (offset, device) in enumerate(ready):
+                        location = location_of(device)
+                        if inflight[location] < self.per_location and inflight['*'] < self.workers:
+                            del ready[i]
+                            inflight[location] += 1
+                            inflight['*'] += 1
+                            peak[location] = max(peak[location], inflight[location])
+                            future = executor.submit(task, offset, device)
+                            future.add_done_callback(lambda f, loc=location: finished(f, loc))
+                            break
+                    else:
+                        # Attente du prochain départ prévu ou d'une sauvegarde terminée
+                        condition.wait(plan[0][0] - elapsed if plan else None)
+
+        summary = self._summary(records, peak, time.monotonic() - start)
+        pruning = time.monotonic()
+        summary.update(self.prune())
+        summary['prune_ms'] = round((time.monotonic() - pruning) * 1000, 1)
+        summary['timestamp'] = datetime.now().isoformat()
+        self.emit(summary)
+        self._append_run(summary)
+        return summary
+
+    def prune(self):
+        """Purge fichiers et lignes au-delà de retention_days"""
+        result = {'pruned_files': 0, 'pruned_bytes': 0, 'pruned_rows': 0}
+        if not self.retention_days:
+            return result
+        cutoff = time.time() - self.retention_days * 86400
+        result['pruned_files'], result['pruned_bytes'] = prune_files(self.backup_dir, cutoff)
+        # Cache de la récupération incrémentale: objets inutilisés depuis la rétention
+        objects, freed = prune_files(Path(self.backup_dir) / '.cache' / 'objects', cutoff, pattern='*')
+        result['pruned_files'] += objects
+        result['pruned_bytes'] += freed
+        if self.database_uri:
+            try:
+                result['pruned_rows'] = prune_rows(
+                    self.database_uri, datetime.utcnow() - timedelta(days=self.retention_days))
+            except Exception as e:
+                print(f"[!] Purge de la table backups impossible: {e}", file=sys.stderr)
+        return result
+
+    def _summary(self, records, peak, duration):
+        locations = defaultdict(list)
+        for record in records:
+            locations[record['location']].append(record)
+        summary = {
+            'type': 'summary',
+            'command': 'backup',
+            'devices': len(records),
+            'failed': sum(1 for record in records if 'error' in record),
+            'duration_ms': round(duration * 1000, 1),
+            'window_s': self.window,
+            'per_location': self.per_location,
+            'backup_ms': _percentiles([record['duration_ms'] for record in records]),
+            'waited_ms': _percentiles([record['waited_ms'] for record in records]),
+            'locations': {
+                location: {
+                    'devices': len(items),
+                    'failed': sum(1 for record in items if 'error' in record),
+                    'max_concurrency': peak[location],
+                    'backup_ms': _percentiles([record['duration_ms'] for record in items]),
+                }
+                for location, items in sorted(locations.items())
+            },
+        }
+        return summary
+
+    def _append_run(self, summary):
+        path = Path(self.backup_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        with open(path / RUNS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary, default=str, ensure_ascii=False) + "\n")
+
+    def serve(self, devices, schedule='daily', at='02:00', iterations=0, now=False, **when):
+        """
+        Boucle de planification: attend chaque échéance puis lance run()
+
+        Args:
+            devices: Équipements sauvegardés à chaque exécution
+            schedule, at, **when: Voir next_run (weekday, day)
+            iterations: Nombre d'exécutions, 0 = infini
+            now: Première exécution immédiate
+        """
+        runs = 0
+        try:
+            while not iterations or runs < iterations:
+                if not (now and runs == 0):
+                    due = next_run(schedule, at, datetime.now(), **when)
+                    print(f"[*] Prochaine sauvegarde: {due:%Y-%m-%d %H:%M}", file=sys.stderr)
+                    # Sommeil par tranches: un changement d'heure système est rattrapé
+                    while datetime.now() < due:
+                        time.sleep(min(60.0, max(0.0, (due - datetime.now()).total_seconds())))
+                self.run(devices)
+                runs += 1
+        except KeyboardInterrupt:
+            print("[*] Arrêt de la planification des sauvegardes", file=sys.stderr)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Module d'exécution en lot (non interactif)
+Découverte, collecte, monitoring et sauvegarde en parallèle sur une sélection
+d'équipements, avec un résultat JSON par ligne (NDJSON) émis dès qu'un
+équipement termine
+"""
+
+import contextlib
+import fnmatch
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from . import tracing
+from .discovery import NetworkDiscovery
+from .monitoring import NetworkMonitoring
+from .napalm_utils import NALPMUtils
+
+# Critères de sélection -> clé de l'équipement dans devices.yaml
+FILTER_KEYS = {
+    'name': 'name',
+    'host': 'host',
+    'location': 'location',
+    'role': 'role',
+    'device_type': 'device_type',
+}
+
+
+def filter_devices(devices, **patterns):
+    """
+    Sélectionne les équipements correspondant aux filtres
+
+    Chaque filtre est une liste de motifs glob (ex: "server-*"); un équipement
+    est retenu s'il correspond à au moins un motif de chaque filtre fourni.
+
+    Args:
+        devices: Liste des équipements
+        **patterns: name, host, location, role, device_type -> liste de motifs
+
+    Returns:
+        list: Équipements sélectionnés
+    """
+    selected = []
+    for device in devices:
+        keep = True
+        for criterion, values in patterns.items():
+            if not values:
+                continue
+            field = str(device.get(FILTER_KEYS[criterion], ''))
+            if not any(fnmatch.fnmatchcase(field, value) for value in values):
+                keep = False
+                break
+        if keep:
+            selected.append(device)
+    return selected
+
+
+def discover_device(device):
+    """Ping puis vérification du port SSH; met à jour device['status']"""
+    if NetworkDiscovery.ping_host(device['host']):
+        if NetworkDiscovery.check_ssh_port(device['host'], device.get('port', 22)):
+            device['status'] = 'online'
+        else:
+            device['status'] = 'ssh_unavailable'
+    else:
+        device['status'] = 'offline'
+    return {'status': device['status']}
+
+
+def collect_device(device, napalm=None):
+    """Découverte puis récupération des facts, interfaces et routes"""
+    record = discover_device(device)
+    if device['status'] != 'online':
+        return record
+
+    napalm = napalm or NALPMUtils()
+    record['facts'] = napalm.get_facts(device)
+    record['interfaces'] = napalm.get_interfaces(device)
+    record['routes'] = napalm.get_routes(device)
+    return record
+
+
+def backup_device(device, backup_dir="backups", napalm=None, incremental=False):
+    """
+    Récupère la configuration et l'écrit dans le répertoire de sauvegarde
+
+    En mode incrémental, seuls les fichiers dont l'empreinte a changé sont
+    transférés (cache dans <backup_dir>/.cache, voir modules/config_fetch.py).
+    """
+    napalm = napalm or NALPMUtils()
+    fetch = {}
+    if incremental:
+        from .config_fetch import ConfigFetcher
+        config, fetch = ConfigFetcher(Path(backup_dir) / '.cache', napalm=napalm).fetch(device)
+    else:
+        config = napalm.get_config(device)
+    if not config:
+        return {'status': 'failed', 'error': 'Configuration vide ou inaccessible'}
+
+    backup_path = Path(backup_dir)
+    backup_path.mkdir(exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = backup_path / f"backup_{device.get('name', device['host'])}_{timestamp}.txt"
+
+    with tracing.span('backup_write', size=len(config)), open(filename, 'w') as f:
+        f.write(f"Configuration de {device.get('name', device['host'])}\n")
+        f.write(f"Sauvegardée le: {datetime.now()}\n")
+        f.write("="*60 + "\n\n")
+        f.write(config)
+
+    return {'status': 'success', 'file': str(filename), 'size': len(config), **fetch}
+
+
+def monitor_device(device, count=4, timeout=2, collector=None, host_metrics=False):
+    """
+    Mesure de ping d'un équipement, plus les métriques /proc si un collecteur
+    est fourni (host_metrics: collecteur propre au processus, voir
+    sharding.worker_local)
+    """
+    if collector is None and host_metrics:
+        from .proc_collector import ProcCollector
+        from .sharding import worker_local
+        collector = worker_local('proc_collector', ProcCollector)
+    record = NetworkMonitoring.ping_monitor(device['host'], count=count, timeout=timeout)
+    if collector is not None and record['success']:
+        record['host_metrics'] = collector.sample(device)
+    return record
+
+
+def poll_interfaces(device, history=90):
+    """Sondage des interfaces par l'InterfacePoller du processus (connexions et historique gardés)"""
+    from .interface_poller import InterfacePoller
+    from .sharding import worker_local
+    return worker_local('interface_poller', lambda: InterfacePoller(history=history)).poll(device)
+
+
+class BatchRunner:
+    """
+    Exécute une action sur une sélection d'équipements en parallèle
+
+    Chaque résultat est écrit sur le flux de sortie en JSON (une ligne par
+    équipement) dès qu'il est disponible. Pendant l'exécution, les messages
+    des modules (print) sont redirigés vers stderr pour ne pas corrompre le
+    flux NDJSON.
+    """
+    def __init__(self, devices, workers=10, stream=None):
+        self.devices = devices
+        self.workers = max(1, workers)
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        """Écrit un enregistrement JSON sur une ligne et vide le tampon"""
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def run(self, command, action, **kwargs):
+        """
+        Exécute action(device, **kwargs) sur tous les équipements
+
+        Args:
+            command: Nom de la commande (champ 'type' des enregistrements)
+            action: Fonction appelée pour chaque équipement
+            **kwargs: Paramètres supplémentaires de l'action
+
+        Returns:
+            dict: {nom de l'équipement: enregistrement}
+        """
+        results = {}
+        failed = 0
+        start = time.perf_counter()
+
+        with contextlib.redirect_stdout(sys.stderr):
+            with tracing.span(command, devices=len(self.devices)), ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {
+                    executor.submit(self._run_one, command, action, device, kwargs): device
+                    for device in self.devices
+                }
+                for future in as_completed(futures):
+                    record = future.result()
+                    results[record['device']] = record
+                    if 'error' in record:
+                        failed += 1
+                    self.emit(record)
+
+        self.emit({
+            'type': 'summary',
+            'command': command,
+            'devices': len(self.devices),
+            'failed': failed,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+            'timestamp': datetime.now().isoformat()
+        })
+        return results
+
+    @staticmethod
+    def _run_one(command, action, device, kwargs):
+        """Exécute l'action sur un équipement et construit l'enregistrement"""
+        start = time.perf_counter()
+        record = {
+            'type': command,
+            'device': device.get('name', device['host']),
+            'host': device['host'],
+        }
+        try:
+            with tracing.device(record['device']), tracing.span(command, category='device'):
+                record.update(action(device, **kwargs))
+        except Exception as e:
+            record['error'] = str(e)
+        record['duration_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        record['timestamp'] = datetime.now().isoformat()
+        return record
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Module de récupération incrémentale des configurations
+Remplace, pour les sauvegardes, les `cat` successifs de
+NALPMUtils.get_config par:
+
+1. une seule commande qui liste les fichiers suivis (find, sans dépendre du
+   glob du shell pour /etc/netplan) avec leur sha256, plus le sha256 de la
+   sortie des commandes d'état (ip route, ip addr sans les durées de vie
+   DHCP, qui décroissent à chaque seconde);
+2. le téléchargement par SFTP (connexion SSH compressée) des seuls fichiers
+   dont l'empreinte n'est pas déjà dans le cache local; les sorties d'état
+   ne sont relues que si leur empreinte a changé.
+
+Le cache est adressé par contenu (<cache_dir>/objects/<sha256>): un fichier
+identique sur toute la flotte n'est téléchargé qu'une fois. Le mtime d'un
+objet est celui de sa dernière utilisation, ce qui permet de purger les
+objets inutilisés depuis retention_days. Sur une flotte inchangée, une
+sauvegarde ne transfère que la liste des empreintes (quelques centaines
+d'octets par équipement).
+
+    fetcher = ConfigFetcher('backups/.cache')
+    config, stats = fetcher.fetch(device)
+"""
+
+import hashlib
+import os
+import shlex
+import tempfile
+from pathlib import Path
+
+from . import metrics, tracing
+
+# Fichiers suivis, répertoires parcourus (motif des fichiers) et commandes d'état
+TRACKED_FILES = ('/etc/network/interfaces', '/etc/sysctl.conf')
+TRACKED_DIRS = (('/etc/netplan', '*.yaml'),)
+STATE_COMMANDS = ('ip route', 'ip addr')
+# Lignes retirées d'une sortie d'état avant l'empreinte et le stockage
+# (valid_lft/preferred_lft: décompte des baux DHCP, change à chaque exécution)
+STATE_FILTERS = {'ip addr': '_lft'}
+CACHE_DIR = 'backups/.cache'
+
+
+def state_command(command, quiet=False):
+    """Commande d'état exécutée, avec son filtre (STATE_FILTERS)"""
+    pipeline = f"{command} 2>/dev/null" if quiet else command
+    pattern = STATE_FILTERS.get(command)
+    return f"{pipeline} | grep -v {shlex.quote(pattern)}" if pattern else pipeline
+
+
+def manifest_command(files=TRACKED_FILES, dirs=TRACKED_DIRS, commands=STATE_COMMANDS):
+    """
+    Commande unique: empreintes des fichiers, empreintes des commandes
+
+    Sortie, une ligne par élément:
+        <sha256>  <chemin>
+        S <sha256> <commande>
+    """
+    names = ' -o '.join(
+        [f"-path {shlex.quote(path)}" for path in files]
+        + [f"-path {shlex.quote(f'{directory}/{pattern}')}" for directory, pattern in dirs]
+    )
+    roots = ' '.join(shlex.quote(path) for path in [*files, *(directory for directory, _ in dirs)])
+    find = f"find {roots} -maxdepth 1 -type f \\( {names} \\)"
+    parts = [f"{find} -exec sha256sum {{}} + 2>/dev/null"]
+    parts += [
+        f"echo \"S $({state_command(command, quiet=True)} | sha256sum | cut -d' ' -f1) {command}\""
+        for command in commands
+    ]
+    return '; '.join(parts)
+
+
+def parse_manifest(output):
+    """
+    Sortie de manifest_command -> ({chemin: sha256}, {commande: sha256})
+    """
+    files, commands = {}, {}
+    for line in output.splitlines():
+        if line.startswith('S '):
+            parts = line.split(' ', 2)
+            if len(parts) == 3:
+                commands[parts[2]] = parts[1]
+        elif len(line) > 66 and line[64:66] == '  ':
+            files[line[66:]] = line[:64]
+    return files, commands
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ConfigFetcher:
+    """
+    Récupération des configurations avec cache local adressé par contenu
+
+    Args:
+        cache_dir: Répertoire du cache (objects/<sha256>)
+        files, dirs, commands: Éléments suivis (voir manifest_command)
+        napalm: NALPMUtils pour la connexion SSH (compressée)
+    """
+    def __init__(self, cache_dir=CACHE_DIR, files=TRACKED_FILES, dirs=TRACKED_DIRS,
+                 commands=STATE_COMMANDS, napalm=None):
+        self.objects = Path(cache_dir) / 'objects'
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.dirs = dirs
+        self.order = [*files, *(directory for directory, _ in dirs)]
+        self.commands = commands
+        self.command = manifest_command(files, dirs, commands)
+        if napalm is None:
+            from .napalm_utils import NALPMUtils
+            napalm = NALPMUtils()
+        self.napalm = napalm
+
+    def _cached(self, digest):
+        """Contenu en cache; le mtime marque la dernière utilisation (purge de rétention)"""
+        path = self.objects / digest
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def _store(self, data):
+        """Écrit l'objet (écriture atomique: plusieurs équipements en parallèle)"""
+        digest = _sha256(data)
+        path = self.objects / digest
+        if not path.exists():
+            fd, tmp = tempfile.mkstemp(dir=self.objects)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest
+
+    @staticmethod
+    def _exec(client, command):
+        with tracing.span('command', command=command.split()[0]):
+            _, stdout, _ = client.exec_command(command)
+            return stdout.read()
+
+    def _download(self, client, sftp, path):
+        """Contenu d'un fichier distant par SFTP (cat si le serveur n'a pas de SFTP)"""
+        if sftp is not None:
+            with tracing.span('sftp_get', path=path), sftp.open(path, 'rb') as f:
+                f.prefetch()
+                return f.read()
+        return self._exec(client, f"cat {shlex.quote(path)}")
+
+    def _sort_key(self, path):
+        for i, root in enumerate(self.order):
+            if path == root or path.startswith(root + '/'):
+                return (i, path)
+        return (len(self.order), path)
+
+    def fetch(self, device):
+        """
+        Configuration d'un équipement, en ne transférant que ce qui a changé
+
+        Returns:
+            tuple: (configuration au format de NALPMUtils.get_config, statistiques)
+        """
+        stats = {'files': 0, 'fetched': 0, 'reused': 0, 'commands_rerun': 0, 'transferred_bytes': 0}
+        client = self.napalm.create_ssh_connection(device, compress=True)
+        if client is None:
+            raise ConnectionError(f"Connexion SSH impossible vers {device['host']}")
+        sftp = None
+        try:
+            manifest = self._exec(client, self.command)
+            stats['transferred_bytes'] += len(manifest)
+            files, commands = parse_manifest(manifest.decode('utf-8', 'replace'))
+
+            sections = []
+            for path in sorted(files, key=self._sort_key):
+                digest = files[path]
+                stats['files'] += 1
+                data = self._cached(digest)
+                if data is None:
+                    if sftp is None:
+                        try:
+                            sftp = client.open_sftp()
+                        except Exception:
+                            sftp = False
+                    data = self._download(client, sftp or None, path)
+                    stats['transferred_bytes'] += len(data)
+                    stats['fetched'] += 1
+                    if self._store(data) != digest:
+                        # Modifié entre l'empreinte et le téléchargement: copie gardée telle quelle
+                        metrics.inc('config_fetch_races_total')
+                else:
+                    stats['reused'] += 1
+                sections.append((path, data))
+
+            for command in self.commands:
+                digest = commands.get(command)
+                data = self._cached(digest) if digest else None
+                if data is None:
+                    data = self._exec(client, state_command(command))
+                    stats['transferred_bytes'] += len(data)
+                    stats['commands_rerun'] += 1
+                    self._store(data)
+                sections.append((command, data))
+        finally:
+            if sftp:
+                sftp.close()
+            client.close()
+
+        metrics.inc('config_fetch_files_total', stats['fetched'], result='fetched')
+        metrics.inc('config_fetch_files_total', stats['reused'], result='reused')
+        config = ''.join(
+            f"\n### {name} ###\n{data.decode('utf-8', 'replace')}\n"
+            for name, data in sections if data.strip()
+        )
+        return config, stats
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Module de construction des dashboards statiques
+Les styles et scripts communs sont regroupés dans un bundle unique
+(assets/dashboard.<empreinte>.css|js, mis en cache par le navigateur), les
+données de chaque dashboard sont écrites dans data/<dashboard>.json et les
+pages HTML ne sont que des coquilles qui chargent bundle et données.
+
+Un fichier d'état (.build_state.json) mémorise les empreintes des entrées:
+à chaque cycle de rafraîchissement, seuls les fichiers de données dont le
+contenu a changé sont réécrits, et les pages HTML ne sont régénérées que si
+le bundle ou leur gabarit change.
+"""
+
+import hashlib
+import html
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from string import Template
+
+# Version du format du fichier d'état (reconstruction complète si différente)
+STATE_VERSION = 1
+STATE_FILE = '.build_state.json'
+
+PLOTLY_CDN = "https://cdn.plot.ly/plotly-latest.min.js"
+
+# ===== BUNDLE COMMUN =====
+
+DASHBOARD_CSS = """\
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    min-height: 100vh;
+    padding: 20px;
+}
+.container { max-width: 1400px; margin: 0 auto; }
+.header {
+    background: white;
+    border-radius: 10px;
+    padding: 30px;
+    margin-bottom: 30px;
+    box-shadow: 0 10px 40px rgba(0,0,0,0.1);
+    text-align: center;
+}
+.header h1 { color: #667eea; font-size: 2.5em; margin-bottom: 10px; }
+.header p { color: #666; font-size: 1.1em; }
+.header .generated { font-size: 0.9em; color: #999; margin-top: 10px; }
+.refresh-info {
+    background: rgba(255,255,255,0.1);
+    color: white;
+    padding: 10px;
+    border-radius: 5px;
+    text-align: center;
+    margin-bottom: 20px;
+}
+.refresh-info.error { background: rgba(244,67,54,0.8); }
+.dashboard-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(600px, 1fr));
+    gap: 20px;
+    margin-bottom: 30px;
+}
+.dashboard-grid.single { grid-template-columns: 1fr; }
+.chart-container {
+    background: white;
+    border-radius: 10px;
+    padding: 20px;
+    box-shadow: 0 10px 40px rgba(0,0,0,0.1);
+    transition: transform 0.3s ease, box-shadow 0.3s ease;
+}
+.chart-container:hover {
+    transform: translateY(-5px);
+    box-shadow: 0 15px 50px rgba(0,0,0,0.2);
+}
+.chart-container h2 {
+    color: #667eea;
+    font-size: 1.3em;
+    margin-bottom: 15px;
+    border-bottom: 2px solid #667eea;
+    padding-bottom: 10px;
+}
+.chart { width: 100%; height: 400px; }
+.chart.tall { height: 500px; }
+.footer { text-align: center; color: white; padding: 20px; margin-top: 30px; }
+"""
+
+DASHBOARD_JS = """\
+/* Rendu des dashboards: chaque page charge data/<nom>.json et le trace */
+(function () {
+    'use strict';
+
+    const FONT = {family: 'Arial'};
+    const BAR_MARGIN = {l: 50, r: 50, t: 0, b: 50};
+    const PIE_MARGIN = {l: 0, r: 0, t: 0, b: 0};
+
+    function fmt(value, suffix) {
+        return value === null || value === undefined ? '' : value.toFixed(1) + suffix;
+    }
+
+    function plot(id, traces, layout) {
+        Plotly.react(id, traces, Object.assign({font: FONT}, layout), {responsive: true});
+    }
+
+    const renderers = {
+        network_dashboard: function (data) {
+            plot('chart1', [{
+                values: data.status_counts,
+                labels: ['En ligne', 'Hors ligne'],
+                type: 'pie',
+                marker: {colors: ['#4caf50', '#f44336']}
+            }], {margin: PIE_MARGIN});
+
+            plot('chart2', [{
+                x: data.devices,
+                y: data.availability,
+                type: 'bar',
+                marker: {color: data.availability.map(v => v > 99 ? '#4caf50' : v > 95 ? '#ff9800' : '#f44336')},
+                text: data.availability.map(v => fmt(v, '%')),
+                textposition: 'outside'
+            }], {yaxis: {title: 'Disponibilité (%)'}, xaxis: {title: 'Équipement'}, margin: BAR_MARGIN});
+
+            plot('chart3', [{
+                x: data.devices,
+                y: data.latencies,
+                type: 'bar',
+                marker: {color: '#2196f3'},
+                text: data.latencies.map(v => fmt(v, 'ms')),
+                textposition: 'outside'
+            }], {yaxis: {title: 'Latence (ms)'}, xaxis: {title: 'Équipement'}, margin: BAR_MARGIN});
+
+            plot('chart4', [{
+                x: data.devices,
+                y: data.loss_rates,
+                type: 'scatter',
+                mode: 'lines+markers',
+                marker: {size: 10, color: '#f44336'},
+                fill: 'tozeroy',
+                line: {width: 2}
+            }], {yaxis: {title: 'Perte (%)'}, xaxis: {title: 'Équipement'}, margin: BAR_MARGIN});
+
+            plot('chart5', [{
+                values: data.devices.map(name => data.interfaces[name] || 0),
+                labels: data.devices,
+                type: 'pie'
+            }], {margin: PIE_MARGIN});
+
+            plot('chart6', [{
+                x: data.history.x,
+                y: data.history.y,
+                type: 'scatter',
+                mode: 'lines',
+                fill: 'tozeroy',
+                line: {color: '#2196f3', width: 3}
+            }], {xaxis: {title: 'Temps (UTC)'}, yaxis: {title: 'Latence (ms)'}, margin: BAR_MARGIN});
+        },
+
+        availability_dashboard: function (data) {
+            const traces = Object.entries(data.availability_history).map(([device, points]) => ({
+                x: points.x,
+                y: points.y,
+                mode: 'lines',
+                name: device
+            }));
+            plot('chart1', traces, {
+                xaxis: {title: 'Temps (UTC)'},
+                yaxis: {title: 'Disponibilité (%)'},
+                hovermode: 'closest',
+                margin: BAR_MARGIN
+            });
+        },
+
+        interfaces_dashboard: function (data) {
+            plot('chart1', [{
+                labels: Object.keys(data.by_status),
+                values: Object.values(data.by_status),
+                type: 'pie',
+                marker: {colors: ['#4caf50', '#f44336']}
+            }], {margin: PIE_MARGIN});
+
+            plot('chart2', [{
+                x: data.devices,
+                y: data.counts,
+                type: 'bar',
+                marker: {color: '#2196f3'}
+            }], {xaxis: {title: 'Équipement'}, yaxis: {title: 'Nombre'}, margin: BAR_MARGIN});
+        },
+
+        latency_heatmap: function (data) {
+            const heatmap = data.heatmap;
+            document.getElementById('chart1').style.height = Math.max(500, 12 * heatmap.devices.length) + 'px';
+            plot('chart1', [{
+                z: heatmap.z,
+                x: heatmap.x,
+                y: heatmap.devices,
+                type: 'heatmap',
+                colorscale: 'RdYlGn_r',
+                colorbar: {title: 'Latence (ms)'}
+            }], {xaxis: {title: 'Temps (UTC)'}, yaxis: {title: 'Équipement'}, margin: {l: 120, r: 50, t: 0, b: 50}});
+        }
+    };
+
+    function setStatus(message, isError) {
+        const status = document.getElementById('status');
+        status.textContent = message;
+        status.classList.toggle('error', Boolean(isError));
+    }
+
+    function load() {
+        const name = document.body.dataset.dashboard;
+        // no-cache: revalidation conditionnelle, 304 si le fichier n'a pas changé
+        return fetch('data/' + name + '.json', {cache: 'no-cache'})
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.json();
+            })
+            .then(data => {
+                renderers[name](data);
+                setStatus('⚡ Données mises à jour le ' + data.generated + ' (actualisation automatique)');
+            })
+            .catch(error => {
+                setStatus('Données indisponibles (' + error.message + '). ' +
+                          'Servez le répertoire par HTTP: python3 generate_dashboards.py --serve', true);
+            });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        load();
+        const refresh = parseInt(document.body.dataset.refresh, 10);
+        if (refresh > 0) {
+            setInterval(load, refresh * 1000);
+        }
+    });
+})();
+"""
+
+# ===== COQUILLES HTML =====
+
+PAGE_SHELL = Template("""\
+<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>$title - Automatisation Réseau</title>
+    <link rel="stylesheet" href="assets/$css">
+    <script src="$plotly"></script>
+    <script src="assets/$js" defer></script>
+</head>
+<body data-dashboard="$name" data-refresh="$refresh">
+    <div class="container">
+        <div class="header">
+            <h1>$heading</h1>
+            <p>$subtitle</p>
+        </div>
+
+        <div id="status" class="refresh-info">Chargement des données...</div>
+
+        <div class="dashboard-grid$grid_class">
+$charts
+        </div>
+    </div>
+
+    <div class="footer">
+        <p>📊 Application d'Automatisation Réseau © 2025</p>
+        <p>Cours: Automatisation Réseau - TCO M1 2025 | Auteur: Tafita Ralijaona</p>
+    </div>
+</body>
+</html>
+""")
+
+CHART_BOX = Template("""\
+            <div class="chart-container">
+                <h2>$title</h2>
+                <div id="$id" class="chart$chart_class"></div>
+            </div>""")
+
+
+def _network_payload(data):
+    return {key: data[key] for key in
+            ('hours', 'devices', 'latencies', 'availability', 'loss_rates',
+             'status_counts', 'interfaces', 'history')}
+
+
+def _availability_payload(data):
+    return {'hours': data['hours'], 'availability_history': data['availability_history']}
+
+
+def _interfaces_payload(data):
+    statuses = data.get('device_status', {})
+    by_status = {'En ligne': 0, 'Hors ligne': 0}
+    for name, count in data['interfaces'].items():
+        key = 'En ligne' if statuses.get(name, 'online') == 'online' else 'Hors ligne'
+        by_status[key] += count
+    return {
+        'devices': data['devices'],
+        'counts': [data['interfaces'].get(name, 0) for name in data['devices']],
+        'by_status': by_status
+    }
+
+
+def _heatmap_payload(data):
+    return {'hours': data['hours'], 'heatmap': data['heatmap']}
+
+
+# Dashboard -> titre, en-tête, graphiques (id, titre, classe) et extraction des données
+DASHBOARDS = {
+    'network_dashboard': {
+        'title': 'Dashboard Principal',
+        'heading': '📊 Dashboard Principal',
+        'subtitle': "Application d'Automatisation Réseau - Monitoring en temps réel",
+        'charts': [
+            ('chart1', '🟢 État des Équipements', ''),
+            ('chart2', '📶 Disponibilité par Équipement', ''),
+            ('chart3', '⏱️ Latence Réseau (ms)', ''),
+            ('chart4', '📉 Taux de Perte de Paquets', ''),
+            ('chart5', '🌐 Interfaces Réseau', ''),
+            ('chart6', '📈 Historique Latence (${hours}h)', ''),
+        ],
+        'payload': _network_payload,
+    },
+    'availability_dashboard': {
+        'title': 'Disponibilité',
+        'heading': '📊 Historique de Disponibilité',
+        'subtitle': 'Suivi de la disponibilité des équipements réseau au cours du temps',
+        'charts': [
+            ('chart1', 'Disponibilité - Dernières ${hours}h (équipements les moins disponibles)', ' tall'),
+        ],
+        'payload': _availability_payload,
+    },
+    'interfaces_dashboard': {
+        'title': 'Interfaces Réseau',
+        'heading': '🌐 État des Interfaces Réseau',
+        'subtitle': 'Interfaces par équipement et par état des équipements',
+        'charts': [
+            ('chart1', 'État Global', ''),
+            ('chart2', 'Interfaces par Équipement', ''),
+        ],
+        'payload': _interfaces_payload,
+    },
+    'latency_heatmap': {
+        'title': 'Heatmap Latence',
+        'heading': '🔥 Heatmap de Latence - Dernières ${hours}h',
+        'subtitle': 'Latence par équipement (moyenne par intervalle)',
+        'charts': [
+            ('chart1', 'Latence par Équipement', ' tall'),
+        ],
+        'payload': _heatmap_payload,
+    },
+}
+
+
+def _digest(content):
+    """Empreinte SHA-256 d'un contenu texte"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _write_atomic(path, content):
+    """Écrit un fichier via un fichier temporaire puis os.replace"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class DashboardBuilder:
+    """
+    Construction incrémentale des dashboards statiques
+
+    Fichiers produits dans le répertoire des dashboards:
+        assets/dashboard.<empreinte>.css|js   bundle commun
+        data/<dashboard>.json                 données des graphiques
+        <dashboard>.html                      coquilles HTML
+        .build_state.json                     empreintes de la dernière construction
+    """
+    def __init__(self, directory="dashboards", refresh_interval=300):
+        self.directory = Path(directory)
+        self.refresh_interval = int(refresh_interval or 0)
+        self.state_path = self.directory / STATE_FILE
+        self.state = self._load_state()
+
+    def _load_state(self):
+        """Charge le fichier d'état (vide si absent, illisible ou d'une autre version)"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if state.get('version') != STATE_VERSION:
+            state = {'version': STATE_VERSION, 'source': None, 'bundle': None, 'pages': {}}
+        return state
+
+    def _save_state(self):
+        _write_atomic(self.state_path, json.dumps(self.state, indent=2))
+
+    def is_current(self, source_signature):
+        """
+        Indique si la dernière construction correspond déjà à ces entrées
+
+        Args:
+            source_signature: Signature des données sources (voir generate_dashboards)
+
+        Returns:
+            bool: True si rien n'a changé et que tous les fichiers existent
+        """
+        if source_signature is None or self.state.get('source') != source_signature:
+            return False
+        return all(
+            (self.directory / f"{name}.html").exists() and (self.directory / 'data' / f"{name}.json").exists()
+            for name in DASHBOARDS
+        )
+
+    def build(self, data, source_signature=None):
+        """
+        Construit les dashboards en ne réécrivant que ce qui a changé
+
+        Args:
+            data: Données chargées par load_dashboard_data()
+            source_signature: Signature des données sources, mémorisée dans l'état
+
+        Returns:
+            dict: {'bundle': bool, 'data': [dashboards], 'pages': [dashboards]}
+                  fichiers effectivement réécrits
+        """
+        (self.directory / 'assets').mkdir(parents=True, exist_ok=True)
+        (self.directory / 'data').mkdir(exist_ok=True)
+
+        changes = {'bundle': self._build_bundle(), 'data': [], 'pages': []}
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        for name, spec in DASHBOARDS.items():
+            page_state = self.state['pages'].setdefault(name, {})
+
+            # Données: réécrites seulement si leur contenu change, pour que le
+            # navigateur reçoive un 304 tant que le fichier est identique
+            payload = spec['payload'](data)
+            data_hash = _digest(json.dumps(payload, sort_keys=True))
+            data_path = self.directory / 'data' / f"{name}.json"
+            if page_state.get('data') != data_hash or not data_path.exists():
+                payload['generated'] = generated
+                _write_atomic(data_path, json.dumps(payload, ensure_ascii=False, separators=(',', ':')))
+                page_state['data'] = data_hash
+                changes['data'].append(name)
+
+            # Coquille HTML: dépend du bundle, du gabarit et de la période
+            shell = self._render_shell(name, spec, data['hours'])
+            shell_hash = _digest(shell)
+            page_path = self.directory / f"{name}.html"
+            if page_state.get('shell') != shell_hash or not page_path.exists():
+                _write_atomic(page_path, shell)
+                page_state['shell'] = shell_hash
+                changes['pages'].append(name)
+
+        self.state['source'] = source_signature
+        self._save_state()
+        return changes
+
+    def _build_bundle(self):
+        """
+        Écrit le bundle CSS/JS nommé par son empreinte et supprime les anciens
+
+        Returns:
+            bool: True si le bundle a été (ré)écrit
+        """
+        bundle_hash = _digest(DASHBOARD_CSS + DASHBOARD_JS)[:12]
+        assets = self.directory / 'assets'
+        css_path = assets / f"dashboard.{bundle_hash}.css"
+        js_path = assets / f"dashboard.{bundle_hash}.js"
+
+        if self.state.get('bundle') == bundle_hash and css_path.exists() and js_path.exists():
+            return False
+
+        _write_atomic(css_path, DASHBOARD_CSS)
+        _write_atomic(js_path, DASHBOARD_JS)
+        for old in assets.glob('dashboard.*'):
+            if old.name not in (css_path.name, js_path.name):
+                old.unlink(missing_ok=True)
+
+        self.state['bundle'] = bundle_hash
+        return True
+
+    def _render_shell(self, name, spec, hours):
+        """Rend la coquille HTML d'un dashboard"""
+        charts = "\n\n".join(
+            CHART_BOX.substitute(
+                id=chart_id,
+                title=html.escape(Template(title).safe_substitute(hours=hours)),
+                chart_class=chart_class
+            )
+            for chart_id, title, chart_class in spec['charts']
+        )
+        return PAGE_SHELL.substitute(
+            title=html.escape(spec['title']),
+            heading=html.escape(Template(spec['heading']).safe_substitute(hours=hours)),
+            subtitle=html.escape(spec['subtitle']),
+            name=name,
+            refresh=self.refresh_interval,
+            css=f"dashboard.{self.state['bundle']}.css",
+            js=f"dashboard.{self.state['bundle']}.js",
+            plotly=PLOTLY_CDN,
+            grid_class=' single' if len(spec['charts']) == 1 else '',
+            charts=charts
+        )
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Module de données des dashboards
+Lit les séries MonitoringData stockées en base (SQLite de l'API) et les
+réduit à un nombre borné de points: agrégats par intervalle calculés en SQL
+en un seul parcours, puis sous-échantillonnage LTTB pour les courbes
+"""
+
+import math
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Emplacements possibles de la base (Flask >= 2.3 la place dans instance/)
+DEFAULT_DB_PATHS = ('instance/network_automation.db', 'network_automation.db')
+
+# Métriques agrégeables de la table monitoring_data
+METRICS = ('latency', 'packet_loss', 'cpu_usage', 'memory_usage', 'availability')
+
+
+def lttb(x, y, threshold):
+    """
+    Sous-échantillonnage Largest-Triangle-Three-Buckets
+
+    Conserve le premier et le dernier point, puis dans chaque intervalle le
+    point formant le plus grand triangle avec le point retenu précédemment et
+    la moyenne de l'intervalle suivant: la forme de la courbe (pics, creux)
+    est préservée avec `threshold` points.
+
+    Args:
+        x: Abscisses croissantes (ex: timestamps en secondes)
+        y: Ordonnées
+        threshold: Nombre de points à conserver
+
+    Returns:
+        tuple: (x, y) sous-échantillonnés (tableaux NumPy)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    sampled = np.empty(threshold, dtype=np.int64)
+    sampled[0] = 0
+    sampled[-1] = n - 1
+
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Moyenne de l'intervalle suivant
+        avg_start = int(math.floor((i + 1) * every)) + 1
+        avg_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_x = x[avg_start:avg_end].mean()
+        avg_y = y[avg_start:avg_end].mean()
+
+        # Point de l'intervalle courant maximisant l'aire du triangle
+        range_start = int(math.floor(i * every)) + 1
+        range_end = int(math.floor((i + 1) * every)) + 1
+        area = np.abs(
+            (x[a] - avg_x) * (y[range_start:range_end] - y[a])
+            - (x[a] - x[range_start:range_end]) * (avg_y - y[a])
+        )
+        a = range_start + int(np.argmax(area))
+        sampled[i + 1] = a
+
+    return x[sampled], y[sampled]
+
+
+def find_database(db_path=None):
+    """Retourne le chemin de la base de monitoring, ou None si introuvable"""
+    candidates = [db_path] if db_path else DEFAULT_DB_PATHS
+    for candidate in candidates:
+        if candidate and Path(candidate).exists():
+            return str(candidate)
+    return None
+
+
+class MonitoringRollup:
+    """
+    Agrégats équipements x intervalles de temps, chargés en une seule requête
+
+    Pour chaque métrique: sommes et nombres de mesures par (équipement,
+    intervalle). Toutes les vues des dashboards (moyennes par équipement,
+    heatmap, courbes) en sont dérivées avec NumPy, sans relire la base.
+    """
+    def __init__(self, devices, bucket_starts, bucket_seconds, sums, counts):
+        self.devices = devices
+        self.bucket_starts = bucket_starts
+        self.bucket_seconds = bucket_seconds
+        self.sums = sums
+        self.counts = counts
+        self._index = {name: i for i, name in enumerate(devices)}
+
+    def means(self, metric):
+        """Matrice des moyennes par intervalle (NaN si aucune mesure)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sums[metric] / self.counts[metric]
+
+    def device_means(self, metric):
+        """Moyenne de la période par équipement (NaN si aucune mesure)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sums[metric].sum(axis=1) / self.counts[metric].sum(axis=1)
+
+    def samples(self):
+        """Nombre de mesures par équipement"""
+        return self.counts['latency'].sum(axis=1)
+
+    def heatmap(self, metric='latency', max_buckets=200):
+        """
+        Matrice équipements x intervalles regroupés en au plus max_buckets colonnes
+
+        Returns:
+            tuple: (équipements, début des intervalles en epoch s, matrice NaN-able)
+        """
+        n_columns = self.sums[metric].shape[1]
+        factor = max(1, int(math.ceil(n_columns / max_buckets)))
+        padding = (-n_columns) % factor
+
+        def regroup(matrix):
+            padded = np.pad(matrix, ((0, 0), (0, padding)))
+            return padded.reshape(matrix.shape[0], -1, factor).sum(axis=2)
+
+        sums, counts = regroup(self.sums[metric]), regroup(self.counts[metric])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matrix = sums / counts
+        return self.devices, self.bucket_starts[::factor], matrix
+
+    def fleet_series(self, metric='latency', max_points=500):
+        """
+        Moyenne de la flotte au cours du temps, réduite par LTTB
+
+        Returns:
+            tuple: (timestamps epoch s, valeurs) avec au plus max_points points
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = self.sums[metric].sum(axis=0) / self.counts[metric].sum(axis=0)
+        return lttb(self.bucket_starts, values, max_points)
+
+    def device_series(self, hostnames, metric='availability', max_points=200):
+        """
+        Séries par équipement, chacune réduite par LTTB
+
+        Returns:
+            dict: hostname -> (timestamps epoch s, valeurs)
+        """
+        means = self.means(metric)
+        return {
+            hostname: lttb(self.bucket_starts, means[self._index[hostname]], max_points)
+            for hostname in hostnames if hostname in self._index
+        }
+
+
+class MonitoringDataSource:
+    """
+    Accès en lecture seule aux mesures MonitoringData pour les dashboards
+
+    L'agrégation par équipement et par intervalle est faite par SQLite en un
+    seul parcours de la période: le volume transféré vers Python est borné par
+    le nombre d'intervalles, pas par le nombre de mesures.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def _connect(self):
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    @staticmethod
+    def _since(hours):
+        """Borne basse au format stocké par SQLAlchemy (UTC)"""
+        return (datetime.utcnow() - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S')
+
+    def devices(self):
+        """
+        Équipements connus de l'API
+
+        Returns:
+            dict: hostname -> {'ip', 'status'}
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT hostname, ip, status FROM devices ORDER BY hostname").fetchall()
+        return {hostname: {'ip': ip, 'status': status} for hostname, ip, status in rows}
+
+    def interfaces_count(self):
+        """Nombre d'interfaces par équipement (hostname -> int)"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT hostname, interfaces_count FROM devices").fetchall()
+        return {hostname: count or 0 for hostname, count in rows}
+    
+    def load_rollup(self, hours=24, max_columns=1000):
+        """
+        Charge les agrégats de la période en une requête
+
+        Args:
+            hours: Période en heures
+            max_columns: Nombre maximal d'intervalles (largeur >= 60 s)
+
+        Returns:
+            MonitoringRollup
+        """
+        bucket_seconds = max(60, int(math.ceil(hours * 3600 / max_columns)))
+        now = time.time()
+        first_bucket = int((now - hours * 3600) // bucket_seconds)
+        n_buckets = int(now // bucket_seconds) - first_bucket + 1
+
+        aggregates = ", ".join(
+            f"COALESCE(SUM({metric}), 0), COUNT({metric})" for metric in METRICS
+        )
+        query = f"""
+            SELECT device_id,
+                   CAST(strftime('%s', timestamp) AS INTEGER) / ? AS bucket,
+                   {aggregates}
+            FROM monitoring_data
+            WHERE timestamp >= ?
+            GROUP BY device_id, bucket
+        """
+        with closing(self._connect()) as conn:
+            names = dict(conn.execute("SELECT id, hostname FROM devices").fetchall())
+            rows = conn.execute(query, (bucket_seconds, self._since(hours))).fetchall()
+
+        data = np.array(rows, dtype=float).reshape(len(rows), 2 + 2 * len(METRICS))
+        columns = data[:, 1].astype(np.int64) - first_bucket
+        data = data[(columns >= 0) & (columns < n_buckets)]
+        columns = columns[(columns >= 0) & (columns < n_buckets)]
+
+        device_ids, lines = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+        devices = [names.get(int(device_id), str(device_id)) for device_id in device_ids]
+        shape = (len(devices), n_buckets)
+        sums, counts = {}, {}
+        for position, metric in enumerate(METRICS):
+            sums[metric] = np.zeros(shape)
+            counts[metric] = np.zeros(shape)
+            sums[metric][lines, columns] = data[:, 2 + 2 * position]
+            counts[metric][lines, columns] = data[:, 3 + 2 * position]
+
+        bucket_starts = (np.arange(n_buckets) + first_bucket) * bucket_seconds
+        return MonitoringRollup(devices, bucket_starts, bucket_seconds, sums, counts)
+
+
+def to_datetimes(timestamps):
+    """Convertit des epoch (s, UTC) en chaînes ISO pour Plotly"""
+    return [datetime.utcfromtimestamp(float(ts)).isoformat() for ts in timestamps]
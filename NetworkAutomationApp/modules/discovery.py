@@ -9,6 +9,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+from . import tracing
+
 class NetworkDiscovery:
     def __init__(self):
         pass
@@ -31,7 +33,8 @@ class NetworkDiscovery:
             command = ["ping", param, "1", "-W" if sys.platform != "win32" else "-w", 
                       str(timeout*1000), host]
             
-            result = subprocess.run(command, capture_output=True, timeout=timeout+1)
+            with tracing.span('ping', host=host):
+                result = subprocess.run(command, capture_output=True, timeout=timeout+1)
             return result.returncode == 0
         except Exception as e:
             print(f"Erreur lors du ping: {e}")
@@ -51,10 +54,11 @@ class NetworkDiscovery:
             bool: True si le port est ouvert, False sinon
         """
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            result = sock.connect_ex((host, port))
-            sock.close()
+            with tracing.span('ssh_port_check', host=host, port=port):
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.settimeout(timeout)
+                result = sock.connect_ex((host, port))
+                sock.close()
             return result == 0
         except Exception as e:
             print(f"Erreur lors de la vérification SSH: {e}")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Module de sondage des compteurs d'interfaces
+Une commande SSH par équipement et par sondage (ip -j -s link, plus
+/proc/uptime et les vitesses de lien de /sys/class/net), sur une connexion
+persistante (SSHConnectionPool). Les compteurs de chaque interface sont
+gardés dans un tampon circulaire NumPy par équipement, d'où sont calculés
+débits (bit/s, paquets/s), taux d'erreurs et de pertes et utilisation par
+rapport à la vitesse du lien.
+
+Empreinte: 8 compteurs uint64 par interface et par sondage, soit 64 octets;
+90 sondages (15 minutes à 10 s) x 6 interfaces x 300 équipements ~ 10 Mo.
+
+    poller = InterfacePoller()
+    poller.poll(device)                  # 1er sondage: états; débits ensuite
+    poller.rates(device['name'], 'eth0') # historique des débits
+    poller.close()
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from .proc_collector import UPTIME_RE
+from .ssh_pool import SSHConnectionPool
+
+COMMAND = "ip -j -s link; cat /proc/uptime; grep -sH . /sys/class/net/*/speed"
+HISTORY = 90
+WORKERS = 32
+
+# Compteurs gardés (ordre des colonnes) et débits correspondants
+COUNTERS = ('rx_bytes', 'tx_bytes', 'rx_packets', 'tx_packets',
+            'rx_errors', 'tx_errors', 'rx_dropped', 'tx_dropped')
+RATES = ('rx_bps', 'tx_bps', 'rx_pps', 'tx_pps',
+         'rx_errors_per_s', 'tx_errors_per_s', 'rx_dropped_per_s', 'tx_dropped_per_s')
+# bits par unité de compteur: octets -> bits pour les deux premières colonnes
+SCALE = np.array([8, 8, 1, 1, 1, 1, 1, 1], dtype=np.float64)
+
+WRAP32 = np.uint64(2**32)
+HALF32 = np.uint64(2**31)
+SPEED_PREFIX = '/sys/class/net/'
+
+
+def parse_link_stats(output):
+    """
+    Instantané des interfaces d'après la sortie de COMMAND
+
+    Returns:
+        dict: uptime (s, None si absent), links [(nom, état, mtu, compteurs)],
+        speeds {interface: Mbit/s}
+    """
+    snapshot = {'uptime': None, 'links': [], 'speeds': {}}
+    for line in output.splitlines():
+        if line.startswith('['):
+            for link in json.loads(line):
+                stats = link.get('stats64') or link.get('stats') or {}
+                rx, tx = stats.get('rx', {}), stats.get('tx', {})
+                snapshot['links'].append((
+                    link['ifname'], link.get('operstate', 'UNKNOWN'), link.get('mtu'),
+                    tuple((rx if name[0] == 'r' else tx).get(name[3:], 0) for name in COUNTERS)
+                ))
+        elif line.startswith(SPEED_PREFIX):
+            path, _, value = line.partition(':')
+            # Interfaces virtuelles ou sans porteuse: -1 ou illisible
+            if value.strip().lstrip('-').isdigit() and int(value) > 0:
+                snapshot['speeds'][path[len(SPEED_PREFIX):].split('/')[0]] = int(value)
+        elif snapshot['uptime'] is None:
+            match = UPTIME_RE.match(line)
+            if match:
+                snapshot['uptime'] = float(match.group(1))
+    return snapshot
+
+
+def counter_deltas(new, old):
+    """
+    Écarts entre deux lectures de compteurs (tableaux uint64)
+
+    Même règle que proc_collector.counter_delta: un compteur qui recule a
+    débordé sur 32 bits si l'ancienne valeur était dans la moitié haute
+    de 2**32, sinon il a été remis à zéro (écart = nouvelle valeur).
+    """
+    backwards = new < old
+    wrapped = backwards & (old >= HALF32) & (old < WRAP32)
+    return np.where(backwards, np.where(wrapped, new + (WRAP32 - old), new), new - old)
+
+
+def compute_rates(new, old, interval, speed_mbps):
+    """
+    Débits entre deux lectures, en bloc
+
+    Args:
+        new, old: Compteurs (..., interfaces, len(COUNTERS)), uint64
+        interval: Secondes entre les lectures (scalaire ou (..., 1))
+        speed_mbps: Vitesse des liens (interfaces,), 0 si inconnue
+
+    Returns:
+        tuple: (débits (..., interfaces, len(RATES)), utilisation rx/tx en %
+        (..., interfaces, 2), NaN sans vitesse connue)
+    """
+    interval = np.asarray(interval, dtype=np.float64)[..., None, None]
+    rates = counter_deltas(new, old).astype(np.float64) * SCALE / interval
+    capacity = np.where(speed_mbps > 0, speed_mbps * 1e6, np.nan)[:, None]
+    return rates, 100 * rates[..., :2] / capacity
+
+
+class InterfaceHistory:
+    """
+    Tampon circulaire des compteurs d'un équipement
+
+    counters[slot, interface, compteur] (uint64), present[slot, interface]
+    (interface vue à ce sondage), clock[slot] (uptime de l'équipement).
+    Les colonnes d'interfaces s'agrandissent quand une interface apparaît.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.names = []
+        self.index = {}
+        self.clock = np.full(size, np.nan)
+        self.counters = np.zeros((size, 0, len(COUNTERS)), dtype=np.uint64)
+        self.present = np.zeros((size, 0), dtype=bool)
+        self.speed = np.zeros(0)
+        self.state = {}
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def _grow(self, needed):
+        capacity = self.counters.shape[1]
+        if needed <= capacity:
+            return
+        extra = max(needed, 2 * capacity, 4) - capacity
+        self.counters = np.concatenate(
+            (self.counters, np.zeros((self.size, extra, len(COUNTERS)), dtype=np.uint64)), axis=1)
+        self.present = np.concatenate((self.present, np.zeros((self.size, extra), dtype=bool)), axis=1)
+        self.speed = np.concatenate((self.speed, np.zeros(extra)))
+
+    def append(self, clock, snapshot):
+        """Écrit un sondage dans le slot suivant"""
+        for name, _, _, _ in snapshot['links']:
+            if name not in self.index:
+                self.index[name] = len(self.names)
+                self.names.append(name)
+        self._grow(len(self.names))
+
+        slot = self.count % self.size
+        columns = [self.index[link[0]] for link in snapshot['links']]
+        self.clock[slot] = clock
+        self.present[slot] = False
+        self.present[slot, columns] = True
+        self.counters[slot, columns] = [link[3] for link in snapshot['links']]
+        for name, speed in snapshot['speeds'].items():
+            if name in self.index:
+                self.speed[self.index[name]] = speed
+        self.state = {link[0]: (link[1], link[2]) for link in snapshot['links']}
+        self.count += 1
+
+    @property
+    def nbytes(self):
+        return self.counters.nbytes + self.present.nbytes + self.clock.nbytes + self.speed.nbytes
+
+    def ordered(self):
+        """Slots du plus ancien au plus récent"""
+        return np.arange(max(0, self.count - self.size), self.count) % self.size
+
+
+class InterfacePoller:
+    """
+    Sondage des compteurs d'interfaces avec historique par équipement
+
+    Le premier sondage d'un équipement (ou le premier après un redémarrage,
+    uptime qui recule) ne donne que l'état des interfaces: les débits
+    demandent deux lectures. L'intervalle est mesuré par l'équipement
+    (/proc/uptime), à défaut par l'horloge locale.
+
+    Args:
+        history: Sondages gardés par équipement
+        workers: Équipements sondés en parallèle (poll_all)
+        pool: SSHConnectionPool partagé (créé si absent)
+    """
+    def __init__(self, history=HISTORY, workers=WORKERS, pool=None):
+        self.history_size = history
+        self.workers = workers
+        self.pool = pool or SSHConnectionPool()
+        self._histories = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def poll(self, device):
+        """
+        Sonde les interfaces d'un équipement
+
+        Returns:
+            dict: interval, interfaces {nom: état, mtu, vitesse, débits,
+            utilisation}, ou error
+        """
+        key = SSHConnectionPool.key(device)
+        try:
+            output = self.pool.run(device, COMMAND)
+            received = time.monotonic()
+            snapshot = parse_link_stats(output)
+            if not snapshot['links']:
+                raise ValueError("Sortie ip -j -s link vide ou illisible")
+            return self.update(key, snapshot, received)
+        except Exception as e:
+            return {
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def poll_all(self, devices):
+        """
+        Sonde tous les équipements en parallèle (connexions persistantes)
+
+        Returns:
+            dict: {nom de l'équipement: résultat de poll}
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        results = self._executor.map(self.poll, devices)
+        return {SSHConnectionPool.key(device): result for device, result in zip(devices, results)}
+
+    def _history(self, key):
+        with self._lock:
+            history = self._histories.get(key)
+            if history is None:
+                history = self._histories[key] = InterfaceHistory(self.history_size)
+            return history
+
+    def update(self, key, snapshot, received=None):
+        """Enregistre un instantané et calcule les débits depuis le précédent"""
+        clock = snapshot['uptime'] if snapshot['uptime'] is not None else (received or time.monotonic())
+        history = self._history(key)
+        with history.lock:
+            previous = (history.count - 1) % history.size if history.count else None
+            if previous is not None and clock < history.clock[previous]:
+                # Redémarrage (uptime qui recule): l'historique repart de zéro
+                history.count = 0
+                previous = None
+            history.append(clock, snapshot)
+            current = (history.count - 1) % history.size
+
+            result = {'interval': None, 'interfaces': {}, 'timestamp': datetime.now().isoformat()}
+            rates = utilization = None
+            interval = clock - history.clock[previous] if previous is not None else 0
+            if interval > 0:
+                result['interval'] = round(float(interval), 2)
+                rates, utilization = compute_rates(
+                    history.counters[current], history.counters[previous], interval, history.speed)
+                both = history.present[current] & history.present[previous]
+
+            for name, (operstate, mtu) in history.state.items():
+                column = history.index[name]
+                speed = history.speed[column]
+                entry = {'operstate': operstate, 'mtu': mtu, 'speed_mbps': int(speed) if speed else None}
+                if rates is not None and both[column]:
+                    entry.update(zip(RATES, np.round(rates[column], 2).tolist()))
+                    rx, tx = utilization[column]
+                    entry['rx_utilization'] = None if np.isnan(rx) else round(float(rx), 3)
+                    entry['tx_utilization'] = None if np.isnan(tx) else round(float(tx), 3)
+                result['interfaces'][name] = entry
+        return result
+
+    def rates(self, key, interface):
+        """
+        Historique des débits d'une interface
+
+        Returns:
+            dict: clock (uptime de l'équipement, fin de chaque intervalle) et
+            une liste par débit (RATES, rx/tx_utilization); None pour les
+            intervalles où l'interface manquait. Vide si inconnue.
+        """
+        with self._lock:
+            history = self._histories.get(key)
+        if history is None:
+            return {}
+        with history.lock:
+            column = history.index.get(interface)
+            if column is None:
+                return {}
+            slots = history.ordered()
+            if slots.size < 2:
+                return {'clock': [], **{name: [] for name in RATES + ('rx_utilization', 'tx_utilization')}}
+            clock = history.clock[slots]
+            counters = history.counters[slots, column][:, None, :]
+            present = history.present[slots, column]
+            intervals = np.diff(clock)
+            rates, utilization = compute_rates(
+                counters[1:], counters[:-1], np.where(intervals > 0, intervals, np.nan),
+                history.speed[column:column + 1])
+            valid = present[1:] & present[:-1] & (intervals > 0)
+
+        series = {'clock': clock[1:].tolist()}
+        columns = np.concatenate((rates[:, 0], utilization[:, 0]), axis=1)
+        names = RATES + ('rx_utilization', 'tx_utilization')
+        for i, name in enumerate(names):
+            values = np.round(columns[:, i], 3)
+            series[name] = np.where(valid & ~np.isnan(values), values, None).tolist()
+        return series
+
+    def history_bytes(self):
+        """Mémoire occupée par les historiques (octets)"""
+        with self._lock:
+            return sum(history.nbytes for history in self._histories.values())
+
+    def forget(self, key):
+        """Oublie l'historique d'un équipement"""
+        with self._lock:
+            self._histories.pop(key, None)
+
+    def close(self):
+        """Arrête les threads de sondage et ferme les connexions"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.pool.close_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
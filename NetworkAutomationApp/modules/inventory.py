@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Module de chargement de l'inventaire (devices.yaml)
+Remplace le yaml.safe_load de chaque démarrage par:
+
+- le chargeur C de PyYAML (CSafeLoader, libyaml) quand il est disponible;
+- une validation du schéma des équipements, faite une seule fois;
+- un cache binaire compact (marshal) à côté du fichier, .<nom>.cache, valide
+  tant que le fichier ne change pas (mtime et taille, puis sha256 si le
+  mtime a bougé sans que le contenu change): un démarrage sur cache n'importe
+  même pas yaml;
+- des équipements en DeviceRecord (__slots__, interface de dict) et des
+  index par nom, adresse, location et rôle.
+
+    inventory = load_inventory('devices.yaml')
+    inventory.get('server-1'), inventory.select(location='rack-1', role='web')
+"""
+
+import hashlib
+import marshal
+import os
+import sys
+from collections import defaultdict
+from collections.abc import MutableMapping
+from pathlib import Path
+
+# Champs d'équipement stockés en slots (les autres clés vont dans extra)
+FIELDS = ('name', 'host', 'port', 'username', 'password', 'device_type', 'location', 'role', 'status')
+STRING_FIELDS = ('name', 'host', 'username', 'password', 'device_type', 'location', 'role', 'status')
+CACHE_VERSION = 1
+# Caractères d'un motif glob (sélection par index impossible)
+GLOB_CHARS = frozenset('*?[')
+
+_FIELD_SET = frozenset(FIELDS)
+
+
+class InventoryError(ValueError):
+    """Inventaire invalide (message: liste des problèmes par équipement)"""
+
+
+class DeviceRecord(MutableMapping):
+    """
+    Équipement de l'inventaire: champs connus en slots, autres clés dans extra
+
+    S'utilise comme le dict lu dans devices.yaml (device['host'],
+    device.get('port', 22), device['status'] = 'online', dict(device)).
+    Un champ connu à None est considéré comme absent.
+    """
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, *values, extra=None, **fields):
+        for field, value in zip(FIELDS, values):
+            setattr(self, field, value)
+        for field in FIELDS[len(values):]:
+            setattr(self, field, None)
+        self.extra = None
+        for key, value in fields.items():
+            self[key] = value
+        if extra:
+            self.extra = dict(extra) if self.extra is None else {**self.extra, **extra}
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key) is not None
+        return self.extra is not None and key in self.extra
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            if getattr(self, key) is None:
+                raise KeyError(key)
+            setattr(self, key, None)
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for field in FIELDS:
+            if getattr(self, field) is not None:
+                yield field
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"DeviceRecord({dict(self)!r})"
+
+
+def validate_devices(devices):
+    """
+    Vérifie et normalise la liste des équipements
+
+    - chaque équipement est un mapping avec un host non vide;
+    - port entier entre 1 et 65535 (une chaîne numérique est convertie);
+    - champs texte convertis en chaîne (location: 1 -> "1"), None = absent;
+    - noms uniques.
+
+    Returns:
+        list: [(ligne des champs connus, clés supplémentaires ou None)]
+
+    Raises:
+        InventoryError: Tous les problèmes trouvés (les 20 premiers détaillés)
+    """
+    if devices is None:
+        return []
+    if not isinstance(devices, list):
+        raise InventoryError("devices doit être une liste d'équipements")
+    problems = []
+    rows = []
+    names = {}
+    # Valeurs répétées (username, device_type, location...) partagées: moins de
+    # mémoire, et marshal les écrit une fois puis par référence
+    shared = {}
+    for i, device in enumerate(devices):
+        label = f"devices[{i}]"
+        if not isinstance(device, dict):
+            problems.append(f"{label}: mapping attendu, {type(device).__name__} trouvé")
+            continue
+        values = dict.fromkeys(FIELDS)
+        extra = {}
+        for key, value in device.items():
+            if isinstance(value, str):
+                value = shared.setdefault(value, value)
+            if key in _FIELD_SET:
+                values[key] = value
+            else:
+                extra[shared.setdefault(str(key), str(key))] = value
+        for field in STRING_FIELDS:
+            value = values[field]
+            if value is not None and not isinstance(value, str):
+                if isinstance(value, (dict, list)):
+                    problems.append(f"{label}: {field} doit être une valeur simple")
+                    continue
+                values[field] = shared.setdefault(str(value), str(value))
+        if values['name']:
+            label = f"{label} ({values['name']})"
+        if not values['host']:
+            problems.append(f"{label}: host manquant")
+        port = values['port']
+        if port is not None:
+            try:
+                port = int(port)
+            except (TypeError, ValueError):
+                port = 0
+            if not 1 <= port <= 65535:
+                problems.append(f"{label}: port invalide {values['port']!r}")
+            values['port'] = port
+        if values['name'] is not None:
+            if values['name'] in names:
+                problems.append(f"{label}: nom déjà utilisé par devices[{names[values['name']]}]")
+            names[values['name']] = i
+        rows.append((tuple(values[field] for field in FIELDS), extra or None))
+    if problems:
+        shown = "\n    - ".join(problems[:20])
+        more = f"\n    ... et {len(problems) - 20} autre(s)" if len(problems) > 20 else ""
+        raise InventoryError(f"Inventaire invalide, {len(problems)} problème(s):\n    - {shown}{more}")
+    return rows
+
+
+class Inventory:
+    """
+    Équipements chargés et leurs index
+
+    Les index reflètent les valeurs du chargement (status, modifié pendant
+    l'exécution, n'est pas indexé).
+
+    Attributes:
+        devices: Liste des DeviceRecord, dans l'ordre du fichier
+        config: Configuration complète (config['devices'] est devices)
+        source: 'cache', 'yaml' ou 'memory'
+    """
+    def __init__(self, devices, config=None, source='memory'):
+        self.devices = devices
+        self.config = dict(config or {})
+        self.config['devices'] = devices
+        self.source = source
+        self.by_name = {}
+        self.by_host = defaultdict(list)
+        self.by_location = defaultdict(list)
+        self.by_role = defaultdict(list)
+        for device in devices:
+            if device.name is not None:
+                self.by_name[device.name] = device
+            self.by_host[device.host].append(device)
+            self.by_location[device.location].append(device)
+            self.by_role[device.role].append(device)
+
+    @classmethod
+    def from_config(cls, config, source='memory'):
+        """Inventaire depuis une configuration déjà chargée (validée ici)"""
+        config = dict(config or {})
+        rows = validate_devices(config.pop('devices', None))
+        return cls([DeviceRecord(*row, extra=extra) for row, extra in rows], config, source)
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def get(self, name):
+        """Équipement par nom (None si inconnu)"""
+        return self.by_name.get(name)
+
+    def get_host(self, host):
+        """Équipement par adresse (le premier du fichier si plusieurs)"""
+        devices = self.by_host.get(host)
+        return devices[0] if devices else None
+
+    def select(self, location=None, role=None):
+        """Équipements d'une location et/ou d'un rôle, dans l'ordre du fichier"""
+        if location is None and role is None:
+            return list(self.devices)
+        if role is None:
+            return list(self.by_location.get(location, ()))
+        if location is None:
+            return list(self.by_role.get(role, ()))
+        return [device for device in self.by_location.get(location, ()) if device.role == role]
+
+    def filter(self, **patterns):
+        """
+        Même sélection que batch.filter_devices (motifs glob par critère)
+
+        Les critères name, host, location et role sans caractère glob passent
+        par les index; les autres motifs sont appliqués sur ce sous-ensemble.
+        """
+        from .batch import filter_devices
+
+        candidates = None
+        remaining = {}
+        indexes = {'name': self.by_name, 'host': self.by_host,
+                   'location': self.by_location, 'role': self.by_role}
+        for criterion, values in patterns.items():
+            if not values:
+                continue
+            index = indexes.get(criterion)
+            if index is None or any(not value or GLOB_CHARS.intersection(value) for value in values):
+                remaining[criterion] = values
+                continue
+            matched = set()
+            for value in values:
+                found = index.get(value, ())
+                matched.update(map(id, (found,) if isinstance(found, DeviceRecord) else found))
+            candidates = matched if candidates is None else candidates & matched
+        devices = self.devices if candidates is None else [d for d in self.devices if id(d) in candidates]
+        return filter_devices(devices, **remaining) if remaining else list(devices)
+
+
+def cache_path(config_file):
+    """Chemin du cache binaire d'un fichier d'inventaire"""
+    path = Path(config_file)
+    return path.with_name(f".{path.name}.cache")
+
+
+def _header(stat, digest):
+    return (CACHE_VERSION, sys.version_info[:2], FIELDS, stat.st_mtime_ns, stat.st_size, digest)
+
+
+def _read_cache(path, stat, data_digest):
+    """
+    Contenu du cache s'il correspond au fichier, sinon None
+
+    data_digest: fonction qui calcule le sha256 du fichier (appelée seulement
+    si mtime ou taille diffèrent). Si le contenu est inchangé (touch,
+    checkout), l'en-tête est réécrit avec le nouveau mtime: les chargements
+    suivants ne relisent plus le fichier.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = marshal.load(f)
+            version, python, fields, mtime_ns, size, digest = header
+            if version != CACHE_VERSION or tuple(python) != sys.version_info[:2] or tuple(fields) != FIELDS:
+                return None
+            if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+                return marshal.load(f)
+            if digest != data_digest():
+                return None
+            payload = f.read()
+        _write_file(path, _header(stat, digest), payload)
+        return marshal.loads(payload)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_file(path, header, payload):
+    """Écrit en-tête et contenu de façon atomique, en 0600 (ignoré si non inscriptible)"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+            marshal.dump(header, f)
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _write_cache(path, stat, digest, config, rows):
+    """
+    Écrit le cache de façon atomique (ignoré si non sérialisable ou non inscriptible)
+
+    Le cache contient les mots de passe de l'inventaire: fichier en 0600.
+    """
+    try:
+        payload = marshal.dumps((config, rows))
+    except ValueError:
+        # Valeurs non sérialisables par marshal (dates YAML...)
+        return
+    _write_file(path, _header(stat, digest), payload)
+
+
+def parse_yaml(data):
+    """Parse le YAML avec libyaml si disponible (CSafeLoader), sinon SafeLoader"""
+    import yaml
+
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    return yaml.load(data, Loader=loader) or {}
+
+
+def load_inventory(config_file, use_cache=True):
+    """
+    Charge l'inventaire depuis le cache binaire ou, à défaut, depuis le YAML
+
+    Args:
+        config_file: Chemin de devices.yaml
+        use_cache: Lit et écrit le cache .<nom>.cache
+
+    Returns:
+        Inventory: Équipements, configuration complète et index
+
+    Raises:
+        OSError: Fichier absent ou illisible
+        InventoryError: Schéma des équipements invalide
+    """
+    config_file = Path(config_file)
+    stat = os.stat(config_file)
+    path = cache_path(config_file)
+    data = None
+
+    def data_digest():
+        nonlocal data
+        if data is None:
+            data = config_file.read_bytes()
+        return hashlib.sha256(data).hexdigest()
+
+    if use_cache:
+        cached = _read_cache(path, stat, data_digest)
+        if cached is not None:
+            config, rows = cached
+            devices = [DeviceRecord(*row, extra=extra) for row, extra in rows]
+            return Inventory(devices, config, source='cache')
+
+    digest = data_digest()
+    config = parse_yaml(data)
+    if not isinstance(config, dict):
+        raise InventoryError(f"{config_file}: mapping attendu à la racine")
+    devices = config.pop('devices', None)
+    rows = validate_devices(devices)
+    if use_cache:
+        _write_cache(path, stat, digest, config, rows)
+    return Inventory([DeviceRecord(*row, extra=extra) for row, extra in rows], config, source='yaml')
+
+
+def load_section(config_file, section):
+    """
+    Section de la configuration (thresholds, notifications, dashboards...)
+
+    Passe par le cache de l'inventaire; un inventaire invalide ne prive pas
+    les autres sections de leur configuration.
+
+    Returns:
+        dict: Section (vide si absente)
+    """
+    try:
+        config = load_inventory(config_file).config
+    except InventoryError:
+        config = parse_yaml(Path(config_file).read_bytes())
+        config = config if isinstance(config, dict) else {}
+    return config.get(section) or {}
+
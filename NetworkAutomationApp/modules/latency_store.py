@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Module de stockage matriciel des latences
+Matrice intervalles x équipements des latences (sommes et nombres de mesures
+par intervalle de 5 minutes), persistée en fichiers mappés en mémoire
+(numpy.memmap) et utilisée comme tampon circulaire sur la durée de rétention.
+
+La matrice est mise à jour de façon incrémentale à partir des nouvelles
+lignes de monitoring_data (filigrane sur l'id); la heatmap ne lit que les
+intervalles de la fenêtre demandée, jamais l'historique complet.
+5 000 équipements x 30 jours à 5 minutes: 8 640 x 5 000 cellules, soit
+environ 260 Mo sur disque (float32 + uint16), paginés à la demande.
+"""
+
+import contextlib
+import json
+import math
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_STORE_DIR = 'instance/latency_store'
+BUCKET_SECONDS = 300
+RETENTION_DAYS = 30
+INITIAL_CAPACITY = 256
+SYNC_BATCH = 50000
+STORE_VERSION = 1
+
+# Équipement et horodatage de la ligne du filigrane (contrôle de la base d'origine)
+LAST_ROW_QUERY = """
+    SELECT device_id, CAST(strftime('%s', timestamp) AS INTEGER) FROM monitoring_data WHERE id = ?
+"""
+
+
+class LatencyMatrixStore:
+    """
+    Tampon circulaire intervalles x équipements des latences
+
+    Disposition "temps d'abord": une ligne par intervalle, une colonne par
+    équipement. Un cycle de monitoring (tous les équipements, même intervalle)
+    écrit dans une seule ligne contiguë, et une fenêtre de temps se lit en
+    une ou deux tranches contiguës du fichier.
+
+    Fichiers du répertoire:
+        meta.json    équipements (ordre des colonnes), intervalle de tête,
+                     filigrane de synchronisation (dernier id lu, sa ligne)
+                     et base d'origine de ce filigrane
+        sums.f4      sommes des latences (float32)
+        counts.u2    nombres de mesures (uint16)
+    """
+    def __init__(self, directory=DEFAULT_STORE_DIR, bucket_seconds=BUCKET_SECONDS,
+                 retention_days=RETENTION_DAYS):
+        self.directory = Path(directory)
+        self.meta_path = self.directory / 'meta.json'
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.meta = self._load_meta()
+        if self.meta is None:
+            self._reset(bucket_seconds, retention_days * 86400 // bucket_seconds)
+        else:
+            self.bucket_seconds = self.meta['bucket_seconds']
+            self.n_buckets = self.meta['n_buckets']
+            self._index = {name: i for i, name in enumerate(self.meta['devices'])}
+            self._open()
+
+    # ----- Persistance -----
+
+    def _load_meta(self):
+        """Charge meta.json (None si absent, illisible ou incompatible)"""
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != STORE_VERSION:
+            return None
+        return meta
+
+    def _reset(self, bucket_seconds, n_buckets, source=None):
+        """Store vide (fichiers supprimés), filigrane remis à zéro"""
+        self.meta = {
+            'version': STORE_VERSION,
+            'bucket_seconds': int(bucket_seconds),
+            'n_buckets': int(n_buckets),
+            'capacity': INITIAL_CAPACITY,
+            'devices': [],
+            'head': None,
+            'last_id': 0,
+            'last_row': None,
+            'source': source
+        }
+        for name in ('sums.f4', 'counts.u2'):
+            (self.directory / name).unlink(missing_ok=True)
+        self.bucket_seconds = self.meta['bucket_seconds']
+        self.n_buckets = self.meta['n_buckets']
+        self._index = {}
+        self._open()
+
+    def _open(self):
+        """Ouvre (ou crée, remplis de zéros) les fichiers mappés en mémoire"""
+        shape = (self.n_buckets, self.meta['capacity'])
+        self.sums = self._memmap('sums.f4', np.float32, shape)
+        self.counts = self._memmap('counts.u2', np.uint16, shape)
+
+    def _memmap(self, name, dtype, shape):
+        path = self.directory / name
+        mode = 'r+' if path.exists() else 'w+'
+        return np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+
+    def save(self):
+        """Vide les pages modifiées puis écrit meta.json de façon atomique"""
+        self.sums.flush()
+        self.counts.flush()
+        tmp_path = self.meta_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Verrou exclusif entre processus (API et générateur de dashboards)"""
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(self.directory / '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Un autre processus a pu écrire depuis l'ouverture
+                meta = self._load_meta()
+                if meta is not None and meta != self.meta:
+                    self.meta = meta
+                    self._index = {name: i for i, name in enumerate(meta['devices'])}
+                    self._open()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _grow(self, needed):
+        """Agrandit le nombre de colonnes (capacité doublée, copie unique)"""
+        old_capacity = self.meta['capacity']
+        capacity = max(needed, old_capacity * 2)
+        for name, old in (('sums.f4', self.sums), ('counts.u2', self.counts)):
+            tmp_path = self.directory / (name + '.tmp')
+            grown = np.memmap(tmp_path, dtype=old.dtype, mode='w+', shape=(self.n_buckets, capacity))
+            # Copie par blocs d'intervalles pour borner la mémoire
+            for start in range(0, self.n_buckets, 1024):
+                grown[start:start + 1024, :old_capacity] = old[start:start + 1024]
+            grown.flush()
+            del grown
+            os.replace(tmp_path, self.directory / name)
+        self.meta['capacity'] = capacity
+        self._open()
+
+    # ----- Écriture -----
+
+    def _columns(self, hostnames):
+        """Colonnes des équipements (ajoutés à la volée)"""
+        columns = np.empty(len(hostnames), dtype=np.int64)
+        for i, hostname in enumerate(hostnames):
+            column = self._index.get(hostname)
+            if column is None:
+                column = len(self.meta['devices'])
+                self.meta['devices'].append(hostname)
+                self._index[hostname] = column
+            columns[i] = column
+        if len(self.meta['devices']) > self.meta['capacity']:
+            self._grow(len(self.meta['devices']))
+        return columns
+
+    def _advance(self, bucket):
+        """Avance la tête jusqu'à bucket en vidant les lignes recyclées"""
+        head = self.meta['head']
+        if head is not None and bucket <= head:
+            return
+        if head is None:
+            # Fichiers neufs: déjà remplis de zéros
+            pass
+        elif bucket - head >= self.n_buckets:
+            self.sums[:] = 0
+            self.counts[:] = 0
+        else:
+            rows = np.arange(head + 1, bucket + 1) % self.n_buckets
+            self.sums[rows] = 0
+            self.counts[rows] = 0
+        self.meta['head'] = int(bucket)
+
+    def update(self, hostnames, timestamps, latencies):
+        """
+        Ajoute des mesures à la matrice
+
+        Args:
+            hostnames: Équipement de chaque mesure
+            timestamps: Epoch (s, UTC) de chaque mesure
+            latencies: Latence en ms (NaN ignorés)
+
+        Returns:
+            int: Nombre de mesures prises en compte
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        latencies = np.asarray(latencies, dtype=np.float64)
+        if len(timestamps) == 0:
+            return 0
+
+        buckets = timestamps // self.bucket_seconds
+        self._advance(int(buckets.max()))
+        head = self.meta['head']
+
+        # Mesures trop anciennes pour la rétention ou sans latence: ignorées
+        keep = (buckets > head - self.n_buckets) & ~np.isnan(latencies)
+        if not keep.any():
+            return 0
+        columns = self._columns([h for h, k in zip(hostnames, keep) if k])
+        rows = buckets[keep] % self.n_buckets
+
+        np.add.at(self.sums, (rows, columns), latencies[keep].astype(np.float32))
+        np.add.at(self.counts, (rows, columns), 1)
+        return int(keep.sum())
+
+    def sync_from_db(self, db_path, batch=SYNC_BATCH):
+        """
+        Intègre les mesures ajoutées en base depuis la dernière synchronisation
+
+        Lecture seule de la base, par lots de `batch` lignes; seules les
+        lignes d'id supérieur au filigrane et dans la rétention sont lues.
+
+        Args:
+            db_path: Chemin de la base SQLite de l'API
+            batch: Taille des lots lus
+
+        Returns:
+            int: Nombre de mesures intégrées
+        """
+        with self._locked():
+            since = time.strftime(
+                '%Y-%m-%d %H:%M:%S',
+                time.gmtime(time.time() - self.n_buckets * self.bucket_seconds)
+            )
+            query = """
+                SELECT id, device_id, CAST(strftime('%s', timestamp) AS INTEGER), latency
+                FROM monitoring_data
+                WHERE id > ? AND timestamp >= ? AND latency IS NOT NULL
+                ORDER BY id
+            """
+            added = 0
+            source = _db_identity(db_path)
+            with closing(sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)) as conn:
+                # Filigrane d'une autre base (recréée, --db différent): ses ids n'ont plus de sens ici.
+                # L'inode peut être réutilisé par une base recréée: la ligne du filigrane doit aussi être intacte
+                max_id = conn.execute("SELECT MAX(id) FROM monitoring_data").fetchone()[0] or 0
+                last_row = conn.execute(LAST_ROW_QUERY, (self.meta['last_id'],)).fetchone()
+                if (self.meta.get('source') != source or max_id < self.meta['last_id']
+                        or (self.meta['last_id'] and list(last_row or ()) != self.meta.get('last_row'))):
+                    if self.meta['last_id']:
+                        print(f"[*] Base {db_path} différente de celle du store, reconstruction")
+                    self._reset(self.bucket_seconds, self.n_buckets, source)
+                names = dict(conn.execute("SELECT id, hostname FROM devices").fetchall())
+                cursor = conn.execute(query, (self.meta['last_id'], since))
+                while True:
+                    rows = cursor.fetchmany(batch)
+                    if not rows:
+                        break
+                    data = np.array(rows, dtype=np.float64)
+                    hostnames = [names.get(int(device_id), str(int(device_id))) for device_id in data[:, 1]]
+                    added += self.update(hostnames, data[:, 2], data[:, 3])
+                    self.meta['last_id'] = int(rows[-1][0])
+                    self.meta['last_row'] = list(rows[-1][1:3])
+            self.save()
+        return added
+
+    # ----- Lecture -----
+
+    def _bounds(self, hours, now=None):
+        """Premier et dernier intervalle (absolus) de la fenêtre"""
+        n_rows = min(self.n_buckets, max(1, int(math.ceil(hours * 3600 / self.bucket_seconds))))
+        end = int((now if now is not None else time.time()) // self.bucket_seconds)
+        return end - n_rows + 1, end
+
+    def _read(self, start, end):
+        """
+        Lit les intervalles absolus [start, end] (zéros hors rétention ou après la tête)
+
+        Returns:
+            tuple: (sommes, nombres) float64, intervalles x équipements
+        """
+        n_devices = len(self.meta['devices'])
+        sums = np.zeros((end - start + 1, n_devices))
+        counts = np.zeros((end - start + 1, n_devices))
+
+        head = self.meta['head']
+        if head is None or not n_devices:
+            return sums, counts
+
+        bucket = max(start, head - self.n_buckets + 1)
+        last = min(end, head)
+        while bucket <= last:
+            # Tranche contiguë jusqu'à la fin du tampon circulaire
+            row = bucket % self.n_buckets
+            length = min(last - bucket + 1, self.n_buckets - row)
+            target = slice(bucket - start, bucket - start + length)
+            sums[target] = self.sums[row:row + length, :n_devices]
+            counts[target] = self.counts[row:row + length, :n_devices]
+            bucket += length
+        return sums, counts
+
+    def window(self, hours=24, now=None):
+        """
+        Tranche de la matrice couvrant les dernières `hours` heures
+
+        Seules les lignes de la fenêtre sont lues depuis les fichiers.
+
+        Returns:
+            tuple: (début des intervalles en epoch s, sommes, nombres)
+                   matrices intervalles x équipements
+        """
+        start, end = self._bounds(hours, now)
+        sums, counts = self._read(start, end)
+        return np.arange(start, end + 1) * self.bucket_seconds, sums, counts
+
+    def heatmap(self, hours=24, max_buckets=200, now=None):
+        """
+        Heatmap équipements x intervalles regroupés en au plus max_buckets colonnes
+
+        La fenêtre est lue groupe par groupe: la mémoire utilisée est bornée
+        par la taille de la heatmap, pas par la durée couverte. Les
+        équipements sans mesure sur la fenêtre sont omis.
+
+        Returns:
+            tuple: (équipements, début des intervalles en epoch s, matrice NaN-able)
+        """
+        start, end = self._bounds(hours, now)
+        factor = max(1, int(math.ceil((end - start + 1) / max_buckets)))
+        group_starts = np.arange(start, end + 1, factor)
+
+        n_devices = len(self.meta['devices'])
+        sums = np.zeros((len(group_starts), n_devices))
+        counts = np.zeros((len(group_starts), n_devices))
+        for i, group_start in enumerate(group_starts):
+            group_sums, group_counts = self._read(int(group_start), min(int(group_start) + factor - 1, end))
+            sums[i] = group_sums.sum(axis=0)
+            counts[i] = group_counts.sum(axis=0)
+
+        present = counts.sum(axis=0) > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matrix = (sums[:, present] / counts[:, present]).T
+
+        devices = [name for name, keep in zip(self.meta['devices'], present) if keep]
+        return devices, group_starts * self.bucket_seconds, matrix
+
+
+def _db_identity(db_path):
+    """Identité d'une base: chemin résolu, périphérique et inode du fichier"""
+    path = Path(db_path).resolve()
+    stat = path.stat()
+    return {'path': str(path), 'device': stat.st_dev, 'inode': stat.st_ino}
+
+
+def latency_heatmap(db_path, hours=24, max_buckets=200, directory=DEFAULT_STORE_DIR):
+    """
+    Synchronise le store avec la base puis en extrait la heatmap
+
+    Args:
+        db_path: Chemin de la base SQLite de l'API
+        hours: Période couverte en heures
+        max_buckets: Nombre maximal de colonnes
+        directory: Répertoire du store
+
+    Returns:
+        tuple: (équipements, début des intervalles en epoch s, matrice NaN-able)
+    """
+    store = LatencyMatrixStore(directory)
+    store.sync_from_db(db_path)
+    return store.heatmap(hours, max_buckets)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Module de métriques
+Compteurs et histogrammes en mémoire, exposés au format texte Prometheus
+(/metrics de l'API) ou en JSON (dump périodique de la CLI).
+
+Désactivé, chaque appel se réduit au test d'un booléen: l'instrumentation
+peut rester dans les chemins critiques (connexions SSH, commandes, pings).
+Activation: enable() ou variable d'environnement NETAUTO_METRICS=1.
+
+    from modules import metrics
+    with metrics.timer('ssh_command_seconds', command='ip'):
+        ...
+    metrics.inc('ssh_connections_total', result='ok')
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+
+# Bornes des histogrammes de durée (secondes)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Métriques connues: nom -> (type, description). Les noms inconnus sont
+# acceptés (type déduit de l'appel) mais n'ont pas de description.
+DEFINITIONS = {
+    'ssh_connections_total': ('counter', "Connexions SSH ouvertes, par résultat"),
+    'ssh_connect_seconds': ('histogram', "Durée d'établissement des connexions SSH"),
+    'ssh_commands_total': ('counter', "Commandes SSH exécutées, par commande et résultat"),
+    'ssh_command_seconds': ('histogram', "Durée des commandes SSH (exécution et lecture), par commande"),
+    'ping_probes_total': ('counter', "Sondes ping, par résultat"),
+    'ping_rtt_seconds': ('histogram', "RTT moyen des sondes ping"),
+    'scheduler_lag_seconds': ('histogram', "Retard du démarrage d'un cycle sur son heure prévue, par boucle"),
+    'http_requests_total': ('counter', "Requêtes HTTP de l'API, par endpoint et code"),
+    'http_request_seconds': ('histogram', "Durée des requêtes HTTP de l'API, par endpoint"),
+    'db_queries_total': ('counter', "Requêtes SQL exécutées, par endpoint"),
+    'db_query_seconds': ('histogram', "Temps SQL cumulé par requête HTTP, par endpoint"),
+    'report_render_seconds': ('histogram', "Durée de rendu des rapports, par format"),
+}
+
+_enabled = os.environ.get('NETAUTO_METRICS', '').lower() in ('1', 'true', 'yes', 'on')
+_lock = threading.Lock()
+_metrics = {}
+
+
+class _NullTimer:
+    """Chronomètre sans effet (métriques désactivées)"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+
+    def add(self, value):
+        self.value += value
+
+    def snapshot(self):
+        return self.value
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts)),
+        }
+
+
+def enable():
+    """Active la collecte des métriques"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Désactive la collecte (les valeurs déjà collectées sont conservées)"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Supprime toutes les valeurs collectées"""
+    with _lock:
+        _metrics.clear()
+
+
+def _record(kind, name, value, labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        metric = _metrics.get(key)
+        if metric is None:
+            metric = _metrics[key] = Counter() if kind == 'counter' else Histogram()
+        metric.add(value)
+
+
+def inc(name, value=1, **labels):
+    """Incrémente un compteur"""
+    if _enabled:
+        _record('counter', name, value, labels)
+
+
+def observe(name, value, **labels):
+    """Ajoute une observation à un histogramme"""
+    if _enabled:
+        _record('histogram', name, value, labels)
+
+
+def timer(name, **labels):
+    """Context manager qui observe la durée du bloc dans un histogramme"""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def snapshot():
+    """
+    Valeurs courantes
+
+    Returns:
+        dict: {nom: [{'labels': {...}, 'value': nombre ou histogramme}]}
+    """
+    with _lock:
+        items = [(name, dict(labels), metric.snapshot()) for (name, labels), metric in _metrics.items()]
+    result = {}
+    for name, labels, value in sorted(items, key=lambda item: (item[0], sorted(item[1].items()))):
+        result.setdefault(name, []).append({'labels': labels, 'value': value})
+    return result
+
+
+def _escape(value):
+    """Échappe une valeur de label (antislash, guillemet, saut de ligne)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels.items()) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def render_prometheus():
+    """
+    Exposition au format texte Prometheus (version 0.0.4)
+
+    Returns:
+        str: Une ligne par échantillon, précédée de # HELP / # TYPE
+    """
+    lines = []
+    for name, samples in snapshot().items():
+        kind, description = DEFINITIONS.get(
+            name, ('histogram' if isinstance(samples[0]['value'], dict) else 'counter', '')
+        )
+        if description:
+            lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample in samples:
+            labels, value = sample['labels'], sample['value']
+            if kind != 'histogram':
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+                continue
+            cumulative = 0
+            for bound, count in value['buckets'].items():
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, {'le': bound})} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']:g}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def dump_json(path):
+    """Écrit les métriques en JSON de façon atomique"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': time.time(), 'metrics': snapshot()}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class MetricsDumper:
+    """
+    Dump JSON périodique des métriques (CLI) dans un thread de fond
+
+    Le fichier est aussi écrit une dernière fois à l'arrêt.
+    """
+    def __init__(self, path, interval=10):
+        self.path = str(path)
+        self.interval = max(1, interval)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        enable()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+        dump_json(self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                dump_json(self.path)
+            except OSError as e:
+                print(f"[!] Écriture des métriques impossible: {e}")
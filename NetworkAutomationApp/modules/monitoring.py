@@ -7,9 +7,14 @@ Ping monitoring, SNMP, collecte de métriques
 import subprocess
 import sys
 import re
+import time
+import threading
+from collections import deque
 from datetime import datetime
 import statistics
 
+from . import metrics, tracing
+
 class NetworkMonitoring:
     def __init__(self):
         self.monitoring_history = {}
@@ -30,27 +35,43 @@ class NetworkMonitoring:
         try:
             param = "-n" if sys.platform == "win32" else "-c"
             timeout_param = "-w" if sys.platform == "win32" else "-W"
+            # Délai d'attente d'une réponse: millisecondes sous Windows et macOS, secondes pour iputils (Linux)
+            wait = timeout * 1000 if sys.platform in ("win32", "darwin") else timeout
             
             command = [
                 "ping",
                 param, str(count),
-                timeout_param, str(timeout*1000),
+                timeout_param, str(wait),
                 host
             ]
             
-            result = subprocess.run(command, capture_output=True, text=True, timeout=count*timeout+2)
+            with tracing.span('ping', host=host, count=count):
+                result = subprocess.run(command, capture_output=True, text=True, timeout=count*timeout+2)
             
             if result.returncode == 0:
-                return NetworkMonitoring._parse_ping_output(result.stdout, host)
+                parsed = NetworkMonitoring._parse_ping_output(result.stdout, host)
+                if parsed['success']:
+                    metrics.observe('ping_rtt_seconds', parsed['avg_rtt'] / 1000)
+                metrics.inc('ping_probes_total', result='ok' if parsed['success'] else 'unparsed')
+                return parsed
             else:
+                metrics.inc('ping_probes_total', result='unreachable')
+                from .ping_stats import analyze
+                
+                # Échec: perte réelle d'après les réponses et le résumé (100% sans résumé ni réponse)
+                stats = analyze(result.stdout)
                 return {
                     'success': False,
                     'host': host,
                     'timestamp': datetime.now().isoformat(),
+                    'sent': stats['sent'] or count,
+                    'received': stats['received'],
+                    'packet_loss': stats['packet_loss'],
                     'stats': 'Impossible de joindre'
                 }
         
         except Exception as e:
+            metrics.inc('ping_probes_total', result='error')
             return {
                 'success': False,
                 'host': host,
@@ -61,7 +82,25 @@ class NetworkMonitoring:
     
     @staticmethod
     def _parse_ping_output(output, host):
-        """Parse la sortie du ping pour extraire les statistiques"""
+        """
+        Parse la sortie du ping pour extraire les statistiques
+        
+        Les réponses individuelles sont extraites en une passe (perte, gigue,
+        écart type, percentiles); à défaut, repli sur la ligne de résumé.
+        """
+        # NumPy n'est chargé qu'au premier ping
+        from .ping_stats import analyze
+        
+        stats = analyze(output)
+        if stats['received']:
+            return {
+                'success': True,
+                'host': host,
+                'timestamp': datetime.now().isoformat(),
+                **stats,
+                'stats': (f"min={stats['min_rtt']}ms avg={stats['avg_rtt']}ms max={stats['max_rtt']}ms "
+                          f"jitter={stats['jitter']}ms loss={stats['packet_loss']}%")
+            }
         
         # Linux/Mac pattern
         match = re.search(r'min/avg/max/[a-z]+ = ([\d.]+)/([\d.]+)/([\d.]+)', output)
@@ -96,6 +135,39 @@ class NetworkMonitoring:
             'stats': 'Impossible de parser'
         }
     
+    @staticmethod
+    def _ssh_connect(device, timeout=5):
+        """Ouvre une connexion SSH (durée et résultat comptés dans les métriques)"""
+        import paramiko
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        start = time.perf_counter()
+        try:
+            with tracing.span('ssh_connect', host=device['host']):
+                client.connect(
+                    hostname=device['host'],
+                    port=device.get('port', 22),
+                    username=device['username'],
+                    password=device['password'],
+                    timeout=timeout
+                )
+        except Exception:
+            metrics.inc('ssh_connections_total', result='error')
+            raise
+        metrics.observe('ssh_connect_seconds', time.perf_counter() - start)
+        metrics.inc('ssh_connections_total', result='ok')
+        return client
+    
+    @staticmethod
+    def _ssh_run(client, command):
+        """Exécute une commande et retourne stdout (durée comptée par commande)"""
+        label = command.split()[0]
+        with metrics.timer('ssh_command_seconds', command=label), tracing.span('command', command=command):
+            stdin, stdout, stderr = client.exec_command(command)
+            output = stdout.read().decode('utf-8')
+        metrics.inc('ssh_commands_total', command=label, result='ok')
+        return output
+    
     @staticmethod
     def check_interface_status(device, interface_name):
         """
@@ -109,19 +181,9 @@ class NetworkMonitoring:
             dict: État de l'interface
         """
         try:
-            import paramiko
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(
-                hostname=device['host'],
-                port=device.get('port', 22),
-                username=device['username'],
-                password=device['password'],
-                timeout=5
-            )
+            client = NetworkMonitoring._ssh_connect(device)
             
-            stdin, stdout, stderr = client.exec_command(f"ip link show {interface_name}")
-            output = stdout.read().decode('utf-8')
+            output = NetworkMonitoring._ssh_run(client, f"ip link show {interface_name}")
             
             is_up = 'UP' in output
             client.close()
@@ -152,22 +214,10 @@ class NetworkMonitoring:
             dict: Statistiques (RX/TX bytes, packets, errors)
         """
         try:
-            import paramiko
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(
-                hostname=device['host'],
-                port=device.get('port', 22),
-                username=device['username'],
-                password=device['password'],
-                timeout=5
-            )
-            
-            stdin, stdout, stderr = client.exec_command(f"cat /sys/class/net/{interface_name}/statistics/rx_bytes")
-            rx_bytes = stdout.read().decode('utf-8').strip()
+            client = NetworkMonitoring._ssh_connect(device)
             
-            stdin, stdout, stderr = client.exec_command(f"cat /sys/class/net/{interface_name}/statistics/tx_bytes")
-            tx_bytes = stdout.read().decode('utf-8').strip()
+            rx_bytes = NetworkMonitoring._ssh_run(client, f"cat /sys/class/net/{interface_name}/statistics/rx_bytes").strip()
+            tx_bytes = NetworkMonitoring._ssh_run(client, f"cat /sys/class/net/{interface_name}/statistics/tx_bytes").strip()
             
             client.close()
             
@@ -229,19 +279,9 @@ class NetworkMonitoring:
             dict: Informations CPU
         """
         try:
-            import paramiko
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(
-                hostname=device['host'],
-                port=device.get('port', 22),
-                username=device['username'],
-                password=device['password'],
-                timeout=5
-            )
+            client = NetworkMonitoring._ssh_connect(device)
             
-            stdin, stdout, stderr = client.exec_command("top -bn1 | grep 'Cpu(s)' | awk '{print $2}'")
-            cpu_usage = stdout.read().decode('utf-8').strip()
+            cpu_usage = NetworkMonitoring._ssh_run(client, "top -bn1 | grep 'Cpu(s)' | awk '{print $2}'").strip()
             
             client.close()
             
@@ -267,19 +307,9 @@ class NetworkMonitoring:
             dict: Informations mémoire
         """
         try:
-            import paramiko
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(
-                hostname=device['host'],
-                port=device.get('port', 22),
-                username=device['username'],
-                password=device['password'],
-                timeout=5
-            )
+            client = NetworkMonitoring._ssh_connect(device)
             
-            stdin, stdout, stderr = client.exec_command("free -h | grep Mem")
-            memory_info = stdout.read().decode('utf-8').strip()
+            memory_info = NetworkMonitoring._ssh_run(client, "free -h | grep Mem").strip()
             
             client.close()
             
@@ -291,4 +321,53 @@ class NetworkMonitoring:
             return {
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
-            }
\ No newline at end of file
+            }
+
+
+class RollingAvailability:
+    """
+    Disponibilité glissante par équipement sur les N derniers échantillons
+    
+    Chaque échantillon vaut la part des sondes ayant répondu (1 - perte).
+    L'anneau garde une somme courante: ajouter un échantillon est O(1),
+    sans relire l'historique. État propre au processus: un anneau vide peut
+    être amorcé une fois depuis la base (seed).
+    """
+    def __init__(self, window=100):
+        self.window = window
+        self._rings = {}
+        self._sums = {}
+        self._lock = threading.Lock()
+    
+    def has(self, key):
+        return key in self._rings
+    
+    def seed(self, key, packet_losses):
+        """Amorce l'anneau avec des pertes historiques (%), de la plus ancienne à la plus récente"""
+        with self._lock:
+            ring = deque((1 - loss / 100 for loss in packet_losses if loss is not None), maxlen=self.window)
+            self._rings[key] = ring
+            self._sums[key] = sum(ring)
+    
+    def add(self, key, packet_loss):
+        """
+        Ajoute un échantillon
+        
+        Args:
+            key: Identifiant de l'équipement
+            packet_loss: Perte de l'échantillon (%)
+        
+        Returns:
+            float: Disponibilité glissante (%)
+        """
+        value = 1 - packet_loss / 100
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = deque(maxlen=self.window)
+                self._sums[key] = 0.0
+            if len(ring) == ring.maxlen:
+                self._sums[key] -= ring[0]
+            ring.append(value)
+            self._sums[key] += value
+            return round(100 * self._sums[key] / len(ring), 2)
@@ -4,11 +4,13 @@ Module utilitaires NAPALM
 Gestion de connexions réseau avec abstraction multi-vendeurs
 """
 
-import paramiko
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 
+from . import metrics, tracing
+
 class NALPMUtils:
     """
     Classe utilitaire pour gérer les connexions réseau avec abstraction
@@ -18,32 +20,40 @@ class NALPMUtils:
     def __init__(self):
         self.ssh_clients = {}
     
-    def create_ssh_connection(self, device):
+    def create_ssh_connection(self, device, compress=False):
         """
         Crée une connexion SSH vers un équipement
         
         Args:
             device: Dictionnaire contenant les paramètres de connexion
+            compress: Compression SSH (zlib), pour les transferts de fichiers
         
         Returns:
             SSHClient: Client SSH ou None en cas d'erreur
         """
+        start = time.perf_counter()
         try:
+            import paramiko
             client = paramiko.SSHClient()
             client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             
-            client.connect(
-                hostname=device['host'],
-                port=device.get('port', 22),
-                username=device['username'],
-                password=device['password'],
-                timeout=10,
-                look_for_keys=False,
-                allow_agent=False
-            )
+            with tracing.span('ssh_connect', host=device['host']):
+                client.connect(
+                    hostname=device['host'],
+                    port=device.get('port', 22),
+                    username=device['username'],
+                    password=device['password'],
+                    timeout=10,
+                    look_for_keys=False,
+                    allow_agent=False,
+                    compress=compress
+                )
             
+            metrics.observe('ssh_connect_seconds', time.perf_counter() - start)
+            metrics.inc('ssh_connections_total', result='ok')
             return client
         except Exception as e:
+            metrics.inc('ssh_connections_total', result='error')
             print(f"Erreur de connexion SSH: {e}")
             return None
     
@@ -62,17 +72,24 @@ class NALPMUtils:
         if not client:
             return None
         
+        label = command.split()[0] if command.split() else command
+        start = time.perf_counter()
         try:
-            stdin, stdout, stderr = client.exec_command(command)
-            output = stdout.read().decode('utf-8')
-            error = stderr.read().decode('utf-8')
+            with tracing.span('command', command=command):
+                stdin, stdout, stderr = client.exec_command(command)
+                output = stdout.read().decode('utf-8')
+                error = stderr.read().decode('utf-8')
+            metrics.observe('ssh_command_seconds', time.perf_counter() - start, command=label)
             
             if error:
+                metrics.inc('ssh_commands_total', command=label, result='error')
                 print(f"Erreur: {error}")
                 return None
             
+            metrics.inc('ssh_commands_total', command=label, result='ok')
             return output
         except Exception as e:
+            metrics.inc('ssh_commands_total', command=label, result='error')
             print(f"Erreur lors de l'exécution: {e}")
             return None
         finally:
@@ -141,14 +158,15 @@ class NALPMUtils:
             if output:
                 try:
                     # Parse JSON si disponible
-                    interfaces_list = json.loads(output)
-                    for iface in interfaces_list:
-                        iface_name = iface.get('ifname', 'unknown')
-                        interfaces[iface_name] = {
-                            'status': 'up' if iface.get('operstate') == 'UP' else 'down',
-                            'mtu': iface.get('mtu', 0),
-                            'addresses': [addr.get('local', 'N/A') for addr in iface.get('addr_info', [])]
-                        }
+                    with tracing.span('parse', what='interfaces'):
+                        interfaces_list = json.loads(output)
+                        for iface in interfaces_list:
+                            iface_name = iface.get('ifname', 'unknown')
+                            interfaces[iface_name] = {
+                                'status': 'up' if iface.get('operstate') == 'UP' else 'down',
+                                'mtu': iface.get('mtu', 0),
+                                'addresses': [addr.get('local', 'N/A') for addr in iface.get('addr_info', [])]
+                            }
                 except json.JSONDecodeError:
                     # Fallback sur ip addr normal
                     output = self.execute_command(device, "ip addr")
@@ -197,30 +215,73 @@ class NALPMUtils:
             output = self.execute_command(device, "ip route")
             
             if output:
-                for line in output.split('\n'):
-                    if line.strip():
-                        parts = line.split()
-                        if len(parts) >= 3:
-                            routes[parts[0]] = {
-                                'via': parts[2] if 'via' in parts else 'directly connected',
-                                'interface': parts[-1] if 'dev' not in line else [p for i, p in enumerate(parts) if parts[i] == 'dev'][0] if 'dev' in parts else 'unknown'
-                            }
+                with tracing.span('parse', what='routes'):
+                    for line in output.split('\n'):
+                        if line.strip():
+                            parts = line.split()
+                            if len(parts) >= 3:
+                                routes[parts[0]] = {
+                                    'via': parts[2] if 'via' in parts else 'directly connected',
+                                    'interface': parts[-1] if 'dev' not in line else [p for i, p in enumerate(parts) if parts[i] == 'dev'][0] if 'dev' in parts else 'unknown'
+                                }
         
         except Exception as e:
             print(f"Erreur lors de la récupération des routes: {e}")
         
         return routes
     
-    def get_config(self, device):
+    def get_state_digest(self, device):
+        """
+        Calcule à distance un condensat de l'état inventorié, en une commande
+        
+        Le condensat couvre hostname, kernel, version OS, liens, adresses et
+        routes; l'uptime est renvoyé à part car il change à chaque appel.
+        
+        Args:
+            device: Dictionnaire contenant les paramètres de connexion
+        
+        Returns:
+            dict: {'uptime': str, 'digest': str} ou None en cas d'erreur
+        """
+        command = (
+            "uptime -p; "
+            "{ hostname; uname -r; grep VERSION_ID /etc/os-release; "
+            "ip -o link; ip -br addr; ip route; } 2>/dev/null | sha256sum"
+        )
+        output = self.execute_command(device, command)
+        if not output:
+            return None
+        
+        lines = output.strip().splitlines()
+        if len(lines) < 2:
+            return None
+        
+        return {
+            'uptime': lines[0].strip(),
+            'digest': lines[-1].split()[0]
+        }
+    
+    def get_config(self, device, incremental=False, cache_dir=None):
         """
         Récupère la configuration réseau complète
         
         Args:
             device: Dictionnaire contenant les paramètres de connexion
+            incremental: Empreintes d'abord, puis SFTP des seuls fichiers modifiés
+                (voir modules/config_fetch.py)
+            cache_dir: Cache des fichiers déjà récupérés (mode incrémental)
         
         Returns:
             str: Contenu de la configuration
         """
+        if incremental:
+            from .config_fetch import CACHE_DIR, ConfigFetcher
+            try:
+                return ConfigFetcher(cache_dir or CACHE_DIR, napalm=self).fetch(device)[0]
+            except Exception as e:
+                print(f"Erreur lors de la récupération de la configuration: {e}")
+                return ""
+        
         config_content = ""
         
         try:
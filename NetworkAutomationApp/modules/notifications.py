@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Module de notifications des alertes
+Envoie les événements d'AlertEngine sur les canaux de la section
+notifications de devices.yaml (email SMTP, webhook Slack, syslog UDP, fichier
+NDJSON local) sans bloquer la boucle de monitoring:
+
+- submit() dépose l'événement dans une file bornée et rend la main aussitôt;
+  un thread de fond fait tous les envois;
+- regroupement: le premier événement d'une rafale ouvre une fenêtre de
+  group_wait secondes, tout ce qui arrive dans la fenêtre part en un seul
+  message (un récapitulatif, pas 500 emails);
+- limitation: un canal n'envoie pas plus d'un message toutes les
+  min_interval secondes; les événements arrivés entre-temps rejoignent le
+  récapitulatif suivant, regroupés par équipement et métrique (dernier état);
+- connexions réutilisées: session SMTP et connexion HTTP keep-alive gardées
+  ouvertes entre deux envois (fermées après idle_timeout), socket UDP unique.
+
+    dispatcher = NotificationDispatcher.from_config(config.get('notifications', {}))
+    dispatcher.submit(event)
+    ...
+    dispatcher.close()   # envoie ce qui reste en attente
+"""
+
+import http.client
+import json
+import queue
+import smtplib
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from email.message import EmailMessage
+from urllib.parse import urlsplit
+
+from . import metrics
+from .alerts import format_event
+
+GROUP_WAIT = 5.0
+IDLE_TIMEOUT = 60.0
+QUEUE_SIZE = 10000
+MAX_LINES = 50
+_STOP = object()
+
+# Sévérités syslog (RFC 5424): critical -> crit, warning -> warning, fin d'alerte -> notice
+SYSLOG_SEVERITY = {'critical': 2, 'warning': 4, 'ok': 5}
+SYSLOG_FACILITIES = {'user': 1, 'daemon': 3, **{f'local{i}': 16 + i for i in range(8)}}
+
+
+def load_notifications(config_file='config/devices.yaml'):
+    """
+    Section notifications de la configuration
+
+    Returns:
+        dict: Canaux (vide si le fichier est absent ou illisible)
+    """
+    try:
+        from .inventory import load_section
+        return load_section(config_file, 'notifications')
+    except (OSError, ImportError) as e:
+        print(f"[!] Notifications indisponibles ({e})")
+        return {}
+
+
+class Digest:
+    """Événements en attente d'un canal, regroupés par équipement et métrique"""
+    def __init__(self):
+        self.groups = {}
+        self.events = 0
+        self.levels = Counter()
+
+    def __bool__(self):
+        return bool(self.groups)
+
+    def add(self, event):
+        key = (event['device'], event['metric'])
+        previous = self.groups.pop(key, None)
+        # Réinséré en fin: l'ordre suit le dernier changement de chaque groupe
+        self.groups[key] = (event, previous[1] + 1 if previous else 1)
+        self.events += 1
+        self.levels[event['level']] += 1
+
+    def subject(self):
+        if self.events == 1:
+            event = next(iter(self.groups.values()))[0]
+            state = 'OK' if event['level'] == 'ok' else event['level'].upper()
+            return f"[NetAuto] {state} {event['device']} {event['metric']}"
+        levels = ', '.join(f"{count} {level}" for level, count in sorted(self.levels.items()))
+        groups = f"{len(self.groups)} métrique" + ("s" if len(self.groups) > 1 else "")
+        return f"[NetAuto] {self.events} alertes sur {groups} ({levels})"
+
+    def lines(self, limit=MAX_LINES):
+        lines = []
+        for event, count in list(self.groups.values())[-limit:]:
+            suffix = f" ({count} changements)" if count > 1 else ""
+            lines.append(format_event(event) + suffix)
+        if len(self.groups) > limit:
+            lines.insert(0, f"... {len(self.groups) - limit} autres groupes omis")
+        return lines
+
+    def body(self):
+        return "\n".join(self.lines())
+
+
+class Channel:
+    """Canal de notification: regroupement, limitation et connexion persistante"""
+    name = 'channel'
+
+    def __init__(self, config):
+        self.min_interval = float(config.get('min_interval', 60))
+        self.group_wait = float(config.get('group_wait', GROUP_WAIT))
+        self.idle_timeout = float(config.get('idle_timeout', IDLE_TIMEOUT))
+        self.levels = set(config.get('levels', ['critical', 'warning', 'ok']))
+        self.pending = Digest()
+        self.due = None
+        self.last_sent = float('-inf')
+        self.last_used = 0.0
+        self.stats = Counter()
+
+    def accept(self, event, now):
+        """Ajoute un événement au récapitulatif en attente"""
+        if event['level'] not in self.levels:
+            return
+        self.pending.add(event)
+        if self.due is None:
+            self.due = max(now + self.group_wait, self.last_sent + self.min_interval)
+
+    def flush(self, now, force=False):
+        """Envoie le récapitulatif si son échéance est passée (ou force)"""
+        if not self.pending or (not force and now < self.due):
+            return
+        digest, self.pending, self.due = self.pending, Digest(), None
+        self.last_sent = self.last_used = now
+        try:
+            with metrics.timer('notification_send_seconds', channel=self.name):
+                self.send(digest)
+            self.stats['messages'] += 1
+            self.stats['events'] += digest.events
+            metrics.inc('notifications_total', channel=self.name, result='ok')
+        except Exception as e:
+            self.stats['failures'] += 1
+            metrics.inc('notifications_total', channel=self.name, result='error')
+            # Thread de fond: stderr, pour ne jamais se mêler à un flux NDJSON sur stdout
+            print(f"[!] Notification {self.name} en échec: {e}", file=sys.stderr)
+            self.disconnect()
+
+    def idle(self, now):
+        """Ferme la connexion inutilisée depuis idle_timeout"""
+        if now - self.last_used > self.idle_timeout:
+            self.disconnect()
+
+    def send(self, digest):
+        raise NotImplementedError
+
+    def disconnect(self):
+        pass
+
+
+class EmailChannel(Channel):
+    """Récapitulatif par email, session SMTP gardée ouverte entre deux envois"""
+    name = 'email'
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.server = config.get('smtp_server', 'localhost')
+        self.port = int(config.get('smtp_port', 25))
+        self.sender = config.get('from', 'netauto@localhost')
+        self.recipients = list(config.get('recipients', []))
+        self.username = config.get('username')
+        self.password = config.get('password')
+        self.starttls = config.get('starttls', self.port == 587)
+        self.timeout = float(config.get('timeout', 10))
+        self._smtp = None
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password or '')
+        self.stats['connections'] += 1
+        return smtp
+
+    def send(self, digest):
+        message = EmailMessage()
+        message['Subject'] = digest.subject()
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        message.set_content(digest.body())
+        if self._smtp is not None:
+            try:
+                self._smtp.send_message(message)
+                return
+            except (smtplib.SMTPServerDisconnected, OSError):
+                # Session fermée par le serveur entre deux envois: une nouvelle tentative
+                self.disconnect()
+        self._smtp = self._connect()
+        self._smtp.send_message(message)
+
+    def disconnect(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+
+class SlackChannel(Channel):
+    """Récapitulatif sur un webhook Slack, connexion HTTP keep-alive"""
+    name = 'slack'
+
+    def __init__(self, config):
+        super().__init__(config)
+        url = urlsplit(config.get('webhook_url', ''))
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise ValueError(f"webhook_url invalide: {config.get('webhook_url')!r}")
+        self.scheme, self.host, self.port = url.scheme, url.hostname, url.port
+        self.path = url.path + (f'?{url.query}' if url.query else '') or '/'
+        self.timeout = float(config.get('timeout', 10))
+        self._http = None
+
+    def _connect(self):
+        factory = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        self.stats['connections'] += 1
+        return factory(self.host, self.port, timeout=self.timeout)
+
+    def _post(self, body):
+        self._http.request('POST', self.path, body=body, headers={'Content-Type': 'application/json'})
+        response = self._http.getresponse()
+        response.read()
+        if response.status >= 300:
+            raise RuntimeError(f"HTTP {response.status}")
+
+    def send(self, digest):
+        body = json.dumps({'text': f"*{digest.subject()}*\n" + digest.body()}).encode('utf-8')
+        if self._http is not None:
+            try:
+                self._post(body)
+                return
+            except (http.client.HTTPException, OSError):
+                # Connexion keep-alive fermée par le serveur: une nouvelle tentative
+                self.disconnect()
+        self._http = self._connect()
+        self._post(body)
+
+    def disconnect(self):
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+
+class SyslogChannel(Channel):
+    """Un message syslog (RFC 5424, UDP) par groupe du récapitulatif, max_messages au plus"""
+    name = 'syslog'
+
+    def __init__(self, config):
+        config = {'min_interval': 0, 'group_wait': 1, **config}
+        super().__init__(config)
+        self.address = (config.get('server', 'localhost'), int(config.get('port', 514)))
+        self.facility = SYSLOG_FACILITIES.get(config.get('facility', 'local0'), 16)
+        # Au-delà, les groupes restants d'un récapitulatif tiennent en un message
+        self.max_messages = int(config.get('max_messages', 200))
+        self.hostname = socket.gethostname()
+        self._socket = None
+
+    def send(self, digest):
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.stats['connections'] += 1
+        timestamp = datetime.now().astimezone().isoformat(timespec='milliseconds')
+        groups = list(digest.groups.values())
+        overflow = groups[self.max_messages:]
+        for event, count in groups[:self.max_messages]:
+            text = format_event(event) + (f" ({count} changements)" if count > 1 else "")
+            self._send(SYSLOG_SEVERITY.get(event['level'], 5), timestamp, text)
+        if overflow:
+            worst = min(SYSLOG_SEVERITY.get(event['level'], 5) for event, _ in overflow)
+            devices = len({event['device'] for event, _ in overflow})
+            self._send(worst, timestamp, f"{len(overflow)} autres alertes sur {devices} équipements "
+                                         f"({sum(count for _, count in overflow)} changements)")
+
+    def _send(self, severity, timestamp, text):
+        line = f"<{self.facility * 8 + severity}>1 {timestamp} {self.hostname} netauto - alert - {text}"
+        self._socket.sendto(line.encode('utf-8'), self.address)
+        self.stats['datagrams'] += 1
+
+    def disconnect(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class FileChannel(Channel):
+    """Événements ajoutés à un fichier NDJSON local (journal, essais)"""
+    name = 'file'
+
+    def __init__(self, config):
+        config = {'min_interval': 0, 'group_wait': 0, **config}
+        super().__init__(config)
+        self.path = config.get('path', 'reports/alerts.ndjson')
+
+    def send(self, digest):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for event, count in digest.groups.values():
+                f.write(json.dumps(dict(event, changes=count), default=str, ensure_ascii=False) + "\n")
+
+
+CHANNELS = {'email': EmailChannel, 'slack': SlackChannel, 'syslog': SyslogChannel, 'file': FileChannel}
+
+
+class NotificationDispatcher:
+    """
+    File d'envoi des alertes et thread d'expédition
+
+    submit() ne bloque jamais: file pleine, l'événement est compté dans
+    stats['dropped']. close() arrête le thread après avoir envoyé tout ce qui
+    reste en attente, échéances comprises.
+    """
+    def __init__(self, channels, queue_size=QUEUE_SIZE):
+        self.channels = list(channels)
+        self.stats = Counter()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, notifications, **kwargs):
+        """Canaux activés (enabled: true) de la section notifications"""
+        channels = []
+        for name, config in (notifications or {}).items():
+            if name not in CHANNELS or not (config or {}).get('enabled'):
+                continue
+            try:
+                channels.append(CHANNELS[name](config))
+            except ValueError as e:
+                print(f"[!] Canal {name} ignoré: {e}")
+        return cls(channels, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, event):
+        """Dépose un événement d'alerte (retour immédiat)"""
+        if not self.channels:
+            return False
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='notifications', daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.stats['dropped'] += 1
+            metrics.inc('notifications_dropped_total')
+            return False
+        self.stats['submitted'] += 1
+        return True
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            due = [channel.due for channel in self.channels if channel.due is not None]
+            wait = min(max(0.0, min(due) - now), 1.0) if due else 1.0
+            try:
+                event = self._queue.get(timeout=wait)
+            except queue.Empty:
+                event = None
+            # Vide la file d'un coup: une rafale est regroupée avant tout envoi
+            events = [event]
+            while True:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            now = time.monotonic()
+            stopping = False
+            for event in events:
+                if event is None:
+                    continue
+                if event is _STOP:
+                    stopping = True
+                    continue
+                for channel in self.channels:
+                    channel.accept(event, now)
+            for channel in self.channels:
+                channel.flush(now, force=stopping)
+                if stopping:
+                    channel.disconnect()
+                else:
+                    channel.idle(now)
+            if stopping:
+                return
+
+    def close(self, timeout=30):
+        """Envoie les récapitulatifs en attente et arrête le thread"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def channel_stats(self):
+        return {channel.name: dict(channel.stats) for channel in self.channels}
+
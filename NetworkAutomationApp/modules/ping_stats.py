@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Module de statistiques ping
+Extrait chaque réponse (icmp_seq, RTT) des sorties ping avec une expression
+régulière par sortie (pas de boucle par ligne), puis calcule perte, gigue,
+percentiles et écart type avec NumPy pour toutes les sorties à la fois
+(calculs groupés par sortie).
+
+Formats reconnus: iputils (Linux), BSD/macOS, BusyBox (seq=) et Windows
+(sans numéro de séquence: l'ordre des réponses en tient lieu).
+
+    from modules.ping_stats import analyze, analyze_many
+    analyze(sortie)                # dict pour une sortie
+    analyze_many([s1, s2, ...])    # liste de dicts, même ordre
+"""
+
+import re
+
+import numpy as np
+
+# Motifs à préfixe littéral (recherche rapide par re): réponse Unix
+# "icmp_seq=3 ttl=64 time=0.512 ms" (BusyBox: "seq=3"), réponse Windows
+# "bytes=32 time=12ms" / "time<1ms"
+UNIX_REPLY_RE = re.compile(r'seq=(\d+) ttl=\d+ time[=<]([\d.]+)')
+WINDOWS_REPLY_RE = re.compile(r'bytes=\d+ time[=<](\d+)ms')
+# Résumés: "4 packets transmitted, 3 received" / "Sent = 4, Received = 3"
+UNIX_SENT_RE = re.compile(r'(\d+) packets transmitted')
+WINDOWS_SENT_RE = re.compile(r'Sent = (\d+)')
+
+PERCENTILES = (50, 90, 95, 99)
+RTT_FIELDS = ('min_rtt', 'avg_rtt', 'max_rtt', 'stddev', 'jitter') + tuple(f'p{p}' for p in PERCENTILES)
+
+
+def _sent(output):
+    """Paquets envoyés d'après le résumé final (-1 si absent)"""
+    index = output.rfind(' packets transmitted')
+    if index >= 0:
+        match = UNIX_SENT_RE.match(output, output.rfind('\n', 0, index) + 1)
+        if match:
+            return int(match.group(1))
+    match = WINDOWS_SENT_RE.search(output, max(0, output.rfind('Sent = ')))
+    return int(match.group(1)) if match else -1
+
+
+def _numbers(strings, width):
+    """Chaînes numériques -> tableau float64 (width colonnes), conversion en un appel C"""
+    if not strings:
+        return np.empty((0, width))
+    return np.fromstring(' '.join(strings), sep=' ').reshape(-1, width)
+
+
+def parse_replies(outputs):
+    """
+    Extrait les réponses de plusieurs sorties ping
+
+    Args:
+        outputs: Liste de sorties texte de la commande ping
+
+    Returns:
+        tuple: (group, seq, rtt_ms, sent) où group/seq/rtt ont une entrée par
+        réponse (group = indice de la sortie) et sent une entrée par sortie
+        (-1 si le résumé est absent)
+    """
+    unix_rows, unix_counts = [], []
+    windows_rows, windows_counts = [], []
+    sent = []
+    for output in outputs:
+        replies = UNIX_REPLY_RE.findall(output)
+        unix_rows.extend(replies)
+        unix_counts.append(len(replies))
+        # Windows: pas de numéro de séquence, l'ordre des réponses en tient lieu
+        replies = [] if replies else WINDOWS_REPLY_RE.findall(output)
+        windows_rows.extend(replies)
+        windows_counts.append(len(replies))
+        sent.append(_sent(output))
+
+    indices = np.arange(len(outputs))
+    unix = _numbers([value for row in unix_rows for value in row], 2)
+    windows_group = np.repeat(indices, windows_counts)
+    windows_seq = np.arange(windows_group.size) - np.searchsorted(windows_group, windows_group)
+    return (
+        np.concatenate((np.repeat(indices, unix_counts), windows_group)),
+        np.concatenate((unix[:, 0].astype(np.int64), windows_seq)),
+        np.concatenate((unix[:, 1], _numbers(windows_rows, 1)[:, 0])),
+        np.array(sent, dtype=np.int64)
+    )
+
+
+def ping_statistics(group, seq, rtt, sent):
+    """
+    Statistiques par sortie, calculées en bloc
+
+    Les doublons (DUP!) ne comptent qu'une fois. La gigue est la moyenne des
+    écarts absolus entre RTT successifs (ordre des numéros de séquence).
+    Sans résumé, les paquets envoyés sont déduits de l'étendue des séquences.
+
+    Args:
+        group, seq, rtt, sent: Sortie de parse_replies
+
+    Returns:
+        dict: Tableaux d'une entrée par sortie: sent, received, duplicates,
+        packet_loss (%), min/avg/max_rtt, stddev, jitter, p50/p90/p95/p99 (ms,
+        NaN sans réponse)
+    """
+    n = sent.size
+    # Tri par sortie puis séquence, doublons retirés
+    order = np.lexsort((seq, group))
+    group, seq, rtt = group[order], seq[order], rtt[order]
+    keep = np.ones(group.size, dtype=bool)
+    keep[1:] = (group[1:] != group[:-1]) | (seq[1:] != seq[:-1])
+    duplicates = np.bincount(group[~keep], minlength=n)
+    group, seq, rtt = group[keep], seq[keep], rtt[keep]
+
+    received = np.bincount(group, minlength=n)
+    starts = np.cumsum(received) - received
+    has = received > 0
+    first, last = starts[has], starts[has] + received[has] - 1
+
+    span = np.zeros(n, dtype=np.int64)
+    span[has] = seq[last] - seq[first] + 1
+    sent = np.maximum(np.where(sent >= 0, sent, span), received)
+    loss = np.where(sent > 0, 100.0 * (sent - received) / np.maximum(sent, 1), 100.0)
+
+    stats = {'sent': sent, 'received': received, 'duplicates': duplicates, 'packet_loss': loss}
+    stats.update({field: np.full(n, np.nan) for field in RTT_FIELDS})
+    if not has.any():
+        return stats
+
+    count = received[has]
+    mean = np.bincount(group, weights=rtt, minlength=n)[has] / count
+    deviation = rtt - np.repeat(mean, count)
+    stats['avg_rtt'][has] = mean
+    stats['stddev'][has] = np.sqrt(np.bincount(group, weights=deviation * deviation, minlength=n)[has] / count)
+    stats['min_rtt'][has] = np.minimum.reduceat(rtt, first)
+    stats['max_rtt'][has] = np.maximum.reduceat(rtt, first)
+
+    same = group[1:] == group[:-1]
+    jitter_sum = np.bincount(group[1:][same], weights=np.abs(np.diff(rtt))[same], minlength=n)
+    stats['jitter'] = np.where(received > 1, jitter_sum / np.maximum(received - 1, 1), stats['jitter'])
+    stats['jitter'][received == 1] = 0.0
+
+    # Percentiles (interpolation linéaire, comme np.percentile) sur les RTT triés par sortie
+    ordered = rtt[np.lexsort((rtt, group))]
+    for p in PERCENTILES:
+        position = first + (count - 1) * (p / 100)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        stats[f'p{p}'][has] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    return stats
+
+
+def _records(stats):
+    """Tableaux par champ -> un dict par sortie (RTT arrondis, None sans réponse)"""
+    columns = {key: stats[key].tolist() for key in ('sent', 'received', 'duplicates')}
+    columns['packet_loss'] = np.round(stats['packet_loss'], 2).tolist()
+    for field in RTT_FIELDS:
+        values = np.round(stats[field], 3)
+        columns[field] = np.where(np.isnan(values), None, values).tolist()
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def analyze_many(outputs):
+    """
+    Statistiques de plusieurs sorties ping en une passe
+
+    Returns:
+        list: Un dict par sortie (voir ping_statistics), dans l'ordre des sorties
+    """
+    outputs = list(outputs)
+    if not outputs:
+        return []
+    return _records(ping_statistics(*parse_replies(outputs)))
+
+
+def analyze(output):
+    """Statistiques d'une sortie ping"""
+    return analyze_many([output])[0]
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Module de collecte des métriques hôte via /proc
+Une seule commande SSH lit /proc/uptime, /proc/stat, /proc/meminfo,
+/proc/loadavg et /proc/net/dev. Le collecteur garde l'instantané précédent
+de chaque équipement et calcule CPU %, mémoire % et débits des interfaces
+à partir des écarts de compteurs, sur l'intervalle mesuré par l'équipement
+lui-même (/proc/uptime, indépendant de la latence SSH).
+
+    collector = ProcCollector()
+    collector.sample(device)   # 1er appel: mémoire et charge; débits et CPU ensuite
+"""
+
+import re
+import threading
+from datetime import datetime
+
+from .monitoring import NetworkMonitoring
+
+COMMAND = "cat /proc/uptime /proc/stat /proc/meminfo /proc/loadavg /proc/net/dev"
+
+# Champs de la ligne "cpu" utilisés: user nice system idle iowait irq softirq steal
+# (guest et guest_nice sont déjà comptés dans user et nice)
+CPU_FIELDS = 8
+# Colonnes de /proc/net/dev retenues: (nom, indice)
+NET_FIELDS = (('rx_bytes', 0), ('rx_packets', 1), ('rx_errors', 2), ('rx_dropped', 3),
+              ('tx_bytes', 8), ('tx_packets', 9), ('tx_errors', 10), ('tx_dropped', 11))
+
+MEMINFO_RE = re.compile(r'^(\w+):\s+(\d+)(?: kB)?$')
+LOADAVG_RE = re.compile(r'^([\d.]+) ([\d.]+) ([\d.]+) (\d+)/(\d+) \d+$')
+UPTIME_RE = re.compile(r'^([\d.]+) [\d.]+$')
+NET_DEV_RE = re.compile(r'^\s*([^:\s]+):\s*((?:\d+\s+){15}\d+)\s*$')
+
+
+def parse_proc(output):
+    """
+    Instantané des compteurs d'après la sortie de COMMAND
+
+    Returns:
+        dict: uptime (s), cpu (tuple de jiffies), meminfo (kB), load, procs,
+        net {interface: {compteur: valeur}}
+    """
+    snapshot = {'uptime': None, 'cpu': None, 'meminfo': {}, 'load': None, 'procs': None, 'net': {}}
+    for line in output.splitlines():
+        if line.startswith('cpu '):
+            snapshot['cpu'] = tuple(int(value) for value in line.split()[1:CPU_FIELDS + 1])
+            continue
+        match = MEMINFO_RE.match(line)
+        if match:
+            snapshot['meminfo'][match.group(1)] = int(match.group(2))
+            continue
+        match = NET_DEV_RE.match(line)
+        if match:
+            values = match.group(2).split()
+            snapshot['net'][match.group(1)] = {name: int(values[i]) for name, i in NET_FIELDS}
+            continue
+        match = LOADAVG_RE.match(line)
+        if match:
+            snapshot['load'] = [float(match.group(i)) for i in (1, 2, 3)]
+            snapshot['procs'] = {'running': int(match.group(4)), 'total': int(match.group(5))}
+            continue
+        match = UPTIME_RE.match(line)
+        if match and snapshot['uptime'] is None:
+            snapshot['uptime'] = float(match.group(1))
+    return snapshot
+
+
+def counter_delta(new, old):
+    """
+    Écart entre deux lectures d'un compteur monotone
+
+    Un compteur qui recule a soit débordé sur 32 bits (ancienne valeur dans
+    la moitié haute: l'écart passe par 2**32), soit été remis à zéro
+    (interface recréée: l'écart est la nouvelle valeur).
+    """
+    if new >= old:
+        return new - old
+    if 2**31 <= old < 2**32:
+        return new + 2**32 - old
+    return new
+
+
+def memory_usage(meminfo):
+    """Mémoire utilisée (%) = (total - disponible) / total"""
+    total = meminfo.get('MemTotal')
+    if not total:
+        return None
+    available = meminfo.get('MemAvailable')
+    if available is None:
+        # Noyaux < 3.14: approximation libre + tampons + cache
+        available = meminfo.get('MemFree', 0) + meminfo.get('Buffers', 0) + meminfo.get('Cached', 0)
+    return round(100 * (total - available) / total, 1)
+
+
+def cpu_usage(new, old):
+    """CPU utilisé (%) entre deux lignes cpu de /proc/stat"""
+    deltas = [counter_delta(n, o) for n, o in zip(new, old)]
+    total = sum(deltas)
+    if total <= 0:
+        return None
+    idle = deltas[3] + (deltas[4] if len(deltas) > 4 else 0)
+    return round(100 * (total - idle) / total, 1)
+
+
+def interface_rates(new, old, interval):
+    """Débits par interface (par seconde) entre deux lectures de /proc/net/dev"""
+    rates = {}
+    for name, counters in new.items():
+        previous = old.get(name)
+        if previous is None:
+            continue
+        rates[name] = {
+            f"{counter}_per_s": round(counter_delta(value, previous[counter]) / interval, 2)
+            for counter, value in counters.items()
+        }
+    return rates
+
+
+class ProcCollector:
+    """
+    Collecteur /proc avec instantané précédent par équipement
+
+    Le premier échantillon d'un équipement (ou le premier après un
+    redémarrage, détecté par un uptime qui recule) ne donne que mémoire et
+    charge: CPU et débits demandent deux lectures.
+    """
+    def __init__(self):
+        self._previous = {}
+        self._lock = threading.Lock()
+
+    def sample(self, device, client=None):
+        """
+        Lit /proc sur l'équipement et calcule les métriques
+
+        Args:
+            device: Paramètres de connexion
+            client: Client SSH déjà ouvert (réutilisé, non fermé)
+
+        Returns:
+            dict: cpu_usage, memory_usage, load, procs, interfaces, interval, ou error
+        """
+        try:
+            if client is None:
+                client = NetworkMonitoring._ssh_connect(device)
+                try:
+                    output = NetworkMonitoring._ssh_run(client, COMMAND)
+                finally:
+                    client.close()
+            else:
+                output = NetworkMonitoring._ssh_run(client, COMMAND)
+            return self.update(device.get('name', device['host']), parse_proc(output))
+        except Exception as e:
+            return {
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def update(self, key, snapshot):
+        """Enregistre l'instantané de l'équipement et calcule les écarts avec le précédent"""
+        if snapshot['uptime'] is None or snapshot['cpu'] is None:
+            raise ValueError("Sortie /proc incomplète")
+
+        with self._lock:
+            previous = self._previous.get(key)
+            self._previous[key] = snapshot
+
+        result = {
+            'cpu_usage': None,
+            'memory_usage': memory_usage(snapshot['meminfo']),
+            'load': snapshot['load'],
+            'procs': snapshot['procs'],
+            'interfaces': {},
+            'interval': None,
+            'timestamp': datetime.now().isoformat()
+        }
+        interval = snapshot['uptime'] - previous['uptime'] if previous else 0
+        if interval > 0:
+            result['interval'] = round(interval, 2)
+            result['cpu_usage'] = cpu_usage(snapshot['cpu'], previous['cpu'])
+            result['interfaces'] = interface_rates(snapshot['net'], previous['net'], interval)
+        return result
+
+    def forget(self, key):
+        """Oublie l'instantané d'un équipement"""
+        with self._lock:
+            self._previous.pop(key, None)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Module de profilage à la demande
+Enveloppe une requête de l'API ou une sous-commande de la CLI dans cProfile
+et écrit le profil (.prof, lisible avec pstats ou snakeviz) accompagné d'un
+résumé texte trié par temps cumulé dans reports/profiles/.
+
+- API: activer à chaud (POST /api/profiling {"enabled": true}) puis
+  envoyer la requête avec l'en-tête X-Profile: 1 ou le paramètre ?profile=1.
+- CLI: option --profile (toute la sous-commande), ou SIGUSR1 pour démarrer
+  et arrêter un profil pendant une exécution longue (monitor, menu).
+
+Avant Python 3.12, cProfile ne suit que le thread qui l'active: les threads
+créés pendant la session (pools de BatchRunner) reçoivent leur propre
+profileur, fusionné à l'arrêt. À partir de 3.12, un seul profileur couvre
+tout l'interpréteur.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_DIR = os.environ.get('NETAUTO_PROFILE_DIR', os.path.join('reports', 'profiles'))
+SUMMARY_LINES = 40
+
+_enabled = os.environ.get('NETAUTO_PROFILING', '').lower() in ('1', 'true', 'yes', 'on')
+# Un seul profil à la fois (cProfile >= 3.12 refuse deux profileurs actifs)
+_active = threading.Lock()
+
+
+def enable():
+    """Autorise le profilage des requêtes marquées"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def requested(value):
+    """True si la valeur d'en-tête ou de paramètre demande un profil"""
+    return str(value or '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class ProfileSession:
+    """
+    Session cProfile, éventuellement étendue aux threads créés pendant la session
+
+    Une seule session peut être active à la fois: start() retourne False
+    si un autre profil est en cours.
+    """
+    def __init__(self, threads=True):
+        self.threads = threads and sys.version_info < (3, 12)
+        self.profilers = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        if not _active.acquire(blocking=False):
+            return False
+        self._started = True
+        if self.threads:
+            threading.setprofile(self._thread_hook)
+        profiler = cProfile.Profile()
+        self.profilers.append(profiler)
+        profiler.enable()
+        return True
+
+    def _thread_hook(self, frame, event, arg):
+        """Premier appel d'un nouveau thread: installe son propre profileur"""
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.profilers.append(profiler)
+        profiler.enable()
+
+    def stop(self):
+        """
+        Arrête la session
+
+        Returns:
+            pstats.Stats: Statistiques fusionnées (None si la session n'a pas démarré)
+        """
+        if not self._started:
+            return None
+        self._started = False
+        self.profilers[0].disable()
+        if self.threads:
+            threading.setprofile(None)
+        try:
+            with self._lock:
+                profilers = list(self.profilers)
+            stats = pstats.Stats(profilers[0])
+            for profiler in profilers[1:]:
+                # Profileur d'un thread encore vivant ou sans appel: ignoré
+                try:
+                    stats.add(profiler)
+                except (TypeError, ValueError):
+                    pass
+            return stats
+        finally:
+            _active.release()
+
+
+def write_profile(stats, name, directory=None):
+    """
+    Écrit le profil binaire et son résumé texte
+
+    Args:
+        stats: pstats.Stats
+        name: Préfixe du fichier (ex: api_get_stats, cli_collect)
+        directory: Répertoire de sortie (défaut: PROFILE_DIR)
+
+    Returns:
+        Path: Chemin du fichier .prof
+    """
+    profile_dir = Path(directory or PROFILE_DIR)
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    path = profile_dir / f"{safe_name}_{timestamp}.prof"
+    stats.dump_stats(str(path))
+
+    summary = io.StringIO()
+    stats.stream = summary
+    stats.sort_stats('cumulative').print_stats(SUMMARY_LINES)
+    path.with_suffix('.txt').write_text(summary.getvalue(), encoding='utf-8')
+    return path
+
+
+def recent_profiles(directory=None, limit=20):
+    """Profils les plus récents (noms de fichiers .prof)"""
+    profile_dir = Path(directory or PROFILE_DIR)
+    if not profile_dir.exists():
+        return []
+    files = sorted(profile_dir.glob('*.prof'), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [p.name for p in files[:limit]]
+
+
+def install_signal_toggle(name, directory=None):
+    """
+    SIGUSR1 démarre puis arrête un profil (POSIX uniquement)
+
+    Args:
+        name: Préfixe des fichiers écrits
+        directory: Répertoire de sortie (défaut: PROFILE_DIR)
+
+    Returns:
+        bool: True si le signal a été installé
+    """
+    import signal
+    if not hasattr(signal, 'SIGUSR1'):
+        return False
+
+    state = {'session': None}
+
+    def toggle(signum, frame):
+        session = state['session']
+        if session is None:
+            session = ProfileSession()
+            if session.start():
+                state['session'] = session
+                print("[*] Profilage démarré (SIGUSR1 pour arrêter)", file=sys.stderr)
+            return
+        state['session'] = None
+        path = write_profile(session.stop(), name, directory)
+        print(f"[+] Profil écrit: {path}", file=sys.stderr)
+
+    signal.signal(signal.SIGUSR1, toggle)
+    return True
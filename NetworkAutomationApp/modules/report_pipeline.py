@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Module de pipeline de rapports
+Normalise une seule fois les résultats collectés, puis rend tous les formats
+configurés (reports.formats) en parallèle dans un pool de processus
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from . import metrics, tracing
+from .reports import ReportGenerator
+
+# Format configuré -> méthode de ReportGenerator
+FORMAT_RENDERERS = {
+    'text': 'generate_inventory_report',
+    'json': 'generate_json_report',
+    'jsonl': 'generate_jsonl_report',
+    'html': 'generate_html_report',
+}
+
+# Sections utilisées par les rapports d'inventaire
+INVENTORY_KEYS = ('facts', 'interfaces', 'routes', 'state_digest')
+
+
+def normalize_results(results):
+    """
+    Normalise les résultats collectés en représentation intermédiaire
+
+    Ne garde que les sections rendues par les rapports et convertit les
+    valeurs en types JSON simples (dates, objets -> str).
+
+    Args:
+        results: Dictionnaire ou itérateur de paires (équipement, données)
+
+    Yields:
+        tuple: (nom de l'équipement, données normalisées)
+    """
+    items = results.items() if hasattr(results, 'items') else results
+    for device_name, device_data in items:
+        section = {key: device_data[key] for key in INVENTORY_KEYS if key in (device_data or {})}
+        yield str(device_name), json.loads(json.dumps(section, default=str))
+
+
+def _iter_ir(ir_file):
+    """Relit la représentation intermédiaire ligne par ligne"""
+    with open(ir_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            yield record['device'], record['data']
+
+
+def _render_format(fmt, ir_file, report_dir, incremental=False):
+    """
+    Rend un format à partir de la représentation intermédiaire (processus worker)
+
+    Returns:
+        tuple: (format, chemin du fichier, durée en secondes)
+    """
+    start = time.perf_counter()
+    reporter = ReportGenerator(report_dir)
+    method = getattr(reporter, FORMAT_RENDERERS[fmt])
+
+    if fmt in ('json', 'jsonl'):
+        path = method(_iter_ir(ir_file), report_name="inventory_report")
+    elif fmt == 'text':
+        path = method(_iter_ir(ir_file), incremental=incremental)
+    else:
+        path = method(_iter_ir(ir_file))
+
+    return fmt, path, time.perf_counter() - start
+
+
+class ReportPipeline:
+    """
+    Pipeline de génération multi-format
+
+    Les résultats sont normalisés une fois dans un fichier JSON Lines
+    intermédiaire, que chaque worker relit en flux pour produire son format.
+    Un manifeste JSON récapitule les fichiers produits et les durées.
+    En mode incrémental, le rapport texte réutilise les sections inchangées.
+    """
+    def __init__(self, formats=None, report_dir="reports", max_workers=None, incremental=False):
+        self.formats = []
+        for fmt in formats or ['text']:
+            if fmt in FORMAT_RENDERERS:
+                self.formats.append(fmt)
+            else:
+                print(f"[!] Format de rapport inconnu ignoré: {fmt}")
+        self.report_dir = Path(report_dir)
+        self.max_workers = max_workers
+        self.incremental = incremental
+
+    def run(self, results):
+        """
+        Normalise les résultats et rend tous les formats en parallèle
+
+        Args:
+            results: Dictionnaire ou itérateur de paires (équipement, données)
+
+        Returns:
+            dict: Manifeste (fichiers, durées par format)
+        """
+        self.report_dir.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        ir_file = self.report_dir / f".inventory_ir_{timestamp}_{os.getpid()}.jsonl"
+        total_start = time.perf_counter()
+
+        # Normalisation unique
+        start = time.perf_counter()
+        device_count = 0
+        with tracing.span('report_normalize'), open(ir_file, 'w', encoding='utf-8') as f:
+            for device_name, data in normalize_results(results):
+                f.write(json.dumps({'device': device_name, 'data': data}))
+                f.write("\n")
+                device_count += 1
+        normalize_seconds = time.perf_counter() - start
+
+        manifest = {
+            'generated': datetime.now().isoformat(),
+            'devices': device_count,
+            'normalize_seconds': round(normalize_seconds, 4),
+            'formats': {}
+        }
+
+        try:
+            render_start = time.perf_counter()
+            for fmt, path, seconds in self._render_all(str(ir_file)):
+                manifest['formats'][fmt] = {'file': path, 'seconds': round(seconds, 4)}
+                metrics.observe('report_render_seconds', seconds, format=fmt)
+                # Rendu mesuré dans le processus fils: placé au lancement du pool, une ligne par format
+                tracing.complete('report_render', render_start, seconds, lane=f"report:{fmt}", format=fmt)
+        finally:
+            ir_file.unlink(missing_ok=True)
+
+        manifest['total_seconds'] = round(time.perf_counter() - total_start, 4)
+
+        manifest_file = self.report_dir / f"manifest_{timestamp}.json"
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        manifest['manifest'] = str(manifest_file)
+
+        print(f"[+] Manifeste des rapports: {manifest_file}")
+        return manifest
+
+    def _render_sequential(self, ir_file):
+        return [_render_format(fmt, ir_file, str(self.report_dir), self.incremental) for fmt in self.formats]
+
+    def _render_all(self, ir_file):
+        """
+        Rend chaque format dans un pool de processus
+
+        Repli séquentiel si le pool ne démarre pas ou si un processus fils
+        meurt (BrokenProcessPool); une erreur de rendu (disque plein...) est
+        propagée telle quelle.
+        """
+        if len(self.formats) <= 1:
+            return self._render_sequential(ir_file)
+
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        
+        workers = self.max_workers or min(len(self.formats), os.cpu_count() or 1)
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError) as e:
+            print(f"[!] Pool de processus indisponible ({e}), rendu séquentiel")
+            return self._render_sequential(ir_file)
+        with executor:
+            try:
+                # Les processus fils sont lancés par submit: un échec ici vient du pool, pas du rendu
+                futures = [
+                    executor.submit(_render_format, fmt, ir_file, str(self.report_dir), self.incremental)
+                    for fmt in self.formats
+                ]
+            except (OSError, BrokenProcessPool) as e:
+                print(f"[!] Pool de processus indisponible ({e}), rendu séquentiel")
+                executor.shutdown(cancel_futures=True)
+                return self._render_sequential(ir_file)
+            try:
+                return [future.result() for future in futures]
+            except BrokenProcessPool as e:
+                print(f"[!] Pool de processus interrompu ({e}), rendu séquentiel")
+        return self._render_sequential(ir_file)
@@ -2,162 +2,73 @@
 """
 Module de génération de rapports
 Rapports d'inventaire, monitoring, dashboards
+
+Les générateurs acceptent soit un dictionnaire {équipement: données}, soit
+un itérateur de paires (équipement, données) : chaque section est écrite
+dans le fichier dès qu'elle arrive, sans garder tout l'inventaire en mémoire.
 """
 
+import hashlib
+import html
 import json
+import os
 from datetime import datetime
 from pathlib import Path
+from string import Template
 
-class ReportGenerator:
-    def __init__(self):
-        self.report_dir = Path("reports")
-        self.report_dir.mkdir(exist_ok=True)
-    
-    def generate_inventory_report(self, results):
-        """
-        Génère un rapport d'inventaire complet
-        
-        Args:
-            results: Dictionnaire avec les données collectées
-        
-        Returns:
-            str: Chemin du fichier rapport
-        """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.report_dir / f"inventory_report_{timestamp}.txt"
-        
-        with open(filename, 'w') as f:
-            f.write("="*70 + "\n")
-            f.write("RAPPORT D'INVENTAIRE RÉSEAU\n")
-            f.write(f"Généré le: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("="*70 + "\n\n")
-            
-            for device_name, device_data in results.items():
-                f.write(f"\n{'─'*70}\n")
-                f.write(f"ÉQUIPEMENT: {device_name}\n")
-                f.write(f"{'─'*70}\n")
-                
-                # Facts
-                if 'facts' in device_data:
-                    facts = device_data['facts']
-                    f.write("\n[INFORMATIONS SYSTÈME]\n")
-                    f.write(f"  Hostname: {facts.get('hostname', 'N/A')}\n")
-                    f.write(f"  Vendeur: {facts.get('vendor', 'N/A')}\n")
-                    f.write(f"  Uptime: {facts.get('uptime', 'N/A')}\n")
-                    f.write(f"  Kernel: {facts.get('kernel', 'N/A')}\n")
-                    f.write(f"  Version OS: {facts.get('os_version', 'N/A')}\n")
-                
-                # Interfaces
-                if 'interfaces' in device_data:
-                    interfaces = device_data['interfaces']
-                    f.write("\n[INTERFACES RÉSEAU]\n")
-                    for iface_name, iface_data in interfaces.items():
-                        f.write(f"  Interface: {iface_name}\n")
-                        f.write(f"    État: {iface_data.get('status', 'N/A')}\n")
-                        f.write(f"    MTU: {iface_data.get('mtu', 'N/A')}\n")
-                        addresses = iface_data.get('addresses', [])
-                        if addresses:
-                            f.write(f"    Adresses IP:\n")
-                            for addr in addresses:
-                                f.write(f"      - {addr}\n")
-                
-                # Routes
-                if 'routes' in device_data:
-                    routes = device_data['routes']
-                    f.write("\n[TABLE DE ROUTAGE]\n")
-                    for route, route_data in list(routes.items())[:10]:  # Top 10
-                        f.write(f"  Route: {route}\n")
-                        f.write(f"    Via: {route_data.get('via', 'N/A')}\n")
-                        f.write(f"    Interface: {route_data.get('interface', 'N/A')}\n")
-            
-            f.write("\n" + "="*70 + "\n")
-            f.write("FIN DU RAPPORT\n")
-            f.write("="*70 + "\n")
-        
-        print(f"[+] Rapport d'inventaire généré: {filename}")
-        return str(filename)
-    
-    def generate_monitoring_report(self, monitoring_data):
-        """
-        Génère un rapport de monitoring
-        
-        Args:
-            monitoring_data: Dictionnaire avec les données de monitoring
-        
-        Returns:
-            str: Chemin du fichier rapport
-        """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.report_dir / f"monitoring_report_{timestamp}.txt"
-        
-        with open(filename, 'w') as f:
-            f.write("="*70 + "\n")
-            f.write("RAPPORT DE MONITORING RÉSEAU\n")
-            f.write(f"Généré le: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("="*70 + "\n\n")
-            
-            for device_name, data in monitoring_data.items():
-                f.write(f"\n{'─'*70}\n")
-                f.write(f"ÉQUIPEMENT: {device_name}\n")
-                f.write(f"{'─'*70}\n")
-                
-                if isinstance(data, dict):
-                    f.write(f"  Succès: {data.get('success', 'N/A')}\n")
-                    f.write(f"  Statistiques: {data.get('stats', 'N/A')}\n")
-                    
-                    if 'min_rtt' in data:
-                        f.write(f"  RTT Min: {data['min_rtt']}ms\n")
-                        f.write(f"  RTT Avg: {data['avg_rtt']}ms\n")
-                        f.write(f"  RTT Max: {data['max_rtt']}ms\n")
-                    
-                    f.write(f"  Timestamp: {data.get('timestamp', 'N/A')}\n")
-            
-            f.write("\n" + "="*70 + "\n")
-            f.write("FIN DU RAPPORT\n")
-            f.write("="*70 + "\n")
-        
-        print(f"[+] Rapport de monitoring généré: {filename}")
-        return str(filename)
-    
-    def generate_json_report(self, results, report_name="report"):
-        """
-        Génère un rapport au format JSON
-        
-        Args:
-            results: Données à exporter
-            report_name: Nom du rapport
-        
-        Returns:
-            str: Chemin du fichier rapport
-        """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.report_dir / f"{report_name}_{timestamp}.json"
-        
-        export_data = {
-            'timestamp': datetime.now().isoformat(),
-            'devices': results
-        }
-        
-        with open(filename, 'w') as f:
-            json.dump(export_data, f, indent=2, default=str)
-        
-        print(f"[+] Rapport JSON généré: {filename}")
-        return str(filename)
-    
-    def generate_html_report(self, results):
-        """
-        Génère un rapport HTML interactif
-        
-        Args:
-            results: Données à afficher
-        
-        Returns:
-            str: Chemin du fichier rapport
-        """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.report_dir / f"report_{timestamp}.html"
-        
-        html_content = """
+# ===== TEMPLATES PRÉCOMPILÉS =====
+
+SEPARATOR = "="*70
+SUB_SEPARATOR = "─"*70
+
+TEXT_HEADER = Template(
+    SEPARATOR + "\n"
+    "$title\n"
+    "Généré le: $generated\n"
+    + SEPARATOR + "\n\n"
+)
+
+TEXT_FOOTER = "\n" + SEPARATOR + "\nFIN DU RAPPORT\n" + SEPARATOR + "\n"
+
+TEXT_DEVICE_HEADER = Template(
+    "\n" + SUB_SEPARATOR + "\n"
+    "ÉQUIPEMENT: $name\n"
+    + SUB_SEPARATOR + "\n"
+)
+
+TEXT_FACTS = Template(
+    "\n[INFORMATIONS SYSTÈME]\n"
+    "  Hostname: $hostname\n"
+    "  Vendeur: $vendor\n"
+    "  Uptime: $uptime\n"
+    "  Kernel: $kernel\n"
+    "  Version OS: $os_version\n"
+)
+
+TEXT_INTERFACE = Template(
+    "  Interface: $name\n"
+    "    État: $status\n"
+    "    MTU: $mtu\n"
+)
+
+TEXT_ROUTE = Template(
+    "  Route: $route\n"
+    "    Via: $via\n"
+    "    Interface: $interface\n"
+)
+
+TEXT_MONITORING = Template(
+    "  Succès: $success\n"
+    "  Statistiques: $stats\n"
+)
+
+TEXT_RTT = Template(
+    "  RTT Min: ${min_rtt}ms\n"
+    "  RTT Avg: ${avg_rtt}ms\n"
+    "  RTT Max: ${max_rtt}ms\n"
+)
+
+HTML_HEADER = Template("""
 <!DOCTYPE html>
 <html lang="fr">
 <head>
@@ -267,68 +178,66 @@ class ReportGenerator:
     <div class="container">
         <div class="header">
             <h1> Rapport d'Automatisation Réseau</h1>
-            <p>Généré le """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """</p>
+            <p>Généré le $generated</p>
         </div>
         
         <div class="content">
-"""
-        
-        for device_name, device_data in results.items():
-            html_content += f"""
+""")
+
+HTML_DEVICE_OPEN = Template("""
             <div class="device-card">
                 <div class="device-title">
-                    🖥️ {device_name}
+                    🖥️ $name
                     <span class="status-badge status-online">EN LIGNE</span>
                 </div>
                 
                 <div class="info-grid">
-"""
-            
-            if 'facts' in device_data:
-                facts = device_data['facts']
-                html_content += f"""
+""")
+
+HTML_FACTS = Template("""
                     <div class="info-item">
                         <div class="info-label">Hostname</div>
-                        <div class="info-value">{facts.get('hostname', 'N/A')}</div>
+                        <div class="info-value">$hostname</div>
                     </div>
                     <div class="info-item">
                         <div class="info-label">Uptime</div>
-                        <div class="info-value">{facts.get('uptime', 'N/A')}</div>
+                        <div class="info-value">$uptime</div>
                     </div>
                     <div class="info-item">
                         <div class="info-label">Kernel</div>
-                        <div class="info-value">{facts.get('kernel', 'N/A')}</div>
+                        <div class="info-value">$kernel</div>
                     </div>
                     <div class="info-item">
                         <div class="info-label">OS Version</div>
-                        <div class="info-value">{facts.get('os_version', 'N/A')}</div>
+                        <div class="info-value">$os_version</div>
                     </div>
-"""
-            
-            if 'interfaces' in device_data:
-                interfaces = device_data['interfaces']
-                html_content += """
+""")
+
+HTML_GRID_CLOSE = """
                 </div>
+"""
+
+HTML_INTERFACES_OPEN = """
                 <div class="interfaces-section">
                     <h3> Interfaces Réseau</h3>
 """
-                for iface_name, iface_data in interfaces.items():
-                    status = "🟢 UP" if iface_data.get('status') == 'up' else "🔴 DOWN"
-                    html_content += f"""
+
+HTML_INTERFACE = Template("""
                     <div class="interface-item">
-                        <strong>{iface_name}</strong> {status}
-                        <div>MTU: {iface_data.get('mtu', 'N/A')} | Adresses: {', '.join(iface_data.get('addresses', ['N/A']))}</div>
+                        <strong>$name</strong> $status
+                        <div>MTU: $mtu | Adresses: $addresses</div>
                     </div>
-"""
-                html_content += """
+""")
+
+HTML_INTERFACES_CLOSE = """
                 </div>
 """
-            
-            html_content += """
+
+HTML_DEVICE_CLOSE = """
             </div>
 """
-        
-        html_content += """
+
+HTML_FOOTER = """
         </div>
         
         <div class="footer">
@@ -338,13 +247,397 @@ class ReportGenerator:
 </body>
 </html>
 """
+
+# Marqueur laissé à la place de l'uptime dans les fragments mis en cache :
+# l'uptime change à chaque collecte sans que la section soit modifiée
+UPTIME_MARKER = "\x00UPTIME\x00"
+
+# Sections d'un équipement prises en compte dans l'empreinte
+FINGERPRINT_KEYS = ('facts', 'interfaces', 'routes')
+
+def _escape(value):
+    """Échappe une valeur pour l'insérer dans le HTML"""
+    return html.escape(str(value))
+
+class InventoryCache:
+    """
+    Cache des sections d'inventaire déjà rendues
+    
+    Pour chaque équipement: empreinte des données, fragment texte rendu,
+    condensat d'état distant (state_digest) et dernières données collectées.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.load()
+    
+    def load(self):
+        """Charge le cache depuis le disque (cache vide si absent ou illisible)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+    
+    def save(self):
+        """Écrit le cache de façon atomique"""
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, default=str)
+        os.replace(tmp_path, self.path)
+    
+    def get(self, device_name):
+        return self.entries.get(device_name)
+    
+    def put(self, device_name, fingerprint, fragment, device_data):
+        self.entries[device_name] = {
+            'fingerprint': fingerprint,
+            'fragment': fragment,
+            'digest': device_data.get('state_digest'),
+            'data': {key: device_data[key] for key in FINGERPRINT_KEYS if key in device_data}
+        }
+    
+    @staticmethod
+    def fingerprint(device_data):
+        """
+        Calcule l'empreinte d'une section d'équipement (hors uptime)
+        
+        Returns:
+            str: Empreinte SHA-256 hexadécimale
+        """
+        section = {key: device_data.get(key) for key in FINGERPRINT_KEYS}
+        if section['facts']:
+            section['facts'] = {k: v for k, v in section['facts'].items() if k != 'uptime'}
+        payload = json.dumps(section, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ReportGenerator:
+    def __init__(self, report_dir="reports"):
+        # Le répertoire est créé à la première écriture, pas à l'instanciation
+        self.report_dir = Path(report_dir)
+    
+    def _report_path(self, name):
+        """Retourne le chemin d'un fichier rapport en créant le répertoire si besoin"""
+        self.report_dir.mkdir(exist_ok=True)
+        return self.report_dir / name
+    
+    @property
+    def inventory_cache_path(self):
+        """Chemin du cache des sections d'inventaire"""
+        return self.report_dir / ".inventory_cache.json"
+    
+    def generate_inventory_report(self, results, incremental=False):
+        """
+        Génère un rapport d'inventaire complet
+        
+        Args:
+            results: Dictionnaire ou itérateur de paires (équipement, données)
+            incremental: Réutilise les sections inchangées depuis le dernier
+                rapport et ajoute un résumé des changements
+        
+        Returns:
+            str: Chemin du fichier rapport
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = self._report_path(f"inventory_report_{timestamp}.txt")
+        cache = InventoryCache(self.inventory_cache_path) if incremental else None
+        changes = {'new': [], 'changed': [], 'unchanged': []}
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(TEXT_HEADER.substitute(
+                title="RAPPORT D'INVENTAIRE RÉSEAU",
+                generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ))
+            
+            seen = set()
+            for device_name, device_data in self._iter_results(results):
+                if cache is None:
+                    f.write(self.render_inventory_section(device_name, device_data))
+                else:
+                    f.write(self._render_cached_section(cache, device_name, device_data, changes))
+                    seen.add(device_name)
+                f.flush()
+            
+            if cache is not None:
+                removed = [name for name in cache.entries if name not in seen]
+                for name in removed:
+                    del cache.entries[name]
+                f.write(self.render_changes_summary(changes, removed))
+                cache.save()
+            
+            f.write(TEXT_FOOTER)
+        
+        print(f"[+] Rapport d'inventaire généré: {filename}")
+        return str(filename)
+    
+    def _render_cached_section(self, cache, device_name, device_data, changes):
+        """Rend une section en réutilisant le fragment en cache si l'empreinte est inchangée"""
+        fingerprint = InventoryCache.fingerprint(device_data)
+        entry = cache.get(device_name)
+        
+        if entry and entry['fingerprint'] == fingerprint:
+            changes['unchanged'].append(device_name)
+            fragment = entry['fragment']
+        else:
+            changes['changed' if entry else 'new'].append(device_name)
+            marked = dict(device_data)
+            if 'facts' in marked:
+                marked['facts'] = dict(marked['facts'], uptime=UPTIME_MARKER)
+            fragment = self.render_inventory_section(device_name, marked)
+        cache.put(device_name, fingerprint, fragment, device_data)
+        
+        uptime = device_data.get('facts', {}).get('uptime', 'N/A')
+        return fragment.replace(UPTIME_MARKER, str(uptime))
+    
+    @staticmethod
+    def render_changes_summary(changes, removed):
+        """
+        Rend le résumé des changements depuis le dernier rapport
+        
+        Args:
+            changes: Dictionnaire {'new', 'changed', 'unchanged'} -> noms d'équipements
+            removed: Équipements présents dans le dernier rapport mais plus maintenant
+        
+        Returns:
+            str: Section formatée
+        """
+        parts = [
+            "\n" + SUB_SEPARATOR + "\n",
+            "CHANGEMENTS DEPUIS LE DERNIER RAPPORT\n",
+            SUB_SEPARATOR + "\n",
+            f"  Nouveaux: {len(changes['new'])}\n",
+            f"  Modifiés: {len(changes['changed'])}\n",
+            f"  Inchangés: {len(changes['unchanged'])}\n",
+            f"  Supprimés: {len(removed)}\n",
+        ]
+        parts.extend(f"  + {name} (nouveau)\n" for name in changes['new'])
+        parts.extend(f"  ~ {name} (modifié)\n" for name in changes['changed'])
+        parts.extend(f"  - {name} (supprimé)\n" for name in removed)
+        return "".join(parts)
+    
+    @staticmethod
+    def render_inventory_section(device_name, device_data):
+        """
+        Rend la section texte d'un équipement du rapport d'inventaire
+        
+        Args:
+            device_name: Nom de l'équipement
+            device_data: Données collectées (facts, interfaces, routes)
+        
+        Returns:
+            str: Section formatée
+        """
+        parts = [TEXT_DEVICE_HEADER.substitute(name=device_name)]
+        
+        # Facts
+        if 'facts' in device_data:
+            facts = device_data['facts']
+            parts.append(TEXT_FACTS.substitute(
+                hostname=facts.get('hostname', 'N/A'),
+                vendor=facts.get('vendor', 'N/A'),
+                uptime=facts.get('uptime', 'N/A'),
+                kernel=facts.get('kernel', 'N/A'),
+                os_version=facts.get('os_version', 'N/A')
+            ))
+        
+        # Interfaces
+        if 'interfaces' in device_data:
+            parts.append("\n[INTERFACES RÉSEAU]\n")
+            for iface_name, iface_data in device_data['interfaces'].items():
+                parts.append(TEXT_INTERFACE.substitute(
+                    name=iface_name,
+                    status=iface_data.get('status', 'N/A'),
+                    mtu=iface_data.get('mtu', 'N/A')
+                ))
+                addresses = iface_data.get('addresses', [])
+                if addresses:
+                    parts.append("    Adresses IP:\n")
+                    parts.extend(f"      - {addr}\n" for addr in addresses)
+        
+        # Routes
+        if 'routes' in device_data:
+            parts.append("\n[TABLE DE ROUTAGE]\n")
+            for route, route_data in list(device_data['routes'].items())[:10]:  # Top 10
+                parts.append(TEXT_ROUTE.substitute(
+                    route=route,
+                    via=route_data.get('via', 'N/A'),
+                    interface=route_data.get('interface', 'N/A')
+                ))
+        
+        return "".join(parts)
+    
+    def generate_monitoring_report(self, monitoring_data):
+        """
+        Génère un rapport de monitoring
+        
+        Args:
+            monitoring_data: Dictionnaire ou itérateur de paires (équipement, mesures)
+        
+        Returns:
+            str: Chemin du fichier rapport
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = self._report_path(f"monitoring_report_{timestamp}.txt")
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(TEXT_HEADER.substitute(
+                title="RAPPORT DE MONITORING RÉSEAU",
+                generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ))
+            
+            for device_name, data in self._iter_results(monitoring_data):
+                f.write(TEXT_DEVICE_HEADER.substitute(name=device_name))
+                
+                if isinstance(data, dict):
+                    f.write(TEXT_MONITORING.substitute(
+                        success=data.get('success', 'N/A'),
+                        stats=data.get('stats', 'N/A')
+                    ))
+                    
+                    if 'min_rtt' in data:
+                        f.write(TEXT_RTT.substitute(
+                            min_rtt=data['min_rtt'],
+                            avg_rtt=data['avg_rtt'],
+                            max_rtt=data['max_rtt']
+                        ))
+                    
+                    f.write(f"  Timestamp: {data.get('timestamp', 'N/A')}\n")
+                f.flush()
+            
+            f.write(TEXT_FOOTER)
+        
+        print(f"[+] Rapport de monitoring généré: {filename}")
+        return str(filename)
+    
+    def generate_json_report(self, results, report_name="report"):
+        """
+        Génère un rapport au format JSON
+        
+        L'objet 'devices' est écrit équipement par équipement, le document
+        final reste un JSON standard.
+        
+        Args:
+            results: Dictionnaire ou itérateur de paires (équipement, données)
+            report_name: Nom du rapport
+        
+        Returns:
+            str: Chemin du fichier rapport
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = self._report_path(f"{report_name}_{timestamp}.json")
         
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            f.write('{\n  "timestamp": ' + json.dumps(datetime.now().isoformat()))
+            f.write(',\n  "devices": {')
+            
+            separator = "\n"
+            for device_name, device_data in self._iter_results(results):
+                f.write(separator)
+                f.write(f"    {json.dumps(str(device_name))}: ")
+                f.write(json.dumps(device_data, default=str))
+                f.flush()
+                separator = ",\n"
+            
+            f.write("\n  }\n}\n")
+        
+        print(f"[+] Rapport JSON généré: {filename}")
+        return str(filename)
+    
+    def generate_jsonl_report(self, results, report_name="report"):
+        """
+        Génère un rapport JSON Lines (un objet JSON par équipement)
+        
+        Args:
+            results: Dictionnaire ou itérateur de paires (équipement, données)
+            report_name: Nom du rapport
+        
+        Returns:
+            str: Chemin du fichier rapport
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = self._report_path(f"{report_name}_{timestamp}.jsonl")
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            for device_name, device_data in self._iter_results(results):
+                f.write(json.dumps({'device': device_name, 'data': device_data}, default=str))
+                f.write("\n")
+                f.flush()
+        
+        print(f"[+] Rapport JSON Lines généré: {filename}")
+        return str(filename)
+    
+    def generate_html_report(self, results):
+        """
+        Génère un rapport HTML interactif
+        
+        Args:
+            results: Dictionnaire ou itérateur de paires (équipement, données)
+        
+        Returns:
+            str: Chemin du fichier rapport
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = self._report_path(f"report_{timestamp}.html")
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(HTML_HEADER.substitute(generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            
+            for device_name, device_data in self._iter_results(results):
+                f.write(self.render_html_section(device_name, device_data))
+                f.flush()
+            
+            f.write(HTML_FOOTER)
         
         print(f"[+] Rapport HTML généré: {filename}")
         return str(filename)
     
+    @staticmethod
+    def render_html_section(device_name, device_data):
+        """
+        Rend la carte HTML d'un équipement
+        
+        Args:
+            device_name: Nom de l'équipement
+            device_data: Données collectées (facts, interfaces)
+        
+        Returns:
+            str: Fragment HTML
+        """
+        esc = _escape
+        parts = [HTML_DEVICE_OPEN.substitute(name=esc(device_name))]
+        
+        if 'facts' in device_data:
+            facts = device_data['facts']
+            parts.append(HTML_FACTS.substitute(
+                hostname=esc(facts.get('hostname', 'N/A')),
+                uptime=esc(facts.get('uptime', 'N/A')),
+                kernel=esc(facts.get('kernel', 'N/A')),
+                os_version=esc(facts.get('os_version', 'N/A'))
+            ))
+        parts.append(HTML_GRID_CLOSE)
+        
+        if 'interfaces' in device_data:
+            parts.append(HTML_INTERFACES_OPEN)
+            for iface_name, iface_data in device_data['interfaces'].items():
+                status = "🟢 UP" if iface_data.get('status') == 'up' else "🔴 DOWN"
+                parts.append(HTML_INTERFACE.substitute(
+                    name=esc(iface_name),
+                    status=status,
+                    mtu=esc(iface_data.get('mtu', 'N/A')),
+                    addresses=esc(', '.join(iface_data.get('addresses', ['N/A'])))
+                ))
+            parts.append(HTML_INTERFACES_CLOSE)
+        
+        parts.append(HTML_DEVICE_CLOSE)
+        return "".join(parts)
+    
+    @staticmethod
+    def _iter_results(results):
+        """Retourne un itérateur de paires (équipement, données)"""
+        if hasattr(results, 'items'):
+            return iter(results.items())
+        return iter(results)
+    
     def generate_summary(self, results):
         """
         Génère un résumé textuel
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Module d'exécution répartie sur plusieurs processus
+Un seul processus Python plafonne sur le GIL dès que l'analyse des sorties
+(JSON, /proc, compteurs) et la préparation des rapports dominent. Ici les
+équipements sont répartis entre N processus par hachage cohérent:
+
+- chaque processus garde ses équipements d'une exécution à l'autre, donc ses
+  connexions SSH persistantes et ses historiques de compteurs (worker_local);
+- en mode périodique (serve), chaque processus suit son propre calendrier
+  de sondage;
+- les résultats remontent au parent par un pipe, un enregistrement à la
+  fois, dès qu'un équipement termine;
+- passer de N à N+1 processus ne déplace qu'environ 1/(N+1) des équipements.
+
+Les métriques et spans (modules/metrics.py, modules/tracing.py) des
+processus de travail restent locaux à ces processus.
+
+    with ShardedRunner(devices, processes=4, workers=10) as runner:
+        runner.run('collect', batch.collect_device)
+        runner.serve('interfaces', batch.poll_interfaces, interval=10)
+"""
+
+import bisect
+import hashlib
+import multiprocessing
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing.connection import wait
+
+from .batch import BatchRunner
+
+# Points par processus sur l'anneau: le plus chargé reste à moins de ~20 % de la moyenne
+REPLICAS = 160
+
+# Objets propres au processus (pool SSH, historiques), voir worker_local
+_locals = {}
+
+
+def worker_local(name, factory):
+    """
+    Objet unique par processus, créé au premier appel
+
+    Une action exécutée dans un processus de travail garde ainsi son état
+    (connexions, historique des compteurs) d'un sondage à l'autre; dans le
+    processus principal, l'objet est partagé de la même façon.
+    """
+    value = _locals.get(name)
+    if value is None:
+        value = _locals.setdefault(name, factory())
+    return value
+
+
+def close_worker_locals():
+    """Ferme (close()) puis oublie les objets créés par worker_local"""
+    while _locals:
+        _, value = _locals.popitem()
+        close = getattr(value, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                print(f"[!] Fermeture impossible: {e}", file=sys.stderr)
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def device_key(device):
+    return device.get('name', device['host'])
+
+
+class HashRing:
+    """
+    Anneau de hachage cohérent (REPLICAS points par nœud)
+
+    Args:
+        nodes: Noms des nœuds (ex: shard-0 ... shard-N)
+        replicas: Points par nœud
+    """
+    def __init__(self, nodes, replicas=REPLICAS):
+        self.nodes = list(nodes)
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas))
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node(self, key):
+        """Nœud responsable d'une clé"""
+        return self._owners[bisect.bisect(self._points, _hash(key)) % len(self._points)]
+
+    def partition(self, devices, key=device_key):
+        """
+        Répartit les équipements entre les nœuds
+
+        Returns:
+            dict: {nœud: [équipements]} (ordre de la liste d'origine)
+        """
+        groups = {node: [] for node in self.nodes}
+        for device in devices:
+            groups[self.node(key(device))].append(device)
+        return groups
+
+
+def shard_names(count):
+    return [f"shard-{i}" for i in range(count)]
+
+
+def _worker_main(conn, shard, devices, workers):
+    """Processus de travail: exécute les travaux reçus sur ses équipements"""
+    # Ctrl+C est reçu par tout le groupe de processus: le parent décide de l'arrêt
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Messages des modules vers stderr: stdout est le flux NDJSON du parent
+    sys.stdout = sys.stderr
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                message = conn.recv()
+                if message[0] == 'stop':
+                    break
+                if message[0] == 'job':
+                    _run_job(conn, executor, shard, devices, *message[1:])
+    except (EOFError, BrokenPipeError):
+        pass
+    finally:
+        close_worker_locals()
+        conn.close()
+
+
+def _run_job(conn, executor, shard, devices, command, action, kwargs, interval, iterations):
+    """Passes successives sur les équipements du processus, selon son propre calendrier"""
+    iteration = 0
+    while not iterations or iteration < iterations:
+        iteration += 1
+        started = time.monotonic()
+        failed = 0
+        futures = [executor.submit(BatchRunner._run_one, command, action, device, kwargs) for device in devices]
+        for future in as_completed(futures):
+            record = future.result()
+            record['shard'] = shard
+            if 'error' in record:
+                failed += 1
+            conn.send(('record', record))
+        conn.send(('pass', {
+            'type': 'summary',
+            'command': command,
+            'shard': shard,
+            'iteration': iteration,
+            'devices': len(devices),
+            'failed': failed,
+            'duration_ms': round((time.monotonic() - started) * 1000, 1),
+            'timestamp': datetime.now().isoformat()
+        }))
+        if iterations and iteration >= iterations:
+            break
+        due = started + interval
+        # Attente de la prochaine passe, interrompue par une annulation du parent
+        if conn.poll(max(0.0, due - time.monotonic())) and conn.recv()[0] == 'cancel':
+            break
+    conn.send(('done', shard))
+
+
+class ShardedRunner(BatchRunner):
+    """
+    BatchRunner dont les équipements sont répartis entre plusieurs processus
+
+    Même flux NDJSON que BatchRunner (chaque enregistrement porte en plus son
+    champ shard). Les processus sont démarrés au premier travail (contexte
+    spawn: pas de fork d'un parent qui a déjà des threads) et gardés jusqu'à
+    close(); les actions et leurs paramètres doivent être sérialisables
+    (fonctions de module, pas de lambda).
+
+    Args:
+        devices: Équipements à répartir
+        processes: Nombre de processus de travail
+        workers: Équipements traités en parallèle dans chaque processus
+        stream: Flux de sortie NDJSON (stdout par défaut)
+    """
+    def __init__(self, devices, processes=2, workers=10, stream=None, replicas=REPLICAS):
+        super().__init__(devices, workers=workers, stream=stream)
+        self.processes = max(1, processes)
+        self.ring = HashRing(shard_names(self.processes), replicas)
+        self.shards = self.ring.partition(devices)
+        self._workers = {}
+
+    def start(self):
+        """Démarre un processus par groupe d'équipements non vide"""
+        if self._workers:
+            return self
+        context = multiprocessing.get_context('spawn')
+        for shard, devices in self.shards.items():
+            if not devices:
+                continue
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker_main, args=(child, shard, devices, self.workers),
+                                      name=f"netauto-{shard}", daemon=True)
+            process.start()
+            child.close()
+            self._workers[shard] = (process, parent)
+        return self
+
+    def run(self, command, action, **kwargs):
+        """
+        Une passe de action(device, **kwargs) sur tous les équipements
+
+        Returns:
+            dict: {nom de l'équipement: enregistrement}
+        """
+        results = {}
+        failed = 0
+        start = time.perf_counter()
+        for kind, record in self._dispatch(command, action, kwargs, 0, 1):
+            if kind == 'record':
+                results[record['device']] = record
+                if 'error' in record:
+                    failed += 1
+                self.emit(record)
+        self.emit({
+            'type': 'summary',
+            'command': command,
+            'devices': len(self.devices),
+            'failed': failed,
+            'processes': len(self._workers),
+            'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+            'timestamp': datetime.now().isoformat()
+        })
+        return results
+
+    def serve(self, command, action, interval, iterations=0, on_record=None, **kwargs):
+        """
+        Sondage périodique: chaque processus répète sa passe toutes les
+        interval secondes (iterations fois, 0 = infini)
+
+        Les enregistrements et le récapitulatif de chaque passe par processus
+        sont émis au fil de l'eau; on_record(record) est appelé dans le
+        parent pour chaque équipement (alertes...). Ctrl+C termine les
+        passes en cours puis rend la main.
+        """
+        for kind, record in self._dispatch(command, action, kwargs, interval, iterations):
+            if kind == 'record' and on_record is not None:
+                on_record(record)
+            self.emit(record)
+
+    def _dispatch(self, command, action, kwargs, interval, iterations):
+        """Envoie le travail à tous les processus et relaie leurs messages (kind, enregistrement)"""
+        self.start()
+        pending = {}
+        for shard, (_, conn) in self._workers.items():
+            conn.send(('job', command, action, kwargs, interval, iterations))
+            pending[conn] = shard
+        cancelled = False
+        while pending:
+            try:
+                ready = wait(list(pending))
+            except KeyboardInterrupt:
+                if not cancelled:
+                    print("[*] Arrêt demandé, fin des passes en cours", file=sys.stderr)
+                    cancelled = True
+                    for conn in pending:
+                        conn.send(('cancel',))
+                continue
+            for conn in ready:
+                try:
+                    kind, payload = conn.recv()
+                except EOFError:
+                    print(f"[!] Processus {pending[conn]} arrêté", file=sys.stderr)
+                    del pending[conn]
+                    continue
+                if kind == 'done':
+                    del pending[conn]
+                else:
+                    yield kind, payload
+
+    def close(self):
+        """Arrête les processus (ils ferment leurs connexions)"""
+        for process, conn in self._workers.values():
+            try:
+                conn.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+        for process, conn in self._workers.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        self._workers = {}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
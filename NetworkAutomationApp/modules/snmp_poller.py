@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+Module de sondage SNMP v2c
+Parcourt les groupes system, ifTable et ifXTable de nombreux équipements à
+la fois avec des requêtes GETBULK, sans agent ni session SSH: un seul socket
+UDP partagé par tous les équipements (asyncio), plusieurs requêtes en vol
+par équipement (ifTable et ifXTable parcourues en parallèle), délai
+d'attente et nouvelles tentatives par requête.
+
+L'encodage BER des messages SNMP est fait ici (sous-ensemble v2c: types
+de base, compteurs, exceptions de varbind). pysnmp 4.4.12 (requirements.txt,
+optionnel) n'est pas utilisé: son API asyncio (hlapi.asyncio) ne s'importe
+plus depuis Python 3.11 (asyncio.coroutine), son API synchrone exige
+pyasn1 < 0.5, et sur la même flotte de 100 équipements elle consomme
+environ 80 fois plus de CPU par cycle (benchmarks/bench_snmp.py
+--compare-pysnmp).
+Paramètres: monitoring.snmp_community / snmp_port / snmp_version de
+devices.yaml, surchargeables par équipement (mêmes clés).
+
+    poller = SNMPPoller.from_config(config.get('monitoring', {}))
+    results = poller.poll(devices)    # {nom: {'system': ..., 'interfaces': ...}}
+"""
+
+import asyncio
+import itertools
+import socket
+import time
+from datetime import datetime
+
+# ----- BER -----
+
+INTEGER, OCTET_STRING, NULL, OBJECT_ID, SEQUENCE = 0x02, 0x04, 0x05, 0x06, 0x30
+IP_ADDRESS, COUNTER32, GAUGE32, TIMETICKS, OPAQUE, COUNTER64 = 0x40, 0x41, 0x42, 0x43, 0x44, 0x46
+NO_SUCH_OBJECT, NO_SUCH_INSTANCE, END_OF_MIB_VIEW = 0x80, 0x81, 0x82
+GET, GET_NEXT, RESPONSE, GET_BULK = 0xA0, 0xA1, 0xA2, 0xA5
+VERSION_2C = 1
+
+# Tampon de réception du socket partagé (plafonné par net.core.rmem_max)
+RECEIVE_BUFFER = 4 * 1024 * 1024
+
+UNSIGNED_TYPES = (COUNTER32, GAUGE32, TIMETICKS, COUNTER64)
+EXCEPTIONS = (NO_SUCH_OBJECT, NO_SUCH_INSTANCE, END_OF_MIB_VIEW)
+
+
+class SNMPError(Exception):
+    """Réponse SNMP en erreur (error-status non nul) ou message illisible"""
+
+
+def _length(n):
+    if n < 0x80:
+        return bytes((n,))
+    encoded = n.to_bytes((n.bit_length() + 7) // 8, 'big')
+    return bytes((0x80 | len(encoded),)) + encoded
+
+
+def _tlv(tag, payload):
+    return bytes((tag,)) + _length(len(payload)) + payload
+
+
+def encode_oid(oid):
+    """OID (tuple d'entiers) -> contenu BER"""
+    body = bytearray()
+    for arc in (oid[0] * 40 + oid[1],) + tuple(oid[2:]):
+        if arc < 0x80:
+            body.append(arc)
+            continue
+        groups = []
+        while arc:
+            groups.append(arc & 0x7F)
+            arc >>= 7
+        body.extend(group | 0x80 for group in reversed(groups[1:]))
+        body.append(groups[0])
+    return bytes(body)
+
+
+def decode_oid(data):
+    if data.isascii():
+        # Cas courant: tous les arcs < 128, un octet chacun
+        first = data[0] // 40 if data[0] < 80 else 2
+        return (first, data[0] - 40 * first) + tuple(data[1:])
+    arcs = []
+    arc = 0
+    for byte in data:
+        arc = (arc << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            arcs.append(arc)
+            arc = 0
+    # Premier sous-identifiant: 40 * arc1 + arc2 (arc1 <= 2)
+    first = min(arcs[0] // 40, 2)
+    return (first, arcs[0] - 40 * first) + tuple(arcs[1:])
+
+
+def encode_value(tag, value):
+    """Valeur SNMP -> TLV BER"""
+    if tag == INTEGER:
+        size = (value if value >= 0 else ~value).bit_length() // 8 + 1
+        return _tlv(tag, value.to_bytes(size, 'big', signed=True))
+    if tag in UNSIGNED_TYPES:
+        return _tlv(tag, value.to_bytes(value.bit_length() // 8 + 1, 'big'))
+    if tag in (OCTET_STRING, OPAQUE):
+        return _tlv(tag, value.encode('utf-8') if isinstance(value, str) else value)
+    if tag == OBJECT_ID:
+        return _tlv(tag, encode_oid(value))
+    if tag == IP_ADDRESS:
+        return _tlv(tag, socket.inet_aton(value))
+    # NULL et exceptions (noSuchObject, endOfMibView...): contenu vide
+    return _tlv(tag, b'')
+
+
+def decode_value(tag, data):
+    if tag == INTEGER:
+        return int.from_bytes(data, 'big', signed=True)
+    if tag in UNSIGNED_TYPES:
+        return int.from_bytes(data, 'big')
+    if tag in (OCTET_STRING, OPAQUE):
+        return bytes(data)
+    if tag == OBJECT_ID:
+        return decode_oid(data)
+    if tag == IP_ADDRESS:
+        return socket.inet_ntoa(data)
+    return None
+
+
+def _read(data, pos):
+    """TLV à la position pos -> (tag, début du contenu, fin du contenu)"""
+    tag, length = data[pos], data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[pos:pos + size], 'big')
+        pos += size
+    if pos + length > len(data):
+        raise SNMPError("Message SNMP tronqué")
+    return tag, pos, pos + length
+
+
+def encode_message(community, pdu_type, request_id, varbinds, error_status=0, error_index=0):
+    """
+    Message SNMP v2c
+
+    Args:
+        community: Communauté (str ou bytes)
+        pdu_type: GET, GET_NEXT, GET_BULK ou RESPONSE
+        request_id: Identifiant de la requête
+        varbinds: [(oid, tag, valeur)] (requêtes: tag NULL)
+        error_status, error_index: Pour GETBULK, non-repeaters et max-repetitions
+
+    Returns:
+        bytes: Datagramme à envoyer
+    """
+    bindings = b''.join(
+        _tlv(SEQUENCE, _tlv(OBJECT_ID, encode_oid(oid)) + encode_value(tag, value))
+        for oid, tag, value in varbinds
+    )
+    pdu = _tlv(pdu_type, encode_value(INTEGER, request_id) + encode_value(INTEGER, error_status)
+               + encode_value(INTEGER, error_index) + _tlv(SEQUENCE, bindings))
+    if isinstance(community, str):
+        community = community.encode('utf-8')
+    return _tlv(SEQUENCE, encode_value(INTEGER, VERSION_2C) + _tlv(OCTET_STRING, community) + pdu)
+
+
+def decode_message(data):
+    """
+    Datagramme SNMP -> dict (version, community, pdu_type, request_id,
+    error_status, error_index, varbinds [(oid, tag, valeur)])
+    """
+    try:
+        tag, pos, end = _read(data, 0)
+        if tag != SEQUENCE:
+            raise SNMPError("Message SNMP invalide")
+        tag, start, pos = _read(data, pos)
+        version = decode_value(INTEGER, data[start:pos])
+        tag, start, pos = _read(data, pos)
+        community = bytes(data[start:pos])
+        pdu_type, pos, end = _read(data, pos)
+        fields = []
+        for _ in range(3):
+            tag, start, pos = _read(data, pos)
+            fields.append(decode_value(INTEGER, data[start:pos]))
+        tag, pos, end = _read(data, pos)
+        varbinds = []
+        while pos < end:
+            # Varbind SEQUENCE { OID, valeur }: longueurs courtes (< 128) lues en ligne
+            if data[pos + 1] & 0x80:
+                _, start, pos = _read(data, pos)
+            else:
+                start, pos = pos + 2, pos + 2 + data[pos + 1]
+            oid_end = start + 2 + data[start + 1]
+            oid = decode_oid(data[start + 2:oid_end])
+            tag = data[oid_end]
+            if data[oid_end + 1] & 0x80:
+                tag, value_start, value_end = _read(data, oid_end)
+            else:
+                value_start = oid_end + 2
+                value_end = value_start + data[oid_end + 1]
+            if value_end > end:
+                raise SNMPError("Varbind tronqué")
+            varbinds.append((oid, tag, decode_value(tag, data[value_start:value_end])))
+    except (IndexError, ValueError) as e:
+        raise SNMPError(f"Message SNMP illisible: {e}") from e
+    return {
+        'version': version, 'community': community, 'pdu_type': pdu_type,
+        'request_id': fields[0], 'error_status': fields[1], 'error_index': fields[2],
+        'varbinds': varbinds
+    }
+
+
+# ----- MIB -----
+
+def parse_oid(text):
+    """'1.3.6.1' -> (1, 3, 6, 1)"""
+    return tuple(int(arc) for arc in text.strip('.').split('.'))
+
+
+SYSTEM = {
+    'descr': parse_oid('1.3.6.1.2.1.1.1'),
+    'object_id': parse_oid('1.3.6.1.2.1.1.2'),
+    'uptime': parse_oid('1.3.6.1.2.1.1.3'),
+    'contact': parse_oid('1.3.6.1.2.1.1.4'),
+    'name': parse_oid('1.3.6.1.2.1.1.5'),
+    'location': parse_oid('1.3.6.1.2.1.1.6'),
+}
+IF_TABLE = {
+    'descr': parse_oid('1.3.6.1.2.1.2.2.1.2'),
+    'type': parse_oid('1.3.6.1.2.1.2.2.1.3'),
+    'mtu': parse_oid('1.3.6.1.2.1.2.2.1.4'),
+    'speed': parse_oid('1.3.6.1.2.1.2.2.1.5'),
+    'oper_status': parse_oid('1.3.6.1.2.1.2.2.1.8'),
+    'in_octets': parse_oid('1.3.6.1.2.1.2.2.1.10'),
+    'in_ucast_pkts': parse_oid('1.3.6.1.2.1.2.2.1.11'),
+    'in_discards': parse_oid('1.3.6.1.2.1.2.2.1.13'),
+    'in_errors': parse_oid('1.3.6.1.2.1.2.2.1.14'),
+    'out_octets': parse_oid('1.3.6.1.2.1.2.2.1.16'),
+    'out_ucast_pkts': parse_oid('1.3.6.1.2.1.2.2.1.17'),
+    'out_discards': parse_oid('1.3.6.1.2.1.2.2.1.19'),
+    'out_errors': parse_oid('1.3.6.1.2.1.2.2.1.20'),
+}
+IFX_TABLE = {
+    'name': parse_oid('1.3.6.1.2.1.31.1.1.1.1'),
+    'hc_in_octets': parse_oid('1.3.6.1.2.1.31.1.1.1.6'),
+    'hc_in_ucast_pkts': parse_oid('1.3.6.1.2.1.31.1.1.1.7'),
+    'hc_out_octets': parse_oid('1.3.6.1.2.1.31.1.1.1.10'),
+    'hc_out_ucast_pkts': parse_oid('1.3.6.1.2.1.31.1.1.1.11'),
+    'high_speed': parse_oid('1.3.6.1.2.1.31.1.1.1.15'),
+}
+OPER_STATUS = {1: 'UP', 2: 'DOWN', 3: 'TESTING', 4: 'UNKNOWN', 5: 'DORMANT',
+               6: 'NOTPRESENT', 7: 'LOWERLAYERDOWN'}
+# Compteurs exposés (ordre de interface_poller.COUNTERS): (64 bits, repli 32 bits)
+COUNTER_SOURCES = (
+    ('rx_bytes', 'hc_in_octets', 'in_octets'),
+    ('tx_bytes', 'hc_out_octets', 'out_octets'),
+    ('rx_packets', 'hc_in_ucast_pkts', 'in_ucast_pkts'),
+    ('tx_packets', 'hc_out_ucast_pkts', 'out_ucast_pkts'),
+    ('rx_errors', None, 'in_errors'),
+    ('tx_errors', None, 'out_errors'),
+    ('rx_dropped', None, 'in_discards'),
+    ('tx_dropped', None, 'out_discards'),
+)
+
+
+def _text(value):
+    return value.decode('utf-8', 'replace') if isinstance(value, bytes) else value
+
+
+def build_result(scalars, if_rows, ifx_rows):
+    """Valeurs parcourues -> dict system / interfaces (clé: ifName, à défaut ifDescr)"""
+    system = {name: scalars.get(column) for name, column in SYSTEM.items()}
+    system = {
+        'name': _text(system['name']),
+        'descr': _text(system['descr']),
+        'object_id': '.'.join(map(str, system['object_id'])) if system['object_id'] else None,
+        'uptime_seconds': system['uptime'] / 100 if system['uptime'] is not None else None,
+        'contact': _text(system['contact']),
+        'location': _text(system['location']),
+    }
+    interfaces = {}
+    for index in sorted(if_rows):
+        row = dict(if_rows[index], **ifx_rows.get(index, {}))
+        name = _text(row.get('name') or row.get('descr')) or f"if{index[0]}"
+        speed = row.get('high_speed') or (row['speed'] / 1e6 if row.get('speed') else None)
+        entry = {
+            'index': index[0],
+            'descr': _text(row.get('descr')),
+            'type': row.get('type'),
+            'mtu': row.get('mtu'),
+            'speed_mbps': speed,
+            'operstate': OPER_STATUS.get(row.get('oper_status'), 'UNKNOWN'),
+        }
+        for counter, wide, narrow in COUNTER_SOURCES:
+            value = row.get(wide) if wide else None
+            entry[counter] = value if value is not None else row.get(narrow, 0)
+        interfaces[name] = entry
+    return {'system': system, 'interfaces': interfaces}
+
+
+def link_snapshot(result):
+    """
+    Résultat SNMP -> instantané au format de interface_poller.parse_link_stats,
+    pour calculer débits et historique avec InterfacePoller.update
+    (horloge: sysUpTime de l'agent)
+    """
+    from .interface_poller import COUNTERS
+    return {
+        'uptime': result['system']['uptime_seconds'],
+        'links': [
+            (name, entry['operstate'], entry['mtu'], tuple(entry[counter] for counter in COUNTERS))
+            for name, entry in result['interfaces'].items()
+        ],
+        'speeds': {name: entry['speed_mbps'] for name, entry in result['interfaces'].items() if entry['speed_mbps']},
+    }
+
+
+# ----- Transport asyncio -----
+
+class _Protocol(asyncio.DatagramProtocol):
+    """Socket UDP partagé: aiguille chaque réponse vers la requête en attente (request-id)"""
+    def __init__(self, poller):
+        self.poller = poller
+
+    def datagram_received(self, data, addr):
+        try:
+            message = decode_message(data)
+        except SNMPError:
+            self.poller.stats['invalid'] += 1
+            return
+        pending = self.poller._pending.get(message['request_id'])
+        # Réponse tardive (après expiration) ou d'une autre source: ignorée
+        if pending is None or pending[0] != addr[:2] or pending[1].done():
+            self.poller.stats['unexpected'] += 1
+            return
+        pending[1].set_result(message)
+
+    def error_received(self, exc):
+        # ICMP port injoignable: la requête concernée expirera
+        self.poller.stats['icmp_errors'] += 1
+
+
+class SNMPPoller:
+    """
+    Sondage SNMP v2c asynchrone d'une flotte d'équipements
+
+    Args:
+        community: Communauté par défaut
+        port: Port UDP par défaut
+        version: Version par défaut (seule '2c' est prise en charge: GETBULK)
+        timeout: Délai d'attente d'une réponse (s), doublé à chaque nouvelle tentative
+        retries: Nouvelles tentatives après expiration
+        max_repetitions: Lignes demandées par colonne et par GETBULK
+        max_inflight: Requêtes en vol au plus, tous équipements confondus
+    """
+    def __init__(self, community='public', port=161, version='2c', timeout=1.0, retries=2,
+                 max_repetitions=10, max_inflight=256):
+        self.community = community
+        self.port = port
+        self.version = str(version)
+        self.timeout = timeout
+        self.retries = retries
+        self.max_repetitions = max_repetitions
+        self.max_inflight = max_inflight
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._transport = None
+        self._slots = None
+        self.stats = {}
+        self.reset_stats()
+
+    @classmethod
+    def from_config(cls, monitoring, **kwargs):
+        """Poller configuré par la section monitoring de devices.yaml"""
+        return cls(
+            community=monitoring.get('snmp_community', 'public'),
+            port=monitoring.get('snmp_port', 161),
+            version=monitoring.get('snmp_version', '2c'),
+            **kwargs
+        )
+
+    def reset_stats(self):
+        self.stats = {'requests': 0, 'responses': 0, 'timeouts': 0, 'retries': 0,
+                      'invalid': 0, 'unexpected': 0, 'icmp_errors': 0}
+
+    def _next_id(self):
+        request_id = next(self._ids)
+        if request_id >= 2**31 - 1:
+            self._ids = itertools.count(1)
+        return request_id
+
+    async def _request(self, address, community, pdu_type, oids, non_repeaters=0, max_repetitions=0):
+        """Envoie une requête et attend sa réponse (nouvelles tentatives sur expiration)"""
+        request_id = self._next_id()
+        packet = encode_message(community, pdu_type, request_id,
+                                [(o, NULL, None) for o in oids], non_repeaters, max_repetitions)
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            try:
+                for attempt in range(self.retries + 1):
+                    future = loop.create_future()
+                    self._pending[request_id] = (address, future)
+                    self._transport.sendto(packet, address)
+                    self.stats['requests'] += 1
+                    if attempt:
+                        self.stats['retries'] += 1
+                    try:
+                        # Délai doublé à chaque tentative: un agent surchargé n'est pas inondé
+                        message = await asyncio.wait_for(future, self.timeout * 2**attempt)
+                    except asyncio.TimeoutError:
+                        self.stats['timeouts'] += 1
+                        continue
+                    self.stats['responses'] += 1
+                    if message['error_status']:
+                        raise SNMPError(f"error-status {message['error_status']} "
+                                        f"(varbind {message['error_index']})")
+                    return message
+            finally:
+                self._pending.pop(request_id, None)
+        raise TimeoutError(f"Pas de réponse SNMP de {address[0]}:{address[1]}")
+
+    async def walk(self, address, community, columns, scalars=()):
+        """
+        Parcourt des colonnes de table en GETBULK (et lit des scalaires au passage)
+
+        Les scalaires sont demandés en non-repeaters (sémantique GETNEXT:
+        sysName -> sysName.0) dans la première requête uniquement.
+
+        Args:
+            address: (ip, port)
+            columns: OID des colonnes à parcourir ensemble
+            scalars: OID (sans .0) des scalaires
+
+        Returns:
+            tuple: ({oid scalaire: valeur}, {oid colonne: {index: valeur}})
+        """
+        values = {}
+        rows = {column: {} for column in columns}
+        cursor = {column: column for column in columns}
+        active = list(columns)
+        pending_scalars = list(scalars)
+        while active or pending_scalars:
+            request = pending_scalars + [cursor[column] for column in active]
+            message = await self._request(address, community, GET_BULK, request,
+                                          len(pending_scalars), self.max_repetitions)
+            varbinds = message['varbinds']
+            for requested, (_, tag, value) in zip(pending_scalars, varbinds):
+                if tag not in EXCEPTIONS:
+                    values[requested] = value
+            repeated = varbinds[len(pending_scalars):]
+            pending_scalars = []
+            if not active:
+                break
+
+            finished, progressed = set(), False
+            for i, (found, tag, value) in enumerate(repeated):
+                column = active[i % len(active)]
+                if column in finished:
+                    continue
+                if tag == END_OF_MIB_VIEW or found[:len(column)] != column or found <= cursor[column]:
+                    finished.add(column)
+                    continue
+                rows[column][found[len(column):]] = value
+                cursor[column] = found
+                progressed = True
+            active = [column for column in active if column not in finished]
+            if not progressed:
+                break
+        return values, rows
+
+    @staticmethod
+    def _pivot(rows, table):
+        """{oid colonne: {index: valeur}} -> {index: {nom: valeur}}"""
+        pivot = {}
+        for name, column in table.items():
+            for index, value in rows.get(column, {}).items():
+                pivot.setdefault(index, {})[name] = value
+        return pivot
+
+    async def poll_device(self, device):
+        """
+        Sonde system, ifTable et ifXTable d'un équipement
+
+        Returns:
+            dict: system, interfaces {nom: état, vitesse, compteurs}, ou error
+        """
+        start = time.perf_counter()
+        result = {'timestamp': datetime.now().isoformat()}
+        try:
+            version = str(device.get('snmp_version', self.version))
+            if version != '2c':
+                raise SNMPError(f"SNMP v{version} non pris en charge (GETBULK v2c uniquement)")
+            community = device.get('snmp_community', self.community)
+            port = device.get('snmp_port', self.port)
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                device['host'], port, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+            address = infos[0][4][:2]
+            # Deux parcours en vol en même temps: system + ifTable, ifXTable
+            (scalars, if_rows), (_, ifx_rows) = await asyncio.gather(
+                self.walk(address, community, list(IF_TABLE.values()), list(SYSTEM.values())),
+                self.walk(address, community, list(IFX_TABLE.values()))
+            )
+            result.update(build_result(
+                scalars, self._pivot(if_rows, IF_TABLE), self._pivot(ifx_rows, IFX_TABLE)))
+        except (SNMPError, TimeoutError, OSError) as e:
+            result['error'] = str(e) or e.__class__.__name__
+        result['duration_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    async def poll_many(self, devices):
+        """Sonde tous les équipements sur un socket UDP partagé (résultats dans l'ordre)"""
+        loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.max_inflight)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Réponses en rafale de centaines d'agents: le tampon par défaut (~200 Ko)
+        # déborde et les datagrammes perdus deviennent des expirations
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        sock.bind(('0.0.0.0', 0))
+        self._transport, _ = await loop.create_datagram_endpoint(lambda: _Protocol(self), sock=sock)
+        try:
+            return await asyncio.gather(*(self.poll_device(device) for device in devices))
+        finally:
+            self._transport.close()
+            self._transport = None
+            self._pending.clear()
+
+    def poll(self, devices):
+        """
+        Sonde une flotte (boucle asyncio dédiée)
+
+        Returns:
+            dict: {nom de l'équipement: résultat de poll_device}
+        """
+        results = asyncio.run(self.poll_many(devices))
+        return {device.get('name', device['host']): result for device, result in zip(devices, results)}
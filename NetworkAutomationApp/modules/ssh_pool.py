@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Module de connexions SSH persistantes
+Garde une connexion paramiko ouverte par équipement et la réutilise d'une
+commande à l'autre: un sondage périodique ne paie la négociation SSH
+(échange de clés, authentification) qu'une fois, puis un canal par commande.
+
+    pool = SSHConnectionPool()
+    output = pool.run(device, "ip -j -s link")
+    ...
+    pool.close_all()
+"""
+
+import threading
+
+from .monitoring import NetworkMonitoring
+
+# Keepalive SSH (s): détecte les connexions coupées entre deux sondages
+KEEPALIVE_SECONDS = 30
+
+
+class SSHConnectionPool:
+    """
+    Une connexion SSH ouverte par équipement, rouverte si elle tombe
+
+    Les commandes vers un même équipement sont sérialisées (un verrou par
+    équipement); des équipements différents sont interrogés en parallèle.
+
+    Args:
+        timeout: Délai de connexion (s)
+        keepalive: Intervalle des keepalive SSH (s), 0 pour les désactiver
+    """
+    def __init__(self, timeout=5, keepalive=KEEPALIVE_SECONDS):
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self._clients = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(device):
+        return device.get('name', device['host'])
+
+    def _device_lock(self, key):
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _client(self, key, device):
+        """Connexion active de l'équipement (ouverte au besoin); appelé sous le verrou de l'équipement"""
+        client = self._clients.get(key)
+        transport = client.get_transport() if client else None
+        if transport is not None and transport.is_active():
+            return client
+        if client is not None:
+            client.close()
+        client = NetworkMonitoring._ssh_connect(device, timeout=self.timeout)
+        if self.keepalive:
+            client.get_transport().set_keepalive(self.keepalive)
+        self._clients[key] = client
+        return client
+
+    def run(self, device, command):
+        """
+        Exécute une commande sur la connexion persistante de l'équipement
+
+        Une commande qui échoue sur une connexion réutilisée (coupée côté
+        équipement depuis le sondage précédent) est rejouée une fois sur
+        une connexion neuve.
+
+        Returns:
+            str: stdout de la commande
+        """
+        key = self.key(device)
+        with self._device_lock(key):
+            reused = key in self._clients
+            try:
+                return NetworkMonitoring._ssh_run(self._client(key, device), command)
+            except Exception:
+                self._drop(key)
+                if not reused:
+                    raise
+            return NetworkMonitoring._ssh_run(self._client(key, device), command)
+
+    def _drop(self, key):
+        client = self._clients.pop(key, None)
+        if client is not None:
+            client.close()
+
+    def close(self, device):
+        """Ferme la connexion d'un équipement"""
+        key = self.key(device)
+        with self._device_lock(key):
+            self._drop(key)
+
+    def close_all(self):
+        """Ferme toutes les connexions"""
+        with self._lock:
+            keys = list(self._clients)
+        for key in keys:
+            with self._device_lock(key):
+                self._drop(key)
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close_all()
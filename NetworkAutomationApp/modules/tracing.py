@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Module de traces d'exécution
+Spans horodatés par étape et par équipement, écrits au format Chrome trace
+JSON (ouvrir le fichier dans chrome://tracing ou https://ui.perfetto.dev).
+
+Chaque équipement a sa propre ligne (lane): les équipements en queue de
+distribution et les étapes exécutées en série sont visibles d'un coup d'oeil.
+Les spans hors équipement vont sur la ligne du thread courant.
+
+Désactivé, span() retourne un context manager sans effet.
+
+    from modules import tracing
+    tracing.start()
+    with tracing.device('server-01'), tracing.span('ping'):
+        ...
+    tracing.save('trace.json')
+"""
+
+import json
+import os
+import threading
+import time
+
+# Première ligne réservée aux équipements (les threads utilisent leur ident)
+DEVICE_LANE_BASE = 1000
+
+_enabled = False
+_lock = threading.Lock()
+_events = []
+_lanes = {}       # nom de l'équipement -> tid
+_lane_names = {}  # tid -> nom affiché
+_local = threading.local()
+_origin = time.perf_counter()
+
+
+class _NullSpan:
+    """Span sans effet (traces désactivées)"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        complete(self.name, self.start, time.perf_counter() - self.start, self.category, **self.args)
+        return False
+
+
+class _DeviceLane:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.previous = getattr(_local, 'device', None)
+        _local.device = self.name
+        return self
+
+    def __exit__(self, *exc):
+        _local.device = self.previous
+        return False
+
+
+def start():
+    """Active la collecte et efface les spans précédents"""
+    global _enabled, _origin
+    with _lock:
+        _events.clear()
+        _lanes.clear()
+        _lane_names.clear()
+        _origin = time.perf_counter()
+    _enabled = True
+
+
+def stop():
+    """Désactive la collecte (les spans collectés sont conservés)"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def _lane(device=None):
+    """tid de la ligne: équipement courant, sinon thread courant"""
+    device = device or getattr(_local, 'device', None)
+    if device is None:
+        tid = threading.get_ident()
+        if tid not in _lane_names:
+            _lane_names[tid] = threading.current_thread().name
+        return tid
+    tid = _lanes.get(device)
+    if tid is None:
+        tid = _lanes[device] = DEVICE_LANE_BASE + len(_lanes)
+        _lane_names[tid] = device
+    return tid
+
+
+def device(name):
+    """Context manager: les spans du bloc vont sur la ligne de l'équipement"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _DeviceLane(name)
+
+
+def span(name, category='stage', **args):
+    """
+    Context manager qui enregistre la durée du bloc
+
+    Args:
+        name: Nom du span (ping, ssh_connect, command, parse...)
+        category: Catégorie Chrome trace (filtrable dans la vue)
+        **args: Attributs affichés dans le détail du span
+
+    Returns:
+        Context manager
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def complete(name, start, duration, category='stage', lane=None, **args):
+    """
+    Enregistre un span déjà mesuré (ex: rendu dans un processus fils)
+
+    Args:
+        name: Nom du span
+        start: Début (valeur de time.perf_counter())
+        duration: Durée en secondes
+        category: Catégorie Chrome trace
+        lane: Nom de ligne explicite (défaut: équipement ou thread courant)
+        **args: Attributs du span
+    """
+    if not _enabled:
+        return
+    event = {
+        'name': name,
+        'cat': category,
+        'ph': 'X',
+        'ts': round((start - _origin) * 1e6, 1),
+        'dur': round(duration * 1e6, 1),
+        'pid': os.getpid(),
+        'args': args
+    }
+    with _lock:
+        event['tid'] = _lane(lane)
+        _events.append(event)
+
+
+def events():
+    """Spans collectés, précédés des métadonnées de nommage des lignes"""
+    pid = os.getpid()
+    with _lock:
+        spans = list(_events)
+        lanes = dict(_lane_names)
+    metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                 'args': {'name': 'NetworkAutomationApp'}}]
+    for tid, name in lanes.items():
+        metadata.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        # Threads d'abord, puis équipements dans l'ordre d'apparition
+        sort_index = tid - DEVICE_LANE_BASE + 1 if tid >= DEVICE_LANE_BASE and tid in _lanes.values() else 0
+        metadata.append({'name': 'thread_sort_index', 'ph': 'M', 'pid': pid, 'tid': tid,
+                         'args': {'sort_index': sort_index}})
+    return metadata + sorted(spans, key=lambda event: event['ts'])
+
+
+def save(path):
+    """
+    Écrit la trace au format Chrome trace JSON (écriture atomique)
+
+    Returns:
+        int: Nombre de spans écrits
+    """
+    trace = {'traceEvents': events(), 'displayTimeUnit': 'ms'}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(trace, f)
+    os.replace(tmp_path, path)
+    return sum(1 for event in trace['traceEvents'] if event['ph'] == 'X')